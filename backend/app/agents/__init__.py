@@ -18,29 +18,28 @@ __all__ = [
     "ContentAnalysisAgent",
 ]
 
-# 延迟导入，避免循环依赖
+# 进程级单例：由组件注册表创建并复用（延迟导入，避免循环依赖）
 def get_video_analysis_agent():
     """获取视频拆解Agent实例"""
-    from app.agents.video_analysis_agent import VideoAnalysisAgent
-    return VideoAnalysisAgent()
+    from app.core.registry import registry
+    return registry.get("video_analysis_agent")
 
 def get_relevance_analysis_agent():
     """获取关联度分析Agent实例"""
-    from app.agents.relevance_analysis_agent import RelevanceAnalysisAgent
-    return RelevanceAnalysisAgent()
+    from app.core.registry import registry
+    return registry.get("relevance_analysis_agent")
 
 def get_script_generation_agent():
     """获取脚本生成Agent实例"""
-    from app.agents.script_generation_agent import ScriptGenerationAgent
-    return ScriptGenerationAgent()
+    from app.core.registry import registry
+    return registry.get("script_generation_agent")
 
 def get_content_structure_agent():
     """获取内容结构Agent实例"""
-    from app.agents.content_structure_agent import ContentStructureAgent
-    return ContentStructureAgent()
+    from app.core.registry import registry
+    return registry.get("content_structure_agent")
 
 def get_content_analysis_agent():
     """获取内容分析Agent实例"""
-    from app.agents.content_analysis_agent import ContentAnalysisAgent
-    return ContentAnalysisAgent()
-
+    from app.core.registry import registry
+    return registry.get("content_analysis_agent")
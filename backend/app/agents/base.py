@@ -5,12 +5,17 @@ Agent基类
 from abc import ABC, abstractmethod
 from typing import Dict, Any, List, Optional
 from loguru import logger
+from app.core.config import settings
 from app.utils.deepseek import DeepSeekClient
 
 
 class BaseAgent(ABC):
     """Agent基类"""
     
+    # LLM响应缓存时间（秒）：None使用LLM_CACHE_DEFAULT_TTL，0表示不缓存
+    # 可通过配置LLM_CACHE_AGENT_TTLS按类名覆盖
+    llm_cache_ttl: Optional[int] = None
+    
     def __init__(self, model_name: str = "deepseek-chat", api_key: Optional[str] = None):
         """
         初始化Agent
@@ -20,7 +25,8 @@ class BaseAgent(ABC):
             api_key: API密钥，如果为None则从配置读取
         """
         self.model_name = model_name
-        self.llm_client = DeepSeekClient(api_key=api_key)
+        cache_ttl = settings.LLM_CACHE_AGENT_TTLS.get(self.__class__.__name__, self.llm_cache_ttl)
+        self.llm_client = DeepSeekClient(api_key=api_key, cache_ttl=cache_ttl)
         self.tools = self._init_tools()
         self.agent = self._create_agent()
         logger.info(f"初始化Agent: {self.__class__.__name__}")
@@ -27,6 +27,9 @@ class ContentAnalysis(BaseModel):
 class ContentAnalysisAgent(BaseAgent):
     """内容分析Agent - 分析视频内容并评估电商适配性"""
     
+    # 同一视频内容的分析结果稳定，缓存7天
+    llm_cache_ttl = 7 * 86400
+    
     def _init_tools(self) -> List:
         """初始化工具"""
         return []
@@ -26,6 +26,9 @@ class VideoStructure(BaseModel):
 class ContentStructureAgent(BaseAgent):
     """内容结构Agent - 提取视频结构化信息"""
     
+    # 视频结构提取结果稳定，缓存7天
+    llm_cache_ttl = 7 * 86400
+    
     def __init__(self):
         super().__init__()
         # 使用本地视频分析工具包（PySceneDetect + Whisper + MoviePy）
@@ -9,15 +9,20 @@ from app.agents.base import BaseAgent
 from app.tools.analysis_tools import calculate_semantic_similarity, analyze_sentiment
 from app.tools.websearch_tools import web_search, search_endorsements
 from app.services.config.live_room_config import LiveRoomConfigService
+from app.utils.embedding import EmbeddingClient
 
 
 class RelevanceAnalysisAgent(BaseAgent):
     """关联度分析Agent（增强版：支持配置文件）"""
     
+    # 直播间画像会调整，匹配结果缓存1天（画像变化时提示词不同，自然不会命中旧缓存）
+    llm_cache_ttl = 86400
+    
     def __init__(self, model_name: str = "deepseek-chat", api_key: str = None):
         """初始化Agent"""
         super().__init__(model_name, api_key)
         self.config_service = LiveRoomConfigService()
+        self.embedding_client = EmbeddingClient()
     
     def _init_tools(self) -> List:
         """初始化工具"""
@@ -147,6 +152,120 @@ PRACTICE: 提供可执行的匹配建议和优化方向
             # 使用旧版本：向后兼容
             return await self._execute_legacy(input_data)
     
+    async def execute_batch(
+        self,
+        hotspots: List[Dict[str, Any]],
+        target_text: str,
+        target_category: str = ""
+    ) -> List[Dict[str, Any]]:
+        """
+        批量关联度分析：把多个热点打包进一次LLM调用
+
+        Args:
+            hotspots: 热点列表（每项包含title、tags，可选content_analysis）
+            target_text: 直播间或商品的描述文本
+            target_category: 直播间或商品类目（可选）
+
+        Returns:
+            与输入顺序一致的结果列表，每项包含：
+                - relevance_score: 关联度分数 (0-1)，LLM未给出时为None
+                - reason: 判断原因
+        """
+        if not hotspots:
+            return []
+
+        if not target_text:
+            raise ValueError("target_text不能为空")
+
+        import time
+        start_time = time.time()
+
+        hotspot_lines = []
+        for idx, hotspot in enumerate(hotspots, 1):
+            title = hotspot.get("title", "")
+            tags = hotspot.get("tags") or []
+            line = f"{idx}. 标题：{title}"
+            if tags:
+                line += f"；标签：{', '.join(str(t) for t in tags)}"
+
+            content_analysis = hotspot.get("content_analysis") or {}
+            if isinstance(content_analysis, str):
+                try:
+                    content_analysis = json.loads(content_analysis)
+                except json.JSONDecodeError:
+                    content_analysis = {}
+            if isinstance(content_analysis, dict):
+                summary = content_analysis.get("summary", "")
+                if summary:
+                    line += f"；摘要：{summary[:100]}"
+                ecommerce_fit = content_analysis.get("ecommerce_fit", {})
+                if isinstance(ecommerce_fit, dict) and ecommerce_fit.get("applicable_categories"):
+                    line += f"；适用类目：{', '.join(ecommerce_fit.get('applicable_categories', []))}"
+            hotspot_lines.append(line)
+
+        batch_prompt = f"""
+请批量评估以下 {len(hotspots)} 个热点与目标直播间/商品的匹配度。
+
+目标信息：
+{target_text.strip()}
+{f"类目：{target_category}" if target_category else ""}
+
+热点列表：
+{chr(10).join(hotspot_lines)}
+
+评分要求：
+- 按照系统提示词中的匹配度评分标准，为每个热点给出0-1之间的综合匹配度
+- 适用类目与目标类目完全不匹配时，匹配度不超过0.4
+- 主题完全不相关时，匹配度低于0.2
+
+请只返回JSON数组，不要输出其他内容，格式如下：
+[
+    {{"index": 1, "relevance_score": 0.0, "reason": "一句话原因"}},
+    ...
+]
+"""
+
+        logger.info(f"🔍 [匹配Agent] 批量分析开始: {len(hotspots)} 个热点")
+        response = await self.llm_client.generate(
+            prompt=batch_prompt,
+            system_prompt=self._get_system_prompt(),
+            temperature=0.3,
+            max_tokens=min(4000, 200 + 80 * len(hotspots))
+        )
+        content = response.get("choices", [{}])[0].get("message", {}).get("content", "")
+
+        results = [{"relevance_score": None, "reason": ""} for _ in hotspots]
+        for item in self._parse_batch_response(content):
+            try:
+                index = int(item.get("index", 0))
+                score = float(item.get("relevance_score"))
+            except (TypeError, ValueError):
+                continue
+            if 1 <= index <= len(hotspots):
+                results[index - 1] = {
+                    "relevance_score": max(0.0, min(1.0, score)),
+                    "reason": item.get("reason", "")
+                }
+
+        scored_count = sum(1 for r in results if r["relevance_score"] is not None)
+        logger.info(f"✅ [匹配Agent] 批量分析完成: {scored_count}/{len(hotspots)} 个热点已评分, 耗时 {time.time() - start_time:.2f}秒")
+        return results
+
+    def _parse_batch_response(self, content: str) -> List[Dict[str, Any]]:
+        """从LLM返回内容中解析批量评分JSON数组"""
+        if "[" not in content or "]" not in content:
+            logger.warning("⚠️  [匹配Agent] 批量分析返回内容中未找到JSON数组")
+            return []
+
+        json_str = content[content.find("["):content.rfind("]") + 1]
+        try:
+            data = json.loads(json_str)
+        except json.JSONDecodeError as e:
+            logger.warning(f"⚠️  [匹配Agent] 批量分析JSON解析失败: {e}")
+            return []
+
+        return [item for item in data if isinstance(item, dict)]
+
     async def _execute_with_content_package(
         self,
         content_package: Dict[str, Any],
@@ -163,7 +282,8 @@ PRACTICE: 提供可执行的匹配建议和优化方向
             # 1. 加载直播间配置
             step_start = time.time()
             logger.info(f"🔍 [匹配Agent] 步骤1: 加载直播间配置")
-            live_room_profile = self.config_service.get_live_room_profile(live_room_name)
+            live_room = self.config_service.get_live_room_entry(live_room_name)
+            live_room_profile = live_room["profile_text"]
             step_time = time.time() - step_start
             logger.info(f"✅ [匹配Agent] 步骤1完成: 直播间配置加载成功, 耗时 {step_time:.2f}秒")
             logger.debug(f"🔍 [匹配Agent] 直播间画像长度: {len(live_room_profile)}")
@@ -205,7 +325,7 @@ PRACTICE: 提供可执行的匹配建议和优化方向
                 try:
                     logger.info(f"🔍 [匹配Agent] 检测到人物: {detected_person}，查找代言信息")
                     # 获取直播间类目用于过滤
-                    category = live_room_profile.split("类目：")[1].split("\n")[0] if "类目：" in live_room_profile else None
+                    category = live_room["category"] or None
                     endorsement_info = search_endorsements(detected_person, category)
                     logger.info(f"✅ [匹配Agent] 找到 {endorsement_info.get('total', 0)} 条代言信息")
                 except Exception as e:
@@ -300,7 +420,7 @@ PRACTICE: 提供可执行的匹配建议和优化方向
             endorsement_bonus = 0.0
             if endorsement_info and endorsement_info.get("total", 0) > 0:
                 # 检查代言信息中是否包含直播间类目相关的品牌
-                category = live_room_profile.split("类目：")[1].split("\n")[0] if "类目：" in live_room_profile else ""
+                category = live_room["category"]
                 if category:
                     for endo in endorsement_info.get("endorsements", []):
                         snippet = endo.get("snippet", "").lower()
@@ -313,11 +433,16 @@ PRACTICE: 提供可执行的匹配建议和优化方向
             relevance_score = ecommerce_score * 0.7 + endorsement_bonus  # 基础分 + 代言加分
             logger.debug(f"🔍 [匹配Agent] 基础匹配度（基于电商适配性）: {relevance_score:.3f} = {ecommerce_score:.3f} * 0.7 + {endorsement_bonus:.3f}")
             
-            # 6. 计算语义相似度（作为补充）
+            # 6. 计算语义相似度（作为补充，直播间画像的embedding进程内缓存）
             hotspot_text = f"{title} {summary}"
-            live_room_text = live_room_profile
-            logger.debug(f"🔍 [匹配Agent] 计算语义相似度: 热点文本长度={len(hotspot_text)}, 直播间文本长度={len(live_room_text)}")
-            semantic_score = calculate_semantic_similarity(hotspot_text, live_room_text)
+            logger.debug(f"🔍 [匹配Agent] 计算语义相似度: 热点文本长度={len(hotspot_text)}, 直播间文本长度={len(live_room_profile)}")
+            room_vector = await self.config_service.get_live_room_embedding(live_room_name, self.embedding_client)
+            hotspot_vector = await self.embedding_client.get_embedding(hotspot_text) if room_vector is not None else None
+            if hotspot_vector is None:
+                logger.warning("无法获取embedding，返回0相似度")
+                semantic_score = 0.0
+            else:
+                semantic_score = self.embedding_client.cosine_similarity(hotspot_vector, room_vector)
             logger.debug(f"🔍 [匹配Agent] 语义相似度: {semantic_score:.3f}")
             
             # 综合匹配度
@@ -372,7 +497,12 @@ PRACTICE: 提供可执行的匹配建议和优化方向
         # 1. 计算语义相似度
         step_start = time.time()
         logger.info(f"🔍 [匹配Agent] 步骤1: 计算语义相似度")
-        semantic_score = calculate_semantic_similarity(hotspot_text, product_text)
+        # 异步路径直接使用EmbeddingClient（远程接口或配置的本地后端），同步工具在远程配置下会降级为字符哈希向量
+        try:
+            semantic_score = await self.embedding_client.calculate_semantic_similarity(hotspot_text, product_text)
+        except Exception as e:
+            logger.warning(f"⚠️ [匹配Agent] 语义相似度计算失败: {e}")
+            semantic_score = 0.0
         step_time = time.time() - step_start
         logger.info(f"✅ [匹配Agent] 步骤1完成: 语义相似度={semantic_score:.3f}, 耗时 {step_time:.2f}秒")
         logger.debug(f"🔍 [匹配Agent] 语义相似度计算详情: 热点文本长度={len(hotspot_text)}, 商品文本长度={len(product_text)}")
@@ -11,6 +11,9 @@ from app.tools.database_tools import get_hotspot_info, get_product_info, get_ana
 class ScriptGenerationAgent(BaseAgent):
     """脚本生成Agent"""
     
+    # 脚本生成需要每次产生不同的创意，不缓存LLM响应
+    llm_cache_ttl = 0
+    
     def _init_tools(self) -> List:
         """初始化工具"""
         return [
@@ -10,6 +10,9 @@ from app.agents.base import BaseAgent
 class VideoAnalysisAgent(BaseAgent):
     """视频拆解Agent"""
     
+    # 同一视频的拆解结果稳定，缓存7天
+    llm_cache_ttl = 7 * 86400
+    
     def _init_tools(self) -> List:
         """初始化工具"""
         # 视频拆解工具在execute中直接调用，这里暂时返回空列表
@@ -89,8 +92,8 @@ class VideoAnalysisAgent(BaseAgent):
             analysis = "分析完成"
         
         # 3. 解析和结构化数据
-        from app.services.analysis.service import VideoAnalysisService
-        analysis_service = VideoAnalysisService()
+        from app.core.registry import get_video_analysis_service
+        analysis_service = get_video_analysis_service()
         structured_report = analysis_service.parse_report(raw_data)
         
         # 4. 添加LLM分析结果
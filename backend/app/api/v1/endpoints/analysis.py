@@ -2,13 +2,14 @@
 视频拆解API端点
 """
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import FileResponse
 from typing import List, Optional
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
+from app.core.registry import get_video_analysis_service
 from app.models.analysis import AnalysisReport
-from app.services.analysis.service import VideoAnalysisService
 from app.services.analysis.tasks import analyze_video_async
 
 router = APIRouter()
@@ -21,7 +22,7 @@ class AnalyzeRequest(BaseModel):
 
 
 @router.post("/analyze")
-async def analyze_video(request: AnalyzeRequest):
+def analyze_video(request: AnalyzeRequest):
     """分析视频"""
     # 异步触发Celery任务
     task = analyze_video_async.delay(request.video_url, request.options)
@@ -34,7 +35,7 @@ async def analyze_video(request: AnalyzeRequest):
 
 
 @router.get("/reports")
-async def get_reports(
+def get_reports(
     limit: int = 20,
     offset: int = 0,
     video_url: Optional[str] = None,
@@ -70,7 +71,7 @@ async def get_reports(
 
 
 @router.get("/reports/{report_id}")
-async def get_report_detail(
+def get_report_detail(
     report_id: str,
     db: Session = Depends(get_db)
 ):
@@ -83,7 +84,7 @@ async def get_report_detail(
         raise HTTPException(status_code=404, detail="拆解报告不存在")
     
     # 提取爆款技巧
-    service = VideoAnalysisService()
+    service = get_video_analysis_service()
     techniques = service.extract_techniques({
         "shot_table": report.shot_table or [],
         "golden_3s": report.golden_3s or {},
@@ -110,17 +111,120 @@ async def get_report_detail(
 
 
 @router.post("/batch")
-async def batch_analyze(video_urls: List[str]):
-    """批量分析视频"""
-    task_ids = []
-    for video_url in video_urls[:10]:  # 最多10个
-        task = analyze_video_async.delay(video_url)
-        task_ids.append(task.id)
+def batch_analyze(
+    video_urls: List[str],
+    force: bool = False,
+    max_age_days: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    """批量分析视频
+    
+    - 批次内重复的URL只分析一次
+    - 已有报告（默认最近ANALYSIS_REPORT_MAX_AGE_DAYS天内更新过）直接复用，force=true时全部重新分析
+    - 其余URL由一个编排任务分发，返回的task_id可通过 GET /analysis/batch/{task_id} 查询每个URL的进度
+    """
+    from app.core.config import settings
+    from app.services.analysis.tasks import analyze_video_batch_async
+    
+    unique_urls = list(dict.fromkeys(url.strip() for url in video_urls if url and url.strip()))
+    if not unique_urls:
+        raise HTTPException(status_code=400, detail="video_urls不能为空")
+    if len(unique_urls) > settings.ANALYSIS_BATCH_MAX_URLS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"单次最多分析{settings.ANALYSIS_BATCH_MAX_URLS}个视频"
+        )
+    
+    reused = {}
+    if not force:
+        service = get_video_analysis_service()
+        existing = service.find_existing_reports(
+            db,
+            unique_urls,
+            max_age_days=settings.ANALYSIS_REPORT_MAX_AGE_DAYS if max_age_days is None else max_age_days
+        )
+        reused = {url: report.id for url, report in existing.items()}
+    
+    pending_urls = [url for url in unique_urls if url not in reused]
+    task = analyze_video_batch_async.delay(pending_urls, None, reused)
     
     return {
         "status": "success",
-        "task_ids": task_ids,
-        "total": len(video_urls),
-        "message": f"批量分析任务已启动，共 {len(task_ids)} 个任务"
+        "task_id": task.id,
+        "total": len(unique_urls),
+        "pending": len(pending_urls),
+        "reused": [{"video_url": url, "report_id": report_id} for url, report_id in reused.items()],
+        "message": f"批量分析任务已启动，需分析 {len(pending_urls)} 个视频，复用已有报告 {len(reused)} 个"
     }
 
+
+@router.get("/batch/{task_id}")
+def get_batch_progress(task_id: str):
+    """查询批量分析进度（每个URL的状态）"""
+    from celery.result import AsyncResult
+    from app.celery_app import celery_app
+    
+    batch = AsyncResult(task_id, app=celery_app)
+    if batch.state != "SUCCESS":
+        return {
+            "task_id": task_id,
+            "state": "FAILURE" if batch.state == "FAILURE" else "PENDING",
+            "status": "批量任务分发失败" if batch.state == "FAILURE" else "批量任务等待分发..."
+        }
+    
+    dispatched = batch.result or {}
+    items = []
+    counts = {"success": 0, "error": 0, "running": 0, "pending": 0}
+    
+    for reused in dispatched.get("reused", []):
+        items.append({**reused, "state": "SUCCESS", "reused": True})
+        counts["success"] += 1
+    
+    for item in dispatched.get("items", []):
+        child = AsyncResult(item["task_id"], app=celery_app)
+        entry = {"video_url": item["video_url"], "task_id": item["task_id"], "state": child.state}
+        if child.state == "SUCCESS":
+            result = child.result or {}
+            if result.get("status") == "success":
+                entry["report_id"] = result.get("report_id")
+                counts["success"] += 1
+            else:
+                entry["state"] = "FAILURE"
+                entry["error"] = result.get("message")
+                counts["error"] += 1
+        elif child.state in ("FAILURE", "REVOKED"):
+            entry["error"] = str(child.info) if child.info else "未知错误"
+            counts["error"] += 1
+        elif child.state in ("STARTED", "PROGRESS"):
+            entry["status"] = (child.info or {}).get("status") if isinstance(child.info, dict) else None
+            counts["running"] += 1
+        else:
+            counts["pending"] += 1
+        items.append(entry)
+    
+    total = len(items)
+    done = counts["success"] + counts["error"]
+    return {
+        "task_id": task_id,
+        "state": "SUCCESS" if done == total else "PROGRESS",
+        "current": done,
+        "total": total,
+        "counts": counts,
+        "items": items
+    }
+
+
+@router.get("/frames/{frame_id}")
+def get_key_frame(frame_id: str):
+    """获取关键帧缩略图（JPEG）"""
+    from app.utils.frame_store import get_frame_store
+    
+    path = get_frame_store().get_path(frame_id)
+    if not path:
+        raise HTTPException(status_code=404, detail="关键帧不存在")
+    # 按内容哈希寻址，内容不会变化，可以长期缓存
+    return FileResponse(
+        path,
+        media_type="image/jpeg",
+        headers={"Cache-Control": "public, max-age=31536000, immutable"}
+    )
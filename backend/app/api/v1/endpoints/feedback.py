@@ -29,7 +29,7 @@ class FeedbackUpdate(BaseModel):
 
 
 @router.get("/")
-async def get_feedbacks(
+def get_feedbacks(
     status: Optional[str] = None,
     feedback_type: Optional[str] = None,
     limit: int = 50,
@@ -72,7 +72,7 @@ async def get_feedbacks(
 
 
 @router.post("/")
-async def create_feedback(
+def create_feedback(
     feedback: FeedbackCreate,
     db: Session = Depends(get_db)
 ):
@@ -111,7 +111,7 @@ async def create_feedback(
 
 
 @router.put("/{feedback_id}")
-async def update_feedback(
+def update_feedback(
     feedback_id: str,
     feedback_update: FeedbackUpdate,
     db: Session = Depends(get_db)
@@ -148,7 +148,7 @@ async def update_feedback(
 
 
 @router.delete("/{feedback_id}")
-async def delete_feedback(
+def delete_feedback(
     feedback_id: str,
     db: Session = Depends(get_db)
 ):
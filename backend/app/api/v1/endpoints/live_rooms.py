@@ -32,7 +32,7 @@ class LiveRoomUpdate(BaseModel):
 
 
 @router.get("/")
-async def get_live_rooms(
+def get_live_rooms(
     category: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
@@ -66,7 +66,7 @@ async def get_live_rooms(
 
 
 @router.post("/")
-async def create_live_room(
+def create_live_room(
     room: LiveRoomCreate,
     db: Session = Depends(get_db)
 ):
@@ -86,7 +86,7 @@ async def create_live_room(
 
 
 @router.get("/{room_id}")
-async def get_live_room_detail(
+def get_live_room_detail(
     room_id: str,
     db: Session = Depends(get_db)
 ):
@@ -108,7 +108,7 @@ async def get_live_room_detail(
 
 
 @router.put("/{room_id}")
-async def update_live_room(
+def update_live_room(
     room_id: str,
     room: LiveRoomUpdate,
     db: Session = Depends(get_db)
@@ -131,7 +131,7 @@ async def update_live_room(
 
 
 @router.delete("/{room_id}")
-async def delete_live_room(
+def delete_live_room(
     room_id: str,
     db: Session = Depends(get_db)
 ):
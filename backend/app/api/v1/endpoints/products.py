@@ -43,7 +43,7 @@ class ProductUpdate(BaseModel):
 
 
 @router.get("/")
-async def get_products(
+def get_products(
     live_room_id: Optional[str] = None,
     live_date: Optional[str] = None,
     limit: int = 20,
@@ -88,7 +88,7 @@ async def get_products(
 
 
 @router.post("/")
-async def create_product(
+def create_product(
     product: ProductCreate,
     db: Session = Depends(get_db)
 ):
@@ -115,7 +115,7 @@ async def create_product(
 
 
 @router.get("/{product_id}")
-async def get_product_detail(
+def get_product_detail(
     product_id: str,
     db: Session = Depends(get_db)
 ):
@@ -142,7 +142,7 @@ async def get_product_detail(
 
 
 @router.put("/{product_id}")
-async def update_product(
+def update_product(
     product_id: str,
     product: ProductUpdate,
     db: Session = Depends(get_db)
@@ -2,24 +2,24 @@
 脚本生成API端点
 """
 from fastapi import APIRouter, HTTPException, Depends
-from fastapi.responses import Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
 from typing import Optional
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
-from reportlab.lib import colors
-from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY
-from io import BytesIO
+from sqlalchemy.orm import Session, defer, selectinload
 import json
 
 from app.core.database import get_db
+from app.core.registry import get_script_service
 from app.models.script import Script
-from app.models.hotspot import Hotspot
-from app.models.product import Product
-from app.services.script.service import ScriptGeneratorService
+from app.services.script.pdf import (
+    build_pdf_payload,
+    content_disposition,
+    get_script_pdf,
+    invalidate_script_pdf,
+    pdf_filename,
+    stream_scripts_zip,
+)
 from app.services.script.tasks import generate_script_async
 
 router = APIRouter()
@@ -47,7 +47,7 @@ class ScriptUpdate(BaseModel):
 
 
 @router.post("/generate")
-async def generate_script(request: GenerateScriptRequest):
+def generate_script(request: GenerateScriptRequest):
     """生成脚本"""
     # 验证duration范围
     if request.duration < 5 or request.duration > 15:
@@ -86,7 +86,7 @@ async def generate_script(request: GenerateScriptRequest):
 
 
 @router.get("/")
-async def get_scripts(
+def get_scripts(
     product_id: Optional[str] = None,
     status: Optional[str] = None,
     limit: int = 20,
@@ -104,6 +104,12 @@ async def get_scripts(
         query = query.filter(Script.status == status)
     
     total = query.count()
+    
+    # 列表视图不加载脚本正文、分镜等大字段；分组视图批量预加载商品和热点（固定查询次数，与分页大小无关）
+    query = query.options(*[defer(getattr(Script, column)) for column in Script.LIST_DEFERRED_COLUMNS])
+    if group_by_product:
+        query = query.options(selectinload(Script.product), selectinload(Script.hotspot))
+    
     scripts = query.order_by(
         Script.created_at.desc()
     ).offset(offset).limit(limit).all()
@@ -130,21 +136,18 @@ async def get_scripts(
         }
     
     # 按商品-热点分组
-    from app.models.product import Product
-    from app.models.hotspot import Hotspot
     from collections import defaultdict
     
     # 构建分组结构：商品 -> 热点 -> 脚本列表
     grouped = defaultdict(lambda: defaultdict(list))
+    products = {}
+    hotspots_by_id = {}
     
     for s in scripts:
-        # 获取商品信息
-        product = db.query(Product).filter(Product.id == s.product_id).first()
-        product_name = product.name if product else f"商品({s.product_id[:8]}...)"
-        
-        # 获取热点信息
-        hotspot = db.query(Hotspot).filter(Hotspot.id == s.hotspot_id).first() if s.hotspot_id else None
-        hotspot_title = hotspot.title if hotspot else f"热点({s.hotspot_id[:8]}...)" if s.hotspot_id else "无热点"
+        # 商品和热点已通过selectinload预加载
+        products[s.product_id] = s.product
+        if s.hotspot_id:
+            hotspots_by_id[s.hotspot_id] = s.hotspot
         
         # 构建脚本信息
         script_info = {
@@ -164,7 +167,7 @@ async def get_scripts(
     # 转换为前端需要的格式
     result_items = []
     for prod_id, hotspots in grouped.items():
-        product = db.query(Product).filter(Product.id == prod_id).first()
+        product = products.get(prod_id)
         product_info = {
             "product_id": prod_id,
             "product_name": product.name if product else f"商品({prod_id[:8]}...)",
@@ -173,7 +176,7 @@ async def get_scripts(
         }
         
         for hotspot_id, scripts_list in hotspots.items():
-            hotspot = db.query(Hotspot).filter(Hotspot.id == hotspot_id).first() if hotspot_id else None
+            hotspot = hotspots_by_id.get(hotspot_id) if hotspot_id else None
             hotspot_info = {
                 "hotspot_id": hotspot_id,
                 "hotspot_title": hotspot.title if hotspot else f"热点({hotspot_id[:8]}...)" if hotspot_id else "无热点",
@@ -194,7 +197,7 @@ async def get_scripts(
 
 
 @router.get("/{script_id}")
-async def get_script_detail(
+def get_script_detail(
     script_id: str,
     db: Session = Depends(get_db)
 ):
@@ -220,7 +223,7 @@ async def get_script_detail(
 
 
 @router.put("/{script_id}")
-async def update_script(
+def update_script(
     script_id: str,
     script_update: ScriptUpdate,
     db: Session = Depends(get_db)
@@ -232,6 +235,9 @@ async def update_script(
     
     update_data = script_update.dict(exclude_unset=True)
     
+    # 旧版本的PDF缓存失效
+    invalidate_script_pdf(script)
+    
     if "script_content" in update_data:
         script.script_content = update_data["script_content"]
     if "shot_list" in update_data:
@@ -264,183 +270,71 @@ async def export_script_pdf(
     script_id: str,
     db: Session = Depends(get_db)
 ):
-    """导出脚本为PDF"""
-    script = db.query(Script).filter(Script.id == script_id).first()
-    if not script:
+    """导出脚本为PDF（渲染在线程池中执行，结果按脚本ID+更新时间缓存）"""
+    def load_payload():
+        script = db.query(Script).options(
+            selectinload(Script.product), selectinload(Script.hotspot)
+        ).filter(Script.id == script_id).first()
+        return build_pdf_payload(script) if script else None
+    
+    payload = await run_in_threadpool(load_payload)
+    if not payload:
         raise HTTPException(status_code=404, detail="脚本不存在")
     
-    # 获取关联的商品和热点信息
-    product = db.query(Product).filter(Product.id == script.product_id).first()
-    hotspot = db.query(Hotspot).filter(Hotspot.id == script.hotspot_id).first() if script.hotspot_id else None
-    
-    # 生成PDF
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4)
-    story = []
-    
-    # 定义样式
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=24,
-        textColor=colors.HexColor('#1f2937'),
-        spaceAfter=30,
-        alignment=TA_CENTER
-    )
-    heading_style = ParagraphStyle(
-        'CustomHeading',
-        parent=styles['Heading2'],
-        fontSize=16,
-        textColor=colors.HexColor('#374151'),
-        spaceAfter=12,
-        spaceBefore=20
-    )
-    normal_style = ParagraphStyle(
-        'CustomNormal',
-        parent=styles['Normal'],
-        fontSize=11,
-        textColor=colors.HexColor('#4b5563'),
-        leading=16,
-        alignment=TA_JUSTIFY
-    )
-    
-    # 标题
-    video_info = script.video_info or {}
-    title = video_info.get('title', '未命名脚本')
-    story.append(Paragraph(title, title_style))
-    story.append(Spacer(1, 0.3*inch))
-    
-    # 基本信息
-    story.append(Paragraph("基本信息", heading_style))
-    
-    meta_data = [
-        ["商品名称", product.name if product else "未知"],
-        ["商品品类", product.category if product else "未知"],
-        ["视频时长", f"{video_info.get('duration', 10)}秒"],
-        ["视频主题", video_info.get('theme', '无')],
-        ["核心卖点", video_info.get('core_selling_point', '无')],
-    ]
-    
-    if hotspot:
-        meta_data.append(["关联热点", hotspot.title])
-        meta_data.append(["热点平台", hotspot.platform])
-    
-    meta_table = Table(meta_data, colWidths=[2*inch, 4*inch])
-    meta_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#f3f4f6')),
-        ('TEXTCOLOR', (0, 0), (-1, -1), colors.HexColor('#1f2937')),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-        ('TOPPADDING', (0, 0), (-1, -1), 8),
-        ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#e5e7eb')),
-    ]))
-    story.append(meta_table)
-    story.append(Spacer(1, 0.3*inch))
-    
-    # 脚本内容
-    if script.script_content:
-        story.append(Paragraph("脚本内容", heading_style))
-        story.append(Paragraph(script.script_content.replace('\n', '<br/>'), normal_style))
-        story.append(Spacer(1, 0.3*inch))
-    
-    # 分镜列表
-    shot_list = script.shot_list or []
-    if shot_list:
-        story.append(Paragraph("分镜列表", heading_style))
-        
-        # 分镜表格表头
-        shot_table_data = [["镜头", "时间", "景别", "画面内容", "台词", "动作", "音乐", "作用", "塑造点"]]
-        
-        for i, shot in enumerate(shot_list, 1):
-            shot_table_data.append([
-                str(i),
-                shot.get('time_range', ''),
-                shot.get('shot_type', ''),
-                shot.get('content', '')[:50] + ('...' if len(shot.get('content', '')) > 50 else ''),
-                shot.get('dialogue', '')[:50] + ('...' if len(shot.get('dialogue', '')) > 50 else ''),
-                shot.get('action', '')[:30] + ('...' if len(shot.get('action', '')) > 30 else ''),
-                shot.get('music', '')[:30] + ('...' if len(shot.get('music', '')) > 30 else ''),
-                shot.get('purpose', '')[:30] + ('...' if len(shot.get('purpose', '')) > 30 else ''),
-                shot.get('shaping_point', '')[:30] + ('...' if len(shot.get('shaping_point', '')) > 30 else ''),
-            ])
-        
-        # 创建分镜表格（由于列太多，需要调整列宽）
-        shot_table = Table(shot_table_data, colWidths=[
-            0.3*inch, 0.6*inch, 0.5*inch, 1.2*inch, 1.2*inch, 
-            0.8*inch, 0.8*inch, 0.8*inch, 0.8*inch
-        ])
-        shot_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#374151')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 8),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-            ('TOPPADDING', (0, 0), (-1, -1), 6),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#e5e7eb')),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f9fafb')]),
-        ]))
-        story.append(shot_table)
-        story.append(Spacer(1, 0.3*inch))
-    
-    # 制作要点
-    production_notes = script.production_notes or {}
-    if production_notes:
-        story.append(Paragraph("制作要点", heading_style))
-        
-        if production_notes.get('shooting_tips'):
-            story.append(Paragraph("<b>拍摄要点：</b>", normal_style))
-            for tip in production_notes.get('shooting_tips', []):
-                story.append(Paragraph(f"• {tip}", normal_style))
-            story.append(Spacer(1, 0.2*inch))
-        
-        if production_notes.get('editing_tips'):
-            story.append(Paragraph("<b>剪辑要点：</b>", normal_style))
-            for tip in production_notes.get('editing_tips', []):
-                story.append(Paragraph(f"• {tip}", normal_style))
-            story.append(Spacer(1, 0.2*inch))
-        
-        if production_notes.get('key_points'):
-            story.append(Paragraph("<b>关键要点：</b>", normal_style))
-            for point in production_notes.get('key_points', []):
-                story.append(Paragraph(f"• {point}", normal_style))
-    
-    # 生成PDF
-    doc.build(story)
-    buffer.seek(0)
-    
-    # 返回PDF文件
-    # 处理文件名编码：使用URL编码确保中文字符正确传输
-    import urllib.parse
-    safe_title = urllib.parse.quote(title.encode('utf-8'))
-    filename = f"脚本_{safe_title}.pdf"
+    pdf_bytes = await get_script_pdf(payload)
     
     return Response(
-        content=buffer.getvalue(),
+        content=pdf_bytes,
         media_type="application/pdf",
         headers={
-            "Content-Disposition": f"attachment; filename*=UTF-8''{filename}",
+            "Content-Disposition": content_disposition(pdf_filename(payload)),
             "Content-Type": "application/pdf"
         }
     )
 
 
+@router.get("/products/{product_id}/export-zip")
+async def export_product_scripts_zip(
+    product_id: str,
+    status: str = "approved",
+    db: Session = Depends(get_db)
+):
+    """批量导出商品下指定状态（默认已通过）的脚本PDF，以ZIP流返回"""
+    def load_payloads():
+        scripts = db.query(Script).options(
+            selectinload(Script.product), selectinload(Script.hotspot)
+        ).filter(
+            Script.product_id == product_id,
+            Script.status == status
+        ).order_by(Script.created_at.desc()).all()
+        return [build_pdf_payload(script) for script in scripts]
+    
+    payloads = await run_in_threadpool(load_payloads)
+    if not payloads:
+        raise HTTPException(status_code=404, detail="没有可导出的脚本")
+    
+    return StreamingResponse(
+        stream_scripts_zip(payloads),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": content_disposition(f"脚本_{product_id[:8]}_{status}.zip")
+        }
+    )
+
+
 @router.post("/{script_id}/optimize")
 async def optimize_script(
     script_id: str,
     db: Session = Depends(get_db)
 ):
     """获取脚本优化建议"""
-    script = db.query(Script).filter(Script.id == script_id).first()
+    script = await run_in_threadpool(
+        lambda: db.query(Script).filter(Script.id == script_id).first()
+    )
     if not script:
         raise HTTPException(status_code=404, detail="脚本不存在")
     
-    service = ScriptGeneratorService()
+    service = get_script_service()
     suggestions = await service.get_optimization_suggestions(script)
     
     return {
@@ -456,7 +350,7 @@ class RegenerateScriptRequest(BaseModel):
 
 
 @router.post("/{script_id}/regenerate")
-async def regenerate_script(
+def regenerate_script(
     script_id: str,
     request: RegenerateScriptRequest,
     db: Session = Depends(get_db)
@@ -104,3 +104,24 @@ async def set_deepseek_api_key(request: DeepSeekApiKeyRequest) -> dict:
             detail=f"保存API Key失败: {str(e)}"
         )
 
+
+
+@router.get("/cache-stats")
+async def get_cache_stats() -> dict:
+    """获取缓存命中率统计（当前进程）"""
+    from app.utils.cache import get_all_cache_stats
+    from app.utils.deepseek import get_llm_cache_stats
+    from app.utils.embedding import get_embedding_cache_stats
+    
+    caches = get_all_cache_stats()
+    caches["embedding"] = get_embedding_cache_stats()
+    caches["llm"] = get_llm_cache_stats()
+    return {"caches": caches}
+
+
+@router.get("/relevance-cascade-stats")
+async def get_relevance_cascade_stats() -> dict:
+    """获取关联度级联筛选各阶段的通过/拒绝数和耗时（当前进程）"""
+    from app.services.hotspot.cascade import get_cascade_stats
+    
+    return get_cascade_stats()
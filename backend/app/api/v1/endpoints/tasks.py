@@ -8,7 +8,7 @@ router = APIRouter()
 
 
 @router.get("/{task_id}")
-async def get_task_status(task_id: str):
+def get_task_status(task_id: str):
     """查询任务状态"""
     from celery.result import AsyncResult
     task = AsyncResult(task_id, app=celery_app)
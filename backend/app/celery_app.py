@@ -3,6 +3,8 @@ Celery应用配置
 """
 from celery import Celery
 from celery.schedules import crontab
+from celery.signals import worker_process_init, worker_process_shutdown
+from kombu import Queue
 from app.core.config import settings
 
 celery_app = Celery(
@@ -39,8 +41,51 @@ celery_app.conf.update(
     task_soft_time_limit=25 * 60,  # 25分钟
     # macOS 上使用 solo pool
     worker_pool=worker_pool,
+    # 未指定-Q启动的worker同时消费默认队列和热点增强队列（docker/systemd/开发脚本均不带-Q）
+    task_default_queue="celery",
+    task_queues=(
+        Queue("celery"),
+        Queue("enrichment"),
+    ),
+    # 热点内容增强走独立队列，可单独启动worker横向扩展（-Q enrichment）
+    task_routes={
+        "app.services.hotspot.tasks.enrich_hotspot_task": {"queue": "enrichment"},
+    },
+    # Redis传输下按消息优先级消费（0最高），高价值热点先增强
+    broker_transport_options={
+        "queue_order_strategy": "priority",
+        "priority_steps": list(range(10)),
+        "sep": ":",
+    },
 )
 
+
+@worker_process_init.connect
+def warmup_components_on_init(**kwargs):
+    """worker子进程启动时在后台线程预热服务和Agent单例（solo pool下首次使用时创建）
+
+    worker_process_init处理函数返回后子进程才会向主进程发送WORKER_UP，
+    预热耗时超过worker_proc_alive_timeout（默认4秒）会导致子进程被反复杀掉重启，
+    因此不在信号处理函数中同步预热。预热期间到达的任务通过注册表的锁等待同一个实例。
+    """
+    if not settings.REGISTRY_WARMUP_ON_STARTUP:
+        return None
+    import threading
+    from app.core.registry import registry
+    thread = threading.Thread(target=registry.warmup, name="registry-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+@worker_process_shutdown.connect
+def close_http_clients_on_shutdown(**kwargs):
+    """worker子进程退出时关闭共享HTTP连接池和转录服务"""
+    from app.utils.http_client import close_all_http_clients
+    from app.utils.transcription import shutdown_transcription_service
+    close_all_http_clients()
+    shutdown_transcription_service()
+
+
 # 定时任务配置
 celery_app.conf.beat_schedule = {
     "fetch-daily-hotspots": {
@@ -57,3 +102,11 @@ celery_app.conf.beat_schedule = {
     },
 }
 
+# 增量抓取热点（只处理相对上一次快照新增或变化的热点）
+if settings.HOTSPOT_INCREMENTAL_FETCH_MINUTES > 0:
+    celery_app.conf.beat_schedule["fetch-incremental-hotspots"] = {
+        "task": "app.services.hotspot.tasks.fetch_daily_hotspots",
+        "schedule": settings.HOTSPOT_INCREMENTAL_FETCH_MINUTES * 60,
+        "kwargs": {"incremental": True},
+    }
+
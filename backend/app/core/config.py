@@ -3,7 +3,7 @@
 """
 from pydantic_settings import BaseSettings
 from pydantic import computed_field
-from typing import List
+from typing import Dict, List
 
 
 class Settings(BaseSettings):
@@ -56,15 +56,51 @@ class Settings(BaseSettings):
     REDIS_DB: int = 0
     REDIS_PASSWORD: str = ""
     
+    # 缓存配置
+    CACHE_USE_REDIS: bool = True  # 是否使用Redis作为二级缓存（False时仅使用进程内LRU）
+    CACHE_REDIS_RETRY_INTERVAL: int = 60  # Redis访问失败后暂停使用Redis缓存的时间（秒）
+    EMBEDDING_CACHE_TTL: int = 30 * 86400  # embedding缓存过期时间（秒），默认30天
+    EMBEDDING_CACHE_MAX_LOCAL: int = 5000  # embedding进程内缓存最大条目数
+    EMBEDDING_BATCH_SIZE: int = 64  # 单次/v1/embeddings请求（或本地模型单次推理）的最大输入数
+    
+    # Embedding后端配置
+    EMBEDDING_BACKEND: str = "remote"  # remote（远程/v1/embeddings）、onnx（本地ONNX模型）、hashing（字符n-gram哈希，零依赖）；切换后需重建热点向量索引
+    EMBEDDING_HASHING_DIM: int = 1024  # 字符哈希向量维度
+    EMBEDDING_HASHING_NGRAM_RANGE: List[int] = [2, 3]  # 字符哈希使用的n-gram长度范围（含两端）
+    EMBEDDING_ONNX_MODEL_PATH: str = ""  # ONNX句向量模型文件路径（需要安装onnxruntime、tokenizers）
+    EMBEDDING_ONNX_TOKENIZER_PATH: str = ""  # 与模型配套的tokenizer.json路径
+    EMBEDDING_ONNX_MAX_LENGTH: int = 128  # 输入文本截断的最大token数
+    EMBEDDING_ONNX_THREADS: int = 0  # ONNX推理线程数，0表示由onnxruntime自动决定
+    
     # Celery配置
     CELERY_BROKER_URL: str = "redis://localhost:6379/0"
     CELERY_RESULT_BACKEND: str = "redis://localhost:6379/0"
     
+    # 组件注册表配置
+    REGISTRY_WARMUP_ON_STARTUP: bool = True  # 启动时（API进程/Celery worker子进程）预热服务和Agent单例
+    
+    # 出站HTTP客户端配置（共享连接池）
+    HTTP_CLIENT_HTTP2: bool = True  # 是否启用HTTP/2（需要安装h2：pip install httpx[http2]，未安装时自动使用HTTP/1.1）
+    HTTP_CLIENT_MAX_CONNECTIONS: int = 100  # 每个连接池的最大连接数
+    HTTP_CLIENT_MAX_KEEPALIVE: int = 20  # 每个连接池保持的空闲keep-alive连接数
+    HTTP_CLIENT_KEEPALIVE_EXPIRY: float = 30.0  # 空闲连接保持时间（秒）
+    HTTP_CLIENT_TIMEOUT: float = 60.0  # 默认请求超时（秒）
+    HTTP_CLIENT_CONNECT_TIMEOUT: float = 10.0  # 建立连接超时（秒）
+    HTTP_CLIENT_CONNECT_RETRIES: int = 2  # 建立连接失败时的重试次数
+    HTTP_CLIENT_MAX_RETRIES: int = 2  # 429/5xx等可重试响应的最大重试次数
+    HTTP_CLIENT_RETRY_BACKOFF: float = 0.5  # 重试退避基数（秒），按指数增长
+    
     # DeepSeek API配置
     DEEPSEEK_API_KEY: str = ""
     DEEPSEEK_API_BASE: str = "https://api.deepseek.com"
     DEEPSEEK_MODEL: str = "deepseek-chat"
     
+    # LLM响应缓存配置
+    LLM_CACHE_ENABLED: bool = True  # 是否缓存LLM响应（按模型+提示词指纹）
+    LLM_CACHE_DEFAULT_TTL: int = 86400  # 默认缓存时间（秒），各Agent可通过llm_cache_ttl覆盖
+    LLM_CACHE_MAX_LOCAL: int = 500  # 进程内缓存最大条目数
+    LLM_CACHE_AGENT_TTLS: Dict[str, int] = {}  # 按Agent类名覆盖缓存时间（秒），如 {"RelevanceAnalysisAgent": 3600}，0表示不缓存
+    
     # TrendRadar配置
     TRENDRADAR_API_URL: str = ""  # MCP服务地址，如: http://localhost:3333/mcp 或 HTTP API地址
     TRENDRADAR_API_KEY: str = ""  # 如果MCP服务需要认证，填写API Key
@@ -81,6 +117,43 @@ class Settings(BaseSettings):
     VIDEO_ANALYZER_API_KEY: str = ""  # 远程API密钥（可选）
     VIDEO_ANALYZER_USE_LOCAL: bool = True  # 是否使用本地分析器（默认True）
     VIDEO_ANALYZER_WHISPER_MODEL: str = "base"  # Whisper模型大小 (tiny, base, small, medium, large)
+    ANALYSIS_BATCH_MAX_URLS: int = 100  # 单次批量分析的最大URL数
+    ANALYSIS_BATCH_CONCURRENCY: int = 4  # 单个批量分析同时执行的视频分析任务数
+    ANALYSIS_REPORT_MAX_AGE_DAYS: int = 30  # 批量分析时复用最近N天内的已有报告，超过则重新分析
+    VIDEO_ANALYZER_STAGE_WORKERS: int = 4  # 视频信息探测、场景检测、关键帧提取的线程池大小
+    VIDEO_ANALYZER_STAGE_TIMEOUTS: Dict[str, float] = {
+        "download": 600.0,
+        "video_info": 60.0,
+        "scenes": 300.0,
+        "transcribe": 900.0,
+        "key_frames": 300.0,
+    }  # 各分析阶段超时（秒），超时的阶段返回空结果，不影响其他阶段
+    
+    # 关键帧缩略图存储配置
+    FRAME_STORE_DIR: str = "./data/frames"  # 关键帧缩略图存储目录（按内容哈希寻址）
+    FRAME_STORE_MAX_SIZE: int = 320  # 缩略图最长边（像素）
+    FRAME_STORE_JPEG_QUALITY: int = 80  # 缩略图JPEG质量
+    
+    # 语音转录配置
+    TRANSCRIPTION_WORKERS: int = 2  # Whisper转录工作进程数（每个进程常驻已加载的模型）
+    TRANSCRIPTION_MAX_PENDING: int = 8  # 排队等待转录的最大任务数，超出时调用方等待（背压）
+    TRANSCRIPTION_QUEUE_TIMEOUT: float = 600.0  # 排队等待的超时时间（秒）
+    TRANSCRIPTION_USE_PROCESS_POOL: bool = True  # 是否使用进程池（守护进程中自动降级为线程池）
+    
+    # 网页内容提取配置
+    WEB_EXTRACT_CONCURRENCY: int = 4  # 同一事件循环内同时下载+解析的网页数量
+    WEB_EXTRACT_PARSE_WORKERS: int = 4  # HTML解析线程数
+    WEB_EXTRACT_MAX_BYTES: int = 10 * 1024 * 1024  # 网页大小上限（10MB），超出时跳过提取
+    WEB_EXTRACT_CACHE_TTL: int = 6 * 3600  # 提取结果缓存时间（秒），默认6小时
+    WEB_EXTRACT_CACHE_MAX_LOCAL: int = 500  # 提取结果进程内缓存最大条目数
+    
+    # 视频下载缓存配置
+    VIDEO_CACHE_DIR: str = "./data/video_cache"  # 下载视频的本地缓存目录（按URL哈希寻址）
+    VIDEO_CACHE_MAX_BYTES: int = 5 * 1024 * 1024 * 1024  # 视频缓存总大小上限（5GB），超出后按LRU淘汰
+    VIDEO_DOWNLOAD_MAX_BYTES: int = 500 * 1024 * 1024  # 单个视频大小上限（500MB）
+    VIDEO_DOWNLOAD_CHUNK_SIZE: int = 1024 * 1024  # 流式写入磁盘的块大小（1MB）
+    VIDEO_DOWNLOAD_READ_TIMEOUT: float = 60.0  # 下载时单次读取的超时时间（秒）
+    VIDEO_DOWNLOAD_MAX_RESUMES: int = 3  # 下载中断后断点续传的最大次数
     
     # 飞书配置
     FEISHU_WEBHOOK_URL: str = ""
@@ -94,8 +167,44 @@ class Settings(BaseSettings):
     UPLOAD_DIR: str = "./uploads"
     MAX_UPLOAD_SIZE: int = 10 * 1024 * 1024  # 10MB
     
+    # 直播间画像缓存配置
+    LIVE_ROOM_PROFILE_CHECK_INTERVAL: float = 5.0  # 直播间配置文件mtime的最小检查间隔（秒），期间直接使用缓存的画像
+    
     # 热点匹配度配置
     MATCH_SCORE_THRESHOLD: float = 0.3  # 匹配度阈值（0-1），低于此值的热点将被过滤，默认30%
+    HOTSPOT_UPSERT_CHUNK_SIZE: int = 500  # 批量保存热点时每条INSERT ... ON CONFLICT语句的最大行数
+    HOTSPOT_SNAPSHOT_TTL: int = 3 * 86400  # 增量抓取的平台快照保留时间（秒）
+    HOTSPOT_SNAPSHOT_RANK_JUMP: int = 10  # 排名变化达到该值时视为明显变化，重新筛选和增强
+    HOTSPOT_INCREMENTAL_FETCH_MINUTES: int = 0  # 增量抓取的定时间隔（分钟），0表示不启用
+    HOTSPOT_HEAT_TREND_WINDOW_HOURS: float = 24.0  # 计算热度增长率/增长速度的时间窗口（小时）
+    HOTSPOT_HEAT_RAW_HOURS: int = 48  # 最近N小时的热度采样保留原始精度
+    HOTSPOT_HEAT_DOWNSAMPLE_HOURS: int = 6  # 更早的采样每个热点每N小时只保留一个
+    HOTSPOT_HEAT_RETENTION_DAYS: int = 7  # 热度采样保留天数
+    HOTSPOT_ENRICH_BUDGET_PER_RUN: int = 30  # 每轮抓取最多投递的内容增强任务数（按优先级取前N个）
+    HOTSPOT_ENRICH_LOOKBACK_DAYS: int = 3  # 未指定候选时，只从最近N天入库的未增强热点中选
+    HOTSPOT_ENRICH_FRESHNESS_HALF_LIFE_HOURS: float = 24.0  # 增强优先级中新鲜度的半衰期（小时）
+    HOTSPOT_ENRICH_CLAIM_TTL: int = 2 * 3600  # 按URL占用增强任务的时间（秒），防止重复投递
+    HOTSPOT_ENRICH_MAX_RETRIES: int = 2  # 单个热点增强失败的最大重试次数
+    RELEVANCE_BATCH_SIZE: int = 20  # 批量关联度分析时每次LLM调用打包的热点数量
+    RELEVANCE_BATCH_CONCURRENCY: int = 4  # 批量关联度分析的最大并发LLM调用数（跨直播间共享）
+    
+    # 关联度级联筛选配置
+    RELEVANCE_CASCADE_ENABLED: bool = True  # 是否先用规则和相似度筛掉明确不相关/明确相关的热点，只把不确定的交给LLM
+    RELEVANCE_CASCADE_MIN_ECOMMERCE_FIT: float = 0.1  # 电商适配性评分低于该值的热点直接拒绝（没有内容分析的热点不受影响）
+    RELEVANCE_CASCADE_USE_EMBEDDING: bool = True  # 相似度阶段是否使用embedding（不可用时回退到字符相似度）
+    RELEVANCE_CASCADE_REJECT_BELOW: float = 0.2  # embedding余弦相似度低于该值且没有关键词命中的热点直接拒绝
+    RELEVANCE_CASCADE_ACCEPT_ABOVE: float = 0.85  # embedding余弦相似度不低于该值的热点直接采纳，不调用LLM
+    RELEVANCE_CASCADE_LEXICAL_REJECT_BELOW: float = 0.0  # 字符相似度低于该值的热点直接拒绝（0表示字符相似度不拒绝）
+    
+    # 脚本生成配置
+    SCRIPT_GENERATION_CONCURRENCY: int = 5  # 同一任务内并发生成脚本的最大LLM调用数
+    SCRIPT_PDF_RENDER_WORKERS: int = 2  # PDF渲染线程数（限制同时渲染的PDF数量）
+    SCRIPT_PDF_CACHE_TTL: int = 7 * 86400  # PDF渲染结果缓存时间（秒），key包含脚本更新时间
+    SCRIPT_PDF_CACHE_MAX_LOCAL: int = 50  # PDF进程内缓存最大条目数
+    
+    # 热点向量索引配置
+    HOTSPOT_VECTOR_INDEX_DIR: str = "./data/vector_index"  # 向量索引存储目录（memmap矩阵+元数据）
+    HOTSPOT_VECTOR_INDEX_DAYS: int = 30  # 只索引最近N天的热点，过期的行在同步时删除
     
     class Config:
         env_file = ".env"
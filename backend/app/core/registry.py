@@ -0,0 +1,169 @@
+"""
+进程级组件注册表
+服务、Agent和客户端在每个进程中只创建一次（FastAPI lifespan / Celery worker_process_init 时预热，
+或首次使用时创建），线程安全地复用，并提供健康检查
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from loguru import logger
+
+
+class ComponentRegistry:
+    """进程级组件注册表（按名称延迟创建单例）"""
+
+    def __init__(self):
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._health_checks: Dict[str, Callable[[Any], bool]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._errors: Dict[str, str] = {}
+        self._init_seconds: Dict[str, float] = {}
+        # 可重入：组件的工厂函数可能从注册表获取其他组件
+        self._lock = threading.RLock()
+
+    def register(
+        self,
+        name: str,
+        factory: Callable[[], Any],
+        health_check: Optional[Callable[[Any], bool]] = None
+    ):
+        """注册组件工厂（重复注册会替换工厂并丢弃已创建的实例）"""
+        with self._lock:
+            self._factories[name] = factory
+            if health_check:
+                self._health_checks[name] = health_check
+            else:
+                self._health_checks.pop(name, None)
+            self._instances.pop(name, None)
+            self._errors.pop(name, None)
+
+    def get(self, name: str) -> Any:
+        """获取组件实例，不存在时创建（创建失败时抛出异常，下次调用重试）"""
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        with self._lock:
+            instance = self._instances.get(name)
+            if instance is not None:
+                return instance
+            factory = self._factories.get(name)
+            if factory is None:
+                raise KeyError(f"组件未注册: {name}")
+            start = time.perf_counter()
+            try:
+                instance = factory()
+            except Exception as e:
+                self._errors[name] = str(e)
+                raise
+            self._init_seconds[name] = time.perf_counter() - start
+            self._errors.pop(name, None)
+            self._instances[name] = instance
+            logger.info(f"组件已初始化: {name}，耗时 {self._init_seconds[name]:.2f}秒")
+            return instance
+
+    def warmup(self, names: Optional[Iterable[str]] = None) -> Dict[str, bool]:
+        """预热组件（单个组件失败不影响其他组件）
+
+        Returns:
+            {组件名: 是否成功}
+        """
+        results = {}
+        for name in list(names if names is not None else self._factories):
+            try:
+                self.get(name)
+                results[name] = True
+            except Exception as e:
+                logger.warning(f"组件预热失败: {name}, {e}")
+                results[name] = False
+        return results
+
+    def health(self) -> Dict[str, Dict[str, Any]]:
+        """各组件健康状态
+
+        status: ready（已初始化且检查通过）、unhealthy（检查未通过）、error（创建失败）、not_initialized
+        """
+        report = {}
+        for name in list(self._factories):
+            instance = self._instances.get(name)
+            if instance is None:
+                if name in self._errors:
+                    report[name] = {"status": "error", "error": self._errors[name]}
+                else:
+                    report[name] = {"status": "not_initialized"}
+                continue
+
+            status = "ready"
+            check = self._health_checks.get(name)
+            if check:
+                try:
+                    if not check(instance):
+                        status = "unhealthy"
+                except Exception as e:
+                    logger.warning(f"组件健康检查失败: {name}, {e}")
+                    status = "unhealthy"
+            report[name] = {"status": status, "init_seconds": round(self._init_seconds.get(name, 0.0), 3)}
+        return report
+
+    def reset(self, names: Optional[Iterable[str]] = None):
+        """丢弃已创建的实例（下次获取时重新创建），主要用于测试和配置变更"""
+        with self._lock:
+            for name in list(names if names is not None else self._instances):
+                self._instances.pop(name, None)
+                self._errors.pop(name, None)
+
+
+registry = ComponentRegistry()
+
+
+def _register_defaults():
+    """注册默认组件（工厂内延迟导入，避免循环依赖）"""
+
+    def hotspot_service():
+        from app.services.hotspot.service import HotspotMonitorService
+        return HotspotMonitorService()
+
+    def script_service():
+        from app.services.script.service import ScriptGeneratorService
+        return ScriptGeneratorService()
+
+    def video_analysis_service():
+        from app.services.analysis.service import VideoAnalysisService
+        return VideoAnalysisService()
+
+    def agent(class_name: str):
+        def factory():
+            import app.agents
+            return getattr(app.agents, class_name)()
+        return factory
+
+    registry.register(
+        "hotspot_service",
+        hotspot_service,
+        health_check=lambda s: not s.use_direct_crawler or s.crawler is not None
+    )
+    registry.register("script_service", script_service)
+    registry.register("video_analysis_service", video_analysis_service)
+    registry.register("video_analysis_agent", agent("VideoAnalysisAgent"))
+    registry.register("relevance_analysis_agent", agent("RelevanceAnalysisAgent"))
+    registry.register("script_generation_agent", agent("ScriptGenerationAgent"))
+    registry.register("content_structure_agent", agent("ContentStructureAgent"))
+    registry.register("content_analysis_agent", agent("ContentAnalysisAgent"))
+
+
+_register_defaults()
+
+
+def get_hotspot_service():
+    """获取进程级热点监控服务"""
+    return registry.get("hotspot_service")
+
+
+def get_script_service():
+    """获取进程级脚本生成服务"""
+    return registry.get("script_service")
+
+
+def get_video_analysis_service():
+    """获取进程级视频拆解服务"""
+    return registry.get("video_analysis_service")
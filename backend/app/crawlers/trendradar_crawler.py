@@ -8,11 +8,11 @@ import time
 import asyncio
 from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
-import httpx
 from loguru import logger
 
 from app.crawlers.base import BaseCrawler
 from app.core.config import settings
+from app.utils.http_client import get_http_client
 
 
 # 平台 ID 映射（基于 TrendRadar 的配置）
@@ -93,15 +93,6 @@ class TrendRadarCrawler(BaseCrawler):
         
         url = f"{self.api_base_url}?id={platform_id}&latest"
         
-        # httpx 的代理配置格式
-        proxies = None
-        if self.proxy_url:
-            # httpx 使用 http:// 和 https:// 作为 key
-            proxies = {
-                "http://": self.proxy_url,
-                "https://": self.proxy_url,
-            }
-        
         headers = {
             "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
             "Accept": "application/json, text/plain, */*",
@@ -115,15 +106,14 @@ class TrendRadarCrawler(BaseCrawler):
         retries = 0
         while retries <= max_retries:
             try:
-                # httpx.AsyncClient 的 proxies 参数
-                client_kwargs = {
-                    "timeout": 10.0,
-                    "follow_redirects": True
-                }
-                if proxies:
-                    client_kwargs["proxies"] = proxies
-                
-                async with httpx.AsyncClient(**client_kwargs) as client:
+                # 共享连接池（重试由本方法控制，不使用客户端自带的重试）
+                async with get_http_client(
+                    "crawler",
+                    timeout=10.0,
+                    follow_redirects=True,
+                    proxy=self.proxy_url or None,
+                    retries=0
+                ) as client:
                     response = await client.get(url, headers=headers)
                     response.raise_for_status()
                     
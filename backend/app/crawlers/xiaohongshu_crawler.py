@@ -6,10 +6,10 @@ import asyncio
 import re
 from typing import List, Dict, Any, Optional
 from datetime import datetime
-import httpx
 from loguru import logger
 
 from app.crawlers.base import BaseCrawler
+from app.utils.http_client import get_http_client
 
 
 class XiaohongshuCrawler(BaseCrawler):
@@ -146,7 +146,8 @@ class XiaohongshuCrawler(BaseCrawler):
             "Sec-Fetch-Site": "same-origin",
         }
         
-        async with httpx.AsyncClient(
+        async with get_http_client(
+            "crawler",
             timeout=15.0,
             follow_redirects=True,
             headers=headers
@@ -293,7 +294,8 @@ class XiaohongshuCrawler(BaseCrawler):
                     "Origin": "https://www.xiaohongshu.com",
                 }
                 
-                async with httpx.AsyncClient(
+                async with get_http_client(
+                    "crawler",
                     timeout=15.0,
                     follow_redirects=True,
                     headers=headers
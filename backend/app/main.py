@@ -1,12 +1,29 @@
 """
 FastAPI应用主入口
 """
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
 from app.core.config import settings
 from app.api.v1 import api_router
+from app.core.registry import registry
+from app.utils.http_client import aclose_http_clients
+from app.utils.transcription import shutdown_transcription_service
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """应用生命周期：启动时预热服务和Agent单例，关闭时释放共享HTTP连接池和转录工作进程"""
+    if settings.REGISTRY_WARMUP_ON_STARTUP:
+        await run_in_threadpool(registry.warmup)
+    yield
+    await aclose_http_clients()
+    shutdown_transcription_service()
+
 
 app = FastAPI(
     title="Action 1.0 API",
@@ -14,6 +31,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 # CORS配置
@@ -40,11 +58,14 @@ async def root():
 
 
 @app.get("/health")
-async def health_check():
-    """健康检查"""
+def health_check():
+    """健康检查（包含进程级组件状态，任一组件创建失败或检查未通过时为degraded）"""
+    components = registry.health()
+    degraded = any(c["status"] in ("error", "unhealthy") for c in components.values())
     return JSONResponse({
-        "status": "healthy",
-        "service": "Action API"
+        "status": "degraded" if degraded else "healthy",
+        "service": "Action API",
+        "components": components
     })
 
 
@@ -2,7 +2,7 @@
 数据模型
 """
 from app.models.base import Base, BaseModel
-from app.models.hotspot import Hotspot
+from app.models.hotspot import Hotspot, HotspotRoomScore, HotspotHeatSample
 from app.models.product import Product, LiveRoom
 from app.models.analysis import AnalysisReport
 from app.models.script import Script
@@ -12,6 +12,8 @@ __all__ = [
     "Base",
     "BaseModel",
     "Hotspot",
+    "HotspotRoomScore",
+    "HotspotHeatSample",
     "Product",
     "LiveRoom",
     "AnalysisReport",
@@ -1,7 +1,7 @@
 """
 热点数据模型
 """
-from sqlalchemy import Column, String, Integer, Float, DateTime, JSON, Text
+from sqlalchemy import Column, String, Integer, Float, DateTime, JSON, Text, ForeignKey, Index, UniqueConstraint
 from app.models.base import BaseModel
 from datetime import datetime
 
@@ -25,3 +25,29 @@ class Hotspot(BaseModel):
     video_structure = Column(JSON, nullable=True)  # 视频结构化信息
     content_analysis = Column(JSON, nullable=True)  # 内容分析结果（包括电商适配性）
 
+
+class HotspotRoomScore(BaseModel):
+    """热点-直播间匹配度表（预计算，供可视化接口按直播间读取Top N）"""
+    __tablename__ = "hotspot_room_scores"
+    __table_args__ = (
+        UniqueConstraint("live_room_id", "hotspot_id", name="uq_hotspot_room_scores_room_hotspot"),
+        Index("ix_hotspot_room_scores_room_score", "live_room_id", "match_score"),
+    )
+    
+    hotspot_id = Column(String(64), ForeignKey("hotspots.id", ondelete="CASCADE"), nullable=False, index=True)
+    live_room_id = Column(String(64), ForeignKey("live_rooms.id", ondelete="CASCADE"), nullable=False)
+    match_score = Column(Float, nullable=False)  # 热点与直播间的匹配度（0-1）
+
+
+class HotspotHeatSample(BaseModel):
+    """热点热度采样表（每次抓取记录一次排名和热度，用于计算增长速率）"""
+    __tablename__ = "hotspot_heat_samples"
+    __table_args__ = (
+        Index("ix_hotspot_heat_samples_hotspot_time", "hotspot_id", "sampled_at"),
+    )
+    
+    hotspot_id = Column(String(64), ForeignKey("hotspots.id", ondelete="CASCADE"), nullable=False)
+    platform = Column(String(50), nullable=False)
+    sampled_at = Column(DateTime, nullable=False, index=True)  # 采样时间（抓取时间）
+    rank = Column(Integer, nullable=True)  # 平台榜单排名
+    heat_score = Column(Integer, nullable=True)  # 热度分数
@@ -1,7 +1,7 @@
 """
 商品数据模型
 """
-from sqlalchemy import Column, String, Float, Date, JSON, Text, ForeignKey
+from sqlalchemy import Column, String, Float, Date, DateTime, JSON, Text, ForeignKey
 from app.models.base import BaseModel
 
 
@@ -30,4 +30,5 @@ class LiveRoom(BaseModel):
     keywords = Column(JSON, nullable=True)
     ip_character = Column(String(100), nullable=True)
     style = Column(String(100), nullable=True)
+    room_scores_refreshed_at = Column(DateTime, nullable=True)  # 最近一次全量计算热点匹配度的时间（为空表示尚未计算）
 
@@ -2,6 +2,7 @@
 脚本数据模型
 """
 from sqlalchemy import Column, String, Text, JSON, ForeignKey
+from sqlalchemy.orm import relationship
 from app.models.base import BaseModel
 
 
@@ -18,4 +19,11 @@ class Script(BaseModel):
     production_notes = Column(JSON, nullable=True)
     tags = Column(JSON, nullable=True)
     status = Column(String(20), nullable=True, index=True)  # draft/reviewed/approved
-
+    
+    # 关联对象（列表查询时用selectinload批量加载，避免逐条查询）
+    product = relationship("Product", lazy="select")
+    hotspot = relationship("Hotspot", lazy="select")
+    analysis_report = relationship("AnalysisReport", lazy="select")
+    
+    # 列表视图不需要的大字段（列表查询时延迟加载）
+    LIST_DEFERRED_COLUMNS = ("script_content", "shot_list", "production_notes")
@@ -3,7 +3,7 @@
 """
 import uuid
 import json
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Dict, Any, Optional, List
 from sqlalchemy.orm import Session
 from loguru import logger
@@ -133,54 +133,86 @@ class VideoAnalysisService:
         logger.info(f"提取了 {len(techniques)} 个爆款技巧")
         return techniques
     
+    # 报告中保存的字段
+    REPORT_FIELDS = (
+        "video_info", "basic_info", "shot_table", "golden_3s",
+        "highlights", "viral_formula", "keywords", "production_tips"
+    )
+    
+    def find_existing_reports(
+        self,
+        db: Session,
+        video_urls: List[str],
+        max_age_days: Optional[int] = None
+    ) -> Dict[str, AnalysisReport]:
+        """批量查询已有的拆解报告（一次IN查询）
+        
+        Args:
+            video_urls: 视频URL列表
+            max_age_days: 只返回最近N天内更新过的报告（None表示不限）
+        
+        Returns:
+            {video_url: AnalysisReport}
+        """
+        if not video_urls:
+            return {}
+        query = db.query(AnalysisReport).filter(AnalysisReport.video_url.in_(list(set(video_urls))))
+        if max_age_days is not None:
+            query = query.filter(AnalysisReport.updated_at >= datetime.now() - timedelta(days=max_age_days))
+        return {report.video_url: report for report in query.all()}
+    
+    def save_reports(
+        self,
+        db: Session,
+        reports: Dict[str, Dict[str, Any]]
+    ) -> Dict[str, AnalysisReport]:
+        """批量保存拆解报告（一次查询已有报告，一次提交）
+        
+        Args:
+            reports: {video_url: 结构化报告}
+        
+        Returns:
+            {video_url: AnalysisReport}
+        """
+        if not reports:
+            return {}
+        
+        existing = self.find_existing_reports(db, list(reports.keys()))
+        now = datetime.now()
+        saved = {}
+        
+        for video_url, report_data in reports.items():
+            report = existing.get(video_url)
+            if report:
+                # 更新现有报告
+                for field in self.REPORT_FIELDS:
+                    setattr(report, field, report_data.get(field))
+                report.updated_at = now
+                logger.info(f"更新拆解报告: {video_url}")
+            else:
+                # 创建新报告
+                report = AnalysisReport(
+                    id=str(uuid.uuid4()),
+                    video_url=video_url,
+                    created_at=now,
+                    updated_at=now,
+                    **{field: report_data.get(field) for field in self.REPORT_FIELDS}
+                )
+                db.add(report)
+                logger.info(f"保存拆解报告: {video_url}")
+            saved[video_url] = report
+        
+        db.commit()
+        return saved
+    
     def save_report(
         self,
         db: Session,
         video_url: str,
         report_data: Dict[str, Any]
     ) -> AnalysisReport:
-        """保存拆解报告到数据库"""
-        # 检查是否已存在
-        existing = db.query(AnalysisReport).filter(
-            AnalysisReport.video_url == video_url
-        ).first()
-        
-        if existing:
-            # 更新现有报告
-            existing.video_info = report_data.get("video_info")
-            existing.basic_info = report_data.get("basic_info")
-            existing.shot_table = report_data.get("shot_table")
-            existing.golden_3s = report_data.get("golden_3s")
-            existing.highlights = report_data.get("highlights")
-            existing.viral_formula = report_data.get("viral_formula")
-            existing.keywords = report_data.get("keywords")
-            existing.production_tips = report_data.get("production_tips")
-            existing.updated_at = datetime.now()
-            
-            logger.info(f"更新拆解报告: {video_url}")
-            db.commit()
-            return existing
-        else:
-            # 创建新报告
-            new_report = AnalysisReport(
-                id=str(uuid.uuid4()),
-                video_url=video_url,
-                video_info=report_data.get("video_info"),
-                basic_info=report_data.get("basic_info"),
-                shot_table=report_data.get("shot_table"),
-                golden_3s=report_data.get("golden_3s"),
-                highlights=report_data.get("highlights"),
-                viral_formula=report_data.get("viral_formula"),
-                keywords=report_data.get("keywords"),
-                production_tips=report_data.get("production_tips"),
-                created_at=datetime.now(),
-                updated_at=datetime.now()
-            )
-            
-            db.add(new_report)
-            db.commit()
-            logger.info(f"保存拆解报告: {video_url}")
-            return new_report
+        """保存拆解报告到数据库（已存在时更新）"""
+        return self.save_reports(db, {video_url: report_data})[video_url]
     
     async def analyze_and_save(
         self,
@@ -4,7 +4,8 @@
 import asyncio
 from app.celery_app import celery_app
 from app.core.database import SessionLocal
-from app.services.analysis.service import VideoAnalysisService
+from app.core.registry import get_video_analysis_service
+from app.utils.http_client import close_loop_http_clients
 from loguru import logger
 
 
@@ -20,7 +21,7 @@ def analyze_video_async(self, video_url: str, options: dict = None):
             meta={'status': '开始拆解视频...', 'video_url': video_url}
         )
         
-        service = VideoAnalysisService()
+        service = get_video_analysis_service()
         db = SessionLocal()
         
         try:
@@ -36,6 +37,7 @@ def analyze_video_async(self, video_url: str, options: dict = None):
             report = loop.run_until_complete(
                 service.analyze_and_save(db, video_url, options)
             )
+            close_loop_http_clients(loop)
             loop.close()
             
             logger.info(f"视频分析完成: {video_url}, 报告ID: {report.id}")
@@ -58,3 +60,61 @@ def analyze_video_async(self, video_url: str, options: dict = None):
             "message": str(e)
         }
 
+
+@celery_app.task(bind=True)
+def analyze_video_batch_async(
+    self,
+    video_urls: list,
+    options: dict = None,
+    reused_reports: dict = None,
+    concurrency: int = None
+):
+    """批量拆解视频（编排任务）
+    
+    把待分析的URL分配到 concurrency 条串行的任务链中，以group并行执行，
+    同一批次同时运行的分析任务不超过 concurrency 个。每个URL的子任务ID预先分配，
+    编排任务的结果记录 URL -> 子任务ID，供批量进度查询使用。
+    
+    Args:
+        video_urls: 需要分析的视频URL（已去重、已排除可复用的报告）
+        options: 分析选项
+        reused_reports: 直接复用的已有报告 {video_url: report_id}
+        concurrency: 并发数，None时使用ANALYSIS_BATCH_CONCURRENCY
+    """
+    import uuid
+    from celery import chain, group
+    from app.core.config import settings
+    
+    concurrency = max(1, min(concurrency or settings.ANALYSIS_BATCH_CONCURRENCY, len(video_urls) or 1))
+    
+    items = [
+        {"video_url": video_url, "task_id": str(uuid.uuid4())}
+        for video_url in video_urls
+    ]
+    lanes = [items[i::concurrency] for i in range(concurrency)]
+    lanes = [lane for lane in lanes if lane]
+    
+    if lanes:
+        # 不可变签名（si），链中上一个任务的结果不会作为参数传给下一个任务
+        group(
+            chain(
+                analyze_video_async.si(item["video_url"], options).set(task_id=item["task_id"])
+                for item in lane
+            )
+            for lane in lanes
+        ).apply_async()
+    
+    logger.info(
+        f"批量分析已分发: {len(items)} 个视频, 并发={len(lanes)}, "
+        f"复用已有报告={len(reused_reports or {})}"
+    )
+    
+    return {
+        "status": "dispatched",
+        "items": items,
+        "reused": [
+            {"video_url": video_url, "report_id": report_id}
+            for video_url, report_id in (reused_reports or {}).items()
+        ],
+        "concurrency": len(lanes)
+    }
@@ -1,15 +1,44 @@
 """
 直播间配置服务
-负责加载和管理直播间配置文件
+负责加载和管理直播间配置文件，并在进程内缓存直播间画像（画像文本、关键词集合、embedding）
 """
 import json
+import threading
+import time
+from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Iterable, Optional, List, Tuple
 from loguru import logger
+from app.core.config import settings
 from app.core.database import SessionLocal
 from app.models.product import LiveRoom
 
 
+# 进程级直播间画像缓存 {(配置目录, 直播间名称): 画像条目}，所有LiveRoomConfigService实例共享
+_profile_cache: Dict[Tuple[str, str], Dict[str, Any]] = {}
+_profile_cache_lock = threading.Lock()
+
+
+def invalidate_live_room_profile(*live_room_names: str):
+    """使直播间画像缓存失效（不传名称时清空全部），下次使用时重新加载"""
+    with _profile_cache_lock:
+        if not live_room_names:
+            _profile_cache.clear()
+            return
+        names = set(live_room_names)
+        for key in [key for key in _profile_cache if key[1] in names]:
+            del _profile_cache[key]
+
+
+def normalize_keywords(values: Iterable[Any]) -> frozenset:
+    """关键词归一化（去空白、小写、去重）"""
+    return frozenset(
+        value.strip().lower()
+        for value in values
+        if isinstance(value, str) and value.strip()
+    )
+
+
 class LiveRoomConfigService:
     """直播间配置服务"""
     
@@ -128,6 +157,97 @@ class LiveRoomConfigService:
         except Exception as e:
             logger.error(f"保存配置文件失败: {e}")
             raise
+        invalidate_live_room_profile(live_room_name)
+    
+    def _config_mtime(self, live_room_name: str) -> Optional[int]:
+        """配置文件的修改时间（纳秒），文件不存在返回None"""
+        try:
+            return (self.config_dir / f"{live_room_name}.json").stat().st_mtime_ns
+        except OSError:
+            return None
+    
+    def _db_version(self, live_room_name: str) -> Optional[datetime]:
+        """数据库中直播间的更新时间，直播间不存在或查询失败返回None"""
+        db = SessionLocal()
+        try:
+            row = db.query(LiveRoom.updated_at).filter(LiveRoom.name == live_room_name).first()
+            return row[0] if row else None
+        except Exception as e:
+            logger.warning(f"查询直播间更新时间失败: {live_room_name}, {e}")
+            return None
+        finally:
+            db.close()
+    
+    def get_live_room_entry(self, live_room_name: str) -> Dict[str, Any]:
+        """
+        获取直播间画像缓存条目（按热点打分时不读磁盘、不查数据库）
+        
+        配置文件的mtime和数据库中直播间的updated_at每LIVE_ROOM_PROFILE_CHECK_INTERVAL秒最多检查一次，
+        任一变化时重新加载（其他进程如API更新直播间后，Celery worker在检查间隔内感知）；
+        本进程内的更新由DataService.update_live_room主动失效
+        
+        Args:
+            live_room_name: 直播间名称
+            
+        Returns:
+            {"config", "profile_text", "category", "keywords"(归一化关键词集合), "embedding"(首次使用时计算)}
+        """
+        key = (str(self.config_dir), live_room_name)
+        entry = _profile_cache.get(key)
+        now = time.monotonic()
+        if entry is not None:
+            if now - entry["checked_at"] < settings.LIVE_ROOM_PROFILE_CHECK_INTERVAL:
+                return entry
+            if (
+                self._config_mtime(live_room_name) == entry["mtime"]
+                and self._db_version(live_room_name) == entry["db_version"]
+            ):
+                entry["checked_at"] = now
+                return entry
+            logger.info(f"直播间配置已变化，重新加载: {live_room_name}")
+        
+        # 先取版本再加载，加载期间配置被修改时下次检查会再次加载
+        mtime = self._config_mtime(live_room_name)
+        db_version = self._db_version(live_room_name)
+        config = self.load_live_room_config(live_room_name)
+        basic_info = config.get("basic_info", {})
+        products = config.get("product_categories", {})
+        entry = {
+            "config": config,
+            "profile_text": self._build_profile_text(config),
+            "category": basic_info.get("category") or "",
+            "keywords": normalize_keywords(
+                list(config.get("keywords") or [])
+                + [basic_info.get("category")]
+                + list(products.get("primary") or [])
+            ),
+            "embedding": None,
+            "mtime": mtime,
+            "db_version": db_version,
+            "checked_at": now,
+        }
+        with _profile_cache_lock:
+            _profile_cache[key] = entry
+        return entry
+    
+    async def get_live_room_embedding(self, live_room_name: str, embedding_client=None) -> Optional[List[float]]:
+        """
+        获取直播间画像的embedding（每个画像版本只计算一次）
+        
+        Args:
+            live_room_name: 直播间名称
+            embedding_client: EmbeddingClient实例，None时新建
+            
+        Returns:
+            向量，获取失败返回None（下次调用重试）
+        """
+        entry = self.get_live_room_entry(live_room_name)
+        if entry["embedding"] is None:
+            if embedding_client is None:
+                from app.utils.embedding import EmbeddingClient
+                embedding_client = EmbeddingClient()
+            entry["embedding"] = await embedding_client.get_embedding(entry["profile_text"])
+        return entry["embedding"]
     
     def get_live_room_profile(self, live_room_name: str) -> str:
         """
@@ -139,9 +259,10 @@ class LiveRoomConfigService:
         Returns:
             直播间画像描述文本
         """
-        config = self.load_live_room_config(live_room_name)
-        
-        # 构建完整的直播间画像描述
+        return self.get_live_room_entry(live_room_name)["profile_text"]
+    
+    def _build_profile_text(self, config: Dict[str, Any]) -> str:
+        """由配置构建完整的直播间画像描述"""
         basic_info = config.get("basic_info", {})
         audience = config.get("audience_profile", {})
         products = config.get("product_categories", {})
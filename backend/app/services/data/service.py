@@ -9,6 +9,9 @@ from sqlalchemy import and_
 from loguru import logger
 
 from app.models.product import Product, LiveRoom
+from app.models.hotspot import HotspotRoomScore
+from app.services.config.live_room_config import invalidate_live_room_profile
+from app.services.hotspot.room_scores import refresh_room_scores
 
 
 class DataService:
@@ -150,6 +153,8 @@ class DataService:
         db.commit()
         db.refresh(room)
         
+        self._refresh_room_scores(db, room.id)
+        
         logger.info(f"创建直播间: {room.name}")
         return room
     
@@ -181,6 +186,7 @@ class DataService:
         if not room:
             return None
         
+        previous_name = room.name
         if "name" in room_data:
             room.name = room_data["name"]
         if "category" in room_data:
@@ -197,15 +203,30 @@ class DataService:
         db.commit()
         db.refresh(room)
         
+        # 直播间画像缓存（画像文本、关键词、embedding）按名称失效
+        invalidate_live_room_profile(previous_name, room.name)
+        
+        # 名称、类目、关键词影响匹配度计算
+        if any(field in room_data for field in ("name", "category", "keywords")):
+            self._refresh_room_scores(db, room.id)
+        
         logger.info(f"更新直播间: {room.name}")
         return room
     
+    def _refresh_room_scores(self, db: Session, room_id: str):
+        """重新计算直播间与热点的预计算匹配度（失败时由可视化接口兜底计算）"""
+        try:
+            refresh_room_scores(db, live_room_ids=[room_id])
+        except Exception as e:
+            logger.warning(f"刷新直播间匹配度失败: {e}")
+    
     def delete_live_room(self, db: Session, room_id: str) -> bool:
         """删除直播间"""
         room = self.get_live_room(db, room_id)
         if not room:
             return False
         
+        db.query(HotspotRoomScore).filter(HotspotRoomScore.live_room_id == room_id).delete(synchronize_session=False)
         db.delete(room)
         db.commit()
         
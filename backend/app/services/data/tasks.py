@@ -3,7 +3,8 @@
 """
 from app.celery_app import celery_app
 from app.core.database import SessionLocal
-from app.models.hotspot import Hotspot
+from app.models.hotspot import Hotspot, HotspotRoomScore, HotspotHeatSample
+from app.services.hotspot.heat_trends import downsample_heat_samples
 from loguru import logger
 from datetime import datetime, timedelta
 
@@ -18,7 +19,14 @@ def cleanup_old_data():
         cutoff_date = datetime.now() - timedelta(days=7)
         
         try:
-            # 删除7天前的热点数据
+            # 先删除这些热点的预计算匹配度和热度采样，再删除7天前的热点数据
+            old_hotspot_ids = db.query(Hotspot.id).filter(Hotspot.created_at < cutoff_date)
+            db.query(HotspotRoomScore).filter(
+                HotspotRoomScore.hotspot_id.in_(old_hotspot_ids.scalar_subquery())
+            ).delete(synchronize_session=False)
+            db.query(HotspotHeatSample).filter(
+                HotspotHeatSample.hotspot_id.in_(old_hotspot_ids.scalar_subquery())
+            ).delete(synchronize_session=False)
             deleted_count = db.query(Hotspot).filter(
                 Hotspot.created_at < cutoff_date
             ).delete()
@@ -26,10 +34,14 @@ def cleanup_old_data():
             db.commit()
             logger.info(f"成功清理 {deleted_count} 条过期热点数据")
             
+            # 旧的热度采样降采样，超过保留期的删除
+            sample_stats = downsample_heat_samples(db)
+            
             return {
                 "status": "success",
                 "message": "数据清理任务已完成",
-                "deleted_count": deleted_count
+                "deleted_count": deleted_count,
+                "heat_samples": sample_stats
             }
         finally:
             db.close()
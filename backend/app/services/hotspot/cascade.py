@@ -0,0 +1,250 @@
+"""
+关联度级联筛选
+热点按成本从低到高依次经过三个阶段，只有前两个阶段无法判断的热点才调用LLM：
+1. 规则：命中不相关关键词、电商适配性接近0、（按直播间打分时）没有任何关键词/类目命中的热点直接拒绝
+   （新抓取的热点还没有content_analysis，电商适配性按URL使用数据库中已保存的分析结果）
+2. 相似度：embedding相似度低于阈值拒绝、高于阈值直接采纳；embedding不可用时使用字符二元组相似度
+3. LLM：只对中间的不确定区间批量打分
+"""
+import json
+import math
+import threading
+import time
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+
+from app.core.config import settings
+from app.utils.keyword_matcher import KeywordMatcher
+
+
+REJECT = "reject"
+ACCEPT = "accept"
+UNCERTAIN = "uncertain"
+
+# 进程级累计统计（各阶段处理数和耗时）
+_stats: Dict[str, Dict[str, float]] = {
+    "rule": {"rejected": 0, "passed": 0, "seconds": 0.0},
+    "similarity": {"rejected": 0, "accepted": 0, "passed": 0, "seconds": 0.0},
+    "llm": {"scored": 0, "failed": 0, "seconds": 0.0},
+}
+_stats_lock = threading.Lock()
+
+
+def get_cascade_stats() -> Dict[str, Any]:
+    """获取级联筛选的累计统计（当前进程）"""
+    with _stats_lock:
+        stats = {stage: dict(values) for stage, values in _stats.items()}
+    total = stats["rule"]["rejected"] + stats["rule"]["passed"]
+    stats["total"] = total
+    stats["llm_ratio"] = round(stats["llm"]["scored"] / total, 4) if total else 0.0
+    return stats
+
+
+def _record_stats(run_stats: Dict[str, Any]):
+    with _stats_lock:
+        for stage, values in _stats.items():
+            for key in values:
+                values[key] += run_stats[stage].get(key, 0)
+
+
+def hotspot_text(hotspot: Dict[str, Any]) -> str:
+    """热点用于匹配的文本（标题 + 标签）"""
+    return f"{hotspot.get('title', '')} {' '.join(hotspot.get('tags') or [])}"
+
+
+def ecommerce_fit_score(hotspot: Dict[str, Any], stored_analysis: Any = None) -> Optional[float]:
+    """热点content_analysis中的电商适配性评分，没有时返回None
+
+    Args:
+        stored_analysis: 数据库中已保存的content_analysis，热点数据本身没有时使用
+    """
+    content_analysis = hotspot.get("content_analysis") or stored_analysis
+    if not content_analysis:
+        return None
+    try:
+        if isinstance(content_analysis, str):
+            content_analysis = json.loads(content_analysis)
+        ecommerce_fit = content_analysis.get("ecommerce_fit")
+        if not isinstance(ecommerce_fit, dict) or ecommerce_fit.get("score") is None:
+            return None
+        return float(ecommerce_fit["score"])
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
+def _char_bigrams(text: str) -> Counter:
+    chars = "".join((text or "").lower().split())
+    if len(chars) < 2:
+        return Counter(chars)
+    return Counter(chars[i:i + 2] for i in range(len(chars) - 1))
+
+
+def lexical_similarity(text1: str, text2: str) -> float:
+    """字符二元组余弦相似度（0-1），不依赖分词和外部服务"""
+    a, b = _char_bigrams(text1), _char_bigrams(text2)
+    if not a or not b:
+        return 0.0
+    dot = sum(count * b[gram] for gram, count in a.items() if gram in b)
+    if not dot:
+        return 0.0
+    norm = math.sqrt(sum(c * c for c in a.values())) * math.sqrt(sum(c * c for c in b.values()))
+    return dot / norm
+
+
+async def _embedding_similarities(
+    texts: List[str],
+    target_text: str,
+    embedding_client
+) -> List[Optional[float]]:
+    """热点文本与目标文本的embedding余弦相似度（截断到0-1），获取失败的项为None"""
+    vectors = await embedding_client.get_embeddings([target_text] + texts)
+    target = vectors[0]
+    if target is None:
+        return [None] * len(texts)
+
+    target_vec = np.asarray(target, dtype=np.float32)
+    target_norm = float(np.linalg.norm(target_vec))
+    similarities: List[Optional[float]] = []
+    for vector in vectors[1:]:
+        if vector is None or target_norm == 0:
+            similarities.append(None)
+            continue
+        vec = np.asarray(vector, dtype=np.float32)
+        norm = float(np.linalg.norm(vec))
+        similarities.append(max(0.0, float(vec @ target_vec) / (norm * target_norm)) if norm else 0.0)
+    return similarities
+
+
+async def run_relevance_cascade(
+    hotspots: List[Dict[str, Any]],
+    target_text: str,
+    llm_scorer: Callable[[List[Dict[str, Any]]], Awaitable[List[Dict[str, Any]]]],
+    matcher: Optional[KeywordMatcher] = None,
+    require_keyword_hit: bool = False,
+    embedding_client=None,
+    stored_analyses: Optional[Dict[str, Any]] = None
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """级联计算热点关联度
+
+    Args:
+        hotspots: 热点列表
+        target_text: 直播间或商品描述文本
+        llm_scorer: 批量LLM打分函数，输入热点列表，返回与输入顺序一致的
+            [{"relevance_score": 分数或None, "reason"}]
+        matcher: 直播间关键词匹配器（include/category/exclude类别），None时跳过关键词规则
+        require_keyword_hit: 没有任何include/category命中的热点直接拒绝
+            （直播间匹配度对没有直接关联的热点恒为0，不必调用LLM）
+        embedding_client: EmbeddingClient实例，None时按配置新建（使用非语义的本地后端时按字符相似度处理）
+        stored_analyses: {热点URL: 数据库中已保存的content_analysis}，用于没有分析结果的新抓取热点
+
+    Returns:
+        (结果列表, 本次统计)。结果与输入顺序一致，每项包含：
+            - relevance_score: 关联度（拒绝为0.0，LLM失败为None）
+            - reason: 判断原因
+            - stage: 做出判断的阶段（rule/similarity/llm）
+            - decision: reject/accept/uncertain（uncertain表示交给LLM）
+    """
+    stats: Dict[str, Any] = {
+        "total": len(hotspots),
+        "rule": {"rejected": 0, "passed": 0, "seconds": 0.0},
+        "similarity": {"rejected": 0, "accepted": 0, "passed": 0, "seconds": 0.0, "method": None},
+        "llm": {"scored": 0, "failed": 0, "seconds": 0.0},
+    }
+    results: List[Optional[Dict[str, Any]]] = [None] * len(hotspots)
+    if not hotspots:
+        return [], stats
+
+    # 1. 规则
+    start = time.perf_counter()
+    texts = [hotspot_text(h) for h in hotspots]
+    all_hits = matcher.match_many(texts) if matcher else [{} for _ in hotspots]
+    passed: List[int] = []
+    for i, (hotspot, hits) in enumerate(zip(hotspots, all_hits)):
+        reason = None
+        fit = ecommerce_fit_score(hotspot, (stored_analyses or {}).get(hotspot.get("url")))
+        if hits.get("exclude"):
+            reason = f"命中不相关关键词: {', '.join(sorted(hits['exclude']))}"
+        elif fit is not None and fit < settings.RELEVANCE_CASCADE_MIN_ECOMMERCE_FIT:
+            reason = f"电商适配性过低: {fit:.2f}"
+        elif require_keyword_hit and not (hits.get("include") or hits.get("category")):
+            reason = "没有关键词或类目命中"
+        if reason:
+            results[i] = {"relevance_score": 0.0, "reason": reason, "stage": "rule", "decision": REJECT}
+        else:
+            passed.append(i)
+    stats["rule"]["rejected"] = len(hotspots) - len(passed)
+    stats["rule"]["passed"] = len(passed)
+    stats["rule"]["seconds"] = time.perf_counter() - start
+
+    # 2. 相似度
+    start = time.perf_counter()
+    embedding_scores: List[Optional[float]] = [None] * len(passed)
+    if passed and settings.RELEVANCE_CASCADE_USE_EMBEDDING:
+        if embedding_client is None:
+            from app.utils.embedding import EmbeddingClient
+            embedding_client = EmbeddingClient()
+        # 字符哈希等非语义后端与字符相似度等价，直接按字符相似度阈值处理
+        backend = getattr(embedding_client, "backend", None)
+        if backend is None or backend.semantic:
+            try:
+                embedding_scores = await _embedding_similarities(
+                    [texts[i] for i in passed], target_text, embedding_client
+                )
+            except Exception as e:
+                logger.warning(f"[级联筛选] embedding相似度计算失败，使用字符相似度: {e}")
+    methods = set()
+    uncertain: List[int] = []
+    for i, similarity in zip(passed, embedding_scores):
+        keyword_hit = bool(all_hits[i].get("include") or all_hits[i].get("category"))
+        if similarity is not None:
+            methods.add("embedding")
+            reject_below = settings.RELEVANCE_CASCADE_REJECT_BELOW
+            accept_above = settings.RELEVANCE_CASCADE_ACCEPT_ABOVE
+        else:
+            methods.add("lexical")
+            similarity = lexical_similarity(texts[i], target_text)
+            reject_below = settings.RELEVANCE_CASCADE_LEXICAL_REJECT_BELOW
+            accept_above = None
+
+        if similarity < reject_below and not keyword_hit:
+            results[i] = {
+                "relevance_score": 0.0, "reason": f"相似度过低: {similarity:.3f}",
+                "stage": "similarity", "decision": REJECT
+            }
+            stats["similarity"]["rejected"] += 1
+        elif accept_above is not None and similarity >= accept_above:
+            results[i] = {
+                "relevance_score": min(1.0, similarity), "reason": f"相似度高: {similarity:.3f}",
+                "stage": "similarity", "decision": ACCEPT
+            }
+            stats["similarity"]["accepted"] += 1
+        else:
+            uncertain.append(i)
+    stats["similarity"]["passed"] = len(uncertain)
+    stats["similarity"]["method"] = "+".join(sorted(methods)) if methods else None
+    stats["similarity"]["seconds"] = time.perf_counter() - start
+
+    # 3. LLM（只处理不确定区间）
+    start = time.perf_counter()
+    if uncertain:
+        llm_results = await llm_scorer([hotspots[i] for i in uncertain])
+        for i, result in zip(uncertain, llm_results):
+            results[i] = {**result, "stage": "llm", "decision": UNCERTAIN}
+            if result.get("relevance_score") is None:
+                stats["llm"]["failed"] += 1
+            else:
+                stats["llm"]["scored"] += 1
+    stats["llm"]["seconds"] = time.perf_counter() - start
+
+    _record_stats(stats)
+    logger.info(
+        f"[级联筛选] {len(hotspots)} 个热点: 规则拒绝 {stats['rule']['rejected']}, "
+        f"相似度拒绝 {stats['similarity']['rejected']} / 采纳 {stats['similarity']['accepted']}"
+        f"（{stats['similarity']['method']}）, LLM打分 {len(uncertain)}; "
+        f"耗时 规则 {stats['rule']['seconds'] * 1000:.1f}ms, 相似度 {stats['similarity']['seconds'] * 1000:.1f}ms, "
+        f"LLM {stats['llm']['seconds']:.2f}s"
+    )
+    return results, stats
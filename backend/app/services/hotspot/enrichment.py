@@ -0,0 +1,189 @@
+"""
+热点内容增强调度
+已保存的热点按 匹配度 × 热度 × 新鲜度 排序，在每轮预算内逐个投递到独立的enrichment队列，
+每个热点一个任务；按URL去重（Redis占位 + 数据库状态），重试和重叠的调度不会重复处理
+"""
+import hashlib
+import math
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.hotspot import Hotspot
+
+
+ENRICHMENT_QUEUE = "enrichment"
+
+
+def _claim_key(url: str) -> str:
+    return f"enrich:claim:{hashlib.sha1(url.encode('utf-8')).hexdigest()}"
+
+
+def claim_url(url: str, owner: str, ttl: Optional[int] = None) -> bool:
+    """占用URL的增强任务（SET NX），已被占用返回False；Redis不可用时只依赖数据库状态去重"""
+    try:
+        from app.core.redis_client import redis_client
+        return bool(redis_client.set(
+            _claim_key(url), owner, nx=True, ex=ttl or settings.HOTSPOT_ENRICH_CLAIM_TTL
+        ))
+    except Exception as e:
+        logger.warning(f"Redis不可用，增强任务去重只依赖数据库状态: {e}")
+        return True
+
+
+def release_url(url: str):
+    """释放URL占用（增强失败后允许下次重新调度）"""
+    try:
+        from app.core.redis_client import redis_client
+        redis_client.delete(_claim_key(url))
+    except Exception as e:
+        logger.warning(f"释放增强任务占用失败: {e}")
+
+
+def is_enriched(hotspot: Hotspot) -> bool:
+    """热点是否已完成内容增强"""
+    return bool(hotspot.content_analysis)
+
+
+def enrichment_priority(hotspot: Hotspot, now: Optional[datetime] = None) -> float:
+    """增强优先级 = 匹配度 × 热度 × 新鲜度
+
+    - 热度：heat_score/100，热度正在上涨的热点按增长率加权
+    - 新鲜度：按发布时间（没有时用入库时间）指数衰减，半衰期HOTSPOT_ENRICH_FRESHNESS_HALF_LIFE_HOURS
+    """
+    now = now or datetime.now()
+    match = max(hotspot.match_score or 0.0, 0.0)
+    heat = max(hotspot.heat_score or 0, 0) / 100 * (1 + max(hotspot.heat_growth_rate or 0.0, 0.0))
+    published = hotspot.publish_time or hotspot.created_at or now
+    age_hours = max((now - published).total_seconds() / 3600, 0.0)
+    freshness = math.pow(0.5, age_hours / settings.HOTSPOT_ENRICH_FRESHNESS_HALF_LIFE_HOURS)
+    return match * heat * freshness
+
+
+def celery_priority(score: float) -> int:
+    """优先级分数映射为Celery消息优先级（Redis传输下0最高，9最低）"""
+    return max(0, min(9, int(round((1 - min(max(score, 0.0), 1.0)) * 9))))
+
+
+def select_enrichment_candidates(
+    db: Session,
+    urls: Optional[List[str]] = None,
+    budget: Optional[int] = None,
+    now: Optional[datetime] = None
+) -> List[Dict[str, Any]]:
+    """选出本轮要增强的热点（未增强、有URL），按优先级降序，最多budget个
+
+    Args:
+        urls: 候选热点URL，None时从最近HOTSPOT_ENRICH_LOOKBACK_DAYS天入库的热点中选
+        budget: 本轮预算，None时使用HOTSPOT_ENRICH_BUDGET_PER_RUN
+
+    Returns:
+        [{"hotspot_id", "url", "priority"}]
+    """
+    now = now or datetime.now()
+    budget = settings.HOTSPOT_ENRICH_BUDGET_PER_RUN if budget is None else budget
+    if budget <= 0:
+        return []
+
+    query = db.query(Hotspot).filter(Hotspot.content_analysis.is_(None))
+    if urls is not None:
+        if not urls:
+            return []
+        query = query.filter(Hotspot.url.in_(list(set(urls))))
+    else:
+        query = query.filter(Hotspot.created_at >= now - timedelta(days=settings.HOTSPOT_ENRICH_LOOKBACK_DAYS))
+
+    candidates = [
+        {"hotspot_id": h.id, "url": h.url, "priority": enrichment_priority(h, now)}
+        for h in query.all()
+        if h.url and not is_enriched(h)
+    ]
+    candidates.sort(key=lambda c: c["priority"], reverse=True)
+    return candidates[:budget]
+
+
+def schedule_enrichment(
+    db: Session,
+    urls: Optional[List[str]] = None,
+    budget: Optional[int] = None
+) -> Dict[str, int]:
+    """按优先级把热点投递到enrichment队列（每个热点一个任务）
+
+    Returns:
+        {"candidates": 候选数, "scheduled": 投递数, "skipped": 已在处理中而跳过的数量}
+    """
+    from app.services.hotspot.tasks import enrich_hotspot_task
+
+    candidates = select_enrichment_candidates(db, urls, budget)
+    scheduled = 0
+    skipped = 0
+    run_id = f"schedule-{time.time():.0f}"
+
+    for candidate in candidates:
+        if not claim_url(candidate["url"], run_id):
+            skipped += 1
+            continue
+        try:
+            enrich_hotspot_task.apply_async(
+                args=[candidate["hotspot_id"]],
+                queue=ENRICHMENT_QUEUE,
+                priority=celery_priority(candidate["priority"])
+            )
+            scheduled += 1
+        except Exception as e:
+            release_url(candidate["url"])
+            logger.error(f"投递增强任务失败: {candidate['url'][:100]}, {e}")
+
+    logger.info(f"增强调度: 候选 {len(candidates)} 个, 投递 {scheduled} 个, 处理中跳过 {skipped} 个")
+    return {"candidates": len(candidates), "scheduled": scheduled, "skipped": skipped}
+
+
+async def enrich_hotspot_content(
+    hotspot: Dict[str, Any],
+    structure_agent=None,
+    analysis_agent=None
+) -> Dict[str, Any]:
+    """用ContentStructureAgent和ContentAnalysisAgent增强单个热点
+
+    Args:
+        hotspot: {"url", "title"}
+
+    Returns:
+        {"video_structure", "content_analysis", "content_compact"}（content_compact可能缺失）
+    """
+    if structure_agent is None or analysis_agent is None:
+        from app.agents import get_content_structure_agent, get_content_analysis_agent
+        structure_agent = structure_agent or get_content_structure_agent()
+        analysis_agent = analysis_agent or get_content_analysis_agent()
+
+    url = hotspot["url"]
+    title = hotspot.get("title", "")
+
+    # 1. 提取视频结构
+    structure_result = await structure_agent.execute({"url": url, "title": title})
+    video_structure = structure_result.get("video_structure", {})
+
+    # 2. 分析内容
+    analysis_result = await analysis_agent.execute({
+        "video_structure": video_structure,
+        "title": title,
+        "url": url
+    })
+    content_analysis = analysis_result.get("content_analysis", {})
+
+    result = {
+        "video_structure": video_structure,
+        "content_analysis": content_analysis,
+    }
+
+    # 3. 内容摘要：优先使用分析摘要，其次使用转录文本
+    summary = content_analysis.get("summary", "")
+    if summary:
+        result["content_compact"] = summary
+    elif video_structure.get("transcript"):
+        result["content_compact"] = video_structure.get("transcript", "")[:500]
+    return result
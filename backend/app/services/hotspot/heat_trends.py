@@ -0,0 +1,226 @@
+"""
+热点热度趋势
+每次抓取批量写入热度采样（排名、热度），按时间窗口向量化计算增长率和增长速度，
+旧采样降采样后按保留期清理
+"""
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from loguru import logger
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.hotspot import Hotspot, HotspotHeatSample
+
+
+# 降采样时间桶的起点（与时区无关）
+_BUCKET_EPOCH = datetime(1970, 1, 1)
+
+
+def record_heat_samples(
+    db: Session,
+    hotspots: List[Dict[str, Any]],
+    platform: Optional[str] = None,
+    hotspot_ids_by_url: Optional[Dict[str, str]] = None,
+    sampled_at: Optional[datetime] = None
+) -> int:
+    """批量写入一次抓取的热度采样，并刷新这些热点的heat_growth_rate
+
+    Args:
+        hotspots: 抓取到的热点（需包含url，rank/heat_score可选）
+        platform: 平台标识，None时使用热点自身的platform
+        hotspot_ids_by_url: {url: 热点ID}，None时按URL查询
+        sampled_at: 采样时间，None时使用当前时间
+
+    Returns:
+        写入的采样数
+    """
+    if hotspot_ids_by_url is None:
+        urls = list({h["url"] for h in hotspots if h.get("url")})
+        hotspot_ids_by_url = dict(
+            db.query(Hotspot.url, Hotspot.id).filter(Hotspot.url.in_(urls)).all()
+        ) if urls else {}
+
+    sampled_at = sampled_at or datetime.now()
+    rows = {}
+    for hotspot in hotspots:
+        hotspot_id = hotspot_ids_by_url.get(hotspot.get("url"))
+        if not hotspot_id or hotspot_id in rows:
+            continue
+        rows[hotspot_id] = {
+            "id": str(uuid.uuid4()),
+            "hotspot_id": hotspot_id,
+            "platform": platform or hotspot.get("platform") or "unknown",
+            "sampled_at": sampled_at,
+            "rank": hotspot.get("rank"),
+            "heat_score": hotspot.get("heat_score"),
+            "created_at": sampled_at,
+            "updated_at": sampled_at,
+        }
+    if not rows:
+        return 0
+
+    db.execute(insert(HotspotHeatSample), list(rows.values()))
+    db.commit()
+    refresh_growth_rates(db, list(rows.keys()))
+    return len(rows)
+
+
+def compute_heat_trends(
+    db: Session,
+    hotspot_ids: Optional[List[str]] = None,
+    window_hours: Optional[float] = None,
+    now: Optional[datetime] = None
+) -> Dict[str, Dict[str, Any]]:
+    """按时间窗口计算热点的热度趋势（所有热点一次查询，numpy分组向量化计算）
+
+    - growth_rate: 窗口内热度增长率 (最新 - 最早) / 最早
+    - velocity: 热度增长速度（热度/小时，最小二乘斜率）
+    - rank_velocity: 排名上升速度（名次/小时，正数表示上升）
+
+    Args:
+        hotspot_ids: 热点ID列表，None时计算窗口内所有有采样的热点
+        window_hours: 时间窗口（小时），None时使用HOTSPOT_HEAT_TREND_WINDOW_HOURS
+        now: 窗口结束时间，None时使用当前时间
+
+    Returns:
+        {热点ID: 趋势}
+    """
+    window_hours = window_hours or settings.HOTSPOT_HEAT_TREND_WINDOW_HOURS
+    now = now or datetime.now()
+    start = now - timedelta(hours=window_hours)
+
+    query = db.query(
+        HotspotHeatSample.hotspot_id,
+        HotspotHeatSample.sampled_at,
+        HotspotHeatSample.heat_score,
+        HotspotHeatSample.rank
+    ).filter(
+        HotspotHeatSample.sampled_at >= start,
+        HotspotHeatSample.sampled_at <= now,
+        HotspotHeatSample.heat_score.isnot(None)
+    )
+    if hotspot_ids is not None:
+        if not hotspot_ids:
+            return {}
+        query = query.filter(HotspotHeatSample.hotspot_id.in_(hotspot_ids))
+    rows = query.order_by(HotspotHeatSample.hotspot_id, HotspotHeatSample.sampled_at).all()
+    if not rows:
+        return {}
+
+    ids = np.array([row[0] for row in rows], dtype=object)
+    hours = np.array([(row[1] - start).total_seconds() / 3600 for row in rows], dtype=np.float64)
+    heat = np.array([row[2] for row in rows], dtype=np.float64)
+    rank = np.array([np.nan if row[3] is None else row[3] for row in rows], dtype=np.float64)
+
+    # 行已按hotspot_id排序，同一热点的采样连续
+    group_ids, codes, counts = np.unique(ids, return_inverse=True, return_counts=True)
+    ends = np.cumsum(counts) - 1
+    starts = ends - counts + 1
+
+    first_heat = heat[starts]
+    last_heat = heat[ends]
+    span = hours[ends] - hours[starts]
+    growth_rate = (last_heat - first_heat) / np.maximum(first_heat, 1.0)
+
+    # 最小二乘斜率：cov(t, h) / var(t)，按热点分组求和
+    mean_t = np.bincount(codes, weights=hours) / counts
+    mean_h = np.bincount(codes, weights=heat) / counts
+    dt = hours - mean_t[codes]
+    cov = np.bincount(codes, weights=dt * (heat - mean_h[codes]))
+    var = np.bincount(codes, weights=dt * dt)
+    velocity = np.divide(cov, var, out=np.zeros_like(cov), where=var > 0)
+
+    rank_change = rank[starts] - rank[ends]
+    rank_velocity = np.divide(
+        rank_change, span,
+        out=np.zeros_like(rank_change), where=(span > 0) & ~np.isnan(rank_change)
+    )
+
+    trends = {}
+    for i, hotspot_id in enumerate(group_ids):
+        latest_rank = rank[ends[i]]
+        trends[hotspot_id] = {
+            "samples": int(counts[i]),
+            "first_heat": float(first_heat[i]),
+            "latest_heat": float(last_heat[i]),
+            "latest_rank": None if np.isnan(latest_rank) else int(latest_rank),
+            "span_hours": round(float(span[i]), 3),
+            "growth_rate": round(float(growth_rate[i]), 4),
+            "velocity": round(float(velocity[i]), 4),
+            "rank_change": None if np.isnan(rank_change[i]) else int(rank_change[i]),
+            "rank_velocity": round(float(rank_velocity[i]), 4),
+        }
+    return trends
+
+
+def refresh_growth_rates(
+    db: Session,
+    hotspot_ids: List[str],
+    window_hours: Optional[float] = None
+) -> int:
+    """按最近窗口的采样刷新热点的heat_growth_rate（至少两个采样才更新）
+
+    Returns:
+        更新的热点数
+    """
+    trends = compute_heat_trends(db, hotspot_ids, window_hours)
+    values = [
+        {"id": hotspot_id, "heat_growth_rate": trend["growth_rate"]}
+        for hotspot_id, trend in trends.items()
+        if trend["samples"] >= 2
+    ]
+    if values:
+        db.execute(update(Hotspot), values)
+        db.commit()
+    return len(values)
+
+
+def downsample_heat_samples(db: Session, now: Optional[datetime] = None) -> Dict[str, int]:
+    """降采样并清理旧的热度采样
+
+    - 超过HOTSPOT_HEAT_RETENTION_DAYS的采样删除
+    - 超过HOTSPOT_HEAT_RAW_HOURS的采样，每个热点每HOTSPOT_HEAT_DOWNSAMPLE_HOURS小时只保留最后一个
+
+    Returns:
+        {"expired": 删除的过期采样数, "downsampled": 降采样删除的采样数}
+    """
+    now = now or datetime.now()
+    retention_cutoff = now - timedelta(days=settings.HOTSPOT_HEAT_RETENTION_DAYS)
+    raw_cutoff = now - timedelta(hours=settings.HOTSPOT_HEAT_RAW_HOURS)
+    bucket_seconds = max(1, settings.HOTSPOT_HEAT_DOWNSAMPLE_HOURS) * 3600
+
+    expired = db.query(HotspotHeatSample).filter(
+        HotspotHeatSample.sampled_at < retention_cutoff
+    ).delete(synchronize_session=False)
+
+    rows = db.query(
+        HotspotHeatSample.id,
+        HotspotHeatSample.hotspot_id,
+        HotspotHeatSample.sampled_at
+    ).filter(
+        HotspotHeatSample.sampled_at < raw_cutoff
+    ).order_by(HotspotHeatSample.hotspot_id, HotspotHeatSample.sampled_at.desc()).all()
+
+    # 每个 (热点, 时间桶) 保留最新的一个采样
+    kept = set()
+    to_delete = []
+    for sample_id, hotspot_id, sampled_at in rows:
+        bucket = (hotspot_id, int((sampled_at - _BUCKET_EPOCH).total_seconds() // bucket_seconds))
+        if bucket in kept:
+            to_delete.append(sample_id)
+        else:
+            kept.add(bucket)
+
+    for i in range(0, len(to_delete), 500):
+        db.query(HotspotHeatSample).filter(
+            HotspotHeatSample.id.in_(to_delete[i:i + 500])
+        ).delete(synchronize_session=False)
+
+    db.commit()
+    if expired or to_delete:
+        logger.info(f"热度采样清理: 过期 {expired} 条, 降采样 {len(to_delete)} 条")
+    return {"expired": expired, "downsampled": len(to_delete)}
@@ -0,0 +1,285 @@
+"""
+热点-直播间匹配度预计算
+热点保存、直播间配置变更时增量刷新hotspot_room_scores表，
+可视化接口直接按(live_room_id, match_score)索引读取每个直播间的Top N
+"""
+import json
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from loguru import logger
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.models.hotspot import Hotspot, HotspotRoomScore
+from app.models.product import LiveRoom
+from app.utils.keyword_matcher import KeywordMatcher, compile_keyword_matcher
+
+
+# 不相关关键词（用于排除）- 根据直播间名称匹配
+# 注意：使用完整词组匹配，避免误排除（如"生活"不应该排除"生活家居"中的"生活"）
+EXCLUDE_KEYWORDS_MAP: Dict[str, List[str]] = {
+    "时尚真惠选": ["家具", "家居", "家电", "智能家居", "3c", "数码", "电器", "装修", "北欧", "沙发", "床", "桌子", "椅子", "柜子", "生活家居", "家居用品", "家居设计"],
+    "美妆真惠选": ["家具", "家居", "家电", "智能家居", "3c", "数码", "电器", "装修", "北欧", "沙发", "床", "生活家居", "家居用品"],
+    "童装真惠选": ["家具", "家居", "家电", "智能家居", "3c", "数码", "电器", "装修", "北欧", "沙发", "床", "美妆", "化妆品", "生活家居", "家居用品", "家居设计", "家居装修", "家居装饰"],
+    "轻奢真惠选": ["家具", "家居", "家电", "智能家居", "3c", "数码", "电器", "装修", "北欧", "沙发", "床", "童装", "儿童", "生活家居", "家居用品"],
+}
+
+# 测试数据的URL标识（不排除标题中的"测试"，因为真实新闻可能包含这个词）
+TEST_URL_PATTERNS = ("test.com", "workflow-real-llm", "/video/test")
+
+# 每次批量写入的行数
+_INSERT_CHUNK_SIZE = 1000
+
+
+def is_test_hotspot_url(url: Optional[str]) -> bool:
+    """是否为测试数据的URL"""
+    url = (url or "").lower()
+    return any(pattern in url for pattern in TEST_URL_PATTERNS)
+
+
+def get_room_matcher(live_room: LiveRoom) -> KeywordMatcher:
+    """直播间关键词匹配器（include: 直播间关键词，category: 类目（、分隔），exclude: 不相关关键词）
+
+    按直播间配置编译一次，配置不变时复用
+    """
+    category = live_room.category or ""
+    return compile_keyword_matcher({
+        "include": live_room.keywords or [],
+        "category": [cat.strip() for cat in category.split('、')] if category else [],
+        "exclude": EXCLUDE_KEYWORDS_MAP.get(live_room.name or "", []),
+    })
+
+
+def _get_ecommerce_fit(hotspot: Hotspot) -> Dict[str, Any]:
+    """解析热点content_analysis中的电商适配性"""
+    content_analysis = hotspot.content_analysis
+    if not content_analysis:
+        return {}
+    try:
+        if isinstance(content_analysis, str):
+            content_analysis = json.loads(content_analysis)
+        ecommerce_fit = content_analysis.get("ecommerce_fit", {})
+        return ecommerce_fit if isinstance(ecommerce_fit, dict) else {}
+    except Exception as e:
+        logger.debug(f"[匹配度计算] 解析content_analysis失败: {e}")
+        return {}
+
+
+def calculate_room_match_score(
+    hotspot: Hotspot,
+    live_room: LiveRoom,
+    matcher: Optional[KeywordMatcher] = None
+) -> float:
+    """快速计算热点与直播间的匹配度（不使用Agent）
+
+    未通过预筛选（无电商适配性潜力、无match_score、无关键词/类目匹配）
+    或包含直播间不相关关键词的热点返回0
+
+    Args:
+        matcher: 直播间关键词匹配器，批量计算时由调用方按直播间编译一次后传入，None时按直播间配置获取
+    """
+    category = live_room.category or ""
+    hotspot_text = f"{hotspot.title} {' '.join(hotspot.tags or [])}"
+    matcher = matcher or get_room_matcher(live_room)
+    hits = matcher.match(hotspot_text)
+
+    # 包含不相关关键词的热点直接排除
+    if hits.get("exclude"):
+        return 0.0
+
+    ecommerce_fit = _get_ecommerce_fit(hotspot)
+    try:
+        ecommerce_score = float(ecommerce_fit.get("score", 0.0))
+    except (TypeError, ValueError):
+        ecommerce_score = 0.0
+
+    # 1. 关键词匹配
+    keyword_score = matcher.hit_ratio(hits, "include")
+
+    # 2. 类目匹配 - 严格匹配
+    category_keywords = [cat.strip().lower() for cat in category.split('、')] if category else []
+    category_score = 1.0 if hits.get("category") else 0.0
+
+    base_match_score = hotspot.match_score if hotspot.match_score and hotspot.match_score > 0 else 0.0
+
+    # 预筛选：信任LLM的判断，有电商适配性潜力（>=0.3）、已有match_score或关键词/类目匹配才计算
+    if not (ecommerce_score >= 0.3 or base_match_score > 0 or keyword_score > 0 or category_score > 0):
+        return 0.0
+
+    # 3. 适用类目匹配 - 只进行直接文本匹配，不使用同义词映射，避免误匹配
+    applicable_categories_match = 0.0
+    applicable_categories = ecommerce_fit.get("applicable_categories", [])
+    if applicable_categories and category_keywords:
+        if any(
+            any(cat_kw in app_cat.lower() or app_cat.lower() in cat_kw for cat_kw in category_keywords)
+            for app_cat in applicable_categories
+        ):
+            applicable_categories_match = 1.0
+
+    # 内容迁移潜力（适用类目有匹配时加权）
+    content_migration_potential = ecommerce_score
+    if applicable_categories_match > 0:
+        content_migration_potential = min(1.0, ecommerce_score * 1.1)
+
+    # 语义关联：有base_match_score时使用Agent的结果，否则用关键词+类目作为简单代理
+    semantic_relevance = base_match_score if base_match_score > 0 else (keyword_score * 0.5 + category_score * 0.5)
+    direct_relevance = keyword_score * 0.6 + category_score * 0.4
+    has_direct_match = keyword_score > 0 or category_score > 0
+
+    if has_direct_match:
+        match_score = (
+            content_migration_potential * 0.50 +
+            semantic_relevance * 0.25 +
+            direct_relevance * 0.15 +
+            applicable_categories_match * 0.10
+        )
+    else:
+        # 没有直接关联时，降低内容迁移潜力的权重，提高适用类目匹配的权重
+        match_score = (
+            content_migration_potential * 0.30 +
+            semantic_relevance * 0.20 +
+            direct_relevance * 0.15 +
+            applicable_categories_match * 0.35
+        )
+        # 没有直接关联时，匹配度上限为50%
+        match_score = min(match_score, 0.5)
+
+    # 内容迁移潜力很高且适用类目有匹配时，给予基础分数
+    if has_direct_match and content_migration_potential >= 0.6 and applicable_categories_match > 0 and match_score < 0.3:
+        match_score = 0.3
+
+    return match_score
+
+
+def refresh_room_scores(
+    db: Session,
+    hotspot_ids: Optional[List[str]] = None,
+    live_room_ids: Optional[List[str]] = None
+) -> int:
+    """重新计算热点-直播间匹配度
+
+    Args:
+        db: 数据库会话
+        hotspot_ids: 只刷新这些热点（None表示所有热点）
+        live_room_ids: 只刷新这些直播间（None表示所有直播间）
+
+    Returns:
+        写入的匹配度行数（只保存匹配度>0的行）
+
+    全量刷新（hotspot_ids为None）后记录直播间的room_scores_refreshed_at，
+    没有任何热点匹配的直播间也不会被 ensure_room_scores 重复计算
+    """
+    if hotspot_ids is not None and not hotspot_ids:
+        return 0
+    if live_room_ids is not None and not live_room_ids:
+        return 0
+
+    room_query = db.query(LiveRoom)
+    if live_room_ids is not None:
+        room_query = room_query.filter(LiveRoom.id.in_(live_room_ids))
+    live_rooms = room_query.all()
+    if not live_rooms:
+        return 0
+    room_ids = [room.id for room in live_rooms]
+
+    delete_query = db.query(HotspotRoomScore).filter(HotspotRoomScore.live_room_id.in_(room_ids))
+    hotspot_query = db.query(Hotspot)
+    if hotspot_ids is not None:
+        delete_query = delete_query.filter(HotspotRoomScore.hotspot_id.in_(hotspot_ids))
+        hotspot_query = hotspot_query.filter(Hotspot.id.in_(hotspot_ids))
+
+    try:
+        delete_query.delete(synchronize_session=False)
+
+        now = datetime.now()
+        # 每个直播间的匹配器只获取一次，热点×直播间循环内不再重复编译/查缓存
+        matchers = [(live_room, get_room_matcher(live_room)) for live_room in live_rooms]
+        rows: List[Dict[str, Any]] = []
+        written = 0
+        for hotspot in hotspot_query.yield_per(500):
+            if is_test_hotspot_url(hotspot.url):
+                continue
+            for live_room, matcher in matchers:
+                match_score = calculate_room_match_score(hotspot, live_room, matcher)
+                if match_score <= 0:
+                    continue
+                rows.append({
+                    "id": str(uuid.uuid4()),
+                    "hotspot_id": hotspot.id,
+                    "live_room_id": live_room.id,
+                    "match_score": match_score,
+                    "created_at": now,
+                    "updated_at": now,
+                })
+            if len(rows) >= _INSERT_CHUNK_SIZE:
+                db.execute(insert(HotspotRoomScore), rows)
+                written += len(rows)
+                rows = []
+
+        if rows:
+            db.execute(insert(HotspotRoomScore), rows)
+            written += len(rows)
+        if hotspot_ids is None:
+            for live_room in live_rooms:
+                live_room.room_scores_refreshed_at = now
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    logger.debug(f"刷新热点匹配度: {len(live_rooms)} 个直播间，写入 {written} 行")
+    return written
+
+
+def ensure_room_scores(db: Session, live_room_ids: List[str]) -> None:
+    """为从未全量计算过匹配度的直播间计算一次（迁移前已有的直播间、刷新失败时的兜底）
+
+    按直播间的room_scores_refreshed_at判断，计算过一次后即使没有任何匹配行也不再重复计算
+    """
+    missing_room_ids = [
+        room_id for (room_id,) in db.query(LiveRoom.id).filter(
+            LiveRoom.id.in_(live_room_ids),
+            LiveRoom.room_scores_refreshed_at.is_(None)
+        )
+    ]
+    if missing_room_ids:
+        refresh_room_scores(db, live_room_ids=missing_room_ids)
+
+
+def get_room_top_hotspots(
+    db: Session,
+    live_room_id: str,
+    limit: int,
+    min_score: float = 0.0
+) -> List[Tuple[Hotspot, float]]:
+    """按匹配度读取直播间的Top N热点（按标题去重，保留匹配度最高的）
+
+    Returns:
+        [(Hotspot, 匹配度)]，按匹配度降序
+    """
+    query = db.query(Hotspot, HotspotRoomScore.match_score).join(
+        HotspotRoomScore, HotspotRoomScore.hotspot_id == Hotspot.id
+    ).filter(
+        HotspotRoomScore.live_room_id == live_room_id,
+        HotspotRoomScore.match_score >= min_score
+    ).order_by(HotspotRoomScore.match_score.desc(), Hotspot.created_at.desc())
+
+    result: List[Tuple[Hotspot, float]] = []
+    seen_titles = set()
+    page_size = max(limit * 2, 50)
+    offset = 0
+    while len(result) < limit:
+        page = query.offset(offset).limit(page_size).all()
+        for hotspot, match_score in page:
+            if hotspot.title in seen_titles:
+                continue
+            seen_titles.add(hotspot.title)
+            result.append((hotspot, match_score))
+            if len(result) >= limit:
+                break
+        if len(page) < page_size:
+            break
+        offset += page_size
+    return result
@@ -1,6 +1,7 @@
 """
 热点监控服务
 """
+import asyncio
 import uuid
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
@@ -14,10 +15,12 @@ from app.utils.trendradar import TrendRadarClient
 from app.utils.feishu import FeishuClient
 from app.utils.embedding import EmbeddingClient
 from app.utils.sentiment import SentimentClient
-from app.agents.relevance_analysis_agent import RelevanceAnalysisAgent
 from app.crawlers.trendradar_crawler import TrendRadarCrawler
 from app.utils.firecrawl import FirecrawlClient
 from app.core.config import settings
+from app.services.hotspot.room_scores import get_room_matcher
+from app.services.hotspot.cascade import REJECT, run_relevance_cascade
+from app.utils.keyword_matcher import KeywordMatcher, compile_keyword_matcher, split_keyword_rules
 
 
 class HotspotMonitorService:
@@ -79,7 +82,8 @@ class HotspotMonitorService:
             self.firecrawl_client = None
         
         if use_agent:
-            self.relevance_agent = RelevanceAnalysisAgent()
+            from app.agents import get_relevance_analysis_agent
+            self.relevance_agent = get_relevance_analysis_agent()  # 进程级共享
         else:
             # 保留原有实现作为fallback
             self.embedding_client = EmbeddingClient()
@@ -181,43 +185,35 @@ class HotspotMonitorService:
     async def _calculate_live_room_match_score(
         self,
         hotspot: Dict[str, Any],
-        live_room: LiveRoom
+        live_room: LiveRoom,
+        agent_result: Optional[Dict[str, Any]] = None,
+        matcher: Optional[KeywordMatcher] = None
     ) -> float:
         """计算热点与直播间的匹配度（基于关键词和语义相似度）
         
         Args:
             hotspot: 热点数据
             live_room: 直播间对象
+            agent_result: 预先计算好的Agent判断结果（批量评分时传入），
+                          传入时不再单独调用Agent；relevance_score为None表示该热点无Agent判断
+            matcher: 直播间关键词匹配器（批量计算时按直播间获取一次后传入），None时按直播间配置获取
             
         Returns:
             匹配度分数（0-1）
         """
         hotspot_text = f"{hotspot.get('title', '')} {' '.join(hotspot.get('tags', []))}"
-        keywords = live_room.keywords or []
         category = live_room.category or ""
+        # 直播间关键词、类目（、分隔）一次扫描匹配
+        matcher = matcher or get_room_matcher(live_room)
+        hits = matcher.match(hotspot_text)
         
         # 1. 关键词匹配（40%权重）
-        keyword_score = 0.0
-        matched_keywords_list = []
-        if keywords:
-            hotspot_lower = hotspot_text.lower()
-            for kw in keywords:
-                if kw.lower() in hotspot_lower:
-                    matched_keywords_list.append(kw)
-            matched_count = len(matched_keywords_list)
-            keyword_score = min(1.0, matched_count / len(keywords)) if keywords else 0.0
+        matched_keywords = hits.get("include", set())
+        keyword_score = matcher.hit_ratio(hits, "include")
         
         # 2. 类目匹配（20%权重）
-        category_score = 0.0
-        category_matched = False
-        if category:
-            # 检查类目关键词是否在热点文本中
-            category_keywords = category.split('、')  # 支持多个类目（用、分隔）
-            for cat_kw in category_keywords:
-                if cat_kw.strip().lower() in hotspot_text.lower():
-                    category_score = 1.0
-                    category_matched = True
-                    break
+        category_matched = bool(category and hits.get("category"))
+        category_score = 1.0 if category_matched else 0.0
         
         # 3. 语义相似度（40%权重）- **强制使用Agent进行二次判断**
         semantic_score = 0.0
@@ -225,19 +221,18 @@ class HotspotMonitorService:
         agent_relevance_score = 0.0  # Agent的最终判断结果
         agent_judgment_available = False  # 是否有Agent的判断结果
         
-        if self.use_agent and self.relevance_agent:
+        if agent_result is not None:
+            # 批量评分已给出结果，直接使用
+            if agent_result.get("relevance_score") is not None:
+                agent_relevance_score = float(agent_result["relevance_score"])
+                agent_judgment_available = True
+                semantic_score = agent_relevance_score
+                semantic_details = {"agent_reason": agent_result.get("reason", "")}
+        elif self.use_agent and self.relevance_agent:
             try:
-                # 构建直播间文本（包含更丰富的上下文信息）
-                live_room_text = f"""
-直播间名称：{live_room.name}
-类目：{category}
-关键词：{', '.join(keywords)}
-定位：{live_room.ip_character or '未设置'}
-风格：{live_room.style or '未设置'}
-"""
                 result = await self.relevance_agent.execute({
                     "hotspot_text": hotspot_text,
-                    "product_text": live_room_text,
+                    "product_text": self.build_live_room_text(live_room),
                     "hotspot_tags": hotspot.get('tags', []),
                     "product_category": category
                 })
@@ -256,9 +251,7 @@ class HotspotMonitorService:
         # 如果没有语义匹配，使用简单的文本相似度
         if semantic_score == 0.0 and not agent_judgment_available:
             # 简单的文本相似度：检查标题中是否包含关键词
-            if keywords:
-                matched = sum(1 for kw in keywords if kw.lower() in hotspot_text.lower())
-                semantic_score = matched / len(keywords) if keywords else 0.0
+            semantic_score = keyword_score
         
         # 检查热点是否有ContentAnalysisAgent的分析结果（电商适配性）
         ecommerce_score = 0.0
@@ -344,6 +337,9 @@ class HotspotMonitorService:
         # 计算直接关联（关键词+类目匹配）
         direct_relevance = (keyword_score * 0.6 + category_score * 0.4)
         
+        # 重要：当没有直接关联时（关键词和类目匹配都为0），应该降低内容迁移潜力的权重
+        has_direct_match = keyword_score > 0 or category_score > 0
+        
         # **核心逻辑：优先信任RelevanceAnalysisAgent的判断，但增加适用类目匹配的否决权**
         # 1. 如果Agent判断不相关（relevance_score < 0.4），直接返回0匹配度（提高阈值，更严格）
         # 2. 如果适用类目完全不匹配（applicable_categories_match = 0），即使Agent判断相关，也应该大幅降低匹配度
@@ -351,44 +347,14 @@ class HotspotMonitorService:
             if agent_relevance_score < 0.4:  # 提高阈值：从0.3提高到0.4，更严格
                 # Agent明确判断不相关，直接返回0匹配度
                 logger.warning(f"❌ RelevanceAnalysisAgent判断不相关 ({agent_relevance_score:.3f} < 0.4)，返回0匹配度")
-                return {
-                    "match_score": 0.0,
-                    "keyword_score": keyword_score,
-                    "category_score": category_score,
-                    "semantic_score": semantic_score,
-                    "ecommerce_score": ecommerce_score,
-                    "applicable_categories_match": applicable_categories_match,
-                    "details": {
-                        **semantic_details,
-                        "agent_relevance_score": agent_relevance_score,
-                        "agent_judgment": "不相关（< 0.4）"
-                    }
-                }
+                return 0.0
+            elif applicable_categories_match == 0.0 and not has_direct_match:
+                # 适用类目完全不匹配 + 无直接关联 = 不应该匹配
+                logger.warning(f"⚠️ 适用类目完全不匹配且无直接关联，即使Agent判断相关({agent_relevance_score:.3f})，也返回0匹配度")
+                return 0.0
             else:
-                # Agent判断相关，但需要检查适用类目匹配
-                # **新增：如果适用类目完全不匹配，即使Agent判断相关，也应该降低匹配度**
-                if applicable_categories_match == 0.0 and not has_direct_match:
-                    # 适用类目完全不匹配 + 无直接关联 = 不应该匹配
-                    logger.warning(f"⚠️ 适用类目完全不匹配且无直接关联，即使Agent判断相关({agent_relevance_score:.3f})，也返回0匹配度")
-                    return {
-                        "match_score": 0.0,
-                        "keyword_score": keyword_score,
-                        "category_score": category_score,
-                        "semantic_score": semantic_score,
-                        "ecommerce_score": ecommerce_score,
-                        "applicable_categories_match": applicable_categories_match,
-                        "details": {
-                            **semantic_details,
-                            "agent_relevance_score": agent_relevance_score,
-                            "agent_judgment": "适用类目不匹配且无直接关联"
-                        }
-                    }
-                else:
-                    # Agent判断相关，使用Agent的relevance_score作为主要依据
-                    logger.info(f"✅ RelevanceAnalysisAgent判断相关 ({agent_relevance_score:.3f} >= 0.4)，使用Agent评分")
-        
-        # 重要：当没有直接关联时（关键词和类目匹配都为0），应该降低内容迁移潜力的权重
-        has_direct_match = keyword_score > 0 or category_score > 0
+                # Agent判断相关，使用Agent的relevance_score作为主要依据
+                logger.info(f"✅ RelevanceAnalysisAgent判断相关 ({agent_relevance_score:.3f} >= 0.4)，使用Agent评分")
         
         # 综合匹配度计算（优化版：优先信任Agent判断，但提高适用类目匹配的权重）
         if agent_judgment_available and agent_relevance_score >= 0.4:
@@ -439,7 +405,7 @@ class HotspotMonitorService:
 === 匹配度详细评分 ===
 热点: {hotspot.get('title', '')[:50]}
 直播间: {live_room.name} ({category})
-关键词匹配: {keyword_score:.3f} (匹配的关键词: {matched_keywords_list})
+关键词匹配: {keyword_score:.3f} (匹配的关键词: {sorted(matched_keywords)})
 类目匹配: {category_score:.3f} (类目: {category}, 匹配: {category_matched})
 语义匹配: {semantic_score:.3f} {f'(详情: {semantic_details})' if semantic_details else ''}
 综合匹配度: {match_score:.3f}
@@ -478,14 +444,7 @@ class HotspotMonitorService:
         hotspot_text = f"{hotspot.get('title', '')} {' '.join(hotspot.get('tags', []))}"
         
         # 构建商品文本
-        product_text_parts = [
-            product.name or "",
-            product.category or "",
-            product.description or "",
-        ]
-        if product.selling_points:
-            product_text_parts.extend(product.selling_points)
-        product_text = " ".join([p for p in product_text_parts if p])
+        product_text = self.build_product_text(product)
         
         try:
             result = await self.relevance_agent.execute({
@@ -567,26 +526,193 @@ class HotspotMonitorService:
         
         return max(0.0, min(1.0, match_score))
     
+    @staticmethod
+    def build_live_room_text(live_room: LiveRoom) -> str:
+        """构建直播间描述文本（包含更丰富的上下文信息，供Agent判断）"""
+        return f"""
+直播间名称：{live_room.name}
+类目：{live_room.category or ""}
+关键词：{', '.join(live_room.keywords or [])}
+定位：{live_room.ip_character or '未设置'}
+风格：{live_room.style or '未设置'}
+"""
+    
+    @staticmethod
+    def build_product_text(product: Product) -> str:
+        """构建商品描述文本"""
+        product_text_parts = [
+            product.name or "",
+            product.category or "",
+            product.description or "",
+        ]
+        if product.selling_points:
+            product_text_parts.extend(product.selling_points)
+        return " ".join([p for p in product_text_parts if p])
+    
+    async def batch_relevance_scores(
+        self,
+        hotspots: List[Dict[str, Any]],
+        target_text: str,
+        target_category: str = "",
+        semaphore: Optional[asyncio.Semaphore] = None
+    ) -> List[Dict[str, Any]]:
+        """批量计算热点关联度：按批打包热点，每批一次LLM调用，批次之间并发执行
+        
+        Args:
+            hotspots: 热点列表
+            target_text: 直播间或商品描述文本
+            target_category: 直播间或商品类目
+            semaphore: 并发控制信号量（跨直播间共享时传入），None时按配置新建
+            
+        Returns:
+            与输入顺序一致的结果列表，批次失败的热点relevance_score为None
+        """
+        if not hotspots:
+            return []
+        
+        batch_size = max(1, settings.RELEVANCE_BATCH_SIZE)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(max(1, settings.RELEVANCE_BATCH_CONCURRENCY))
+        
+        async def score_chunk(chunk: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+            async with semaphore:
+                try:
+                    return await self.relevance_agent.execute_batch(chunk, target_text, target_category)
+                except Exception as e:
+                    logger.warning(f"批量关联度分析失败（{len(chunk)} 个热点）: {e}")
+                    return [{"relevance_score": None, "reason": ""} for _ in chunk]
+        
+        chunks = [hotspots[i:i + batch_size] for i in range(0, len(hotspots), batch_size)]
+        chunk_results = await asyncio.gather(*(score_chunk(chunk) for chunk in chunks))
+        
+        results = []
+        for chunk_result in chunk_results:
+            results.extend(chunk_result)
+        return results
+    
+    async def _score_hotspots(
+        self,
+        hotspots: List[Dict[str, Any]],
+        product: Optional[Product],
+        live_room: Optional[LiveRoom],
+        semaphore: Optional[asyncio.Semaphore] = None,
+        stored_analyses: Optional[Dict[str, Any]] = None
+    ) -> List[float]:
+        """为一组热点计算匹配度（使用Agent时走批量评分）
+        
+        Args:
+            stored_analyses: {热点URL: 数据库中已保存的content_analysis}，供级联筛选的电商适配性规则使用
+        """
+        if not product and not live_room:
+            # 既没有商品也没有直播间，匹配度为0
+            return [0.0] * len(hotspots)
+        
+        if not (self.use_agent and self.relevance_agent):
+            if product:
+                return [await self.calculate_product_match_score(h, product) for h in hotspots]
+            matcher = get_room_matcher(live_room)
+            return [await self._calculate_live_room_match_score(h, live_room, matcher=matcher) for h in hotspots]
+        
+        if product:
+            # 有商品时，使用商品匹配度计算
+            agent_results = await self._relevance_results(
+                hotspots, self.build_product_text(product), product.category or "", live_room, semaphore,
+                stored_analyses=stored_analyses
+            )
+            scores = []
+            for hotspot, result in zip(hotspots, agent_results):
+                if result.get("relevance_score") is not None:
+                    scores.append(result["relevance_score"])
+                else:
+                    # 该批失败，回退到单条计算
+                    scores.append(await self.calculate_product_match_score(hotspot, product))
+            return scores
+        
+        # 没有商品但有直播间时，使用直播间关键词和语义匹配
+        matcher = get_room_matcher(live_room)
+        agent_results = await self._relevance_results(
+            hotspots, self.build_live_room_text(live_room), live_room.category or "", live_room, semaphore,
+            require_keyword_hit=True, matcher=matcher, stored_analyses=stored_analyses
+        )
+        return [
+            0.0 if result.get("decision") == REJECT
+            else await self._calculate_live_room_match_score(hotspot, live_room, agent_result=result, matcher=matcher)
+            for hotspot, result in zip(hotspots, agent_results)
+        ]
+    
+    async def _relevance_results(
+        self,
+        hotspots: List[Dict[str, Any]],
+        target_text: str,
+        target_category: str,
+        live_room: Optional[LiveRoom],
+        semaphore: Optional[asyncio.Semaphore] = None,
+        require_keyword_hit: bool = False,
+        matcher: Optional[KeywordMatcher] = None,
+        stored_analyses: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """计算关联度：启用级联筛选时只把规则和相似度无法判断的热点交给LLM批量评分
+    
+        Args:
+            require_keyword_hit: 没有关键词/类目命中的热点直接拒绝（直播间匹配度对这类热点恒为0）
+            matcher: 直播间关键词匹配器，None时按live_room获取
+            stored_analyses: {热点URL: 数据库中已保存的content_analysis}
+        """
+        async def llm_scorer(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+            return await self.batch_relevance_scores(items, target_text, target_category, semaphore)
+    
+        if not settings.RELEVANCE_CASCADE_ENABLED:
+            return await llm_scorer(hotspots)
+    
+        results, _ = await run_relevance_cascade(
+            hotspots,
+            target_text,
+            llm_scorer,
+            matcher=matcher or (get_room_matcher(live_room) if live_room else None),
+            require_keyword_hit=require_keyword_hit,
+            embedding_client=getattr(self.relevance_agent, "embedding_client", None),
+            stored_analyses=stored_analyses
+        )
+        return results
+    
+    def _stored_content_analyses(self, db: Session, hotspots: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """按URL批量读取数据库中已保存的content_analysis（只查询自身没有分析结果的热点）
+        
+        新抓取的热点数据只有标题和标签，同一URL之前已入库并补全过时，级联筛选的电商适配性规则使用已保存的结果
+        """
+        urls = list({h["url"] for h in hotspots if h.get("url") and not h.get("content_analysis")})
+        if not urls:
+            return {}
+        try:
+            rows = db.query(Hotspot.url, Hotspot.content_analysis).filter(Hotspot.url.in_(urls)).all()
+        except Exception as e:
+            logger.warning(f"读取已保存的热点分析结果失败: {e}")
+            return {}
+        return {url: content_analysis for url, content_analysis in rows if content_analysis}
+    
     async def filter_hotspots_with_semantic(
         self,
         db: Session,
         hotspots: List[Dict[str, Any]],
         live_room_id: Optional[str] = None,
-        target_date: Optional[datetime] = None
+        target_date: Optional[datetime] = None,
+        semaphore: Optional[asyncio.Semaphore] = None
     ) -> List[Dict[str, Any]]:
         """使用语义关联度和情感关联度筛选热点
         
+        使用Agent时按 RELEVANCE_BATCH_SIZE 打包热点批量评分，
+        并发LLM调用数受 RELEVANCE_BATCH_CONCURRENCY 限制。
+        
         Args:
             db: 数据库会话
             hotspots: 热点列表
             live_room_id: 直播间ID（可选）
             target_date: 目标日期（可选）
+            semaphore: 并发控制信号量（多直播间共享时传入）
             
         Returns:
             筛选后的热点列表，包含match_score字段
         """
-        filtered_hotspots = []
-        
         # 获取主推商品
         product = None
         if live_room_id:
@@ -599,19 +725,12 @@ class HotspotMonitorService:
         if live_room_id:
             live_room = db.query(LiveRoom).filter(LiveRoom.id == live_room_id).first()
         
-        for hotspot in hotspots:
-            # 计算匹配度
-            if product:
-                # 有商品时，使用商品匹配度计算
-                match_score = await self.calculate_product_match_score(hotspot, product)
-            elif live_room:
-                # 没有商品但有直播间时，使用直播间关键词和语义匹配
-                match_score = await self._calculate_live_room_match_score(hotspot, live_room)
-            else:
-                # 既没有商品也没有直播间，匹配度为0
-                match_score = 0.0
-            
-            # 保留所有热点（即使匹配度为0也保留，用于测试和展示）
+        stored_analyses = self._stored_content_analyses(db, hotspots) if settings.RELEVANCE_CASCADE_ENABLED else None
+        scores = await self._score_hotspots(hotspots, product, live_room, semaphore, stored_analyses)
+        
+        # 保留所有热点（即使匹配度为0也保留，用于测试和展示）
+        filtered_hotspots = []
+        for hotspot, match_score in zip(hotspots, scores):
             hotspot["match_score"] = match_score
             filtered_hotspots.append(hotspot)
         
@@ -621,6 +740,80 @@ class HotspotMonitorService:
         logger.info(f"语义筛选后剩余 {len(filtered_hotspots)} 个热点")
         return filtered_hotspots
     
+    async def filter_hotspots_for_live_rooms(
+        self,
+        db: Session,
+        hotspots: List[Dict[str, Any]],
+        live_room_ids: List[str],
+        target_date: Optional[datetime] = None
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """为多个直播间并发计算热点匹配度
+        
+        所有直播间共享同一个并发信号量，总LLM并发数不超过 RELEVANCE_BATCH_CONCURRENCY。
+        
+        Args:
+            db: 数据库会话
+            hotspots: 热点列表
+            live_room_ids: 直播间ID列表
+            target_date: 目标日期（可选）
+            
+        Returns:
+            {live_room_id: 按匹配度排序的热点列表}，每个直播间的热点为独立副本
+        """
+        semaphore = asyncio.Semaphore(max(1, settings.RELEVANCE_BATCH_CONCURRENCY))
+        
+        results = await asyncio.gather(*(
+            self.filter_hotspots_with_semantic(
+                db,
+                [dict(hotspot) for hotspot in hotspots],
+                live_room_id=live_room_id,
+                target_date=target_date,
+                semaphore=semaphore
+            )
+            for live_room_id in live_room_ids
+        ))
+        return dict(zip(live_room_ids, results))
+    
+    async def filter_hotspots_across_live_rooms(
+        self,
+        db: Session,
+        hotspots: List[Dict[str, Any]],
+        target_date: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """按所有直播间计算热点匹配度，每个热点取各直播间中的最高匹配度
+    
+        用于未指定直播间的每日抓取：所有直播间并发评分（共享LLM并发信号量）。
+        没有直播间时与 filter_hotspots_with_semantic 一致（匹配度为0）。
+    
+        Args:
+            db: 数据库会话
+            hotspots: 热点列表
+            target_date: 目标日期（可选）
+    
+        Returns:
+            按匹配度排序的热点列表，包含match_score字段
+        """
+        live_room_ids = [room_id for (room_id,) in db.query(LiveRoom.id).all()]
+        if not live_room_ids:
+            return await self.filter_hotspots_with_semantic(db, hotspots, target_date=target_date)
+    
+        room_results = await self.filter_hotspots_for_live_rooms(db, hotspots, live_room_ids, target_date)
+    
+        def hotspot_key(hotspot: Dict[str, Any]) -> str:
+            return hotspot.get("url") or hotspot.get("title", "")
+    
+        best_scores: Dict[str, float] = {}
+        for room_hotspots in room_results.values():
+            for hotspot in room_hotspots:
+                key = hotspot_key(hotspot)
+                best_scores[key] = max(best_scores.get(key, 0.0), hotspot.get("match_score", 0.0))
+    
+        for hotspot in hotspots:
+            hotspot["match_score"] = best_scores.get(hotspot_key(hotspot), 0.0)
+        hotspots.sort(key=lambda x: x.get("match_score", 0), reverse=True)
+        logger.info(f"按 {len(live_room_ids)} 个直播间计算了 {len(hotspots)} 个热点的匹配度")
+        return hotspots
+    
     def filter_hotspots(
         self,
         hotspots: List[Dict[str, Any]],
@@ -646,55 +839,34 @@ class HotspotMonitorService:
         else:
             all_keywords = keywords
         
-        # 分类关键词
-        required_keywords = []  # 必须词（+标记）
-        normal_keywords = []    # 普通词
-        exclude_keywords = []   # 过滤词（!标记）
-        
-        for keyword in all_keywords:
-            keyword = keyword.strip()
-            if keyword.startswith("+"):
-                required_keywords.append(keyword[1:].lower())
-            elif keyword.startswith("!"):
-                exclude_keywords.append(keyword[1:].lower())
-            else:
-                normal_keywords.append(keyword.lower())
+        # 分类关键词：必须词（+标记）、普通词、过滤词（!标记），编译为一个多模式匹配器
+        matcher = compile_keyword_matcher(split_keyword_rules(all_keywords))
+        required_count = matcher.pattern_counts["required"]
         
+        contents = [
+            hotspot.get("title", "") + " " + " ".join(hotspot.get("tags", []))
+            for hotspot in hotspots
+        ]
         filtered_hotspots = []
         
-        for hotspot in hotspots:
-            title = hotspot.get("title", "").lower()
-            tags = [tag.lower() for tag in hotspot.get("tags", [])]
-            content = title + " " + " ".join(tags)
-            
+        for hotspot, hits in zip(hotspots, matcher.match_many(contents)):
             # 检查过滤词
-            has_exclude = any(exclude_word in content for exclude_word in exclude_keywords)
-            if has_exclude:
+            if hits.get("exclude"):
                 continue
             
             # 检查必须词
-            has_all_required = all(
-                required_word in content for required_word in required_keywords
-            )
-            if required_keywords and not has_all_required:
+            if required_count and len(hits.get("required", ())) < required_count:
                 continue
             
             # 计算匹配度
             match_score = 0.0
             
             # 必须词权重：50%
-            if required_keywords:
-                required_matches = sum(
-                    1 for word in required_keywords if word in content
-                )
-                match_score += (required_matches / len(required_keywords)) * 0.5
+            if required_count:
+                match_score += matcher.hit_ratio(hits, "required") * 0.5
             
             # 普通词权重：30%
-            if normal_keywords:
-                normal_matches = sum(
-                    1 for word in normal_keywords if word in content
-                )
-                match_score += (normal_matches / len(normal_keywords)) * 0.3
+            match_score += matcher.hit_ratio(hits, "include") * 0.3
             
             # 过滤词权重：-100%（已排除，这里不需要处理）
             
@@ -709,6 +881,12 @@ class HotspotMonitorService:
         logger.info(f"筛选后剩余 {len(filtered_hotspots)} 个热点")
         return filtered_hotspots
     
+    # 更新已有热点时，按“字段是否出现在数据中”合并的列
+    UPSERT_MERGE_FIELDS = (
+        "title", "heat_score", "match_score", "tags", "video_info",
+        "content_compact", "video_structure", "content_analysis", "publish_time",
+    )
+    
     def save_hotspots(
         self,
         db: Session,
@@ -716,36 +894,145 @@ class HotspotMonitorService:
         platform: str = "douyin"
     ) -> int:
         """保存热点到数据库"""
-        saved_count = 0
+        result = self.bulk_upsert_hotspots(db, hotspots, platform)
+        saved_count = result["inserted"] + result["updated"]
+        logger.info(f"成功保存 {saved_count} 个热点（新增 {result['inserted']}，更新 {result['updated']}）")
+        
+        urls = list({h["url"] for h in hotspots if h.get("url")})
+        if urls:
+            hotspot_ids_by_url = dict(db.query(Hotspot.url, Hotspot.id).filter(Hotspot.url.in_(urls)).all())
+            
+            # 刷新这些热点与各直播间的预计算匹配度（失败时由可视化接口兜底计算）
+            try:
+                from app.services.hotspot.room_scores import refresh_room_scores
+                refresh_room_scores(db, hotspot_ids=list(hotspot_ids_by_url.values()))
+            except Exception as e:
+                logger.warning(f"刷新热点匹配度失败: {e}")
+            
+            # 记录本次抓取的排名和热度采样（用于计算热度增长率）
+            try:
+                from app.services.hotspot.heat_trends import record_heat_samples
+                record_heat_samples(db, hotspots, platform, hotspot_ids_by_url)
+            except Exception as e:
+                db.rollback()
+                logger.warning(f"记录热度采样失败: {e}")
         
+        return saved_count
+    
+    def bulk_upsert_hotspots(
+        self,
+        db: Session,
+        hotspots: List[Dict[str, Any]],
+        platform: str = "douyin"
+    ) -> Dict[str, int]:
+        """批量插入或更新热点（INSERT ... ON CONFLICT (url) DO UPDATE，按批执行）
+        
+        合并规则与逐条更新一致：已存在的热点只更新数据中出现的字段，
+        publish_time只在有值时更新，platform不变。
+        
+        Args:
+            db: 数据库会话
+            hotspots: 热点列表
+            platform: 平台标识（新增热点使用）
+            
+        Returns:
+            {"inserted": 新增数量, "updated": 更新数量}
+        """
+        # 合并同一批中URL重复的热点（后出现的字段覆盖先出现的）
+        merged: Dict[str, Dict[str, Any]] = {}
         for hotspot_data in hotspots:
             url = hotspot_data.get("url", "")
             if not url:
                 continue
+            data = {k: v for k, v in hotspot_data.items() if k != "publish_time" or v}
+            merged[url] = {**merged.get(url, {}), **data}
+        
+        if not merged:
+            return {"inserted": 0, "updated": 0}
+        
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            return self._upsert_hotspots_per_row(db, list(merged.values()), platform)
+        
+        table = Hotspot.__table__
+        chunk_size = max(1, settings.HOTSPOT_UPSERT_CHUNK_SIZE)
+        items = list(merged.items())
+        inserted = 0
+        updated = 0
+        
+        try:
+            for i in range(0, len(items), chunk_size):
+                chunk = items[i:i + chunk_size]
+                urls = [url for url, _ in chunk]
+                existing_urls = {
+                    row.url for row in db.query(Hotspot.url).filter(Hotspot.url.in_(urls)).all()
+                }
+                
+                # 按出现的字段分组，每组一条语句，只更新该组出现的字段
+                groups: Dict[tuple, List[Dict[str, Any]]] = {}
+                now = datetime.now()
+                for url, data in chunk:
+                    present = tuple(f for f in self.UPSERT_MERGE_FIELDS if f in data)
+                    groups.setdefault(present, []).append({
+                        "id": str(uuid.uuid4()),
+                        "title": data.get("title") or "",
+                        "url": url,
+                        "platform": platform,
+                        "tags": data.get("tags"),
+                        "heat_score": data.get("heat_score"),
+                        "publish_time": data.get("publish_time"),
+                        "video_info": data.get("video_info"),
+                        "match_score": data.get("match_score"),
+                        "content_compact": data.get("content_compact"),
+                        "video_structure": data.get("video_structure"),
+                        "content_analysis": data.get("content_analysis"),
+                        "created_at": now,
+                        "updated_at": now,
+                    })
+                
+                for present, rows in groups.items():
+                    stmt = insert(table).values(rows)
+                    set_ = {field: stmt.excluded[field] for field in present}
+                    set_["updated_at"] = stmt.excluded.updated_at
+                    db.execute(stmt.on_conflict_do_update(index_elements=[table.c.url], set_=set_))
+                
+                updated += len(existing_urls)
+                inserted += len(chunk) - len(existing_urls)
             
-            # 检查是否已存在
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        
+        # 批量语句绕过了ORM，使会话中已加载的热点失效以便重新读取
+        db.expire_all()
+        return {"inserted": inserted, "updated": updated}
+    
+    def _upsert_hotspots_per_row(
+        self,
+        db: Session,
+        hotspots: List[Dict[str, Any]],
+        platform: str
+    ) -> Dict[str, int]:
+        """逐条插入或更新热点（不支持ON CONFLICT的数据库使用）"""
+        inserted = 0
+        updated = 0
+        
+        for hotspot_data in hotspots:
+            url = hotspot_data["url"]
             existing = db.query(Hotspot).filter(Hotspot.url == url).first()
             if existing:
-                # 更新现有热点
-                existing.title = hotspot_data.get("title", existing.title)
-                existing.heat_score = hotspot_data.get("heat_score", existing.heat_score)
-                existing.match_score = hotspot_data.get("match_score", existing.match_score)
-                existing.tags = hotspot_data.get("tags", existing.tags)
-                existing.video_info = hotspot_data.get("video_info", existing.video_info)
-                # 新增字段：内容Compact相关
-                if "content_compact" in hotspot_data:
-                    existing.content_compact = hotspot_data.get("content_compact")
-                if "video_structure" in hotspot_data:
-                    existing.video_structure = hotspot_data.get("video_structure")
-                if "content_analysis" in hotspot_data:
-                    existing.content_analysis = hotspot_data.get("content_analysis")
-                if hotspot_data.get("publish_time"):
-                    existing.publish_time = hotspot_data.get("publish_time")
+                for field in self.UPSERT_MERGE_FIELDS:
+                    if field in hotspot_data:
+                        setattr(existing, field, hotspot_data[field])
                 existing.updated_at = datetime.now()
-                saved_count += 1
+                updated += 1
             else:
-                # 创建新热点
-                new_hotspot = Hotspot(
+                db.add(Hotspot(
                     id=str(uuid.uuid4()),
                     title=hotspot_data.get("title", ""),
                     url=url,
@@ -755,19 +1042,16 @@ class HotspotMonitorService:
                     publish_time=hotspot_data.get("publish_time"),
                     video_info=hotspot_data.get("video_info"),
                     match_score=hotspot_data.get("match_score"),
-                    # 新增字段：内容Compact相关
                     content_compact=hotspot_data.get("content_compact"),
                     video_structure=hotspot_data.get("video_structure"),
                     content_analysis=hotspot_data.get("content_analysis"),
                     created_at=datetime.now(),
                     updated_at=datetime.now()
-                )
-                db.add(new_hotspot)
-                saved_count += 1
+                ))
+                inserted += 1
         
         db.commit()
-        logger.info(f"成功保存 {saved_count} 个热点")
-        return saved_count
+        return {"inserted": inserted, "updated": updated}
     
     async def enrich_hotspot_with_firecrawl(
         self,
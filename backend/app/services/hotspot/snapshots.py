@@ -0,0 +1,131 @@
+"""
+热点抓取快照（增量抓取）
+按平台（指定直播间时按平台+直播间，筛选结果依赖直播间）保存上一次抓取结果的指纹（标题+URL）和排名，
+本次抓取结果与快照对比：新出现或发生明显变化（新URL、排名大幅变化）的热点需要完整处理
+（语义筛选、内容增强），其余热点只更新热度
+"""
+import hashlib
+from typing import Any, Dict, List, Optional, Tuple
+
+from loguru import logger
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.hotspot import Hotspot
+from app.utils.cache import LayeredCache
+
+
+# 平台快照 {平台[:直播间ID]: {标题指纹: {"url", "rank", "heat_score"}}}，Redis不可用时降级为进程内缓存
+_snapshot_cache = LayeredCache(
+    "hotspot_snapshot",
+    ttl=settings.HOTSPOT_SNAPSHOT_TTL,
+    max_local_entries=64
+)
+
+
+def title_fingerprint(title: str) -> str:
+    """标题指纹（忽略空白和大小写）"""
+    normalized = "".join((title or "").split()).lower()
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+def _rank_of(hotspot: Dict[str, Any], index: int) -> int:
+    return hotspot.get("rank") or index + 1
+
+
+def build_snapshot(hotspots: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """由抓取结果生成快照"""
+    snapshot = {}
+    for index, hotspot in enumerate(hotspots):
+        fingerprint = title_fingerprint(hotspot.get("title", ""))
+        if fingerprint in snapshot:
+            continue
+        snapshot[fingerprint] = {
+            "url": hotspot.get("url", ""),
+            "rank": _rank_of(hotspot, index),
+            "heat_score": hotspot.get("heat_score"),
+        }
+    return snapshot
+
+
+def _snapshot_key(platform: str, live_room_id: Optional[str] = None) -> str:
+    return f"{platform}:{live_room_id}" if live_room_id else platform
+
+
+def get_snapshot(platform: str, live_room_id: Optional[str] = None) -> Optional[Dict[str, Dict[str, Any]]]:
+    """读取平台（及直播间）的上一次快照，不存在返回None"""
+    return _snapshot_cache.get(_snapshot_key(platform, live_room_id))
+
+
+def save_snapshot(platform: str, hotspots: List[Dict[str, Any]], live_room_id: Optional[str] = None):
+    """保存平台（及直播间）的本次快照"""
+    _snapshot_cache.set(_snapshot_key(platform, live_room_id), build_snapshot(hotspots))
+
+
+def diff_hotspots(
+    previous: Optional[Dict[str, Dict[str, Any]]],
+    hotspots: List[Dict[str, Any]],
+    rank_jump: Optional[int] = None
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """对比本次抓取结果与上一次快照
+
+    Args:
+        previous: 上一次快照，None表示没有快照（全部视为新热点）
+        hotspots: 本次抓取结果
+        rank_jump: 排名变化超过该值视为明显变化，None时使用HOTSPOT_SNAPSHOT_RANK_JUMP
+
+    Returns:
+        (需要完整处理的热点, 只需更新热度的热点)
+    """
+    if previous is None:
+        return list(hotspots), []
+
+    rank_jump = settings.HOTSPOT_SNAPSHOT_RANK_JUMP if rank_jump is None else rank_jump
+    changed, unchanged = [], []
+    for index, hotspot in enumerate(hotspots):
+        entry = previous.get(title_fingerprint(hotspot.get("title", "")))
+        if (
+            entry is None
+            or entry.get("url") != hotspot.get("url", "")
+            or abs(_rank_of(hotspot, index) - (entry.get("rank") or 0)) >= rank_jump
+        ):
+            changed.append(hotspot)
+        else:
+            unchanged.append(hotspot)
+    return changed, unchanged
+
+
+def update_hotspot_heat(db: Session, hotspots: List[Dict[str, Any]]) -> int:
+    """只更新已入库热点的热度（按URL匹配，一次查询 + 一次批量UPDATE），未入库的热点忽略
+
+    Returns:
+        更新的行数
+    """
+    heat_by_url = {
+        h["url"]: h.get("heat_score")
+        for h in hotspots
+        if h.get("url") and h.get("heat_score") is not None
+    }
+    if not heat_by_url:
+        return 0
+
+    rows = db.query(Hotspot.id, Hotspot.url).filter(Hotspot.url.in_(list(heat_by_url))).all()
+    if not rows:
+        return 0
+
+    db.execute(
+        update(Hotspot),
+        [{"id": row.id, "heat_score": heat_by_url[row.url]} for row in rows]
+    )
+    db.commit()
+    logger.info(f"增量抓取：更新 {len(rows)} 个未变化热点的热度")
+
+    # 未变化的热点同样记录热度采样，保证趋势连续
+    try:
+        from app.services.hotspot.heat_trends import record_heat_samples
+        record_heat_samples(db, hotspots, hotspot_ids_by_url={row.url: row.id for row in rows})
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"记录热度采样失败: {e}")
+    return len(rows)
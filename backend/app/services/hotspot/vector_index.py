@@ -0,0 +1,405 @@
+"""
+热点向量索引
+预先计算近期热点的归一化embedding矩阵（磁盘memmap），一次矩阵-向量乘法完成Top-K相似度检索
+"""
+import json
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from loguru import logger
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.hotspot import Hotspot
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+def build_hotspot_text(title: str, tags: Optional[Sequence[str]] = None) -> str:
+    """构建用于embedding的热点文本（标题+标签）"""
+    return f"{title or ''} {' '.join(tags or [])}".strip()
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """按行L2归一化（零向量保持为零）"""
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class HotspotVectorIndex:
+    """热点向量索引
+
+    磁盘结构（index_dir下）：
+        - vectors.f32: float32矩阵（capacity × dim），前count行有效，每行已L2归一化
+        - meta.json: embedding模型、维度、行数、容量以及每行对应的热点ID/平台/创建时间
+        - index.lock: 写锁文件
+
+    写入（add/compact）在index.lock的排他flock内完成"重新加载-修改-保存"，
+    prefork下多个worker进程同时同步索引时串行执行；写入方追加向量后原子替换meta.json，
+    读取方（API进程）以只读方式映射矩阵，检测到meta.json变化后重新映射。
+    """
+
+    VECTORS_FILE = "vectors.f32"
+    META_FILE = "meta.json"
+    LOCK_FILE = "index.lock"
+
+    def __init__(self, index_dir: Optional[str] = None):
+        self.index_dir = Path(index_dir or settings.HOTSPOT_VECTOR_INDEX_DIR)
+        self._lock = threading.RLock()
+        self._model: Optional[str] = None
+        self._dim = 0
+        self._count = 0
+        self._capacity = 0
+        self._rows: List[Dict[str, Any]] = []
+        self._id_to_row: Dict[str, int] = {}
+        self._matrix: Optional[np.memmap] = None
+        self._meta_mtime = 0.0
+        self._load()
+
+    @property
+    def vectors_path(self) -> Path:
+        return self.index_dir / self.VECTORS_FILE
+
+    @property
+    def meta_path(self) -> Path:
+        return self.index_dir / self.META_FILE
+
+    @property
+    def model(self) -> Optional[str]:
+        """构建索引使用的embedding模型（未记录时为None）"""
+        self._maybe_reload()
+        return self._model
+
+    def __len__(self) -> int:
+        self._maybe_reload()
+        return self._count
+
+    def __contains__(self, hotspot_id: str) -> bool:
+        self._maybe_reload()
+        return hotspot_id in self._id_to_row
+
+    def _load(self, writable: bool = False):
+        """从磁盘加载索引（不存在时为空索引）
+
+        Args:
+            writable: 以读写方式映射矩阵（只在持有写锁时使用），否则只读映射
+        """
+        with self._lock:
+            if not self.meta_path.exists() or not self.vectors_path.exists():
+                return
+            try:
+                meta = json.loads(self.meta_path.read_text(encoding="utf-8"))
+                self._model = meta.get("model")
+                self._dim = int(meta["dim"])
+                self._count = int(meta["count"])
+                self._capacity = int(meta["capacity"])
+                self._rows = meta["rows"][:self._count]
+                self._id_to_row = {row["id"]: i for i, row in enumerate(self._rows)}
+                self._matrix = np.memmap(
+                    self.vectors_path, dtype=np.float32, mode="r+" if writable else "r",
+                    shape=(self._capacity, self._dim)
+                )
+                self._meta_mtime = self.meta_path.stat().st_mtime
+            except Exception as e:
+                logger.error(f"加载热点向量索引失败: {e}，将使用空索引")
+                self._reset()
+
+    def _reset(self):
+        self._model = None
+        self._dim = 0
+        self._count = 0
+        self._capacity = 0
+        self._rows = []
+        self._id_to_row = {}
+        self._matrix = None
+        self._meta_mtime = 0.0
+
+    def _maybe_reload(self):
+        """其他进程更新了索引时重新加载"""
+        try:
+            mtime = self.meta_path.stat().st_mtime
+        except FileNotFoundError:
+            return
+        if mtime != self._meta_mtime:
+            self._load()
+
+    def _save_meta(self):
+        """原子写入meta.json"""
+        meta = {
+            "model": self._model,
+            "dim": self._dim,
+            "count": self._count,
+            "capacity": self._capacity,
+            "updated_at": datetime.now().isoformat(),
+            "rows": self._rows,
+        }
+        tmp_path = self.meta_path.with_suffix(".json.tmp")
+        tmp_path.write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, self.meta_path)
+        self._meta_mtime = self.meta_path.stat().st_mtime
+
+    def _allocate(self, capacity: int, keep_rows: Optional[np.ndarray] = None):
+        """分配新的memmap矩阵（扩容或压缩时使用）"""
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.vectors_path.with_suffix(".f32.tmp")
+        matrix = np.memmap(tmp_path, dtype=np.float32, mode="w+", shape=(capacity, self._dim))
+        if keep_rows is not None and len(keep_rows):
+            matrix[:len(keep_rows)] = keep_rows
+        matrix.flush()
+        del matrix
+        os.replace(tmp_path, self.vectors_path)
+        self._capacity = capacity
+        self._matrix = np.memmap(
+            self.vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self._dim)
+        )
+
+    @contextmanager
+    def _write_lock(self):
+        """跨进程写锁：持有index.lock的排他flock并从磁盘重新加载最新索引"""
+        with self._lock:
+            self.index_dir.mkdir(parents=True, exist_ok=True)
+            with open(self.index_dir / self.LOCK_FILE, "a") as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                try:
+                    self._load(writable=True)
+                    yield
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def add(
+        self,
+        items: Sequence[Tuple[str, Sequence[float], Dict[str, Any]]],
+        model: Optional[str] = None
+    ) -> int:
+        """增量添加或更新向量
+
+        Args:
+            items: [(hotspot_id, vector, meta)]，meta可包含platform、created_at（时间戳）
+            model: 生成向量的embedding模型；与索引记录的模型或维度不一致时清空索引重建
+
+        Returns:
+            新增的行数
+        """
+        items = [item for item in items if item[1] is not None]
+        if not items:
+            return 0
+
+        with self._write_lock():
+            vectors = _normalize(np.asarray([item[1] for item in items], dtype=np.float32))
+            model_changed = model is not None and self._model is not None and model != self._model
+            if self._dim and (model_changed or vectors.shape[1] != self._dim):
+                logger.warning(
+                    f"热点向量索引的embedding模型或维度变化（{self._model}/{self._dim} -> "
+                    f"{model or self._model}/{vectors.shape[1]}），清空索引重建"
+                )
+                self._reset()
+            if self._dim == 0:
+                self._dim = vectors.shape[1]
+            if model is not None:
+                self._model = model
+
+            new_ids = [item[0] for item in items if item[0] not in self._id_to_row]
+            needed = self._count + len(set(new_ids))
+            if self._matrix is None or needed > self._capacity:
+                capacity = max(1024, self._capacity)
+                while capacity < needed:
+                    capacity *= 2
+                existing = np.array(self._matrix[:self._count]) if self._matrix is not None else None
+                self._allocate(capacity, existing)
+
+            added = 0
+            for (hotspot_id, _, meta), vector in zip(items, vectors):
+                row_meta = {
+                    "id": hotspot_id,
+                    "platform": meta.get("platform"),
+                    "created_at": meta.get("created_at"),
+                }
+                row = self._id_to_row.get(hotspot_id)
+                if row is None:
+                    row = self._count
+                    self._rows.append(row_meta)
+                    self._id_to_row[hotspot_id] = row
+                    self._count += 1
+                    added += 1
+                else:
+                    self._rows[row] = row_meta
+                self._matrix[row] = vector
+
+            self._matrix.flush()
+            self._save_meta()
+            return added
+
+    def compact(self, min_created_at: Optional[float] = None, keep_ids: Optional[set] = None) -> int:
+        """删除过期行并压缩矩阵
+
+        Args:
+            min_created_at: 早于该时间戳的行被删除
+            keep_ids: 只保留这些ID（None表示不按ID过滤）
+
+        Returns:
+            删除的行数
+        """
+        with self._write_lock():
+            if self._matrix is None or self._count == 0:
+                return 0
+            keep = [
+                i for i, row in enumerate(self._rows)
+                if (min_created_at is None or (row.get("created_at") or 0) >= min_created_at)
+                and (keep_ids is None or row["id"] in keep_ids)
+            ]
+            removed = self._count - len(keep)
+            if removed == 0:
+                return 0
+
+            kept_vectors = np.array(self._matrix[keep]) if keep else None
+            self._rows = [self._rows[i] for i in keep]
+            self._id_to_row = {row["id"]: i for i, row in enumerate(self._rows)}
+            self._count = len(keep)
+            self._allocate(max(1024, self._count), kept_vectors)
+            self._save_meta()
+            return removed
+
+    def top_k(
+        self,
+        query_vector: Sequence[float],
+        k: int = 10,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Tuple[str, float]]:
+        """检索与查询向量最相似的K个热点
+
+        Args:
+            query_vector: 查询向量（商品/直播间embedding）
+            k: 返回数量
+            filters: 过滤条件（可选）
+                - platforms: 平台列表
+                - min_created_at: 最早创建时间（datetime或时间戳）
+                - exclude_ids: 需要排除的热点ID集合
+
+        Returns:
+            [(hotspot_id, 余弦相似度)]，按相似度从高到低排序
+        """
+        with self._lock:
+            self._maybe_reload()
+            if self._matrix is None or self._count == 0 or k <= 0:
+                return []
+
+            query = np.asarray(query_vector, dtype=np.float32)
+            if query.shape[0] != self._dim:
+                raise ValueError(f"查询向量维度不一致: {query.shape[0]} != {self._dim}")
+            query = _normalize(query)
+
+            scores = np.asarray(self._matrix[:self._count] @ query)
+            mask = self._filter_mask(filters or {})
+            if mask is not None:
+                scores = np.where(mask, scores, -np.inf)
+
+            candidates = int(np.count_nonzero(np.isfinite(scores)))
+            k = min(k, candidates)
+            if k == 0:
+                return []
+
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [(self._rows[i]["id"], float(scores[i])) for i in top]
+
+    def _filter_mask(self, filters: Dict[str, Any]) -> Optional[np.ndarray]:
+        """根据过滤条件构建行掩码"""
+        platforms = filters.get("platforms")
+        min_created_at = filters.get("min_created_at")
+        exclude_ids = filters.get("exclude_ids")
+        if not platforms and min_created_at is None and not exclude_ids:
+            return None
+
+        if isinstance(min_created_at, datetime):
+            min_created_at = min_created_at.timestamp()
+        platforms = set(platforms) if platforms else None
+
+        mask = np.ones(self._count, dtype=bool)
+        for i, row in enumerate(self._rows):
+            if platforms is not None and row.get("platform") not in platforms:
+                mask[i] = False
+            elif min_created_at is not None and (row.get("created_at") or 0) < min_created_at:
+                mask[i] = False
+            elif exclude_ids and row["id"] in exclude_ids:
+                mask[i] = False
+        return mask
+
+
+async def sync_vector_index(
+    db: Session,
+    index: HotspotVectorIndex,
+    hotspot_ids: Optional[List[str]] = None,
+    days: Optional[int] = None
+) -> Dict[str, int]:
+    """把数据库中的近期热点同步到向量索引（只为索引中不存在的热点计算embedding）
+
+    Args:
+        db: 数据库会话
+        index: 向量索引
+        hotspot_ids: 只同步这些热点（None表示同步时间窗口内所有热点）
+        days: 时间窗口（天），None时使用配置
+
+    Returns:
+        {"added": 新增行数, "removed": 过期删除行数, "total": 索引总行数}
+    """
+    from app.utils.embedding import EmbeddingClient
+
+    days = days or settings.HOTSPOT_VECTOR_INDEX_DAYS
+    since = datetime.now() - timedelta(days=days)
+
+    client = EmbeddingClient()
+    # 切换embedding后端/模型后旧向量不可比较，按时间窗口全量重建
+    rebuild = index.model is not None and index.model != client.model
+    if rebuild:
+        logger.warning(f"热点向量索引模型变化: {index.model} -> {client.model}，全量重建")
+
+    query = db.query(Hotspot.id, Hotspot.title, Hotspot.tags, Hotspot.platform, Hotspot.created_at)
+    if hotspot_ids and not rebuild:
+        query = query.filter(Hotspot.id.in_(hotspot_ids))
+    else:
+        query = query.filter(Hotspot.created_at >= since)
+    rows = [row for row in query.all() if rebuild or row.id not in index]
+
+    added = 0
+    if rows:
+        vectors = await client.get_embeddings([build_hotspot_text(row.title, row.tags) for row in rows])
+        added = index.add([
+            (
+                row.id,
+                vector,
+                {
+                    "platform": row.platform,
+                    "created_at": row.created_at.timestamp() if row.created_at else None,
+                },
+            )
+            for row, vector in zip(rows, vectors)
+        ], model=client.model)
+
+    removed = index.compact(min_created_at=since.timestamp())
+    logger.info(f"热点向量索引同步完成: 新增 {added}，删除过期 {removed}，共 {len(index)} 行")
+    return {"added": added, "removed": removed, "total": len(index)}
+
+
+_index: Optional[HotspotVectorIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_hotspot_vector_index() -> HotspotVectorIndex:
+    """获取进程内共享的热点向量索引"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = HotspotVectorIndex()
+    return _index
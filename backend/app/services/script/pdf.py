@@ -0,0 +1,297 @@
+"""
+脚本PDF导出
+PDF渲染在独立线程池中执行，段落样式只构建一次；渲染结果按 脚本ID + updated_at 缓存，
+脚本更新后旧缓存失效
+"""
+import asyncio
+import base64
+import threading
+import urllib.parse
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from io import BytesIO
+from typing import Any, AsyncIterator, Dict, Iterable, Optional
+
+from loguru import logger
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+
+from app.core.config import settings
+from app.models.script import Script
+from app.utils.cache import LayeredCache
+
+
+# 渲染结果缓存（base64编码的PDF字节），key包含updated_at，脚本更新后自然失效
+_pdf_cache = LayeredCache(
+    "script_pdf",
+    ttl=settings.SCRIPT_PDF_CACHE_TTL,
+    max_local_entries=settings.SCRIPT_PDF_CACHE_MAX_LOCAL
+)
+
+_render_executor: Optional[ThreadPoolExecutor] = None
+_render_executor_lock = threading.Lock()
+
+_META_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#f3f4f6')),
+    ('TEXTCOLOR', (0, 0), (-1, -1), colors.HexColor('#1f2937')),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+    ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+    ('TOPPADDING', (0, 0), (-1, -1), 8),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#e5e7eb')),
+])
+
+_SHOT_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#374151')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 0), (-1, -1), 8),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+    ('TOPPADDING', (0, 0), (-1, -1), 6),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#e5e7eb')),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f9fafb')]),
+])
+
+_SHOT_COL_WIDTHS = [
+    0.3*inch, 0.6*inch, 0.5*inch, 1.2*inch, 1.2*inch,
+    0.8*inch, 0.8*inch, 0.8*inch, 0.8*inch
+]
+
+
+@lru_cache(maxsize=1)
+def _get_styles() -> Dict[str, ParagraphStyle]:
+    """段落样式（进程内只构建一次）"""
+    styles = getSampleStyleSheet()
+    return {
+        "title": ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Heading1'],
+            fontSize=24,
+            textColor=colors.HexColor('#1f2937'),
+            spaceAfter=30,
+            alignment=TA_CENTER
+        ),
+        "heading": ParagraphStyle(
+            'CustomHeading',
+            parent=styles['Heading2'],
+            fontSize=16,
+            textColor=colors.HexColor('#374151'),
+            spaceAfter=12,
+            spaceBefore=20
+        ),
+        "normal": ParagraphStyle(
+            'CustomNormal',
+            parent=styles['Normal'],
+            fontSize=11,
+            textColor=colors.HexColor('#4b5563'),
+            leading=16,
+            alignment=TA_JUSTIFY
+        ),
+    }
+
+
+def _get_render_executor() -> ThreadPoolExecutor:
+    global _render_executor
+    if _render_executor is None:
+        with _render_executor_lock:
+            if _render_executor is None:
+                _render_executor = ThreadPoolExecutor(
+                    max_workers=settings.SCRIPT_PDF_RENDER_WORKERS,
+                    thread_name_prefix="script_pdf"
+                )
+    return _render_executor
+
+
+def _truncate(value: Any, length: int) -> str:
+    text = value or ''
+    return text[:length] + ('...' if len(text) > length else '')
+
+
+def pdf_cache_key(script_id: str, updated_at) -> str:
+    """PDF缓存key（脚本ID + 更新时间）"""
+    return f"{script_id}:{updated_at.isoformat() if updated_at else ''}"
+
+
+def build_pdf_payload(script: Script) -> Dict[str, Any]:
+    """从脚本（及其关联的商品、热点）提取渲染所需的数据
+
+    返回普通字典，可在数据库会话关闭后、在其他线程中渲染。
+    """
+    product = script.product
+    hotspot = script.hotspot
+    video_info = script.video_info or {}
+    return {
+        "script_id": script.id,
+        "cache_key": pdf_cache_key(script.id, script.updated_at),
+        "title": video_info.get('title', '未命名脚本'),
+        "video_info": video_info,
+        "product_name": product.name if product else None,
+        "product_category": product.category if product else None,
+        "has_hotspot": hotspot is not None,
+        "hotspot_title": hotspot.title if hotspot else None,
+        "hotspot_platform": hotspot.platform if hotspot else None,
+        "script_content": script.script_content,
+        "shot_list": script.shot_list or [],
+        "production_notes": script.production_notes or {},
+    }
+
+
+def pdf_filename(payload: Dict[str, Any]) -> str:
+    """PDF文件名（未编码）"""
+    return f"脚本_{payload['title']}.pdf"
+
+
+def content_disposition(filename: str) -> str:
+    """Content-Disposition头（URL编码确保中文字符正确传输）"""
+    return f"attachment; filename*=UTF-8''{urllib.parse.quote(filename.encode('utf-8'))}"
+
+
+def render_script_pdf(payload: Dict[str, Any]) -> bytes:
+    """渲染脚本PDF（同步，CPU密集）"""
+    styles = _get_styles()
+    title_style = styles["title"]
+    heading_style = styles["heading"]
+    normal_style = styles["normal"]
+
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4)
+    story = []
+
+    # 标题
+    video_info = payload["video_info"]
+    story.append(Paragraph(payload["title"], title_style))
+    story.append(Spacer(1, 0.3*inch))
+
+    # 基本信息
+    story.append(Paragraph("基本信息", heading_style))
+
+    meta_data = [
+        ["商品名称", payload["product_name"] or "未知"],
+        ["商品品类", payload["product_category"] or "未知"],
+        ["视频时长", f"{video_info.get('duration', 10)}秒"],
+        ["视频主题", video_info.get('theme', '无')],
+        ["核心卖点", video_info.get('core_selling_point', '无')],
+    ]
+
+    if payload["has_hotspot"]:
+        meta_data.append(["关联热点", payload["hotspot_title"]])
+        meta_data.append(["热点平台", payload["hotspot_platform"]])
+
+    meta_table = Table(meta_data, colWidths=[2*inch, 4*inch])
+    meta_table.setStyle(_META_TABLE_STYLE)
+    story.append(meta_table)
+    story.append(Spacer(1, 0.3*inch))
+
+    # 脚本内容
+    if payload["script_content"]:
+        story.append(Paragraph("脚本内容", heading_style))
+        story.append(Paragraph(payload["script_content"].replace('\n', '<br/>'), normal_style))
+        story.append(Spacer(1, 0.3*inch))
+
+    # 分镜列表
+    shot_list = payload["shot_list"]
+    if shot_list:
+        story.append(Paragraph("分镜列表", heading_style))
+
+        shot_table_data = [["镜头", "时间", "景别", "画面内容", "台词", "动作", "音乐", "作用", "塑造点"]]
+        for i, shot in enumerate(shot_list, 1):
+            shot_table_data.append([
+                str(i),
+                shot.get('time_range', ''),
+                shot.get('shot_type', ''),
+                _truncate(shot.get('content'), 50),
+                _truncate(shot.get('dialogue'), 50),
+                _truncate(shot.get('action'), 30),
+                _truncate(shot.get('music'), 30),
+                _truncate(shot.get('purpose'), 30),
+                _truncate(shot.get('shaping_point'), 30),
+            ])
+
+        shot_table = Table(shot_table_data, colWidths=_SHOT_COL_WIDTHS)
+        shot_table.setStyle(_SHOT_TABLE_STYLE)
+        story.append(shot_table)
+        story.append(Spacer(1, 0.3*inch))
+
+    # 制作要点
+    production_notes = payload["production_notes"]
+    if production_notes:
+        story.append(Paragraph("制作要点", heading_style))
+
+        for key, label in (("shooting_tips", "拍摄要点"), ("editing_tips", "剪辑要点"), ("key_points", "关键要点")):
+            if production_notes.get(key):
+                story.append(Paragraph(f"<b>{label}：</b>", normal_style))
+                for item in production_notes.get(key, []):
+                    story.append(Paragraph(f"• {item}", normal_style))
+                if key != "key_points":
+                    story.append(Spacer(1, 0.2*inch))
+
+    doc.build(story)
+    return buffer.getvalue()
+
+
+async def get_script_pdf(payload: Dict[str, Any]) -> bytes:
+    """获取脚本PDF（优先读缓存，未命中时在渲染线程池中渲染并写入缓存）"""
+    cache_key = payload["cache_key"]
+    cached = await _pdf_cache.aget(cache_key)
+    if cached is not None:
+        logger.debug(f"脚本PDF命中缓存: {payload['script_id']}")
+        return base64.b64decode(cached)
+
+    loop = asyncio.get_running_loop()
+    pdf_bytes = await loop.run_in_executor(_get_render_executor(), render_script_pdf, payload)
+    await _pdf_cache.aset(cache_key, base64.b64encode(pdf_bytes).decode("ascii"))
+    return pdf_bytes
+
+
+def invalidate_script_pdf(script: Script):
+    """删除脚本当前版本的PDF缓存（脚本更新前调用）"""
+    _pdf_cache.delete(pdf_cache_key(script.id, script.updated_at))
+
+
+class _ZipStream:
+    """只追加的写缓冲，供zipfile以流式方式写入（不需要seek）"""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def stream_scripts_zip(payloads: Iterable[Dict[str, Any]]) -> AsyncIterator[bytes]:
+    """逐个渲染脚本PDF并以ZIP流输出（每写完一个文件输出一次，不在内存中保留整个压缩包）"""
+    stream = _ZipStream()
+    used_names = set()
+    with zipfile.ZipFile(stream, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for payload in payloads:
+            pdf_bytes = await get_script_pdf(payload)
+            name = pdf_filename(payload)
+            if name in used_names:
+                name = f"脚本_{payload['title']}_{payload['script_id'][:8]}.pdf"
+            used_names.add(name)
+            archive.writestr(name, pdf_bytes)
+            yield stream.drain()
+    yield stream.drain()
@@ -1,11 +1,12 @@
 """
 脚本生成服务
 """
+import asyncio
 import uuid
 import json
 import re
 from datetime import datetime
-from typing import Dict, Any, Optional, List
+from typing import Callable, Dict, Any, Optional, List, Tuple
 from sqlalchemy.orm import Session
 from loguru import logger
 
@@ -14,7 +15,7 @@ from app.models.hotspot import Hotspot
 from app.models.product import Product
 from app.models.analysis import AnalysisReport
 from app.utils.deepseek import DeepSeekClient
-from app.agents.script_generation_agent import ScriptGenerationAgent
+from app.core.config import settings
 
 
 class ScriptGeneratorService:
@@ -29,14 +30,15 @@ class ScriptGeneratorService:
         """
         self.use_agent = use_agent
         if use_agent:
-            self.script_agent = ScriptGenerationAgent()
+            from app.agents import get_script_generation_agent
+            self.script_agent = get_script_generation_agent()  # 进程级共享
         else:
             # 保留原有实现作为fallback
-            self.deepseek_client = DeepSeekClient()
+            self.deepseek_client = DeepSeekClient(cache_ttl=0)
         
-        # 优化建议也需要LLM，所以保留deepseek_client
+        # 优化建议也需要LLM，所以保留deepseek_client（脚本需要多样性，不缓存）
         if not hasattr(self, 'deepseek_client'):
-            self.deepseek_client = DeepSeekClient()
+            self.deepseek_client = DeepSeekClient(cache_ttl=0)
         
         # 为了兼容，也添加llm_client别名
         self.llm_client = self.deepseek_client
@@ -80,8 +82,8 @@ class ScriptGeneratorService:
         
         if analysis_report:
             # 提取技巧
-            from app.services.analysis.service import VideoAnalysisService
-            analysis_service = VideoAnalysisService()
+            from app.core.registry import get_video_analysis_service
+            analysis_service = get_video_analysis_service()
             techniques = analysis_service.extract_techniques({
                 "shot_table": analysis_report.shot_table or [],
                 "golden_3s": analysis_report.golden_3s or {},
@@ -218,6 +220,63 @@ class ScriptGeneratorService:
             # 使用传统方法
             return await self._generate_script_legacy(hotspot, product, analysis_report, duration, script_index, total_scripts)
     
+    async def generate_scripts(
+        self,
+        hotspot: Hotspot,
+        product: Product,
+        analysis_report: Optional[AnalysisReport] = None,
+        duration: int = 10,
+        adjustment_feedback: Optional[str] = None,
+        script_count: int = 5,
+        on_complete: Optional[Callable[[int, int, Optional[Exception]], None]] = None
+    ) -> List[Tuple[int, Dict[str, Any]]]:
+        """并发生成多个不同版本的脚本（并发数受 SCRIPT_GENERATION_CONCURRENCY 限制）
+        
+        Args:
+            hotspot: 热点
+            product: 商品
+            analysis_report: 拆解报告（可选）
+            duration: 视频时长
+            adjustment_feedback: 调整意见（可选）
+            script_count: 脚本数量
+            on_complete: 每个脚本完成（成功或失败）时的回调，参数为(已完成数, 脚本序号, 异常)
+            
+        Returns:
+            生成成功的[(脚本序号, 脚本数据)]，按脚本序号排序，脚本数据已包含shot_list
+        """
+        semaphore = asyncio.Semaphore(max(1, settings.SCRIPT_GENERATION_CONCURRENCY))
+        completed = 0
+        
+        async def generate_one(script_index: int) -> Tuple[int, Optional[Dict[str, Any]]]:
+            nonlocal completed
+            error = None
+            script_data = None
+            async with semaphore:
+                try:
+                    logger.info(f"正在生成第 {script_index}/{script_count} 个脚本...")
+                    script_data = await self.generate_script(
+                        hotspot,
+                        product,
+                        analysis_report,
+                        duration,
+                        adjustment_feedback,
+                        script_index=script_index,
+                        total_scripts=script_count
+                    )
+                    # 生成分镜列表
+                    script_data["shot_list"] = self.generate_shot_list(script_data)
+                except Exception as e:
+                    logger.error(f"第 {script_index} 个脚本生成失败: {e}")
+                    error = e
+            
+            completed += 1
+            if on_complete:
+                on_complete(completed, script_index, error)
+            return script_index, script_data
+        
+        results = await asyncio.gather(*(generate_one(i + 1) for i in range(script_count)))
+        return [(index, data) for index, data in sorted(results, key=lambda r: r[0]) if data is not None]
+    
     async def _generate_script_legacy(
         self,
         hotspot: Hotspot,
@@ -388,31 +447,52 @@ class ScriptGeneratorService:
         status: str = "draft"
     ) -> Script:
         """保存脚本到数据库"""
+        return self.save_scripts(db, hotspot_id, product_id, analysis_report_id, [script_data], status)[0]
+    
+    def save_scripts(
+        self,
+        db: Session,
+        hotspot_id: str,
+        product_id: str,
+        analysis_report_id: Optional[str],
+        scripts_data: List[Dict[str, Any]],
+        status: str = "draft"
+    ) -> List[Script]:
+        """在同一个事务中批量保存脚本"""
         # 修复：确保空字符串转换为None，避免外键约束错误
         if analysis_report_id == '' or not analysis_report_id:
             analysis_report_id = None
         
-        script = Script(
-            id=str(uuid.uuid4()),
-            hotspot_id=hotspot_id,
-            product_id=product_id,
-            analysis_report_id=analysis_report_id,  # 现在确保是None而不是空字符串
-            video_info=script_data.get("video_info"),
-            script_content=script_data.get("script_content"),
-            shot_list=script_data.get("shot_list"),
-            production_notes=script_data.get("production_notes"),
-            tags=script_data.get("tags"),
-            status=status,
-            created_at=datetime.now(),
-            updated_at=datetime.now()
-        )
-        
-        db.add(script)
-        db.commit()
-        db.refresh(script)
-        
-        logger.info(f"保存脚本: {script.id}")
-        return script
+        now = datetime.now()
+        scripts = [
+            Script(
+                id=str(uuid.uuid4()),
+                hotspot_id=hotspot_id,
+                product_id=product_id,
+                analysis_report_id=analysis_report_id,  # 现在确保是None而不是空字符串
+                video_info=script_data.get("video_info"),
+                script_content=script_data.get("script_content"),
+                shot_list=script_data.get("shot_list"),
+                production_notes=script_data.get("production_notes"),
+                tags=script_data.get("tags"),
+                status=status,
+                created_at=now,
+                updated_at=now
+            )
+            for script_data in scripts_data
+        ]
+        
+        try:
+            db.add_all(scripts)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        
+        for script in scripts:
+            db.refresh(script)
+            logger.info(f"保存脚本: {script.id}")
+        return scripts
     
     async def get_optimization_suggestions(self, script: Script) -> List[Dict[str, Any]]:
         """获取脚本优化建议（使用LLM生成更智能的建议）"""
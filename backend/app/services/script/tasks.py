@@ -5,10 +5,11 @@ import asyncio
 import os
 from app.celery_app import celery_app
 from app.core.database import SessionLocal
-from app.services.script.service import ScriptGeneratorService
+from app.core.registry import get_script_service
 from app.models.hotspot import Hotspot
 from app.models.product import Product
 from app.models.analysis import AnalysisReport
+from app.utils.http_client import close_loop_http_clients
 from loguru import logger
 
 # 在测试环境中，使用测试数据库
@@ -44,7 +45,7 @@ def generate_script_async(
     )
     
     try:
-        service = ScriptGeneratorService()
+        service = get_script_service()
         db = SessionLocal()
         
         try:
@@ -77,73 +78,71 @@ def generate_script_async(
                     AnalysisReport.id == analysis_report_id
                 ).first()
             
-            # 生成多个脚本
-            script_ids = []
+            # 并发生成多个脚本
             loop = asyncio.new_event_loop()
             asyncio.set_event_loop(loop)
             
+            def report_progress(completed: int, script_index: int, error: Exception = None):
+                """每完成一个脚本更新一次进度"""
+                result_text = "生成失败" if error else "生成完成"
+                self.update_state(
+                    state='PROGRESS',
+                    meta={
+                        'current': completed,
+                        'total': script_count,
+                        'status': f'已完成 {completed}/{script_count} 个脚本（第 {script_index} 个{result_text}）'
+                    }
+                )
+            
+            self.update_state(
+                state='PROGRESS',
+                meta={
+                    'current': 0,
+                    'total': script_count,
+                    'status': f'正在并发生成 {script_count} 个脚本...'
+                }
+            )
+            
             try:
-                for i in range(script_count):
-                    logger.info(f"正在生成第 {i+1}/{script_count} 个脚本...")
-                    
-                    # 更新进度：开始生成第i+1个脚本
-                    self.update_state(
-                        state='PROGRESS',
-                        meta={
-                            'current': i,
-                            'total': script_count,
-                            'status': f'正在生成第 {i+1}/{script_count} 个脚本...'
-                        }
-                    )
-                    
-                    # 生成脚本（传入脚本序号，用于生成不同的脚本）
-                    script_data = loop.run_until_complete(
-                        service.generate_script(
-                            hotspot, 
-                            product, 
-                            analysis_report, 
-                            duration, 
-                            adjustment_feedback,
-                            script_index=i + 1,  # 传入脚本序号
-                            total_scripts=script_count  # 传入总数量
-                        )
-                    )
-                    
-                    # 生成分镜列表
-                    shot_list = service.generate_shot_list(script_data)
-                    script_data["shot_list"] = shot_list
-                    
-                    # 保存脚本
-                    script = service.save_script(
-                        db,
-                        hotspot_id,
-                        product_id,
-                        analysis_report_id,
-                        script_data,
-                        status="draft"
+                generated = loop.run_until_complete(
+                    service.generate_scripts(
+                        hotspot,
+                        product,
+                        analysis_report,
+                        duration,
+                        adjustment_feedback,
+                        script_count=script_count,
+                        on_complete=report_progress
                     )
-                    
-                    script_ids.append(script.id)
-                    logger.info(f"第 {i+1} 个脚本生成完成: {script.id}")
-                    
-                    # 更新进度：第i+1个脚本已完成
-                    self.update_state(
-                        state='PROGRESS',
-                        meta={
-                            'current': i + 1,
-                            'total': script_count,
-                            'status': f'已完成 {i+1}/{script_count} 个脚本'
-                        }
-                    )
-                    
+                )
             finally:
+                close_loop_http_clients(loop)
                 loop.close()
             
+            if not generated:
+                raise ValueError(f"{script_count} 个脚本全部生成失败")
+            
+            # 所有脚本在同一个事务中保存
+            scripts = service.save_scripts(
+                db,
+                hotspot_id,
+                product_id,
+                analysis_report_id,
+                [script_data for _, script_data in generated],
+                status="draft"
+            )
+            script_ids = [script.id for script in scripts]
+            
+            failed_count = script_count - len(script_ids)
+            if failed_count:
+                logger.warning(f"{failed_count} 个脚本生成失败，已保存成功的 {len(script_ids)} 个")
+            
             logger.info(f"所有脚本生成完成，共 {len(script_ids)} 个脚本")
             return {
                 "status": "success",
                 "script_ids": script_ids,
                 "script_count": len(script_ids),
+                "failed_count": failed_count,
                 "message": f"成功生成 {len(script_ids)} 个脚本"
             }
         finally:
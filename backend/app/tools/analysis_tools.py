@@ -8,7 +8,11 @@ from loguru import logger
 
 def calculate_semantic_similarity(text1: str, text2: str) -> float:
     """
-    计算语义相似度
+    计算文本相似度（同步，使用本地embedding后端批量计算，不创建事件循环）
+    
+    注意：只有EMBEDDING_BACKEND配置为语义模型（onnx）时结果才是语义相似度；
+    默认的远程接口（remote）没有同步客户端，此时返回的是字符哈希向量的字面重合度，
+    不代表语义关联，需要语义判断的异步调用方应使用EmbeddingClient.calculate_semantic_similarity
     
     Args:
         text1: 文本1
@@ -17,26 +21,14 @@ def calculate_semantic_similarity(text1: str, text2: str) -> float:
     Returns:
         相似度分数 (0-1)
     """
-    from app.utils.embedding import EmbeddingClient
-    client = EmbeddingClient()
+    from app.utils.embedding_backends import get_sync_embedding_backend
     
     try:
-        # 注意：这里需要异步调用，但在工具中同步包装
-        import asyncio
-        loop = asyncio.get_event_loop()
-        if loop.is_running():
-            # 如果事件循环正在运行，使用线程池
-            import concurrent.futures
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                future = executor.submit(
-                    asyncio.run,
-                    client.calculate_semantic_similarity(text1, text2)
-                )
-                return future.result()
-        else:
-            return loop.run_until_complete(
-                client.calculate_semantic_similarity(text1, text2)
-            )
+        vectors = get_sync_embedding_backend().embed([text1, text2])
+        if not vectors[0].any() or not vectors[1].any():
+            return 0.0
+        # 归一化到0-1范围（与EmbeddingClient.cosine_similarity一致）
+        return (float(vectors[0] @ vectors[1]) + 1) / 2
     except Exception as e:
         logger.error(f"计算语义相似度失败: {e}")
         return 0.0
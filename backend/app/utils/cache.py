@@ -0,0 +1,256 @@
+"""
+两级缓存工具
+进程内LRU + Redis（可选），用于缓存embedding、LLM响应等可复用的计算结果
+异步代码使用 aget/aget_many/aset/aset_many：进程内命中时不切换线程，Redis读写在线程池中执行，不阻塞事件循环
+"""
+import asyncio
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from loguru import logger
+
+from app.core.config import settings
+
+
+# 所有已创建的缓存实例，用于统一导出命中率统计
+_caches: Dict[str, "LayeredCache"] = {}
+_caches_lock = threading.Lock()
+
+# Redis不可用时暂停访问的截止时间（进程级，避免每次请求都等待连接超时）
+_redis_disabled_until = 0.0
+
+
+def _get_redis():
+    """获取可用的Redis客户端，不可用时返回None"""
+    if time.time() < _redis_disabled_until:
+        return None
+    try:
+        from app.core.redis_client import redis_client
+        return redis_client
+    except Exception as e:
+        _mark_redis_failed(e)
+        return None
+
+
+def _mark_redis_failed(error: Exception):
+    """记录Redis访问失败，在一段时间内只使用进程内缓存"""
+    global _redis_disabled_until
+    retry_interval = settings.CACHE_REDIS_RETRY_INTERVAL
+    if time.time() >= _redis_disabled_until:
+        logger.warning(f"Redis缓存不可用: {error}，{retry_interval}秒内仅使用进程内缓存")
+    _redis_disabled_until = time.time() + retry_interval
+
+
+class LayeredCache:
+    """两级缓存：进程内LRU（带TTL） + Redis
+
+    值以JSON序列化后存储，读取时先查进程内LRU，未命中再查Redis，
+    Redis命中后回填进程内LRU。Redis不可用时自动降级为纯进程内缓存。
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        ttl: int = 86400,
+        max_local_entries: int = 1000,
+        use_redis: bool = True
+    ):
+        """
+        Args:
+            namespace: 缓存命名空间（Redis key前缀）
+            ttl: 过期时间（秒）
+            max_local_entries: 进程内LRU最大条目数
+            use_redis: 是否使用Redis作为二级缓存
+        """
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_local_entries = max_local_entries
+        self.use_redis = use_redis and settings.CACHE_USE_REDIS
+
+        self._local: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0,
+            "local_hits": 0,
+            "redis_hits": 0,
+            "misses": 0,
+            "sets": 0,
+            "evictions": 0,
+        }
+
+        with _caches_lock:
+            _caches[namespace] = self
+
+    def _redis_key(self, key: str) -> str:
+        return f"cache:{self.namespace}:{key}"
+
+    def _incr(self, name: str, amount: int = 1):
+        with self._lock:
+            self._stats[name] += amount
+
+    def _local_get(self, key: str) -> Tuple[bool, Any]:
+        with self._lock:
+            item = self._local.get(key)
+            if item is None:
+                return False, None
+            expires_at, value = item
+            if expires_at < time.time():
+                del self._local[key]
+                return False, None
+            self._local.move_to_end(key)
+            return True, value
+
+    def _local_set(self, key: str, value: Any, ttl: int):
+        with self._lock:
+            self._local[key] = (time.time() + ttl, value)
+            self._local.move_to_end(key)
+            while len(self._local) > self.max_local_entries:
+                self._local.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def get(self, key: str) -> Optional[Any]:
+        """读取缓存，未命中返回None"""
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """批量读取缓存
+
+        Returns:
+            {key: value}，只包含命中的key
+        """
+        keys, found, remote_keys = self._get_local_many(keys)
+        if remote_keys:
+            found.update(self._get_remote_many(remote_keys))
+        return self._count_lookup(keys, found)
+
+    async def aget(self, key: str) -> Optional[Any]:
+        """异步读取缓存（Redis访问在线程池中执行），未命中返回None"""
+        return (await self.aget_many([key])).get(key)
+
+    async def aget_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """异步批量读取缓存（进程内全部命中时不访问Redis）"""
+        keys, found, remote_keys = self._get_local_many(keys)
+        if remote_keys and self.use_redis and _get_redis() is not None:
+            found.update(await asyncio.to_thread(self._get_remote_many, remote_keys))
+        return self._count_lookup(keys, found)
+
+    def _get_local_many(self, keys: Iterable[str]) -> Tuple[List[str], Dict[str, Any], List[str]]:
+        """查进程内缓存，返回(去重后的key, 命中结果, 需要查Redis的key)"""
+        keys = list(dict.fromkeys(keys))
+        found: Dict[str, Any] = {}
+        remote_keys: List[str] = []
+        for key in keys:
+            hit, value = self._local_get(key)
+            if hit:
+                found[key] = value
+            else:
+                remote_keys.append(key)
+        self._incr("local_hits", len(found))
+        return keys, found, remote_keys
+
+    def _get_remote_many(self, keys: List[str]) -> Dict[str, Any]:
+        """查Redis并回填进程内缓存（阻塞调用）"""
+        found: Dict[str, Any] = {}
+        redis = _get_redis() if self.use_redis else None
+        if redis is None:
+            return found
+        try:
+            raw_values = redis.mget([self._redis_key(k) for k in keys])
+            for key, raw in zip(keys, raw_values):
+                if raw is None:
+                    continue
+                value = json.loads(raw)
+                found[key] = value
+                self._local_set(key, value, self.ttl)
+            self._incr("redis_hits", len(found))
+        except Exception as e:
+            _mark_redis_failed(e)
+        return found
+
+    def _count_lookup(self, keys: List[str], found: Dict[str, Any]) -> Dict[str, Any]:
+        self._incr("hits", len(found))
+        self._incr("misses", len(keys) - len(found))
+        return found
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        """写入缓存"""
+        self.set_many({key: value}, ttl)
+
+    def set_many(self, items: Dict[str, Any], ttl: Optional[int] = None):
+        """批量写入缓存"""
+        if not items:
+            return
+        ttl = self._set_local_many(items, ttl)
+        self._set_remote_many(items, ttl)
+
+    async def aset(self, key: str, value: Any, ttl: Optional[int] = None):
+        """异步写入缓存（Redis写入在线程池中执行）"""
+        await self.aset_many({key: value}, ttl)
+
+    async def aset_many(self, items: Dict[str, Any], ttl: Optional[int] = None):
+        """异步批量写入缓存"""
+        if not items:
+            return
+        ttl = self._set_local_many(items, ttl)
+        if self.use_redis and _get_redis() is not None:
+            await asyncio.to_thread(self._set_remote_many, items, ttl)
+
+    def _set_local_many(self, items: Dict[str, Any], ttl: Optional[int]) -> int:
+        ttl = ttl or self.ttl
+        for key, value in items.items():
+            self._local_set(key, value, ttl)
+        self._incr("sets", len(items))
+        return ttl
+
+    def _set_remote_many(self, items: Dict[str, Any], ttl: int):
+        """写入Redis（阻塞调用）"""
+        redis = _get_redis() if self.use_redis else None
+        if redis is None:
+            return
+        try:
+            pipe = redis.pipeline()
+            for key, value in items.items():
+                pipe.set(self._redis_key(key), json.dumps(value, ensure_ascii=False), ex=ttl)
+            pipe.execute()
+        except Exception as e:
+            _mark_redis_failed(e)
+
+    def delete(self, key: str):
+        """删除缓存"""
+        with self._lock:
+            self._local.pop(key, None)
+        redis = _get_redis() if self.use_redis else None
+        if redis is not None:
+            try:
+                redis.delete(self._redis_key(key))
+            except Exception as e:
+                _mark_redis_failed(e)
+
+    def clear_local(self):
+        """清空进程内缓存（不影响Redis）"""
+        with self._lock:
+            self._local.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取命中率统计"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["local_size"] = len(self._local)
+        total = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / total, 4) if total else 0.0
+        return stats
+
+    def reset_stats(self):
+        """重置统计计数"""
+        with self._lock:
+            for name in self._stats:
+                self._stats[name] = 0
+
+
+def get_all_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """获取所有缓存实例的统计信息"""
+    with _caches_lock:
+        caches = list(_caches.values())
+    return {cache.namespace: cache.get_stats() for cache in caches}
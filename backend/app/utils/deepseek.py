@@ -1,39 +1,105 @@
 """
 DeepSeek API客户端
 """
-import httpx
+import copy
+import hashlib
+import json
+import threading
 from loguru import logger
 from app.core.config import settings
+from app.utils.cache import LayeredCache
+from app.utils.http_client import get_http_client
 from typing import Optional, Dict, Any
 
 
+# 进程级LLM响应缓存（按模型+提示词指纹），所有DeepSeekClient实例共享
+_llm_cache = LayeredCache(
+    "llm",
+    ttl=settings.LLM_CACHE_DEFAULT_TTL,
+    max_local_entries=settings.LLM_CACHE_MAX_LOCAL
+)
+
+# 缓存命中节省的token统计
+_token_stats = {"prompt_tokens_saved": 0, "completion_tokens_saved": 0}
+_token_stats_lock = threading.Lock()
+
+
+def get_llm_cache_stats() -> Dict[str, Any]:
+    """获取LLM响应缓存命中率和节省的token数"""
+    stats = _llm_cache.get_stats()
+    with _token_stats_lock:
+        stats.update(_token_stats)
+    stats["tokens_saved"] = stats["prompt_tokens_saved"] + stats["completion_tokens_saved"]
+    return stats
+
+
 class DeepSeekClient:
     """DeepSeek API客户端"""
     
-    def __init__(self, api_key: str = None, api_base: str = None):
+    def __init__(self, api_key: str = None, api_base: str = None, cache_ttl: Optional[int] = None):
+        """
+        Args:
+            api_key: API密钥，None时从配置读取
+            api_base: API地址，None时从配置读取
+            cache_ttl: 响应缓存时间（秒），None使用LLM_CACHE_DEFAULT_TTL，0表示不缓存
+        """
         self.api_key = api_key or settings.DEEPSEEK_API_KEY
         self.api_base = api_base or settings.DEEPSEEK_API_BASE
         self.model = settings.DEEPSEEK_MODEL
+        self.cache_ttl = settings.LLM_CACHE_DEFAULT_TTL if cache_ttl is None else cache_ttl
+        self.cache = _llm_cache
+    
+    def _cache_key(
+        self,
+        prompt: str,
+        system_prompt: Optional[str],
+        temperature: float,
+        max_tokens: int
+    ) -> str:
+        """按(模型, 系统提示词, 提示词, temperature, max_tokens)生成缓存指纹"""
+        fingerprint = json.dumps(
+            [self.model, system_prompt or "", prompt, round(float(temperature), 4), int(max_tokens)],
+            ensure_ascii=False
+        )
+        return hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()
     
     async def generate(
         self,
         prompt: str,
         system_prompt: Optional[str] = None,
         temperature: float = 0.7,
-        max_tokens: int = 2000
+        max_tokens: int = 2000,
+        use_cache: bool = True
     ) -> Dict[str, Any]:
-        """调用DeepSeek API生成内容"""
+        """调用DeepSeek API生成内容
+        
+        相同指纹的请求在缓存有效期内直接返回缓存的响应；
+        cache_ttl为0、LLM_CACHE_ENABLED为False或use_cache=False时不使用缓存。
+        """
         if not self.api_key:
             logger.error("DeepSeek API Key未配置")
             raise ValueError("DeepSeek API Key未配置")
         
+        cache_key = None
+        if use_cache and self.cache_ttl > 0 and settings.LLM_CACHE_ENABLED:
+            cache_key = self._cache_key(prompt, system_prompt, temperature, max_tokens)
+            cached = await self.cache.aget(cache_key)
+            if cached is not None:
+                usage = cached.get("usage") or {}
+                with _token_stats_lock:
+                    _token_stats["prompt_tokens_saved"] += int(usage.get("prompt_tokens", 0) or 0)
+                    _token_stats["completion_tokens_saved"] += int(usage.get("completion_tokens", 0) or 0)
+                logger.debug("DeepSeek响应命中缓存")
+                # 返回副本，避免调用方修改缓存中的对象
+                return copy.deepcopy(cached)
+        
         messages = []
         if system_prompt:
             messages.append({"role": "system", "content": system_prompt})
         messages.append({"role": "user", "content": prompt})
         
         try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
+            async with get_http_client("deepseek", timeout=60.0) as client:
                 response = await client.post(
                     f"{self.api_base}/v1/chat/completions",
                     headers={
@@ -49,7 +115,11 @@ class DeepSeekClient:
                 )
                 response.raise_for_status()
                 result = response.json()
-                return result
+            
+            # 只缓存有内容的正常响应
+            if cache_key and result.get("choices"):
+                await self.cache.aset(cache_key, result, ttl=self.cache_ttl)
+            return result
         except Exception as e:
             logger.error(f"DeepSeek API调用失败: {e}")
             raise
@@ -1,20 +1,66 @@
 """
 Embedding客户端 - 用于语义关联度计算
 """
-import httpx
-from typing import List, Optional
+import asyncio
+import hashlib
+import threading
+from typing import Any, Dict, List, Optional
 from loguru import logger
 from app.core.config import settings
+from app.utils.http_client import get_http_client
+from app.utils.cache import LayeredCache
+from app.utils.embedding_backends import EmbeddingBackend, get_embedding_backend
 import numpy as np
 
 
+# 进程级embedding缓存（按模型+文本内容哈希），所有EmbeddingClient实例共享
+_embedding_cache = LayeredCache(
+    "embedding",
+    ttl=settings.EMBEDDING_CACHE_TTL,
+    max_local_entries=settings.EMBEDDING_CACHE_MAX_LOCAL
+)
+
+# API调用统计
+_api_stats = {"requests": 0, "inputs": 0, "local_batches": 0, "local_inputs": 0}
+_api_stats_lock = threading.Lock()
+
+
+def get_embedding_cache_stats() -> Dict[str, Any]:
+    """获取embedding缓存命中率和API调用统计"""
+    stats = _embedding_cache.get_stats()
+    with _api_stats_lock:
+        stats["api_requests"] = _api_stats["requests"]
+        stats["api_inputs"] = _api_stats["inputs"]
+        stats["local_batches"] = _api_stats["local_batches"]
+        stats["local_inputs"] = _api_stats["local_inputs"]
+    try:
+        backend = get_embedding_backend()
+        stats["backend"] = backend.name if backend else "remote"
+    except RuntimeError as e:
+        stats["backend"] = settings.EMBEDDING_BACKEND
+        stats["backend_error"] = str(e)
+    return stats
+
+
 class EmbeddingClient:
-    """Embedding客户端 - 使用DeepSeek Embedding API"""
+    """Embedding客户端 - 默认使用DeepSeek Embedding API，配置本地后端时在CPU上批量计算"""
     
-    def __init__(self, api_key: str = None, api_base: str = None):
+    def __init__(
+        self,
+        api_key: str = None,
+        api_base: str = None,
+        backend: Optional[EmbeddingBackend] = None
+    ):
         self.api_key = api_key or settings.DEEPSEEK_API_KEY
         self.api_base = api_base or settings.DEEPSEEK_API_BASE
-        self.model = "text-embedding-3-small"  # DeepSeek兼容OpenAI格式
+        # 本地后端（None表示使用远程接口）
+        self.backend = backend if backend is not None else get_embedding_backend()
+        self.model = self.backend.model if self.backend else "text-embedding-3-small"  # DeepSeek兼容OpenAI格式
+        self.cache = _embedding_cache
+    
+    def _cache_key(self, text: str) -> str:
+        """按模型和文本内容生成缓存key"""
+        return hashlib.sha256(f"{self.model}\n{text}".encode("utf-8")).hexdigest()
     
     async def get_embedding(self, text: str) -> Optional[List[float]]:
         """获取文本的向量表示
@@ -25,12 +71,72 @@ class EmbeddingClient:
         Returns:
             向量列表，如果失败返回None
         """
-        if not self.api_key:
-            logger.warning("DeepSeek API Key未配置，无法计算语义关联度")
-            return None
+        embeddings = await self.get_embeddings([text])
+        return embeddings[0]
+    
+    async def get_embeddings(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """批量获取文本的向量表示（优先读缓存，只请求未命中的文本）
+        
+        Args:
+            texts: 输入文本列表
+            
+        Returns:
+            与输入顺序一致的向量列表，失败的项为None
+        """
+        if not texts:
+            return []
+        
+        keys = [self._cache_key(text) for text in texts]
+        cached = await self.cache.aget_many(keys)
+        
+        # 未命中的文本（去重）
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in missing:
+                missing[key] = text
+        
+        if missing and self.backend:
+            vectors = await self._embed_local(list(missing.values()))
+            fetched = dict(zip(missing.keys(), vectors))
+            if self.backend.cache_vectors:
+                await self.cache.aset_many(fetched)
+            cached.update(fetched)
+        elif missing:
+            if not self.api_key:
+                logger.warning("DeepSeek API Key未配置，无法计算语义关联度")
+            else:
+                missing_items = list(missing.items())
+                batch_size = max(1, settings.EMBEDDING_BATCH_SIZE)
+                for i in range(0, len(missing_items), batch_size):
+                    batch = missing_items[i:i + batch_size]
+                    vectors = await self._request_embeddings([text for _, text in batch])
+                    fetched = {
+                        key: vector
+                        for (key, _), vector in zip(batch, vectors)
+                        if vector is not None
+                    }
+                    await self.cache.aset_many(fetched)
+                    cached.update(fetched)
+        
+        return [cached.get(key) for key in keys]
+    
+    async def _embed_local(self, texts: List[str]) -> List[List[float]]:
+        """使用本地后端批量计算（在线程中执行，不阻塞事件循环）"""
+        with _api_stats_lock:
+            _api_stats["local_batches"] += 1
+            _api_stats["local_inputs"] += len(texts)
+        
+        matrix = await asyncio.to_thread(self.backend.embed, texts)
+        return matrix.tolist()
+    
+    async def _request_embeddings(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """调用/v1/embeddings接口（一次请求多个输入）"""
+        with _api_stats_lock:
+            _api_stats["requests"] += 1
+            _api_stats["inputs"] += len(texts)
         
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with get_http_client("deepseek", timeout=30.0) as client:
                 # 使用DeepSeek兼容OpenAI的embedding接口
                 response = await client.post(
                     f"{self.api_base}/v1/embeddings",
@@ -40,20 +146,23 @@ class EmbeddingClient:
                     },
                     json={
                         "model": self.model,
-                        "input": text
+                        "input": texts
                     }
                 )
                 response.raise_for_status()
                 data = response.json()
                 
-                # 提取embedding向量
-                if "data" in data and len(data["data"]) > 0:
-                    return data["data"][0]["embedding"]
-                return None
+                # 按index字段还原顺序提取embedding向量
+                vectors: List[Optional[List[float]]] = [None] * len(texts)
+                for position, item in enumerate(data.get("data", [])):
+                    index = item.get("index", position)
+                    if 0 <= index < len(texts):
+                        vectors[index] = item.get("embedding")
+                return vectors
                 
         except Exception as e:
             logger.error(f"获取embedding失败: {e}")
-            return None
+            return [None] * len(texts)
     
     def cosine_similarity(self, vec1: List[float], vec2: List[float]) -> float:
         """计算两个向量的余弦相似度
@@ -99,8 +208,7 @@ class EmbeddingClient:
         Returns:
             相似度分数（0-1）
         """
-        vec1 = await self.get_embedding(text1)
-        vec2 = await self.get_embedding(text2)
+        vec1, vec2 = await self.get_embeddings([text1, text2])
         
         if vec1 is None or vec2 is None:
             logger.warning("无法获取embedding，返回0相似度")
@@ -0,0 +1,211 @@
+"""
+本地embedding后端
+在CPU上批量计算向量，不依赖远程/v1/embeddings接口：
+- hashing：字符n-gram哈希向量（零依赖，只表达字面重合，作为兜底）
+- onnx：ONNX句向量模型（需要安装onnxruntime和tokenizers），进程内只加载一次，加载失败时报错（不降级）
+通过 EMBEDDING_BACKEND 选择，"remote" 表示使用远程接口（EmbeddingClient原有实现）
+"""
+import abc
+import threading
+import zlib
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from loguru import logger
+
+from app.core.config import settings
+
+try:
+    import onnxruntime as ort
+    from tokenizers import Tokenizer
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
+
+def l2_normalize(matrix: np.ndarray) -> np.ndarray:
+    """按行L2归一化（零向量保持为0）"""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1.0, norms)
+
+
+class EmbeddingBackend(abc.ABC):
+    """本地embedding后端接口"""
+
+    name = "base"
+    # 用于embedding缓存key，区分不同模型的向量
+    model = ""
+    # 向量是否表达语义（字符哈希只表达字面重合）
+    semantic = True
+    # 是否写入embedding缓存（计算比读缓存还快的后端不缓存）
+    cache_vectors = True
+
+    @abc.abstractmethod
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """批量计算向量
+
+        Returns:
+            float32矩阵（len(texts) × dim），每行已L2归一化，空文本为零向量
+        """
+
+    def similarity_matrix(self, queries: Sequence[str], documents: Sequence[str]) -> np.ndarray:
+        """批量计算余弦相似度矩阵（len(queries) × len(documents)，范围-1到1）"""
+        if not queries or not documents:
+            return np.zeros((len(queries), len(documents)), dtype=np.float32)
+        vectors = self.embed(list(queries) + list(documents))
+        return vectors[:len(queries)] @ vectors[len(queries):].T
+
+
+class HashingEmbeddingBackend(EmbeddingBackend):
+    """字符n-gram哈希向量
+
+    n-gram用crc32映射到固定维度并带符号累加，跨进程结果一致，可以写入共享缓存
+    """
+
+    name = "hashing"
+    semantic = False
+    cache_vectors = False
+
+    def __init__(self, dim: int = None, ngram_range: Sequence[int] = None):
+        self.dim = dim or settings.EMBEDDING_HASHING_DIM
+        self.ngram_range = tuple(ngram_range or settings.EMBEDDING_HASHING_NGRAM_RANGE)
+        self.model = f"hashing-{self.dim}-{self.ngram_range[0]}-{self.ngram_range[1]}"
+
+    def _ngrams(self, text: str) -> List[str]:
+        chars = "".join((text or "").lower().split())
+        low, high = self.ngram_range
+        if 0 < len(chars) < low:
+            return [chars]
+        return [
+            chars[i:i + n]
+            for n in range(low, high + 1)
+            for i in range(len(chars) - n + 1)
+        ]
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            hashes = np.fromiter(
+                (zlib.crc32(gram.encode("utf-8")) for gram in self._ngrams(text)), dtype=np.uint32
+            )
+            if not hashes.size:
+                continue
+            signs = np.where(hashes & 0x80000000, -1.0, 1.0).astype(np.float32)
+            np.add.at(matrix[row], (hashes % self.dim).astype(np.intp), signs)
+        return l2_normalize(matrix)
+
+
+class OnnxEmbeddingBackend(EmbeddingBackend):
+    """ONNX句向量模型（如量化后的多语言MiniLM/bge），CPU推理
+
+    模型输出为token向量时按attention_mask做均值池化，输出为句向量时直接使用
+    """
+
+    name = "onnx"
+
+    def __init__(self, model_path: str = None, tokenizer_path: str = None):
+        if not ONNX_AVAILABLE:
+            raise RuntimeError("onnxruntime或tokenizers未安装，请运行: pip install onnxruntime tokenizers")
+        self.model_path = model_path or settings.EMBEDDING_ONNX_MODEL_PATH
+        tokenizer_path = tokenizer_path or settings.EMBEDDING_ONNX_TOKENIZER_PATH
+        if not self.model_path or not tokenizer_path:
+            raise RuntimeError("未配置EMBEDDING_ONNX_MODEL_PATH或EMBEDDING_ONNX_TOKENIZER_PATH")
+
+        options = ort.SessionOptions()
+        if settings.EMBEDDING_ONNX_THREADS:
+            options.intra_op_num_threads = settings.EMBEDDING_ONNX_THREADS
+        self.session = ort.InferenceSession(self.model_path, options, providers=["CPUExecutionProvider"])
+        self.input_names = {item.name for item in self.session.get_inputs()}
+
+        self.tokenizer = Tokenizer.from_file(tokenizer_path)
+        self.tokenizer.enable_truncation(max_length=settings.EMBEDDING_ONNX_MAX_LENGTH)
+        self.tokenizer.enable_padding()
+        self.model = f"onnx:{self.model_path}"
+        logger.info(f"ONNX embedding模型已加载: {self.model_path}")
+
+    def _embed_batch(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self.input_names:
+            feeds["token_type_ids"] = np.array([e.type_ids for e in encodings], dtype=np.int64)
+        feeds = {name: value for name, value in feeds.items() if name in self.input_names}
+
+        output = self.session.run(None, feeds)[0].astype(np.float32)
+        if output.ndim == 3:
+            mask = attention_mask[:, :, None].astype(np.float32)
+            output = (output * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1.0)
+        return output
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        texts = [text or "" for text in texts]
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        batch_size = max(1, settings.EMBEDDING_BATCH_SIZE)
+        batches = [self._embed_batch(texts[i:i + batch_size]) for i in range(0, len(texts), batch_size)]
+        matrix = l2_normalize(np.vstack(batches))
+        for row, text in enumerate(texts):
+            if not text.strip():
+                matrix[row] = 0.0
+        return matrix
+
+
+EMBEDDING_BACKENDS = {
+    "hashing": HashingEmbeddingBackend,
+    "onnx": OnnxEmbeddingBackend,
+}
+
+# 进程级后端实例（模型只加载一次）
+_backends: Dict[str, EmbeddingBackend] = {}
+_backends_lock = threading.Lock()
+
+
+def _load_backend(name: str) -> EmbeddingBackend:
+    backend = _backends.get(name)
+    if backend is None:
+        with _backends_lock:
+            backend = _backends.get(name)
+            if backend is None:
+                try:
+                    backend = EMBEDDING_BACKENDS[name]()
+                except Exception as e:
+                    # 不静默降级为字符哈希向量：维度和语义都不同，会导致向量索引重建、匹配质量下降
+                    logger.error(f"embedding后端 {name} 加载失败: {e}")
+                    raise RuntimeError(
+                        f"embedding后端 {name} 加载失败: {e}（如需使用字符哈希向量请设置 EMBEDDING_BACKEND=hashing）"
+                    ) from e
+                _backends[name] = backend
+    return backend
+
+
+def get_embedding_backend(name: Optional[str] = None) -> Optional[EmbeddingBackend]:
+    """获取配置的本地embedding后端
+
+    Args:
+        name: 后端名称，None时使用 EMBEDDING_BACKEND
+
+    Returns:
+        本地后端实例；使用远程接口（remote）时返回None
+
+    Raises:
+        RuntimeError: 配置的后端加载失败（如ONNX依赖或模型文件缺失）
+    """
+    name = (name or settings.EMBEDDING_BACKEND).lower()
+    if name == "remote":
+        return None
+    if name not in EMBEDDING_BACKENDS:
+        logger.warning(f"未知的embedding后端: {name}，使用远程接口")
+        return None
+    return _load_backend(name)
+
+
+def get_sync_embedding_backend() -> EmbeddingBackend:
+    """获取可同步调用的本地后端（配置为远程接口时使用字符哈希向量）"""
+    return get_embedding_backend() or _load_backend("hashing")
+
+
+def reset_embedding_backends():
+    """清空已加载的后端（配置变化或测试时使用）"""
+    with _backends_lock:
+        _backends.clear()
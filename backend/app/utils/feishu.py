@@ -1,9 +1,9 @@
 """
 飞书客户端工具
 """
-import httpx
 from loguru import logger
 from app.core.config import settings
+from app.utils.http_client import get_http_client
 
 
 class FeishuClient:
@@ -19,7 +19,7 @@ class FeishuClient:
             return {"status": "error", "message": "Webhook URL未配置"}
         
         try:
-            async with httpx.AsyncClient() as client:
+            async with get_http_client("feishu") as client:
                 response = await client.post(
                     self.webhook_url,
                     json=card_data,
@@ -3,10 +3,10 @@ Firecrawl MCP 客户端
 用于热点详情深度提取、批量内容抓取等增强功能
 """
 import json
-import httpx
 from typing import List, Dict, Any, Optional
 from loguru import logger
 from app.core.config import settings
+from app.utils.http_client import get_http_client
 
 
 class FirecrawlClient:
@@ -66,7 +66,7 @@ class FirecrawlClient:
         if self.api_key:
             headers["Authorization"] = f"Bearer {self.api_key}"
         
-        async with httpx.AsyncClient(timeout=60.0) as client:
+        async with get_http_client("firecrawl", timeout=60.0) as client:
             try:
                 response = await client.post(
                     self.mcp_server_url,
@@ -122,7 +122,7 @@ class FirecrawlClient:
             "Authorization": f"Bearer {self.api_key}"
         }
         
-        async with httpx.AsyncClient(timeout=60.0) as client:
+        async with get_http_client("firecrawl", timeout=60.0) as client:
             try:
                 response = await client.post(url, json=data, headers=headers)
                 response.raise_for_status()
@@ -281,7 +281,7 @@ class FirecrawlClient:
                 "Authorization": f"Bearer {self.api_key}"
             }
             
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with get_http_client("firecrawl", timeout=30.0) as client:
                 try:
                     response = await client.get(url, headers=headers)
                     response.raise_for_status()
@@ -0,0 +1,139 @@
+"""
+关键帧缩略图存储
+关键帧缩放后编码为JPEG，按内容哈希存储到本地目录，数据库只保存引用（frame_id）
+和感知哈希、颜色直方图等小体积特征
+"""
+import hashlib
+import io
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from loguru import logger
+
+from app.core.config import settings
+
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+    logger.warning("Pillow未安装，关键帧缩略图存储将不可用。请运行: pip install Pillow")
+
+
+_FRAME_ID_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+# 颜色直方图每个通道的分箱数
+HISTOGRAM_BINS = 4
+
+
+def dhash(image: "Image.Image", hash_size: int = 8) -> str:
+    """计算差异哈希（dHash），相似画面的哈希汉明距离小
+
+    Returns:
+        16位十六进制字符串（64 bit）
+    """
+    gray = image.convert("L").resize((hash_size + 1, hash_size), Image.BILINEAR)
+    pixels = np.asarray(gray, dtype=np.int16)
+    bits = (pixels[:, 1:] > pixels[:, :-1]).flatten()
+    value = 0
+    for bit in bits:
+        value = (value << 1) | int(bit)
+    return f"{value:0{hash_size * hash_size // 4}x}"
+
+
+def hamming_distance(hash_a: str, hash_b: str) -> int:
+    """两个感知哈希的汉明距离"""
+    return bin(int(hash_a, 16) ^ int(hash_b, 16)).count("1")
+
+
+def color_histogram(image: "Image.Image", bins: int = HISTOGRAM_BINS) -> List[float]:
+    """RGB颜色直方图（每通道bins个分箱，归一化），作为画面的小体积特征向量"""
+    pixels = np.asarray(image.convert("RGB"), dtype=np.uint8).reshape(-1, 3)
+    features = []
+    for channel in range(3):
+        hist, _ = np.histogram(pixels[:, channel], bins=bins, range=(0, 256))
+        features.extend((hist / max(len(pixels), 1)).round(4).tolist())
+    return features
+
+
+class FrameStore:
+    """关键帧缩略图存储（按JPEG内容的sha256寻址，相同画面只存一份）"""
+
+    def __init__(
+        self,
+        store_dir: Optional[str] = None,
+        max_size: Optional[int] = None,
+        quality: Optional[int] = None
+    ):
+        """
+        Args:
+            store_dir: 存储目录，None时使用FRAME_STORE_DIR
+            max_size: 缩略图最长边（像素），None时使用FRAME_STORE_MAX_SIZE
+            quality: JPEG质量（1-95），None时使用FRAME_STORE_JPEG_QUALITY
+        """
+        self.store_dir = Path(store_dir or settings.FRAME_STORE_DIR)
+        self.max_size = max_size or settings.FRAME_STORE_MAX_SIZE
+        self.quality = quality or settings.FRAME_STORE_JPEG_QUALITY
+
+    def _path_for(self, frame_id: str) -> Path:
+        return self.store_dir / frame_id[:2] / f"{frame_id}.jpg"
+
+    def get_path(self, frame_id: str) -> Optional[str]:
+        """获取缩略图文件路径，frame_id无效或文件不存在时返回None"""
+        if not _FRAME_ID_PATTERN.match(frame_id or ""):
+            return None
+        path = self._path_for(frame_id)
+        return str(path) if path.exists() else None
+
+    def save_frame(self, frame: Any) -> Dict[str, Any]:
+        """保存一帧画面
+
+        Args:
+            frame: RGB图像数组（H x W x 3，如MoviePy的clip.get_frame返回值）
+
+        Returns:
+            {"frame_id", "width", "height", "phash", "color_hist"}
+        """
+        if not PIL_AVAILABLE:
+            raise RuntimeError("Pillow未安装，无法保存关键帧")
+
+        image = Image.fromarray(np.asarray(frame, dtype=np.uint8)).convert("RGB")
+        image.thumbnail((self.max_size, self.max_size), Image.LANCZOS)
+
+        buffer = io.BytesIO()
+        image.save(buffer, format="JPEG", quality=self.quality, optimize=True)
+        data = buffer.getvalue()
+        frame_id = hashlib.sha256(data).hexdigest()
+
+        path = self._path_for(frame_id)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+
+        return {
+            "frame_id": frame_id,
+            "width": image.width,
+            "height": image.height,
+            "phash": dhash(image),
+            "color_hist": color_histogram(image),
+        }
+
+
+_frame_store: Optional[FrameStore] = None
+_frame_store_lock = threading.Lock()
+
+
+def get_frame_store() -> FrameStore:
+    """获取进程级关键帧存储单例"""
+    global _frame_store
+    if _frame_store is None:
+        with _frame_store_lock:
+            if _frame_store is None:
+                _frame_store = FrameStore()
+    return _frame_store
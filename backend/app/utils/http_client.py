@@ -0,0 +1,245 @@
+"""
+共享HTTP客户端
+进程内按事件循环复用httpx.AsyncClient连接池（keep-alive，可选HTTP/2），
+统一配置连接数限制、超时和重试退避策略
+"""
+import asyncio
+import random
+import threading
+import weakref
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+from loguru import logger
+
+from app.core.config import settings
+
+
+# 可以安全重试的HTTP方法（幂等）
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+# 服务端明确未处理请求、任何方法都可以重试的状态码
+RETRY_STATUS_CODES = {429, 503}
+
+# 网关错误：上游可能已经处理了请求（如LLM补全已计费），只对幂等方法重试
+IDEMPOTENT_RETRY_STATUS_CODES = {502, 504}
+
+# {事件循环: {(pool_name, proxy): httpx.AsyncClient}}
+# httpx的连接绑定在创建它的事件循环上，Celery任务每次新建事件循环，因此按循环隔离
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple[str, Optional[str]], httpx.AsyncClient]]" = weakref.WeakKeyDictionary()
+_clients_lock = threading.Lock()
+
+
+def _http2_available() -> bool:
+    """检查是否安装了HTTP/2依赖（h2）"""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+_HTTP2_ENABLED = settings.HTTP_CLIENT_HTTP2 and _http2_available()
+
+
+def _create_client(proxy: Optional[str] = None) -> httpx.AsyncClient:
+    """创建新的连接池客户端"""
+    transport_kwargs: Dict[str, Any] = {
+        "http2": _HTTP2_ENABLED,
+        "limits": httpx.Limits(
+            max_connections=settings.HTTP_CLIENT_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_CLIENT_MAX_KEEPALIVE,
+            keepalive_expiry=settings.HTTP_CLIENT_KEEPALIVE_EXPIRY,
+        ),
+        # 建立连接失败时由传输层重试（请求尚未发出，任何方法都可安全重试）
+        "retries": settings.HTTP_CLIENT_CONNECT_RETRIES,
+    }
+    if proxy:
+        transport_kwargs["proxy"] = proxy
+    return httpx.AsyncClient(
+        transport=httpx.AsyncHTTPTransport(**transport_kwargs),
+        timeout=httpx.Timeout(settings.HTTP_CLIENT_TIMEOUT, connect=settings.HTTP_CLIENT_CONNECT_TIMEOUT),
+    )
+
+
+def _get_pooled_client(pool: str, proxy: Optional[str]) -> httpx.AsyncClient:
+    """获取当前事件循环下的共享客户端（不存在时创建）"""
+    loop = asyncio.get_running_loop()
+    key = (pool, proxy)
+    with _clients_lock:
+        loop_clients = _clients.setdefault(loop, {})
+        client = loop_clients.get(key)
+        if client is None or client.is_closed:
+            client = _create_client(proxy)
+            loop_clients[key] = client
+        return client
+
+
+class PooledHttpClient:
+    """共享连接池的轻量句柄
+
+    每次调用get_http_client()都会返回新的句柄，句柄只保存默认参数（超时、请求头、重试次数），
+    实际请求走当前事件循环内共享的httpx.AsyncClient。支持`async with`写法，
+    退出时不会关闭底层连接池。
+    """
+
+    def __init__(
+        self,
+        pool: str = "default",
+        timeout: Optional[float] = None,
+        headers: Optional[Dict[str, str]] = None,
+        follow_redirects: bool = False,
+        proxy: Optional[str] = None,
+        retries: Optional[int] = None,
+        backoff: Optional[float] = None,
+    ):
+        self.pool = pool
+        self.timeout = timeout
+        self.headers = headers or {}
+        self.follow_redirects = follow_redirects
+        self.proxy = proxy
+        self.retries = settings.HTTP_CLIENT_MAX_RETRIES if retries is None else retries
+        self.backoff = settings.HTTP_CLIENT_RETRY_BACKOFF if backoff is None else backoff
+
+    async def __aenter__(self) -> "PooledHttpClient":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return None
+
+    def _build_kwargs(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        if self.headers:
+            kwargs["headers"] = {**self.headers, **(kwargs.get("headers") or {})}
+        if self.timeout is not None:
+            kwargs.setdefault("timeout", self.timeout)
+        kwargs.setdefault("follow_redirects", self.follow_redirects)
+        return kwargs
+
+    def _retry_delay(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        """指数退避（带抖动），优先使用服务端返回的Retry-After"""
+        if response is not None:
+            retry_after = response.headers.get("retry-after")
+            if retry_after:
+                try:
+                    return min(float(retry_after), 30.0)
+                except ValueError:
+                    pass
+        return self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5)
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """发送请求（按配置重试）
+
+        重试策略：
+            - 429/503：任何方法都重试（服务端未处理请求）
+            - 502/504：只对幂等方法重试（上游可能已处理，POST重试会重复计费）
+            - 连接失败：任何方法都重试（请求未发出）
+            - 其他网络错误：只对幂等方法重试
+        """
+        client = _get_pooled_client(self.pool, self.proxy)
+        kwargs = self._build_kwargs(kwargs)
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+
+        attempt = 0
+        while True:
+            try:
+                response = await client.request(method, url, **kwargs)
+            except httpx.TransportError as e:
+                if not (idempotent or isinstance(e, httpx.ConnectError)) or attempt >= self.retries:
+                    raise
+                delay = self._retry_delay(attempt)
+                logger.debug(f"请求 {url} 失败: {e}，{delay:.2f}秒后重试 ({attempt + 1}/{self.retries})")
+            else:
+                retryable = response.status_code in RETRY_STATUS_CODES or (
+                    idempotent and response.status_code in IDEMPOTENT_RETRY_STATUS_CODES
+                )
+                if not retryable or attempt >= self.retries:
+                    return response
+                delay = self._retry_delay(attempt, response)
+                logger.debug(f"请求 {url} 返回 {response.status_code}，{delay:.2f}秒后重试 ({attempt + 1}/{self.retries})")
+                await response.aclose()
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    def stream(self, method: str, url: str, **kwargs):
+        """流式请求（不重试），用法与httpx.AsyncClient.stream相同"""
+        client = _get_pooled_client(self.pool, self.proxy)
+        return client.stream(method, url, **self._build_kwargs(kwargs))
+
+
+def get_http_client(
+    pool: str = "default",
+    timeout: Optional[float] = None,
+    headers: Optional[Dict[str, str]] = None,
+    follow_redirects: bool = False,
+    proxy: Optional[str] = None,
+    retries: Optional[int] = None,
+    backoff: Optional[float] = None,
+) -> PooledHttpClient:
+    """获取共享连接池的HTTP客户端
+
+    Args:
+        pool: 连接池名称（同一事件循环内同名同代理的调用共享连接）
+        timeout: 默认请求超时（秒），None时使用HTTP_CLIENT_TIMEOUT
+        headers: 默认请求头
+        follow_redirects: 是否跟随重定向
+        proxy: 代理地址（不同代理使用独立连接池）
+        retries: 最大重试次数，None时使用HTTP_CLIENT_MAX_RETRIES
+        backoff: 退避基数（秒），None时使用HTTP_CLIENT_RETRY_BACKOFF
+    """
+    return PooledHttpClient(
+        pool=pool,
+        timeout=timeout,
+        headers=headers,
+        follow_redirects=follow_redirects,
+        proxy=proxy,
+        retries=retries,
+        backoff=backoff,
+    )
+
+
+async def aclose_http_clients():
+    """关闭当前事件循环下的所有共享客户端（FastAPI关闭、Celery任务结束时调用）"""
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        loop_clients = _clients.pop(loop, {})
+    for client in loop_clients.values():
+        try:
+            await client.aclose()
+        except Exception as e:
+            logger.debug(f"关闭HTTP客户端失败: {e}")
+
+
+def close_loop_http_clients(loop: asyncio.AbstractEventLoop):
+    """在关闭事件循环前关闭其共享客户端（Celery任务使用独立事件循环时调用）"""
+    if loop.is_closed() or loop.is_running():
+        return
+    with _clients_lock:
+        has_clients = loop in _clients
+    if has_clients:
+        loop.run_until_complete(aclose_http_clients())
+
+
+def close_all_http_clients():
+    """同步关闭所有事件循环下的共享客户端（进程退出时调用）
+
+    已关闭的事件循环无法再执行aclose，直接丢弃引用，由进程退出回收连接。
+    """
+    with _clients_lock:
+        items = list(_clients.items())
+        _clients.clear()
+
+    for loop, loop_clients in items:
+        if loop.is_closed() or loop.is_running():
+            continue
+        for client in loop_clients.values():
+            try:
+                loop.run_until_complete(client.aclose())
+            except Exception as e:
+                logger.debug(f"关闭HTTP客户端失败: {e}")
+
@@ -0,0 +1,116 @@
+"""
+多模式关键词匹配（Aho-Corasick自动机）
+按类别（如 include/exclude/required/category）编译一次，单次扫描文本即可得到所有类别的全部命中，
+扫描耗时只与文本长度和命中数有关，与关键词数量无关
+"""
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Iterable, List, Mapping, Set, Tuple
+
+
+def normalize_keyword(keyword: str) -> str:
+    """关键词归一化（小写）"""
+    return keyword.lower()
+
+
+class KeywordMatcher:
+    """多模式关键词匹配器
+
+    用法：
+        matcher = KeywordMatcher({"include": ["连衣裙", "夏装"], "exclude": ["家电"]})
+        matcher.match("夏装连衣裙推荐")  # {"include": {"连衣裙", "夏装"}}
+    """
+
+    def __init__(self, patterns: Mapping[str, Iterable[str]]):
+        """
+        Args:
+            patterns: {类别: 关键词列表}，关键词按小写匹配，空关键词忽略，同一关键词可属于多个类别
+        """
+        # 每个类别去重后的关键词数（用于计算命中率）
+        self.pattern_counts: Dict[str, int] = {}
+        self._goto: List[Dict[str, int]] = [{}]
+        self._outputs: List[List[Tuple[str, str]]] = [[]]
+
+        for category, keywords in patterns.items():
+            unique = {normalize_keyword(kw) for kw in keywords if kw}
+            self.pattern_counts[category] = len(unique)
+            for keyword in unique:
+                self._add(category, keyword)
+        self._build_failure_links()
+
+    def _add(self, category: str, keyword: str):
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._outputs.append([])
+            state = next_state
+        self._outputs[state].append((category, keyword))
+
+    def _build_failure_links(self):
+        """BFS构建失败指针，并把失败链上的输出合并到每个状态"""
+        self._fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                if self._outputs[self._fail[next_state]]:
+                    self._outputs[next_state] = self._outputs[next_state] + self._outputs[self._fail[next_state]]
+
+    def match(self, text: str) -> Dict[str, Set[str]]:
+        """单次扫描文本，返回 {类别: 命中的关键词集合}（只包含有命中的类别）"""
+        hits: Dict[str, Set[str]] = {}
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        state = 0
+        for char in (text or "").lower():
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for category, keyword in outputs[state]:
+                hits.setdefault(category, set()).add(keyword)
+        return hits
+
+    def match_many(self, texts: Iterable[str]) -> List[Dict[str, Set[str]]]:
+        """批量匹配，结果与输入顺序一致"""
+        return [self.match(text) for text in texts]
+
+    def hit_ratio(self, hits: Dict[str, Set[str]], category: str) -> float:
+        """某类别的关键词命中率（命中数 / 该类别关键词数）"""
+        total = self.pattern_counts.get(category, 0)
+        return len(hits.get(category, ())) / total if total else 0.0
+
+
+@lru_cache(maxsize=256)
+def _compile(patterns: Tuple[Tuple[str, Tuple[str, ...]], ...]) -> KeywordMatcher:
+    return KeywordMatcher(dict(patterns))
+
+
+def compile_keyword_matcher(patterns: Mapping[str, Iterable[str]]) -> KeywordMatcher:
+    """获取编译好的匹配器（相同关键词配置进程内只编译一次）"""
+    return _compile(tuple(
+        (category, tuple(sorted({normalize_keyword(kw) for kw in keywords if kw})))
+        for category, keywords in sorted(patterns.items())
+    ))
+
+
+def split_keyword_rules(keywords: Iterable[str]) -> Dict[str, List[str]]:
+    """按标记拆分筛选关键词：+必须词（required）、!过滤词（exclude）、普通词（include）"""
+    rules: Dict[str, List[str]] = {"required": [], "exclude": [], "include": []}
+    for keyword in keywords:
+        keyword = keyword.strip()
+        if keyword.startswith("+"):
+            rules["required"].append(keyword[1:])
+        elif keyword.startswith("!"):
+            rules["exclude"].append(keyword[1:])
+        else:
+            rules["include"].append(keyword)
+    return rules
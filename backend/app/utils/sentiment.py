@@ -1,10 +1,10 @@
 """
 情感分析客户端 - 用于情感关联度计算
 """
-import httpx
 from typing import Dict, Optional
 from loguru import logger
 from app.core.config import settings
+from app.utils.http_client import get_http_client
 
 
 class SentimentClient:
@@ -31,7 +31,7 @@ class SentimentClient:
             return {"sentiment": "neutral", "score": 0.5}
         
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with get_http_client("deepseek", timeout=30.0) as client:
                 prompt = f"""请分析以下文本的情感倾向，返回JSON格式：
 {{
     "sentiment": "positive/negative/neutral",
@@ -0,0 +1,245 @@
+"""
+语音转录服务
+独立的Whisper工作进程池：每个工作进程按模型大小常驻已加载的模型，
+输入为ffmpeg提取一次的16kHz单声道音频，提交数量有上限（背压）
+"""
+import asyncio
+import multiprocessing
+import os
+import shutil
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional
+
+from loguru import logger
+
+from app.core.config import settings
+
+
+# Whisper要求的采样率
+WHISPER_SAMPLE_RATE = 16000
+
+# 工作进程内常驻的模型 {模型大小: 模型}（线程池模式下为当前进程共享）
+_worker_models: Dict[str, Any] = {}
+_worker_models_lock = threading.Lock()
+
+
+class TranscriptionQueueFullError(RuntimeError):
+    """转录队列已满，等待超时"""
+
+
+def _get_worker_model(model_name: str):
+    """获取工作进程内常驻的Whisper模型（首次使用时加载）"""
+    model = _worker_models.get(model_name)
+    if model is None:
+        with _worker_models_lock:
+            model = _worker_models.get(model_name)
+            if model is None:
+                import whisper
+                logger.info(f"[转录进程 {os.getpid()}] 加载Whisper模型: {model_name}")
+                model = whisper.load_model(model_name)
+                _worker_models[model_name] = model
+    return model
+
+
+def _transcribe_in_worker(audio_path: str, model_name: str, language: str) -> Dict[str, Any]:
+    """在工作进程中执行转录（模块级函数，可被进程池序列化）"""
+    model = _get_worker_model(model_name)
+    result = model.transcribe(audio_path, language=language)
+    return {
+        "text": result.get("text", ""),
+        "segments": result.get("segments", []),
+        "language": result.get("language", language),
+    }
+
+
+async def extract_audio(video_path: str, output_path: Optional[str] = None) -> Optional[str]:
+    """用ffmpeg从视频中提取16kHz单声道WAV音频
+
+    已存在且不早于视频文件的音频直接复用。
+
+    Args:
+        video_path: 视频文件路径
+        output_path: 音频输出路径，None时与视频同目录同名（.wav）
+
+    Returns:
+        音频文件路径；ffmpeg不可用或提取失败返回None
+    """
+    ffmpeg = shutil.which("ffmpeg")
+    if not ffmpeg:
+        logger.warning("ffmpeg未安装，无法预先提取音频")
+        return None
+
+    output_path = output_path or f"{os.path.splitext(video_path)[0]}.wav"
+    try:
+        if os.path.getmtime(output_path) >= os.path.getmtime(video_path):
+            return output_path
+    except OSError:
+        pass
+
+    tmp_path = f"{output_path}.tmp.wav"
+    process = await asyncio.create_subprocess_exec(
+        ffmpeg, "-nostdin", "-y", "-loglevel", "error",
+        "-i", video_path,
+        "-vn", "-ac", "1", "-ar", str(WHISPER_SAMPLE_RATE), "-f", "wav",
+        tmp_path,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    _, stderr = await process.communicate()
+    if process.returncode != 0:
+        logger.warning(f"ffmpeg提取音频失败: {stderr.decode('utf-8', errors='ignore')[:500]}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return None
+
+    os.replace(tmp_path, output_path)
+    return output_path
+
+
+class TranscriptionService:
+    """Whisper转录服务
+
+    - 进程池模式：每个工作进程常驻已加载的模型，转录可以使用多个CPU核心
+    - 线程池模式：当前进程不能创建子进程时（如Celery prefork的守护进程）自动降级
+    - 背压：正在执行和排队的转录总数不超过 workers + max_pending，
+      超出时调用方等待，等待超过queue_timeout抛出TranscriptionQueueFullError
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        queue_timeout: Optional[float] = None,
+        use_processes: Optional[bool] = None,
+    ):
+        """
+        Args:
+            workers: 工作进程数，None时使用TRANSCRIPTION_WORKERS
+            max_pending: 最大排队数，None时使用TRANSCRIPTION_MAX_PENDING
+            queue_timeout: 排队等待超时（秒），None时使用TRANSCRIPTION_QUEUE_TIMEOUT
+            use_processes: 是否使用进程池，None时使用TRANSCRIPTION_USE_PROCESS_POOL
+        """
+        self.workers = max(1, workers or settings.TRANSCRIPTION_WORKERS)
+        self.max_pending = settings.TRANSCRIPTION_MAX_PENDING if max_pending is None else max_pending
+        self.queue_timeout = settings.TRANSCRIPTION_QUEUE_TIMEOUT if queue_timeout is None else queue_timeout
+        use_processes = settings.TRANSCRIPTION_USE_PROCESS_POOL if use_processes is None else use_processes
+        # 守护进程不能创建子进程
+        self.use_processes = use_processes and not multiprocessing.current_process().daemon
+
+        self._slots = threading.BoundedSemaphore(self.workers + self.max_pending)
+        self._executor: Optional[Executor] = None
+        self._executor_lock = threading.Lock()
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        """正在执行和排队的转录数"""
+        return self._pending
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    if self.use_processes:
+                        # spawn避免fork带有事件循环、连接池等状态的父进程
+                        self._executor = ProcessPoolExecutor(
+                            max_workers=self.workers,
+                            mp_context=multiprocessing.get_context("spawn"),
+                        )
+                    else:
+                        self._executor = ThreadPoolExecutor(
+                            max_workers=self.workers,
+                            thread_name_prefix="transcription",
+                        )
+                    logger.info(
+                        f"转录服务启动: {'进程池' if self.use_processes else '线程池'}, workers={self.workers}"
+                    )
+        return self._executor
+
+    def _reset_executor(self, executor: Executor):
+        """工作进程异常退出后重建进程池"""
+        with self._executor_lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False)
+
+    def _release_slot(self, _future=None):
+        with self._pending_lock:
+            self._pending -= 1
+        self._slots.release()
+
+    async def transcribe(
+        self,
+        audio_path: str,
+        model_name: Optional[str] = None,
+        language: str = "zh"
+    ) -> Dict[str, Any]:
+        """转录音频（或视频）文件
+
+        Args:
+            audio_path: 音频文件路径（建议先用extract_audio提取）
+            model_name: Whisper模型大小，None时使用VIDEO_ANALYZER_WHISPER_MODEL
+            language: 语言
+
+        Returns:
+            {"text": 文本, "segments": 分段, "language": 语言}
+
+        Raises:
+            TranscriptionQueueFullError: 排队等待超时
+        """
+        model_name = model_name or settings.VIDEO_ANALYZER_WHISPER_MODEL
+
+        # 背压：在线程中等待空位，不阻塞事件循环
+        acquired = await asyncio.to_thread(self._slots.acquire, True, self.queue_timeout)
+        if not acquired:
+            raise TranscriptionQueueFullError(f"转录队列已满（{self.workers + self.max_pending}），等待超时")
+        with self._pending_lock:
+            self._pending += 1
+
+        try:
+            executor = self._get_executor()
+            future = executor.submit(_transcribe_in_worker, audio_path, model_name, language)
+        except Exception:
+            self._release_slot()
+            raise
+        # 调用方取消时任务仍在执行，完成后才释放空位
+        future.add_done_callback(self._release_slot)
+
+        try:
+            return await asyncio.wrap_future(future)
+        except BrokenProcessPool:
+            self._reset_executor(executor)
+            raise
+
+    def shutdown(self, wait: bool = True):
+        """关闭工作进程池"""
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+
+_transcription_service: Optional[TranscriptionService] = None
+_transcription_service_lock = threading.Lock()
+
+
+def get_transcription_service() -> TranscriptionService:
+    """获取进程级转录服务单例（所有视频分析器共享同一个工作进程池）"""
+    global _transcription_service
+    if _transcription_service is None:
+        with _transcription_service_lock:
+            if _transcription_service is None:
+                _transcription_service = TranscriptionService()
+    return _transcription_service
+
+
+def shutdown_transcription_service():
+    """关闭转录服务（进程退出时调用）"""
+    global _transcription_service
+    with _transcription_service_lock:
+        service, _transcription_service = _transcription_service, None
+    if service is not None:
+        service.shutdown(wait=False)
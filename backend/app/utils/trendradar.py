@@ -2,10 +2,10 @@
 TrendRadar客户端
 支持通过MCP协议或HTTP API调用TrendRadar服务
 """
-import httpx
 import json
 from loguru import logger
 from app.core.config import settings
+from app.utils.http_client import get_http_client
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 
@@ -63,7 +63,7 @@ class TrendRadarClient:
         date: Optional[datetime] = None
     ) -> List[Dict[str, Any]]:
         """通过MCP协议获取热点列表"""
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with get_http_client("trendradar", timeout=30.0) as client:
             # MCP协议调用格式
             # 根据TrendRadar的MCP服务器实现，可能需要调用特定的工具
             mcp_request = {
@@ -117,7 +117,7 @@ class TrendRadarClient:
         date: Optional[datetime] = None
     ) -> List[Dict[str, Any]]:
         """通过HTTP API获取热点列表"""
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with get_http_client("trendradar", timeout=30.0) as client:
             params = {"platform": platform}
             if date:
                 params["date"] = date.strftime("%Y-%m-%d")
@@ -218,7 +218,7 @@ class TrendRadarClient:
     
     async def _get_hotspot_detail_via_mcp(self, hotspot_id: str) -> Optional[Dict[str, Any]]:
         """通过MCP协议获取热点详情"""
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with get_http_client("trendradar", timeout=30.0) as client:
             mcp_request = {
                 "jsonrpc": "2.0",
                 "id": 1,
@@ -257,7 +257,7 @@ class TrendRadarClient:
     
     async def _get_hotspot_detail_via_http(self, hotspot_id: str) -> Optional[Dict[str, Any]]:
         """通过HTTP API获取热点详情"""
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with get_http_client("trendradar", timeout=30.0) as client:
             headers = {}
             if self.api_key:
                 headers["Authorization"] = f"Bearer {self.api_key}"
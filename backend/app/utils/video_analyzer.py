@@ -2,9 +2,9 @@
 AI拆解工具客户端
 支持本地分析器和远程API两种模式
 """
-import httpx
 from loguru import logger
 from app.core.config import settings
+from app.utils.http_client import get_http_client
 from typing import Optional, Dict, Any
 
 
@@ -119,7 +119,7 @@ class VideoAnalyzerClient:
             logger.debug(f"🔍 [探针] API URL: {self.api_url}, 有API Key: {bool(self.api_key)}")
             
             request_start = time.time()
-            async with httpx.AsyncClient(timeout=600.0) as client:  # 10分钟超时
+            async with get_http_client("video_analyzer", timeout=600.0, retries=0) as client:  # 10分钟超时
                 headers = {"Content-Type": "application/json"}
                 if self.api_key:
                     headers["Authorization"] = f"Bearer {self.api_key}"
@@ -3,18 +3,18 @@
 基于 PySceneDetect + Whisper + MoviePy 实现
 """
 import os
-import tempfile
 import asyncio
+import importlib.util
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Optional, List
 from pathlib import Path
 from loguru import logger
 import httpx
 
-try:
-    import whisper
-    WHISPER_AVAILABLE = True
-except ImportError:
-    WHISPER_AVAILABLE = False
+# 模型在转录服务的工作进程中加载，这里只检查是否已安装（不导入，避免主进程加载torch）
+WHISPER_AVAILABLE = importlib.util.find_spec("whisper") is not None
+if not WHISPER_AVAILABLE:
     logger.warning("Whisper未安装，语音转录功能将不可用")
 
 try:
@@ -34,6 +34,26 @@ except (ImportError, ModuleNotFoundError):
     pass
 
 from app.core.config import settings
+from app.utils.frame_store import get_frame_store
+from app.utils.transcription import extract_audio, get_transcription_service
+from app.utils.video_cache import get_video_cache
+
+
+# 同步分析步骤（视频信息探测、场景检测、关键帧提取）的线程池，所有分析器共享
+_stage_executor: Optional[ThreadPoolExecutor] = None
+_stage_executor_lock = threading.Lock()
+
+
+def _get_stage_executor() -> ThreadPoolExecutor:
+    global _stage_executor
+    if _stage_executor is None:
+        with _stage_executor_lock:
+            if _stage_executor is None:
+                _stage_executor = ThreadPoolExecutor(
+                    max_workers=settings.VIDEO_ANALYZER_STAGE_WORKERS,
+                    thread_name_prefix="video_stage"
+                )
+    return _stage_executor
 
 
 class LocalVideoAnalyzer:
@@ -47,7 +67,6 @@ class LocalVideoAnalyzer:
             whisper_model: Whisper模型大小 (tiny, base, small, medium, large)
         """
         self.whisper_model_name = whisper_model or getattr(settings, 'VIDEO_ANALYZER_WHISPER_MODEL', 'base')
-        self.whisper_model = None
         self.temp_dir = None
         
         # 检查依赖（只在初始化时警告一次）
@@ -58,77 +77,29 @@ class LocalVideoAnalyzer:
         if not MOVIEPY_AVAILABLE:
             logger.warning("MoviePy未安装，视频处理功能将不可用。请运行: pip install moviepy")
     
-    def _load_whisper_model(self):
-        """延迟加载Whisper模型（避免启动时加载）"""
-        if not WHISPER_AVAILABLE:
-            return None
-        
-        if self.whisper_model is None:
-            try:
-                logger.info(f"加载Whisper模型: {self.whisper_model_name}")
-                self.whisper_model = whisper.load_model(self.whisper_model_name)
-                logger.info("Whisper模型加载完成")
-            except Exception as e:
-                logger.error(f"加载Whisper模型失败: {e}")
-                return None
-        
-        return self.whisper_model
-    
     async def _download_video(self, video_url: str) -> Optional[str]:
         """
-        下载视频到临时文件
+        下载视频到本地视频缓存（流式写入磁盘，同一URL只下载一次）
+        
+        返回的视频已pin住（分析期间不会被缓存淘汰），用完后需调用 get_video_cache().unpin
         
         Args:
             video_url: 视频URL
             
         Returns:
-            临时文件路径，失败返回None
+            缓存文件路径，失败返回None
         """
         import time
         start_time = time.time()
         
         logger.debug(f"🔍 [探针] _download_video 开始: {video_url[:100]}")
         
-        # 检查httpx是否可用
-        try:
-            import httpx
-        except (ImportError, ModuleNotFoundError):
-            logger.error("❌ [探针] httpx未安装，无法下载视频。请运行: pip install httpx")
-            return None
-        
         try:
-            # 创建临时目录
-            if self.temp_dir is None:
-                self.temp_dir = tempfile.mkdtemp(prefix="video_analyzer_")
-                logger.debug(f"🔍 [探针] 创建临时目录: {self.temp_dir}")
-            
-            # 从URL提取文件名
-            filename = os.path.basename(video_url.split('?')[0])
-            if not filename or '.' not in filename:
-                filename = "video.mp4"
-            
-            temp_path = os.path.join(self.temp_dir, filename)
-            logger.debug(f"🔍 [探针] 目标文件路径: {temp_path}")
-            
-            # 下载视频
-            logger.info(f"🔍 [探针] 开始HTTP下载: {video_url[:100]}")
-            import httpx
-            download_start = time.time()
-            async with httpx.AsyncClient(timeout=300.0) as client:
-                response = await client.get(video_url)
-                response.raise_for_status()
-                content_size = len(response.content)
-                logger.debug(f"🔍 [探针] HTTP响应: status={response.status_code}, size={content_size} bytes, 耗时 {time.time() - download_start:.2f}秒")
-                
-                write_start = time.time()
-                with open(temp_path, 'wb') as f:
-                    f.write(response.content)
-                logger.debug(f"🔍 [探针] 文件写入完成, 耗时 {time.time() - write_start:.2f}秒")
-            
-            file_size = os.path.getsize(temp_path) if os.path.exists(temp_path) else 0
+            video_path = await get_video_cache().acquire(video_url)
+            file_size = os.path.getsize(video_path) if os.path.exists(video_path) else 0
             total_time = time.time() - start_time
-            logger.info(f"✅ [探针] _download_video 完成: {temp_path}, 文件大小={file_size} bytes, 总耗时 {total_time:.2f}秒")
-            return temp_path
+            logger.info(f"✅ [探针] _download_video 完成: {video_path}, 文件大小={file_size} bytes, 总耗时 {total_time:.2f}秒")
+            return video_path
             
         except Exception as e:
             total_time = time.time() - start_time
@@ -217,12 +188,13 @@ class LocalVideoAnalyzer:
             logger.debug(f"❌ [探针] 错误堆栈:\n{traceback.format_exc()}")
             return []
     
-    async def _transcribe_audio(self, video_path: str) -> Dict[str, Any]:
+    async def _transcribe_audio(self, video_path: str, model_name: Optional[str] = None) -> Dict[str, Any]:
         """
-        转录音频
+        转录音频（先用ffmpeg提取音频，再交给共享的Whisper转录服务）
         
         Args:
             video_path: 视频文件路径
+            model_name: 本次使用的Whisper模型，None时使用初始化时的设置
             
         Returns:
             转录结果，包含 text 和 segments
@@ -232,21 +204,23 @@ class LocalVideoAnalyzer:
         
         logger.debug(f"🔍 [探针] _transcribe_audio 开始: {video_path}")
         
-        model = self._load_whisper_model()
-        if model is None:
-            logger.warning("❌ [探针] Whisper模型未加载，语音转录不可用")
+        if not WHISPER_AVAILABLE:
+            logger.warning("❌ [探针] Whisper未安装，语音转录不可用")
             return {"text": "", "segments": []}
         
+        model_name = model_name or self.whisper_model_name
         try:
             logger.info("🔍 [探针] 开始语音转录...")
-            logger.debug(f"🔍 [探针] 使用Whisper模型: {self.whisper_model_name}")
+            logger.debug(f"🔍 [探针] 使用Whisper模型: {model_name}")
+            
+            # 只提取一次音频，转录进程不再解码整个视频；ffmpeg不可用时直接转录视频文件
+            audio_path = await extract_audio(video_path) or video_path
             
-            # 在后台线程中运行（Whisper是同步的）
-            loop = asyncio.get_event_loop()
             transcribe_start = time.time()
-            result = await loop.run_in_executor(
-                None,
-                lambda: model.transcribe(video_path, language="zh")
+            result = await get_transcription_service().transcribe(
+                audio_path,
+                model_name=model_name,
+                language="zh"
             )
             transcribe_time = time.time() - transcribe_start
             logger.debug(f"🔍 [探针] Whisper转录完成, 耗时 {transcribe_time:.2f}秒")
@@ -282,27 +256,31 @@ class LocalVideoAnalyzer:
             shot_table: 场景列表
             
         Returns:
-            关键帧列表
+            关键帧列表，每帧只包含缩略图引用（frame_id、url）和感知哈希、颜色直方图，
+            不包含像素数据
         """
         if not MOVIEPY_AVAILABLE:
             return []
         
         try:
             clip = VideoFileClip(video_path)
+            frame_store = get_frame_store()
             key_frames = []
             
-            for shot in shot_table:
-                # 取场景中间时刻的帧
-                mid_time = (shot["start_time"] + shot["end_time"]) / 2
-                frame = clip.get_frame(mid_time)
-                
-                key_frames.append({
-                    "shot_number": shot["shot_number"],
-                    "time": mid_time,
-                    "frame": frame.tolist() if hasattr(frame, 'tolist') else None
-                })
-            
-            clip.close()
+            try:
+                for shot in shot_table:
+                    # 取场景中间时刻的帧，保存为缩略图后立即释放原始帧
+                    mid_time = (shot["start_time"] + shot["end_time"]) / 2
+                    frame_ref = frame_store.save_frame(clip.get_frame(mid_time))
+                    
+                    key_frames.append({
+                        "shot_number": shot["shot_number"],
+                        "time": mid_time,
+                        **frame_ref,
+                        "url": f"{settings.API_V1_PREFIX}/analysis/frames/{frame_ref['frame_id']}"
+                    })
+            finally:
+                clip.close()
             return key_frames
             
         except Exception as e:
@@ -323,9 +301,10 @@ class LocalVideoAnalyzer:
                 - download_video: 是否需要下载视频（默认True）
                 - extract_key_frames: 是否提取关键帧（默认False，因为数据量大）
                 - whisper_model: Whisper模型大小（覆盖初始化时的设置）
+                - stage_timeouts: 各阶段超时（秒），覆盖VIDEO_ANALYZER_STAGE_TIMEOUTS
         
         Returns:
-            分析结果，格式与远程API一致
+            分析结果，格式与远程API一致，另含各阶段耗时stage_timings和状态stage_status
         """
         import time
         start_time = time.time()
@@ -337,11 +316,13 @@ class LocalVideoAnalyzer:
         logger.info(f"🔍 [探针] LocalVideoAnalyzer.analyze 开始")
         logger.info(f"🔍 [探针] 输入参数: video_url={video_url[:100]}, download_video={download_video}, extract_key_frames={extract_key_frames}")
         
-        # 如果指定了whisper模型，更新
-        if "whisper_model" in options:
-            logger.info(f"🔍 [探针] 更新Whisper模型: {options['whisper_model']}")
-            self.whisper_model_name = options["whisper_model"]
-            self.whisper_model = None  # 重置，下次使用时重新加载
+        # 本次分析使用的whisper模型（各模型常驻在转录服务的工作进程中，不需要重新加载）；
+        # 分析器是进程级单例且各阶段并发执行，不修改实例属性，避免影响其他分析
+        whisper_model = options.get("whisper_model") or self.whisper_model_name
+        
+        stage_timeouts = {**settings.VIDEO_ANALYZER_STAGE_TIMEOUTS, **(options.get("stage_timeouts") or {})}
+        stage_timings: Dict[str, float] = {}
+        stage_status: Dict[str, str] = {}
         
         video_path = None
         try:
@@ -349,9 +330,18 @@ class LocalVideoAnalyzer:
             step_start = time.time()
             if download_video:
                 logger.info(f"🔍 [探针] 步骤1: 开始下载视频")
-                video_path = await self._download_video(video_url)
+                try:
+                    video_path = await asyncio.wait_for(
+                        self._download_video(video_url),
+                        timeout=stage_timeouts.get("download")
+                    )
+                except asyncio.TimeoutError:
+                    video_path = None
+                stage_timings["download"] = round(time.time() - step_start, 3)
                 if not video_path:
+                    stage_status["download"] = "error"
                     raise ValueError("视频下载失败")
+                stage_status["download"] = "ok"
                 logger.info(f"🔍 [探针] 步骤1完成: 视频下载成功, 耗时 {time.time() - step_start:.2f}秒, 路径={video_path}")
             else:
                 # 假设video_url是本地路径
@@ -361,37 +351,56 @@ class LocalVideoAnalyzer:
                     raise ValueError(f"视频文件不存在: {video_path}")
                 logger.info(f"🔍 [探针] 步骤1完成: 本地路径验证成功, 耗时 {time.time() - step_start:.2f}秒")
             
-            # 2. 获取视频基本信息
-            step_start = time.time()
-            logger.info(f"🔍 [探针] 步骤2: 开始获取视频基本信息")
-            video_info = self._get_video_info(video_path)
-            logger.info(f"🔍 [探针] 步骤2完成: 视频信息获取成功, 耗时 {time.time() - step_start:.2f}秒")
+            # 2-4. 视频信息、场景检测、语音转录互不依赖，文件就绪后并发执行
+            # （同步的探测和场景检测在阶段线程池中运行，转录在转录服务的工作进程中运行）
+            logger.info(f"🔍 [探针] 步骤2-4: 并发执行视频信息获取、场景检测、语音转录")
+            video_info, shot_table, transcript_result = await asyncio.gather(
+                self._run_stage(
+                    "video_info",
+                    self._run_blocking(self._get_video_info, video_path),
+                    stage_timeouts,
+                    {"duration": 0.0, "fps": 0.0, "size": (0, 0)},
+                    stage_timings,
+                    stage_status
+                ),
+                self._run_stage(
+                    "scenes",
+                    self._run_blocking(self._detect_scenes, video_path),
+                    stage_timeouts,
+                    [],
+                    stage_timings,
+                    stage_status
+                ),
+                self._run_stage(
+                    "transcribe",
+                    self._transcribe_audio(video_path, whisper_model),
+                    stage_timeouts,
+                    {"text": "", "segments": []},
+                    stage_timings,
+                    stage_status
+                ),
+            )
+            transcript_text = transcript_result.get("text", "")
             logger.debug(f"🔍 [探针] 视频信息: duration={video_info.get('duration')}, fps={video_info.get('fps')}, size={video_info.get('size')}")
-            
-            # 3. 场景检测
-            step_start = time.time()
-            logger.info(f"🔍 [探针] 步骤3: 开始场景检测")
-            shot_table = self._detect_scenes(video_path)
-            logger.info(f"🔍 [探针] 步骤3完成: 场景检测成功, 耗时 {time.time() - step_start:.2f}秒, 场景数={len(shot_table)}")
+            logger.info(f"🔍 [探针] 步骤2-4完成: 场景数={len(shot_table)}, 文本长度={len(transcript_text)}, 各阶段耗时={stage_timings}")
             if shot_table:
                 logger.debug(f"🔍 [探针] 前3个场景: {shot_table[:3]}")
-            
-            # 4. 语音转录
-            step_start = time.time()
-            logger.info(f"🔍 [探针] 步骤4: 开始语音转录")
-            transcript_result = await self._transcribe_audio(video_path)
-            transcript_text = transcript_result.get("text", "")
-            logger.info(f"🔍 [探针] 步骤4完成: 语音转录成功, 耗时 {time.time() - step_start:.2f}秒, 文本长度={len(transcript_text)}")
             if transcript_text:
                 logger.debug(f"🔍 [探针] 转录文本预览: {transcript_text[:200]}...")
             
-            # 5. 提取关键帧（可选，数据量大）
+            # 5. 提取关键帧（可选，数据量大，依赖场景检测结果）
             key_frames = []
             if extract_key_frames:
-                step_start = time.time()
                 logger.info(f"🔍 [探针] 步骤5: 开始提取关键帧")
-                key_frames = self._extract_key_frames(video_path, shot_table)
-                logger.info(f"🔍 [探针] 步骤5完成: 关键帧提取成功, 耗时 {time.time() - step_start:.2f}秒, 关键帧数={len(key_frames)}")
+                key_frames = await self._run_stage(
+                    "key_frames",
+                    self._run_blocking(self._extract_key_frames, video_path, shot_table),
+                    stage_timeouts,
+                    [],
+                    stage_timings,
+                    stage_status
+                )
+                logger.info(f"🔍 [探针] 步骤5完成: 关键帧提取成功, 耗时 {stage_timings['key_frames']:.2f}秒, 关键帧数={len(key_frames)}")
             else:
                 logger.info(f"🔍 [探针] 步骤5: 跳过关键帧提取（extract_key_frames=False）")
             
@@ -408,7 +417,9 @@ class LocalVideoAnalyzer:
                 "segments": transcript_result.get("segments", []),
                 "language": transcript_result.get("language", "zh"),
                 "key_frames": key_frames if extract_key_frames else [],
-                "video_info": video_info
+                "video_info": video_info,
+                "stage_timings": stage_timings,  # 各阶段耗时（秒）
+                "stage_status": stage_status  # 各阶段状态：ok / timeout / error
             }
             total_time = time.time() - start_time
             logger.info(f"🔍 [探针] 步骤6完成: 结果构建成功, 耗时 {time.time() - step_start:.4f}秒")
@@ -424,17 +435,46 @@ class LocalVideoAnalyzer:
             logger.error(f"❌ [探针] 错误堆栈:\n{traceback.format_exc()}")
             raise
         finally:
-            # 清理临时文件
-            # 注意：视频文件存储在本地临时目录（tempfile.mkdtemp），不在数据库中
-            # 临时目录路径：self.temp_dir（例如：/tmp/video_analyzer_xxxxx）
-            # 分析完成后自动删除临时视频文件，节省磁盘空间
-            if download_video and video_path and os.path.exists(video_path):
-                try:
-                    logger.debug(f"🔍 [探针] 清理临时视频文件: {video_path}")
-                    os.remove(video_path)
-                    logger.debug(f"✅ [探针] 临时视频文件已删除: {video_path}")
-                except Exception as e:
-                    logger.warning(f"⚠️  [探针] 删除临时视频文件失败: {e}")
+            # 下载的视频保存在本地视频缓存（VIDEO_CACHE_DIR）中，不在这里删除：
+            # 同一视频的后续分析直接复用，缓存按总大小LRU淘汰；分析结束后解除pin，允许淘汰
+            if download_video and video_path:
+                get_video_cache().unpin(video_path)
+    
+    async def _run_blocking(self, func, *args):
+        """在阶段线程池中运行同步的分析步骤"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_stage_executor(), func, *args)
+    
+    async def _run_stage(
+        self,
+        name: str,
+        coro,
+        stage_timeouts: Dict[str, float],
+        default: Any,
+        stage_timings: Dict[str, float],
+        stage_status: Dict[str, str]
+    ) -> Any:
+        """执行一个分析阶段，记录耗时；超时或失败时返回默认值，不影响其他阶段
+        
+        注意：线程池中的同步步骤超时后仍会在后台执行完，只是结果被丢弃
+        """
+        import time
+        step_start = time.time()
+        timeout = stage_timeouts.get(name)
+        try:
+            result = await asyncio.wait_for(coro, timeout=timeout)
+            stage_status[name] = "ok"
+            return result
+        except asyncio.TimeoutError:
+            logger.warning(f"⚠️  [探针] 阶段 {name} 超时（{timeout}秒），使用默认结果")
+            stage_status[name] = "timeout"
+            return default
+        except Exception as e:
+            logger.error(f"❌ [探针] 阶段 {name} 失败: {e}")
+            stage_status[name] = "error"
+            return default
+        finally:
+            stage_timings[name] = round(time.time() - step_start, 3)
     
     def cleanup(self):
         """清理临时文件"""
@@ -0,0 +1,350 @@
+"""
+视频下载与本地磁盘缓存
+流式下载到磁盘（不在内存中缓冲整个视频），支持大小上限、断点续传（Range请求），
+按URL哈希寻址缓存文件，按总字节数LRU淘汰
+"""
+import asyncio
+import hashlib
+import os
+import threading
+import time
+import weakref
+from pathlib import Path
+from typing import IO, Dict, List, Optional
+
+import httpx
+from loguru import logger
+
+from app.core.config import settings
+from app.utils.http_client import get_http_client
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:  # Windows
+    FCNTL_AVAILABLE = False
+
+
+class VideoTooLargeError(ValueError):
+    """视频超过下载大小上限"""
+
+
+class VideoCache:
+    """视频磁盘缓存
+
+    缓存文件路径为 {cache_dir}/{sha256(url)[:2]}/{sha256(url)}{扩展名}，
+    下载中的文件以.part结尾，下载完成后原子重命名；从视频提取的音频（同名.wav）
+    计入所属视频的大小，随视频一起淘汰。
+    每次命中会更新文件mtime，淘汰时按mtime从旧到新删除，直到总大小不超过上限；
+    正在使用的视频（acquire/pin后未unpin，跨进程通过共享flock标记）不会被删除。
+    """
+
+    PART_SUFFIX = ".part"
+    AUDIO_SUFFIX = ".wav"
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+        max_file_bytes: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+        max_resumes: Optional[int] = None,
+    ):
+        """
+        Args:
+            cache_dir: 缓存目录，None时使用VIDEO_CACHE_DIR
+            max_bytes: 缓存总大小上限（字节），None时使用VIDEO_CACHE_MAX_BYTES
+            max_file_bytes: 单个视频大小上限（字节），None时使用VIDEO_DOWNLOAD_MAX_BYTES
+            chunk_size: 流式写入的块大小（字节），None时使用VIDEO_DOWNLOAD_CHUNK_SIZE
+            max_resumes: 下载中断后断点续传的最大次数，None时使用VIDEO_DOWNLOAD_MAX_RESUMES
+        """
+        self.cache_dir = Path(cache_dir or settings.VIDEO_CACHE_DIR)
+        self.max_bytes = settings.VIDEO_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        self.max_file_bytes = settings.VIDEO_DOWNLOAD_MAX_BYTES if max_file_bytes is None else max_file_bytes
+        self.chunk_size = chunk_size or settings.VIDEO_DOWNLOAD_CHUNK_SIZE
+        self.max_resumes = settings.VIDEO_DOWNLOAD_MAX_RESUMES if max_resumes is None else max_resumes
+        # {事件循环: {缓存key: asyncio.Lock}}，同一进程内同一URL只下载一次
+        self._locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Lock]]" = weakref.WeakKeyDictionary()
+        self._locks_guard = threading.Lock()
+        # {文件路径: [持有共享flock的文件对象]}，本进程正在使用的视频（引用计数）
+        self._pins: Dict[str, List[IO[bytes]]] = {}
+        self._pins_guard = threading.Lock()
+
+    @staticmethod
+    def cache_key(video_url: str) -> str:
+        """URL的缓存key（sha256）"""
+        return hashlib.sha256(video_url.strip().encode("utf-8")).hexdigest()
+
+    def _path_for(self, video_url: str) -> Path:
+        key = self.cache_key(video_url)
+        ext = os.path.splitext(video_url.split("?")[0])[1].lower()
+        if not ext or len(ext) > 5:
+            ext = ".mp4"
+        return self.cache_dir / key[:2] / f"{key}{ext}"
+
+    def _get_lock(self, key: str) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        with self._locks_guard:
+            loop_locks = self._locks.setdefault(loop, {})
+            lock = loop_locks.get(key)
+            if lock is None:
+                lock = asyncio.Lock()
+                loop_locks[key] = lock
+            return lock
+
+    def get(self, video_url: str) -> Optional[str]:
+        """获取已缓存的视频路径（命中时更新LRU时间），未缓存返回None"""
+        path = self._path_for(video_url)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return str(path)
+
+    async def get_or_download(self, video_url: str) -> str:
+        """获取视频本地路径，未缓存时流式下载
+
+        Raises:
+            VideoTooLargeError: 视频超过大小上限
+            httpx.HTTPError: 下载失败
+        """
+        cached = self.get(video_url)
+        if cached:
+            logger.debug(f"视频缓存命中: {video_url[:100]}")
+            return cached
+
+        path = self._path_for(video_url)
+        async with self._get_lock(path.name):
+            cached = self.get(video_url)
+            if cached:
+                return cached
+
+            path.parent.mkdir(parents=True, exist_ok=True)
+            part_path = path.with_name(path.name + self.PART_SUFFIX)
+            with open(part_path, "ab") as part_file:
+                # 其他进程正在下载同一个视频时等待其完成
+                await self._acquire_file_lock(part_file)
+                try:
+                    cached = self.get(video_url)
+                    if cached:
+                        return cached
+                    await self._download_to(video_url, part_file)
+                    os.replace(part_path, path)
+                finally:
+                    if FCNTL_AVAILABLE:
+                        fcntl.flock(part_file, fcntl.LOCK_UN)
+
+        self.evict(keep=path)
+        return str(path)
+
+    async def acquire(self, video_url: str, attempts: int = 3) -> str:
+        """获取视频本地路径（未缓存时下载）并标记为正在使用，用完后调用unpin
+
+        下载完成到加锁之间视频可能被其他进程淘汰，此时重新下载
+
+        Raises:
+            VideoTooLargeError: 视频超过大小上限
+            httpx.HTTPError: 下载失败
+        """
+        for _ in range(attempts):
+            path = await self.get_or_download(video_url)
+            if self.pin(path):
+                return path
+        raise FileNotFoundError(f"视频缓存文件被淘汰: {video_url[:100]}")
+
+    def pin(self, path: str) -> bool:
+        """标记视频正在使用（进程内引用计数 + 跨进程共享flock），淘汰时跳过
+
+        Returns:
+            文件已被删除时返回False
+        """
+        try:
+            handle = open(path, "rb")
+        except FileNotFoundError:
+            return False
+        if FCNTL_AVAILABLE:
+            fcntl.flock(handle, fcntl.LOCK_SH)
+            # 打开后、加锁前文件可能已被其他进程淘汰（持有的是已删除的文件）
+            try:
+                if os.stat(path).st_ino != os.fstat(handle.fileno()).st_ino:
+                    raise FileNotFoundError(path)
+            except FileNotFoundError:
+                handle.close()
+                return False
+        with self._pins_guard:
+            self._pins.setdefault(str(path), []).append(handle)
+        return True
+
+    def unpin(self, path: str):
+        """释放一次pin（关闭文件即释放共享flock）"""
+        with self._pins_guard:
+            handles = self._pins.get(str(path))
+            if not handles:
+                return
+            handle = handles.pop()
+            if not handles:
+                del self._pins[str(path)]
+        handle.close()
+
+    def _audio_path(self, path: Path) -> Path:
+        return path.with_suffix(self.AUDIO_SUFFIX)
+
+    def _try_remove(self, path: Path) -> bool:
+        """删除未被使用的视频及其提取的音频，正在使用时返回False"""
+        with self._pins_guard:
+            if self._pins.get(str(path)):
+                return False
+        try:
+            handle = open(path, "rb")
+        except FileNotFoundError:
+            return False
+        with handle:
+            if FCNTL_AVAILABLE:
+                try:
+                    fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    return False
+            path.unlink()
+        try:
+            self._audio_path(path).unlink()
+        except FileNotFoundError:
+            pass
+        return True
+
+    async def _acquire_file_lock(self, part_file, poll_interval: float = 0.5):
+        """非阻塞地获取.part文件的排他锁（跨进程）"""
+        if not FCNTL_AVAILABLE:
+            return
+        while True:
+            try:
+                fcntl.flock(part_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return
+            except BlockingIOError:
+                await asyncio.sleep(poll_interval)
+
+    async def _download_to(self, video_url: str, part_file):
+        """流式下载到.part文件，已有部分内容时用Range请求续传"""
+        client = get_http_client(
+            "video_download",
+            timeout=settings.VIDEO_DOWNLOAD_READ_TIMEOUT,
+            follow_redirects=True
+        )
+        resumes = 0
+        while True:
+            offset = part_file.seek(0, os.SEEK_END)
+            headers = {"Range": f"bytes={offset}-"} if offset else {}
+            try:
+                async with client.stream("GET", video_url, headers=headers) as response:
+                    if response.status_code == 416 and offset:
+                        # 服务器不接受该范围（文件已变化），从头下载
+                        part_file.truncate(0)
+                        continue
+                    response.raise_for_status()
+
+                    if offset and response.status_code != 206:
+                        # 服务器不支持Range，从头下载
+                        part_file.seek(0)
+                        part_file.truncate(0)
+                        offset = 0
+
+                    content_length = response.headers.get("content-length")
+                    if content_length and offset + int(content_length) > self.max_file_bytes:
+                        raise VideoTooLargeError(
+                            f"视频大小 {offset + int(content_length)} 字节超过上限 {self.max_file_bytes} 字节"
+                        )
+
+                    written = offset
+                    async for chunk in response.aiter_bytes(self.chunk_size):
+                        written += len(chunk)
+                        if written > self.max_file_bytes:
+                            raise VideoTooLargeError(f"视频大小超过上限 {self.max_file_bytes} 字节")
+                        part_file.write(chunk)
+                    part_file.flush()
+                    return
+            except VideoTooLargeError:
+                part_file.truncate(0)
+                raise
+            except httpx.TransportError as e:
+                part_file.flush()
+                if resumes >= self.max_resumes:
+                    raise
+                resumes += 1
+                logger.warning(
+                    f"视频下载中断（已下载 {part_file.tell()} 字节）: {e}，断点续传 ({resumes}/{self.max_resumes})"
+                )
+
+    def total_bytes(self) -> int:
+        """缓存中已完成文件（视频及其音频）的总大小"""
+        return sum(size for _, size, _ in self._iter_files())
+
+    def _iter_files(self):
+        """遍历已完成的视频文件：(路径, 视频+音频大小, mtime)，音频和临时文件不单独列出"""
+        if not self.cache_dir.exists():
+            return
+        for path in self.cache_dir.glob("*/*"):
+            if path.name.endswith(self.PART_SUFFIX) or path.name.endswith(self.AUDIO_SUFFIX):
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            size = stat.st_size
+            try:
+                size += self._audio_path(path).stat().st_size
+            except FileNotFoundError:
+                pass
+            yield path, size, stat.st_mtime
+
+    def evict(self, keep: Optional[Path] = None) -> int:
+        """按LRU删除缓存文件，直到总大小不超过上限
+
+        Args:
+            keep: 不删除的文件（刚下载完成的视频）；pin住的视频同样跳过
+
+        Returns:
+            删除的文件数
+        """
+        self.cleanup_stale_parts()
+        files = sorted(self._iter_files(), key=lambda item: item[2])
+        total = sum(size for _, size, _ in files)
+        removed = 0
+        for path, size, _ in files:
+            if total <= self.max_bytes:
+                break
+            if keep is not None and path == keep:
+                continue
+            if self._try_remove(path):
+                total -= size
+                removed += 1
+        if removed:
+            logger.info(f"视频缓存淘汰 {removed} 个文件，当前大小 {total} 字节")
+        return removed
+
+    def cleanup_stale_parts(self, max_age: float = 86400) -> int:
+        """删除长时间未完成的.part文件"""
+        if not self.cache_dir.exists():
+            return 0
+        removed = 0
+        now = time.time()
+        for path in self.cache_dir.glob(f"*/*{self.PART_SUFFIX}"):
+            try:
+                if now - path.stat().st_mtime > max_age:
+                    path.unlink()
+                    removed += 1
+            except FileNotFoundError:
+                continue
+        return removed
+
+
+_video_cache: Optional[VideoCache] = None
+_video_cache_lock = threading.Lock()
+
+
+def get_video_cache() -> VideoCache:
+    """获取进程级视频缓存单例"""
+    global _video_cache
+    if _video_cache is None:
+        with _video_cache_lock:
+            if _video_cache is None:
+                _video_cache = VideoCache()
+    return _video_cache
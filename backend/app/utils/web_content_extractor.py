@@ -1,18 +1,108 @@
 """
 网页内容提取工具
 使用 Trafilatura 提取网页的主要内容和元数据
+下载走共享异步连接池，解析放到线程池执行，不阻塞事件循环；提取结果按URL缓存
 """
-from typing import Dict, Any, Optional
+import asyncio
+import hashlib
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, Union
 from loguru import logger
 
+from app.core.config import settings
+from app.utils.cache import LayeredCache
+from app.utils.http_client import get_http_client
+
 try:
-    from trafilatura import fetch_url, extract, extract_metadata
+    from trafilatura import extract, extract_metadata
     TRAFILATURA_AVAILABLE = True
 except ImportError:
     TRAFILATURA_AVAILABLE = False
     logger.warning("Trafilatura未安装，网页内容提取功能将不可用。请运行: pip install trafilatura")
 
 
+# 进程级提取结果缓存（按URL），所有WebContentExtractor实例共享
+_extract_cache = LayeredCache(
+    "web_extract",
+    ttl=settings.WEB_EXTRACT_CACHE_TTL,
+    max_local_entries=settings.WEB_EXTRACT_CACHE_MAX_LOCAL
+)
+
+# HTML解析线程池（lxml解析时释放GIL）
+_parse_executor: Optional[ThreadPoolExecutor] = None
+_parse_executor_lock = threading.Lock()
+
+# {事件循环: asyncio.Semaphore}，限制同时进行的下载+解析数量
+_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+_semaphores_lock = threading.Lock()
+
+_REQUEST_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+}
+
+
+def _get_parse_executor() -> ThreadPoolExecutor:
+    global _parse_executor
+    if _parse_executor is None:
+        with _parse_executor_lock:
+            if _parse_executor is None:
+                _parse_executor = ThreadPoolExecutor(
+                    max_workers=settings.WEB_EXTRACT_PARSE_WORKERS,
+                    thread_name_prefix="web_extract"
+                )
+    return _parse_executor
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    with _semaphores_lock:
+        semaphore = _semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(settings.WEB_EXTRACT_CONCURRENCY)
+            _semaphores[loop] = semaphore
+        return semaphore
+
+
+def _empty_result() -> Dict[str, Any]:
+    return {
+        "content": "",
+        "metadata": {}
+    }
+
+
+def _parse_html(html: Union[str, bytes], url: Optional[str], include_metadata: bool) -> Dict[str, Any]:
+    """解析HTML，提取主要内容和元数据（同步，在线程池中执行）
+
+    html为原始字节时由trafilatura按<meta charset>和内容检测编码（很多中文站点只在页面内声明GBK）
+    """
+    main_content = extract(html)
+
+    result = {
+        "content": main_content or "",
+        "metadata": {}
+    }
+
+    # 提取元数据（如果需要）
+    if include_metadata:
+        try:
+            metadata = extract_metadata(html)
+            if metadata:
+                result["metadata"] = {
+                    "title": metadata.title or "",
+                    "author": metadata.author or "",
+                    "date": metadata.date or "",
+                    "description": metadata.description or "",
+                    "url": url or ""
+                }
+        except Exception as e:
+            logger.warning(f"提取元数据失败: {e}")
+
+    return result
+
+
 class WebContentExtractor:
     """网页内容提取器 - 使用 Trafilatura 提取网页主要内容"""
     
@@ -22,6 +112,53 @@ class WebContentExtractor:
             self.available = False
         else:
             self.available = True
+        self.cache = _extract_cache
+    
+    @staticmethod
+    def _cache_key(url: str, include_metadata: bool) -> str:
+        return hashlib.sha256(f"{int(include_metadata)}:{url.strip()}".encode("utf-8")).hexdigest()
+    
+    async def _fetch_html(self, url: str, timeout: int) -> Optional[bytes]:
+        """通过共享连接池流式下载网页，超过 WEB_EXTRACT_MAX_BYTES 时立即停止读取
+
+        返回原始字节，不按响应头解码：httpx只识别Content-Type中的charset，
+        编码交给trafilatura检测
+        """
+        max_bytes = settings.WEB_EXTRACT_MAX_BYTES
+        async with get_http_client(
+            "web_extract",
+            timeout=float(timeout),
+            headers=_REQUEST_HEADERS,
+            follow_redirects=True
+        ) as client:
+            async with client.stream("GET", url) as response:
+                if response.status_code != 200:
+                    logger.warning(f"下载网页失败: {url[:100]}, 状态码={response.status_code}")
+                    return None
+                
+                content_length = response.headers.get("content-length")
+                if content_length and content_length.isdigit() and int(content_length) > max_bytes:
+                    logger.warning(f"网页过大，跳过提取: {url[:100]}, Content-Length={content_length}")
+                    return None
+                
+                body = bytearray()
+                async for chunk in response.aiter_bytes():
+                    body.extend(chunk)
+                    if len(body) > max_bytes:
+                        logger.warning(f"网页过大，跳过提取: {url[:100]}, 已读取={len(body)}")
+                        return None
+                return bytes(body)
+    
+    async def _parse(self, html: Union[str, bytes], url: Optional[str], include_metadata: bool) -> Dict[str, Any]:
+        """在线程池中解析HTML"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            _get_parse_executor(),
+            _parse_html,
+            html,
+            url,
+            include_metadata
+        )
     
     async def extract_from_url(
         self,
@@ -36,7 +173,7 @@ class WebContentExtractor:
             url: 网页URL
             include_metadata: 是否包含元数据（标题、作者、日期等）
             timeout: 请求超时时间（秒）
-            
+        
         Returns:
             包含以下字段的字典：
                 - content: 主要内容文本
@@ -49,57 +186,35 @@ class WebContentExtractor:
         """
         if not self.available:
             logger.warning("Trafilatura未安装，无法提取网页内容")
-            return {
-                "content": "",
-                "metadata": {}
-            }
+            return _empty_result()
+        
+        cache_key = self._cache_key(url, include_metadata)
+        cached = await self.cache.aget(cache_key)
+        if cached is not None:
+            logger.debug(f"网页内容命中缓存: {url[:100]}")
+            return cached
         
         try:
-            logger.info(f"开始提取网页内容: {url[:100]}")
-            
-            # 使用Trafilatura下载并提取内容
-            # fetch_url会自动处理下载，extract会提取主要内容
-            downloaded = fetch_url(url, timeout=timeout)
-            
-            if not downloaded:
-                logger.warning(f"无法下载网页内容: {url}")
-                return {
-                    "content": "",
-                    "metadata": {}
-                }
-            
-            # 提取主要内容
-            main_content = extract(downloaded)
+            async with _get_semaphore():
+                logger.info(f"开始提取网页内容: {url[:100]}")
+                
+                downloaded = await self._fetch_html(url, timeout)
+                if not downloaded:
+                    logger.warning(f"无法下载网页内容: {url}")
+                    return _empty_result()
+                
+                result = await self._parse(downloaded, url, include_metadata)
             
-            result = {
-                "content": main_content or "",
-                "metadata": {}
-            }
-            
-            # 提取元数据（如果需要）
-            if include_metadata:
-                try:
-                    metadata = extract_metadata(downloaded)
-                    if metadata:
-                        result["metadata"] = {
-                            "title": metadata.get("title", ""),
-                            "author": metadata.get("author", ""),
-                            "date": metadata.get("date", ""),
-                            "description": metadata.get("description", ""),
-                            "url": url
-                        }
-                except Exception as e:
-                    logger.warning(f"提取元数据失败: {e}")
+            # 只缓存提取到内容的结果，失败的URL下次重试
+            if result["content"]:
+                await self.cache.aset(cache_key, result)
             
             logger.info(f"成功提取网页内容: {url[:100]}, 内容长度={len(result['content'])}")
             return result
-            
+        
         except Exception as e:
             logger.error(f"提取网页内容失败: {url[:100]}, 错误: {e}")
-            return {
-                "content": "",
-                "metadata": {}
-            }
+            return _empty_result()
     
     async def extract_from_html(
         self,
@@ -114,7 +229,7 @@ class WebContentExtractor:
             html: HTML字符串
             url: 原始URL（可选，用于元数据）
             include_metadata: 是否包含元数据
-            
+        
         Returns:
             包含以下字段的字典：
                 - content: 主要内容文本
@@ -122,44 +237,17 @@ class WebContentExtractor:
         """
         if not self.available:
             logger.warning("Trafilatura未安装，无法提取网页内容")
-            return {
-                "content": "",
-                "metadata": {}
-            }
+            return _empty_result()
         
         try:
             logger.info(f"开始从HTML提取内容, HTML长度={len(html)}")
             
-            # 提取主要内容
-            main_content = extract(html)
-            
-            result = {
-                "content": main_content or "",
-                "metadata": {}
-            }
-            
-            # 提取元数据（如果需要）
-            if include_metadata:
-                try:
-                    metadata = extract_metadata(html)
-                    if metadata:
-                        result["metadata"] = {
-                            "title": metadata.get("title", ""),
-                            "author": metadata.get("author", ""),
-                            "date": metadata.get("date", ""),
-                            "description": metadata.get("description", ""),
-                            "url": url or ""
-                        }
-                except Exception as e:
-                    logger.warning(f"提取元数据失败: {e}")
+            async with _get_semaphore():
+                result = await self._parse(html, url, include_metadata)
             
             logger.info(f"成功从HTML提取内容, 内容长度={len(result['content'])}")
             return result
-            
+        
         except Exception as e:
             logger.error(f"从HTML提取内容失败: {e}")
-            return {
-                "content": "",
-                "metadata": {}
-            }
-
+            return _empty_result()
@@ -0,0 +1,25 @@
+"""add room_scores_refreshed_at to live_rooms
+
+Revision ID: b7d3e9f2a614
+Revises: 8e4b2f6a1c37
+Create Date: 2025-11-27 10:12:45.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7d3e9f2a614'
+down_revision = '8e4b2f6a1c37'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 直播间最近一次全量计算热点匹配度的时间
+    op.add_column('live_rooms', sa.Column('room_scores_refreshed_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('live_rooms', 'room_scores_refreshed_at')
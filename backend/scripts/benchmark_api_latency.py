@@ -0,0 +1,147 @@
+"""
+API延迟压测脚本
+对运行中的服务并发请求若干只读接口，统计各接口的p50/p95/p99延迟和吞吐，
+用于对比同步数据库访问放到线程池前后事件循环的阻塞情况
+
+默认逐个接口压测；--mixed 时所有接口的请求交错并发打到同一个worker，
+慢接口阻塞事件循环时会拖高其他接口的延迟，更接近线上的混合流量
+
+用法:
+    python scripts/benchmark_api_latency.py --base-url http://localhost:8000 --concurrency 50 --requests 500
+    python scripts/benchmark_api_latency.py --mixed --concurrency 50 --requests 500
+"""
+import sys
+import os
+import argparse
+import asyncio
+import math
+import time
+from typing import Dict, List
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from app.core.config import settings
+
+# 默认压测的接口（相对API前缀）
+DEFAULT_ENDPOINTS = [
+    "/hotspots/?limit=20",
+    "/hotspots/visualization",
+    "/live-rooms/",
+    "/products/",
+    "/scripts/",
+    "/analysis/reports",
+]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """计算百分位数（最近秩法）"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> Dict[str, float]:
+    """汇总延迟统计（毫秒）"""
+    return {
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "max": max(latencies) if latencies else 0.0,
+        "rps": len(latencies) / elapsed if elapsed > 0 else 0.0,
+        "errors": errors,
+    }
+
+
+async def run_requests(
+    client: httpx.AsyncClient,
+    paths: List[str],
+    concurrency: int
+) -> Dict[str, Dict[str, float]]:
+    """按给定顺序并发发出请求（最多concurrency个同时进行），返回每个接口的延迟统计"""
+    latencies: Dict[str, List[float]] = {path: [] for path in paths}
+    errors: Dict[str, int] = {path: 0 for path in paths}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one_request(path: str):
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                response = await client.get(path)
+                if response.status_code >= 400:
+                    errors[path] += 1
+            except httpx.HTTPError:
+                errors[path] += 1
+            latencies[path].append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one_request(path) for path in paths))
+    elapsed = time.perf_counter() - start
+
+    stats = {path: summarize(latencies[path], errors[path], elapsed) for path in latencies}
+    stats["全部"] = summarize(
+        [value for values in latencies.values() for value in values],
+        sum(errors.values()),
+        elapsed
+    )
+    return stats
+
+
+async def benchmark_endpoint(
+    client: httpx.AsyncClient,
+    path: str,
+    concurrency: int,
+    total_requests: int
+) -> Dict[str, float]:
+    """并发请求单个接口，返回延迟统计（毫秒）"""
+    return (await run_requests(client, [path] * total_requests, concurrency))[path]
+
+
+async def benchmark_mixed(
+    client: httpx.AsyncClient,
+    endpoints: List[str],
+    concurrency: int,
+    total_requests: int
+) -> Dict[str, Dict[str, float]]:
+    """所有接口交错并发请求（每个接口total_requests次），返回每个接口及整体的延迟统计"""
+    paths = [endpoints[i % len(endpoints)] for i in range(total_requests * len(endpoints))]
+    return await run_requests(client, paths, concurrency)
+
+
+def print_row(path: str, stats: Dict[str, float]):
+    print(
+        f"{path:<32}{stats['p50']:>10.1f}{stats['p95']:>10.1f}{stats['p99']:>10.1f}"
+        f"{stats['max']:>10.1f}{stats['rps']:>10.1f}{stats['errors']:>8}"
+    )
+
+
+async def main(args):
+    base_url = args.base_url.rstrip("/") + settings.API_V1_PREFIX
+    endpoints = args.endpoints or DEFAULT_ENDPOINTS
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+    mode = "混合并发" if args.mixed else "逐个接口"
+    print(f"压测目标: {base_url}, 模式={mode}, 并发={args.concurrency}, 每个接口请求数={args.requests}")
+    print(f"{'接口':<32}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}{'max(ms)':>10}{'rps':>10}{'错误':>8}")
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+        if args.mixed:
+            for path, stats in (await benchmark_mixed(client, endpoints, args.concurrency, args.requests)).items():
+                print_row(path, stats)
+            return
+        for path in endpoints:
+            print_row(path, await benchmark_endpoint(client, path, args.concurrency, args.requests))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="API延迟压测（p50/p95/p99）")
+    parser.add_argument("--base-url", default="http://localhost:8000", help="服务地址")
+    parser.add_argument("--concurrency", type=int, default=50, help="并发请求数")
+    parser.add_argument("--requests", type=int, default=500, help="每个接口的请求总数")
+    parser.add_argument("--timeout", type=float, default=30.0, help="单个请求超时（秒）")
+    parser.add_argument("--endpoints", nargs="*", help="要压测的接口路径（相对API前缀），默认压测常用只读接口")
+    parser.add_argument("--mixed", action="store_true", help="所有接口交错并发请求同一服务（混合流量下的尾延迟）")
+    asyncio.run(main(parser.parse_args()))
@@ -1,17 +1,28 @@
 #!/bin/bash
 # 启动Celery Worker
+# 用法：
+#   ./start_celery.sh             默认worker，消费 celery 和 enrichment 队列
+#   ./start_celery.sh enrichment  只消费热点内容增强队列（可在多台机器上启动以横向扩展）
 
-echo "启动Celery Worker..."
+MODE=${1:-default}
+
+echo "启动Celery Worker（$MODE）..."
 
 # 激活虚拟环境
 source venv/bin/activate
 
+if [[ "$MODE" == "enrichment" ]]; then
+    # 增强任务耗时长，每次只预取一个，保证按优先级消费
+    QUEUE_ARGS="-Q enrichment --prefetch-multiplier=1 -n enrichment@%h"
+else
+    QUEUE_ARGS="-Q celery,enrichment"
+fi
+
 # 启动Celery Worker
 # macOS 上使用 --pool=solo 避免 fork 问题
 # 在 macOS 上，fork() 与 Objective-C 运行时冲突会导致 SIGABRT
 if [[ "$OSTYPE" == "darwin"* ]]; then
-    celery -A app.celery_app worker --loglevel=info --pool=solo
+    celery -A app.celery_app worker --loglevel=info --pool=solo $QUEUE_ARGS
 else
-    celery -A app.celery_app worker --loglevel=info
+    celery -A app.celery_app worker --loglevel=info $QUEUE_ARGS
 fi
-
@@ -0,0 +1,82 @@
+"""
+视频拆解API端点测试
+"""
+import uuid
+from datetime import datetime
+from unittest.mock import patch
+
+from app.core.config import settings
+from app.models.analysis import AnalysisReport
+
+
+class TestAnalysisAPI:
+    """视频拆解API测试"""
+    
+    def test_batch_analyze_dedup(self, client, db_session):
+        """测试批量分析：批次内去重，已有报告直接复用，只分发剩余URL"""
+        report = AnalysisReport(
+            id=str(uuid.uuid4()),
+            video_url="https://test.com/done",
+            created_at=datetime.now(),
+            updated_at=datetime.now()
+        )
+        db_session.add(report)
+        db_session.commit()
+        
+        urls = ["https://test.com/done", "https://test.com/new", "https://test.com/new", " https://test.com/other "]
+        with patch("app.services.analysis.tasks.analyze_video_batch_async.delay") as mock_task:
+            mock_task.return_value.id = "batch-task-id"
+            response = client.post("/api/v1/analysis/batch", json=urls)
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["task_id"] == "batch-task-id"
+        assert data["total"] == 3
+        assert data["pending"] == 2
+        assert data["reused"] == [{"video_url": "https://test.com/done", "report_id": report.id}]
+        pending_urls, _, reused = mock_task.call_args[0]
+        assert pending_urls == ["https://test.com/new", "https://test.com/other"]
+        assert reused == {"https://test.com/done": report.id}
+        
+        # force=true时全部重新分析
+        with patch("app.services.analysis.tasks.analyze_video_batch_async.delay") as mock_task:
+            mock_task.return_value.id = "batch-task-id"
+            response = client.post("/api/v1/analysis/batch?force=true", json=urls)
+        assert response.json()["pending"] == 3
+    
+    def test_batch_analyze_limit(self, client):
+        """测试批量分析URL数量上限"""
+        urls = [f"https://test.com/{i}" for i in range(settings.ANALYSIS_BATCH_MAX_URLS + 1)]
+        response = client.post("/api/v1/analysis/batch", json=urls)
+        assert response.status_code == 400
+    
+    def test_batch_progress(self, client):
+        """测试批量分析进度汇总每个URL的状态"""
+        from types import SimpleNamespace
+        
+        results = {
+            "batch": SimpleNamespace(state="SUCCESS", info=None, result={
+                "items": [
+                    {"video_url": "https://test.com/a", "task_id": "a"},
+                    {"video_url": "https://test.com/b", "task_id": "b"},
+                    {"video_url": "https://test.com/c", "task_id": "c"},
+                ],
+                "reused": [{"video_url": "https://test.com/done", "report_id": "r0"}]
+            }),
+            "a": SimpleNamespace(state="SUCCESS", info=None, result={"status": "success", "report_id": "r1"}),
+            "b": SimpleNamespace(state="SUCCESS", info=None, result={"status": "error", "message": "下载失败"}),
+            "c": SimpleNamespace(state="PROGRESS", info={"status": "正在分析视频内容..."}, result=None),
+        }
+        with patch("celery.result.AsyncResult", side_effect=lambda task_id, app=None: results[task_id]):
+            response = client.get("/api/v1/analysis/batch/batch")
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["state"] == "PROGRESS"
+        assert data["current"] == 3
+        assert data["total"] == 4
+        assert data["counts"] == {"success": 2, "error": 1, "running": 1, "pending": 0}
+        by_url = {item["video_url"]: item for item in data["items"]}
+        assert by_url["https://test.com/a"]["report_id"] == "r1"
+        assert by_url["https://test.com/b"]["error"] == "下载失败"
+        assert by_url["https://test.com/c"]["status"] == "正在分析视频内容..."
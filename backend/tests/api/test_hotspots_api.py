@@ -132,3 +132,101 @@ class TestHotspotsAPI:
         assert "filtered_count" in data
         assert "items" in data
 
+    
+    def test_semantic_rank_requires_target(self, client):
+        """测试语义检索必须指定直播间或商品"""
+        response = client.get("/api/v1/hotspots/semantic-rank")
+        assert response.status_code == 400
+    
+    def test_semantic_rank_with_index(self, client, db_session, sample_live_room_id, tmp_path):
+        """测试基于向量索引的语义检索"""
+        from unittest.mock import AsyncMock
+        from app.services.hotspot.vector_index import HotspotVectorIndex
+        
+        for i, vector in enumerate([[1.0, 0.0], [0.0, 1.0]]):
+            db_session.add(Hotspot(
+                id=f"rank-{i}",
+                title=f"语义热点{i}",
+                url=f"https://example.com/rank/{i}",
+                platform="douyin",
+                created_at=datetime.now(),
+                updated_at=datetime.now()
+            ))
+        db_session.commit()
+        
+        index = HotspotVectorIndex(index_dir=str(tmp_path / "index"))
+        index.add([("rank-0", [1.0, 0.0], {}), ("rank-1", [0.0, 1.0], {})])
+        
+        with patch("app.services.hotspot.vector_index.get_hotspot_vector_index", return_value=index), \
+             patch("app.utils.embedding.EmbeddingClient.get_embedding", new_callable=AsyncMock, return_value=[0.0, 1.0]):
+            response = client.get(f"/api/v1/hotspots/semantic-rank?live_room_id={sample_live_room_id}&k=2")
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert [item["id"] for item in data["items"]] == ["rank-1", "rank-0"]
+        assert data["items"][0]["similarity"] == pytest.approx(1.0)
+    
+    def test_semantic_rank_model_mismatch(self, client, sample_live_room_id, tmp_path):
+        """测试索引的embedding模型与当前配置不一致（切换后端后未重建）时返回503"""
+        from app.services.hotspot.vector_index import HotspotVectorIndex
+        
+        index = HotspotVectorIndex(index_dir=str(tmp_path / "index"))
+        index.add([("rank-0", [1.0, 0.0], {})], model="other-model")
+        
+        with patch("app.services.hotspot.vector_index.get_hotspot_vector_index", return_value=index):
+            response = client.get(f"/api/v1/hotspots/semantic-rank?live_room_id={sample_live_room_id}&k=2")
+        
+        assert response.status_code == 503
+    
+    def test_get_hotspots_visualization(self, client, db_session, sample_live_room_id):
+        """测试可视化接口按预计算匹配度返回直播间的Top N热点"""
+        for i, title in enumerate(["测试关键词热点", "无关热点"]):
+            db_session.add(Hotspot(
+                id=f"viz-{i}",
+                title=title,
+                url=f"https://example.com/viz/{i}",
+                platform="douyin",
+                created_at=datetime.now(),
+                updated_at=datetime.now()
+            ))
+        db_session.commit()
+        
+        response = client.get(f"/api/v1/hotspots/visualization?live_room_id={sample_live_room_id}")
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["categories"]) == 1
+        category = data["categories"][0]
+        assert category["live_room_id"] == sample_live_room_id
+        assert [h["id"] for h in category["hotspots"]] == ["viz-0"]
+        assert category["hotspots"][0]["match_score"] >= 0.3
+    
+    def test_get_hotspot_trends(self, client, db_session):
+        """测试热度趋势接口按增长速度排序"""
+        from datetime import timedelta
+        from app.models.hotspot import HotspotHeatSample
+        
+        now = datetime.now()
+        for hotspot_id, heats in (("slow", [50, 55]), ("fast", [20, 80])):
+            db_session.add(Hotspot(id=hotspot_id, title=hotspot_id, url=f"https://test.com/{hotspot_id}", platform="douyin"))
+            db_session.flush()
+            for hours_ago, heat in zip((2, 0.5), heats):
+                db_session.add(HotspotHeatSample(
+                    id=str(uuid.uuid4()),
+                    hotspot_id=hotspot_id,
+                    platform="douyin",
+                    sampled_at=now - timedelta(hours=hours_ago),
+                    heat_score=heat
+                ))
+        db_session.commit()
+        
+        response = client.get("/api/v1/hotspots/trends?window_hours=6")
+        assert response.status_code == 200
+        data = response.json()
+        assert [item["id"] for item in data["items"]] == ["fast", "slow"]
+        assert data["items"][0]["velocity"] == pytest.approx(40.0)
+        assert data["items"][0]["growth_rate"] == pytest.approx(3.0)
+        
+        response = client.get("/api/v1/hotspots/trends?hotspot_ids=slow")
+        assert [item["id"] for item in response.json()["items"]] == ["slow"]
+        
+        assert client.get("/api/v1/hotspots/trends?sort=bad").status_code == 400
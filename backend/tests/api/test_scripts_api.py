@@ -210,3 +210,84 @@ class TestScriptsAPI:
         assert "suggestions" in data
         assert len(data["suggestions"]) > 0
 
+    
+    def test_get_scripts_grouped_fixed_query_count(self, client, db_session, test_hotspot: Hotspot, sample_live_room_id: str):
+        """测试分组列表的查询次数与分页大小无关（商品、热点批量预加载）"""
+        from sqlalchemy import event
+        
+        products = [
+            Product(id=str(uuid.uuid4()), name=f"商品{i}", category="测试", live_room_id=sample_live_room_id)
+            for i in range(5)
+        ]
+        db_session.add_all(products)
+        db_session.add_all([
+            Script(
+                id=str(uuid.uuid4()),
+                product_id=products[i % len(products)].id,
+                hotspot_id=test_hotspot.id if i % 2 else None,
+                script_content="很长的脚本正文" * 100,
+                shot_list=[{"shot": i}],
+                status="draft"
+            )
+            for i in range(30)
+        ])
+        db_session.commit()
+        db_session.expire_all()
+        
+        statements = []
+        engine = db_session.get_bind()
+        
+        def count_statement(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        
+        event.listen(engine, "before_cursor_execute", count_statement)
+        try:
+            response = client.get("/api/v1/scripts?limit=30")
+        finally:
+            event.remove(engine, "before_cursor_execute", count_statement)
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 30
+        assert {item["product_name"] for item in data["items"]} == {p.name for p in products}
+        hotspot_titles = {h["hotspot_title"] for item in data["items"] for h in item["hotspots"]}
+        assert hotspot_titles == {"测试热点", "无热点"}
+        # count + 脚本列表 + 商品 + 热点
+        assert len(statements) <= 4
+        # 列表查询不读取脚本正文和分镜
+        script_select = next(s for s in statements if "FROM scripts" in s and "count(" not in s.lower())
+        assert "script_content" not in script_select
+        assert "shot_list" not in script_select
+    
+    def test_export_script_pdf_and_zip(self, client, db_session, test_hotspot: Hotspot, test_product: Product):
+        """测试导出单个脚本PDF和按商品批量导出ZIP"""
+        import io
+        import zipfile
+        
+        scripts = [
+            Script(
+                id=str(uuid.uuid4()),
+                product_id=test_product.id,
+                hotspot_id=test_hotspot.id,
+                video_info={"title": f"Script {i}", "duration": 10},
+                script_content="content",
+                status="approved" if i < 2 else "draft"
+            )
+            for i in range(3)
+        ]
+        db_session.add_all(scripts)
+        db_session.commit()
+        
+        response = client.get(f"/api/v1/scripts/{scripts[0].id}/export-pdf")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/pdf"
+        assert response.content.startswith(b"%PDF")
+        
+        response = client.get(f"/api/v1/scripts/products/{test_product.id}/export-zip")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/zip"
+        with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+            assert sorted(archive.namelist()) == ["脚本_Script 0.pdf", "脚本_Script 1.pdf"]
+        
+        response = client.get(f"/api/v1/scripts/products/{test_product.id}/export-zip?status=reviewed")
+        assert response.status_code == 404
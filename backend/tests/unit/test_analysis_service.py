@@ -170,3 +170,51 @@ class TestVideoAnalysisService:
         # 验证已更新
         assert report.video_info["title"] == "新标题"
 
+    
+    def test_save_reports_and_find_existing(self, service: VideoAnalysisService, db_session):
+        """测试批量保存报告，并按更新时间筛选可复用的报告"""
+        import uuid
+        from datetime import datetime, timedelta
+        
+        stale = AnalysisReport(
+            id=str(uuid.uuid4()),
+            video_url="https://test.com/stale",
+            video_info={"title": "旧报告"},
+            created_at=datetime.now() - timedelta(days=60),
+            updated_at=datetime.now() - timedelta(days=60)
+        )
+        db_session.add(stale)
+        db_session.commit()
+        
+        saved = service.save_reports(db_session, {
+            "https://test.com/a": {"video_info": {"title": "A"}},
+            "https://test.com/stale": {"video_info": {"title": "刷新"}},
+        })
+        assert set(saved) == {"https://test.com/a", "https://test.com/stale"}
+        assert saved["https://test.com/stale"].id == stale.id
+        assert db_session.query(AnalysisReport).count() == 2
+        
+        urls = ["https://test.com/a", "https://test.com/stale", "https://test.com/missing"]
+        assert set(service.find_existing_reports(db_session, urls)) == {"https://test.com/a", "https://test.com/stale"}
+        
+        # 超过时效的报告不复用
+        stale.updated_at = datetime.now() - timedelta(days=60)
+        db_session.commit()
+        assert set(service.find_existing_reports(db_session, urls, max_age_days=30)) == {"https://test.com/a"}
+    
+    def test_batch_task_caps_concurrency(self):
+        """测试批量编排任务把URL分到不超过并发数的串行任务链中"""
+        from app.services.analysis.tasks import analyze_video_batch_async
+        
+        urls = [f"https://test.com/video-{i}" for i in range(7)]
+        with patch("celery.group") as mock_group:
+            result = analyze_video_batch_async.run(urls, None, {"https://test.com/reused": "report-1"}, 3)
+        
+        lanes = list(mock_group.call_args[0][0])
+        assert len(lanes) == 3
+        task_ids = [sig.options["task_id"] for lane in lanes for sig in lane.tasks]
+        assert sorted(task_ids) == sorted(item["task_id"] for item in result["items"])
+        assert all(sig.immutable for lane in lanes for sig in lane.tasks)
+        assert [item["video_url"] for item in result["items"]] == urls
+        assert result["reused"] == [{"video_url": "https://test.com/reused", "report_id": "report-1"}]
+        mock_group.return_value.apply_async.assert_called_once()
@@ -0,0 +1,118 @@
+"""
+本地embedding后端单元测试
+"""
+import uuid
+from unittest.mock import AsyncMock, patch
+
+import numpy as np
+import pytest
+
+from app.agents.relevance_analysis_agent import RelevanceAnalysisAgent
+from app.core.config import settings
+from app.tools.analysis_tools import calculate_semantic_similarity
+from app.utils import embedding_backends
+from app.utils.cache import LayeredCache
+from app.utils.embedding import EmbeddingClient
+from app.utils.embedding_backends import EmbeddingBackend, HashingEmbeddingBackend, get_embedding_backend
+
+
+class TestHashingEmbeddingBackend:
+    """字符哈希向量测试"""
+
+    def test_embed_normalized_and_deterministic(self):
+        """测试向量已归一化、结果稳定，空文本为零向量"""
+        backend = HashingEmbeddingBackend(dim=256)
+        vectors = backend.embed(["夏季连衣裙", "夏季连衣裙", "", "裙"])
+
+        assert vectors.shape == (4, 256)
+        assert vectors.dtype == np.float32
+        assert np.allclose(np.linalg.norm(vectors[[0, 1, 3]], axis=1), 1.0)
+        assert np.array_equal(vectors[0], vectors[1])
+        assert not vectors[2].any()
+
+    def test_backend_interface_is_abstract(self):
+        """测试未实现embed的后端不能实例化"""
+        with pytest.raises(TypeError):
+            EmbeddingBackend()
+
+    def test_similarity_matrix(self):
+        """测试批量相似度矩阵，字面相近的文本相似度更高"""
+        backend = HashingEmbeddingBackend()
+        matrix = backend.similarity_matrix(["夏季连衣裙推荐", "家电促销"], ["连衣裙穿搭", "冰箱家电促销", "今日天气"])
+
+        assert matrix.shape == (2, 3)
+        assert matrix[0, 0] > matrix[0, 1]
+        assert matrix[1, 1] > matrix[1, 0]
+        assert backend.similarity_matrix([], ["a"]).shape == (0, 1)
+
+
+class TestEmbeddingBackendSelection:
+    """后端选择测试"""
+
+    @pytest.fixture(autouse=True)
+    def reset(self):
+        embedding_backends.reset_embedding_backends()
+        yield
+        embedding_backends.reset_embedding_backends()
+
+    def test_remote_returns_none(self):
+        """测试remote和未知名称使用远程接口"""
+        assert get_embedding_backend("remote") is None
+        assert get_embedding_backend("unknown") is None
+
+    def test_backend_loaded_once(self):
+        """测试后端进程内只创建一次"""
+        with patch.object(settings, "EMBEDDING_BACKEND", "hashing"):
+            assert get_embedding_backend() is get_embedding_backend("hashing")
+
+    def test_onnx_unavailable_fails_loudly(self):
+        """测试ONNX依赖或模型缺失时报错，不静默降级为字符哈希向量"""
+        with patch.object(embedding_backends, "ONNX_AVAILABLE", False):
+            with pytest.raises(RuntimeError, match="EMBEDDING_BACKEND=hashing"):
+                get_embedding_backend("onnx")
+        assert "onnx" not in embedding_backends._backends
+
+
+class TestLocalEmbeddingUsage:
+    """本地后端接入测试"""
+
+    async def test_client_uses_local_backend(self):
+        """测试EmbeddingClient使用本地后端时不请求远程接口、不写缓存"""
+        client = EmbeddingClient(api_key="", backend=HashingEmbeddingBackend(dim=64))
+        client.cache = LayeredCache(f"test-embedding-{uuid.uuid4()}", use_redis=False)
+
+        with patch.object(client, "_request_embeddings", new_callable=AsyncMock) as mock_request:
+            vectors = await client.get_embeddings(["连衣裙", "家电"])
+
+        mock_request.assert_not_called()
+        assert len(vectors) == 2 and len(vectors[0]) == 64
+        assert client.cache.get_stats()["local_size"] == 0
+        assert await client.calculate_semantic_similarity("连衣裙", "连衣裙") == pytest.approx(1.0)
+
+    async def test_tool_similarity_sync_inside_event_loop(self):
+        """测试工具函数在运行中的事件循环里同步计算，不创建线程和新事件循环"""
+        with patch.object(settings, "EMBEDDING_BACKEND", "remote"), \
+             patch("asyncio.run") as mock_run:
+            same = calculate_semantic_similarity("夏季连衣裙", "夏季连衣裙")
+            different = calculate_semantic_similarity("夏季连衣裙", "冰箱促销")
+            empty = calculate_semantic_similarity("", "冰箱促销")
+
+        mock_run.assert_not_called()
+        assert same == pytest.approx(1.0)
+        assert 0 < different < same
+        assert empty == 0.0
+
+    async def test_legacy_relevance_awaits_embedding_client(self):
+        """测试Agent传统方法（异步）使用EmbeddingClient计算语义相似度，不走同步工具的字符哈希降级"""
+        agent = RelevanceAnalysisAgent()
+        agent.embedding_client.calculate_semantic_similarity = AsyncMock(return_value=0.9)
+        agent.llm_client.generate = AsyncMock(return_value={})
+
+        with patch.object(settings, "EMBEDDING_BACKEND", "remote"), \
+             patch("app.agents.relevance_analysis_agent.calculate_semantic_similarity") as sync_similarity, \
+             patch("app.agents.relevance_analysis_agent.analyze_sentiment", return_value={"sentiment": "positive", "score": 0.5}):
+            result = await agent._execute_legacy({"hotspot_text": "夏季连衣裙", "product_text": "女装直播间"})
+
+        sync_similarity.assert_not_called()
+        agent.embedding_client.calculate_semantic_similarity.assert_awaited_once_with("夏季连衣裙", "女装直播间")
+        assert result["semantic_score"] == 0.9
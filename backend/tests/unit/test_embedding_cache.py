@@ -0,0 +1,125 @@
+"""
+Embedding缓存单元测试
+"""
+import threading
+import time
+import uuid
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.utils.cache import LayeredCache
+from app.utils.embedding import EmbeddingClient
+
+
+class TestLayeredCache:
+    """两级缓存测试"""
+
+    @pytest.fixture
+    def cache(self):
+        """创建仅使用进程内LRU的缓存"""
+        return LayeredCache(f"test-{uuid.uuid4()}", ttl=60, max_local_entries=2, use_redis=False)
+
+    def test_set_and_get(self, cache: LayeredCache):
+        """测试写入和读取"""
+        cache.set("a", [0.1, 0.2])
+        assert cache.get("a") == [0.1, 0.2]
+        assert cache.get("missing") is None
+
+        stats = cache.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+
+    def test_lru_eviction(self, cache: LayeredCache):
+        """测试超过容量时淘汰最久未使用的条目"""
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")  # a变为最近使用
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.get_stats()["evictions"] == 1
+
+    def test_ttl_expiry(self, cache: LayeredCache):
+        """测试过期条目不再命中"""
+        cache.set("a", 1, ttl=1)
+        with patch("app.utils.cache.time.time", return_value=time.time() + 5):
+            assert cache.get("a") is None
+
+    @pytest.mark.asyncio
+    async def test_async_redis_calls_off_event_loop(self):
+        """测试异步接口的Redis读写在线程池中执行，进程内命中时不访问Redis"""
+        cache = LayeredCache(f"test-{uuid.uuid4()}", ttl=60)
+        loop_thread = threading.get_ident()
+        redis_threads = []
+        redis = MagicMock()
+        redis.mget.side_effect = lambda keys: redis_threads.append(threading.get_ident()) or ['[1]'] * len(keys)
+        redis.pipeline.return_value.execute.side_effect = lambda: redis_threads.append(threading.get_ident())
+
+        with patch("app.utils.cache._get_redis", return_value=redis):
+            assert await cache.aget("remote") == [1]
+            await cache.aset("b", 2)
+            assert await cache.aget_many(["remote", "b"]) == {"remote": [1], "b": 2}
+
+        assert len(redis_threads) == 2
+        assert loop_thread not in redis_threads
+        assert redis.mget.call_count == 1
+
+
+class TestEmbeddingClientCache:
+    """EmbeddingClient缓存测试"""
+
+    @pytest.fixture
+    def client(self):
+        """创建客户端（使用独立的进程内缓存）"""
+        client = EmbeddingClient(api_key="sk-test")
+        client.cache = LayeredCache(f"test-embedding-{uuid.uuid4()}", use_redis=False)
+        return client
+
+    @pytest.mark.asyncio
+    async def test_get_embeddings_only_requests_misses(self, client: EmbeddingClient):
+        """测试批量获取时只请求未命中的文本，并且一次请求多个输入"""
+        async def fake_request(texts):
+            return [[float(len(text)), 1.0] for text in texts]
+
+        with patch.object(client, "_request_embeddings", side_effect=fake_request) as mock_request:
+            first = await client.get_embeddings(["热点A", "直播间", "热点A"])
+            assert mock_request.call_count == 1
+            # 重复文本只请求一次
+            assert mock_request.call_args[0][0] == ["热点A", "直播间"]
+            assert first[0] == first[2]
+
+            second = await client.get_embeddings(["直播间", "热点B"])
+            assert mock_request.call_count == 2
+            assert mock_request.call_args[0][0] == ["热点B"]
+            assert second[0] == first[1]
+
+        stats = client.cache.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 3
+
+    @pytest.mark.asyncio
+    async def test_failed_embeddings_not_cached(self, client: EmbeddingClient):
+        """测试请求失败的结果不写入缓存"""
+        with patch.object(
+            client, "_request_embeddings", new_callable=AsyncMock, return_value=[None]
+        ) as mock_request:
+            assert await client.get_embedding("热点") is None
+            assert await client.get_embedding("热点") is None
+            assert mock_request.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_semantic_similarity_uses_single_request(self, client: EmbeddingClient):
+        """测试语义相似度计算把两个文本合并为一次请求"""
+        with patch.object(
+            client,
+            "_request_embeddings",
+            new_callable=AsyncMock,
+            return_value=[[1.0, 0.0], [1.0, 0.0]]
+        ) as mock_request:
+            score = await client.calculate_semantic_similarity("文本1", "文本2")
+
+        assert mock_request.await_count == 1
+        assert score == pytest.approx(1.0)
@@ -0,0 +1,79 @@
+"""
+关键帧缩略图存储单元测试
+"""
+import numpy as np
+import pytest
+from unittest.mock import MagicMock, patch
+
+from app.utils.frame_store import FrameStore, hamming_distance
+
+
+def _gradient_frame(height=1080, width=1920, flip=False):
+    """生成水平渐变的RGB画面"""
+    row = np.linspace(0, 255, width, dtype=np.uint8)
+    if flip:
+        row = row[::-1]
+    frame = np.repeat(row[np.newaxis, :], height, axis=0)
+    return np.stack([frame, frame, frame], axis=-1)
+
+
+class TestFrameStore:
+    """关键帧存储测试"""
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        return FrameStore(store_dir=str(tmp_path / "frames"), max_size=320, quality=80)
+
+    def test_save_frame_downscales_and_dedups(self, store: FrameStore):
+        """测试缩放保存、相同画面只存一份"""
+        first = store.save_frame(_gradient_frame())
+        second = store.save_frame(_gradient_frame())
+
+        assert first["frame_id"] == second["frame_id"]
+        assert max(first["width"], first["height"]) == 320
+        assert len(first["color_hist"]) == 12
+        assert sum(first["color_hist"][:4]) == pytest.approx(1.0, abs=1e-3)
+
+        path = store.get_path(first["frame_id"])
+        assert path is not None
+        with open(path, "rb") as f:
+            assert f.read(3) == b"\xff\xd8\xff"
+        assert len(list(store.store_dir.glob("*/*.jpg"))) == 1
+
+    def test_perceptual_hash(self, store: FrameStore):
+        """测试相似画面的感知哈希距离小，不同画面距离大"""
+        a = store.save_frame(_gradient_frame())
+        b = store.save_frame(_gradient_frame(height=720, width=1280))
+        c = store.save_frame(_gradient_frame(flip=True))
+
+        assert hamming_distance(a["phash"], b["phash"]) <= 4
+        assert hamming_distance(a["phash"], c["phash"]) > 32
+
+    def test_get_path_rejects_invalid_id(self, store: FrameStore):
+        """测试非法frame_id不会访问任意路径"""
+        assert store.get_path("../../etc/passwd") is None
+        assert store.get_path("0" * 64) is None
+
+    def test_key_frames_store_references(self, tmp_path):
+        """测试关键帧只保存缩略图引用，不包含像素数据"""
+        from app.utils import video_analyzer_local
+        from app.utils.video_analyzer_local import LocalVideoAnalyzer
+
+        clip = MagicMock()
+        clip.get_frame.return_value = _gradient_frame()
+        store = FrameStore(store_dir=str(tmp_path / "frames"))
+
+        with patch.object(video_analyzer_local, "MOVIEPY_AVAILABLE", True), \
+             patch.object(video_analyzer_local, "VideoFileClip", return_value=clip, create=True), \
+             patch.object(video_analyzer_local, "get_frame_store", return_value=store):
+            key_frames = LocalVideoAnalyzer()._extract_key_frames(
+                "video.mp4",
+                [{"shot_number": 1, "start_time": 0.0, "end_time": 2.0}]
+            )
+
+        assert len(key_frames) == 1
+        assert "frame" not in key_frames[0]
+        assert key_frames[0]["time"] == 1.0
+        assert key_frames[0]["url"].endswith(key_frames[0]["frame_id"])
+        assert store.get_path(key_frames[0]["frame_id"]) is not None
+        clip.close.assert_called_once()
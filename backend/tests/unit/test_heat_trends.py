@@ -0,0 +1,108 @@
+"""
+热点热度趋势单元测试
+"""
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.hotspot import Hotspot, HotspotHeatSample
+from app.services.hotspot.heat_trends import (
+    compute_heat_trends,
+    downsample_heat_samples,
+    record_heat_samples,
+)
+
+
+class TestHeatTrends:
+    """热度采样与趋势计算测试"""
+
+    @pytest.fixture
+    def hotspots(self, db_session):
+        items = [
+            Hotspot(id=str(uuid.uuid4()), title=f"热点{i}", url=f"https://test.com/{i}", platform="douyin")
+            for i in range(2)
+        ]
+        db_session.add_all(items)
+        db_session.commit()
+        return items
+
+    def test_record_samples_and_growth_rate(self, db_session, hotspots):
+        """测试按抓取批量写入采样，并刷新heat_growth_rate"""
+        now = datetime.now()
+        record_heat_samples(db_session, [
+            {"url": "https://test.com/0", "rank": 20, "heat_score": 50},
+            {"url": "https://test.com/1", "rank": 1, "heat_score": 100},
+            {"url": "https://test.com/missing", "rank": 2, "heat_score": 99},
+        ], "douyin", sampled_at=now - timedelta(hours=2))
+        written = record_heat_samples(db_session, [
+            {"url": "https://test.com/0", "rank": 5, "heat_score": 100},
+            {"url": "https://test.com/1", "rank": 1, "heat_score": 100},
+        ], "douyin", sampled_at=now)
+
+        assert written == 2
+        assert db_session.query(HotspotHeatSample).count() == 4
+        db_session.expire_all()
+        assert db_session.get(Hotspot, hotspots[0].id).heat_growth_rate == 1.0
+        assert db_session.get(Hotspot, hotspots[1].id).heat_growth_rate == 0.0
+
+    def test_compute_heat_trends(self, db_session, hotspots):
+        """测试向量化计算增长速度（最小二乘斜率）和排名上升速度"""
+        now = datetime.now()
+        samples = [
+            (hotspots[0].id, 3, 30, 40),
+            (hotspots[0].id, 2, 50, 30),
+            (hotspots[0].id, 1, 70, 20),
+            (hotspots[1].id, 1, 80, 3),
+        ]
+        db_session.add_all([
+            HotspotHeatSample(
+                id=str(uuid.uuid4()),
+                hotspot_id=hotspot_id,
+                platform="douyin",
+                sampled_at=now - timedelta(hours=hours_ago),
+                heat_score=heat,
+                rank=rank
+            )
+            for hotspot_id, hours_ago, heat, rank in samples
+        ])
+        db_session.commit()
+
+        trends = compute_heat_trends(db_session, window_hours=24, now=now)
+
+        rising = trends[hotspots[0].id]
+        assert rising["samples"] == 3
+        assert rising["velocity"] == pytest.approx(20.0)
+        assert rising["growth_rate"] == pytest.approx(40 / 30, abs=1e-4)
+        assert rising["rank_change"] == 20
+        assert rising["rank_velocity"] == pytest.approx(10.0)
+        assert rising["latest_rank"] == 20
+
+        single = trends[hotspots[1].id]
+        assert single["samples"] == 1
+        assert single["velocity"] == 0.0
+        assert single["growth_rate"] == 0.0
+
+        # 窗口之外的采样不参与计算
+        assert compute_heat_trends(db_session, window_hours=1.5, now=now)[hotspots[0].id]["samples"] == 1
+
+    def test_downsample_heat_samples(self, db_session, hotspots):
+        """测试旧采样降采样，超过保留期的删除"""
+        now = datetime(2025, 1, 10, 12, 0, 0)
+        offsets = [1, 2, 62, 62.5, 63, 24 * 30]
+        db_session.add_all([
+            HotspotHeatSample(
+                id=str(uuid.uuid4()),
+                hotspot_id=hotspots[0].id,
+                platform="douyin",
+                sampled_at=now - timedelta(hours=hours_ago),
+                heat_score=50
+            )
+            for hours_ago in offsets
+        ])
+        db_session.commit()
+
+        stats = downsample_heat_samples(db_session, now=now)
+
+        assert stats == {"expired": 1, "downsampled": 2}
+        assert db_session.query(HotspotHeatSample).count() == 3
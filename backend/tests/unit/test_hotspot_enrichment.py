@@ -0,0 +1,173 @@
+"""
+热点内容增强调度单元测试
+"""
+import uuid
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.models.hotspot import Hotspot, HotspotRoomScore
+from app.models.product import LiveRoom
+from app.services.hotspot import enrichment
+from app.services.hotspot.enrichment import (
+    celery_priority,
+    enrich_hotspot_content,
+    enrichment_priority,
+    schedule_enrichment,
+    select_enrichment_candidates,
+)
+
+
+class TestEnrichmentScheduling:
+    """增强优先级与调度测试"""
+
+    @pytest.fixture
+    def hotspots(self, db_session):
+        now = datetime.now()
+        items = {
+            # 匹配度高、热度高、刚发布
+            "best": Hotspot(id=str(uuid.uuid4()), title="最佳", url="https://test.com/best", platform="douyin",
+                            match_score=0.9, heat_score=90, publish_time=now - timedelta(hours=1)),
+            # 匹配度高但已发布很久
+            "stale": Hotspot(id=str(uuid.uuid4()), title="过时", url="https://test.com/stale", platform="douyin",
+                             match_score=0.9, heat_score=90, publish_time=now - timedelta(hours=72)),
+            # 热度一般但正在上涨
+            "rising": Hotspot(id=str(uuid.uuid4()), title="上涨", url="https://test.com/rising", platform="douyin",
+                              match_score=0.6, heat_score=50, heat_growth_rate=1.0, publish_time=now - timedelta(hours=2)),
+            # 已增强
+            "done": Hotspot(id=str(uuid.uuid4()), title="已增强", url="https://test.com/done", platform="douyin",
+                            match_score=1.0, heat_score=100, publish_time=now, content_analysis={"summary": "x"}),
+        }
+        db_session.add_all(items.values())
+        db_session.commit()
+        return items
+
+    def test_priority_combines_match_heat_freshness(self, hotspots):
+        """测试优先级 = 匹配度 × 热度 × 新鲜度"""
+        now = datetime.now()
+        best = enrichment_priority(hotspots["best"], now)
+        stale = enrichment_priority(hotspots["stale"], now)
+        rising = enrichment_priority(hotspots["rising"], now)
+
+        assert best > rising > stale
+        # 相差71小时（半衰期24小时）
+        assert stale == pytest.approx(best * 0.5 ** (71 / 24), rel=1e-3)
+
+    def test_celery_priority_mapping(self):
+        """测试优先级分数映射到Celery优先级（0最高）"""
+        assert celery_priority(1.0) == 0
+        assert celery_priority(5.0) == 0
+        assert celery_priority(0.0) == 9
+        assert celery_priority(-1.0) == 9
+
+    def test_default_worker_consumes_enrichment_queue(self):
+        """测试增强任务路由到的队列在默认消费队列中（未指定-Q启动的worker也会执行增强任务）"""
+        from app.celery_app import celery_app
+
+        route = celery_app.conf.task_routes["app.services.hotspot.tasks.enrich_hotspot_task"]
+        queue_names = {queue.name for queue in celery_app.conf.task_queues}
+        assert route["queue"] in queue_names
+        assert celery_app.conf.task_default_queue in queue_names
+
+    def test_select_candidates_ordered_and_budgeted(self, db_session, hotspots):
+        """测试候选按优先级排序、受预算限制、跳过已增强的热点"""
+        urls = [h.url for h in hotspots.values()]
+
+        candidates = select_enrichment_candidates(db_session, urls=urls, budget=10)
+        assert [c["url"] for c in candidates] == [
+            "https://test.com/best", "https://test.com/rising", "https://test.com/stale"
+        ]
+
+        top = select_enrichment_candidates(db_session, urls=urls, budget=1)
+        assert [c["url"] for c in top] == ["https://test.com/best"]
+        assert select_enrichment_candidates(db_session, urls=[], budget=10) == []
+
+    def test_schedule_dedups_by_url_claim(self, db_session, hotspots):
+        """测试按URL占用去重：已在处理中的热点不重复投递"""
+        claimed = set()
+
+        def fake_claim(url, owner, ttl=None):
+            if url in claimed:
+                return False
+            claimed.add(url)
+            return True
+
+        task = MagicMock()
+        with patch.object(enrichment, "claim_url", side_effect=fake_claim), \
+             patch("app.services.hotspot.tasks.enrich_hotspot_task", task):
+            first = schedule_enrichment(db_session, urls=[h.url for h in hotspots.values()], budget=10)
+            second = schedule_enrichment(db_session, urls=[h.url for h in hotspots.values()], budget=10)
+
+        assert first == {"candidates": 3, "scheduled": 3, "skipped": 0}
+        assert second == {"candidates": 3, "scheduled": 0, "skipped": 3}
+        assert task.apply_async.call_count == 3
+        first_call = task.apply_async.call_args_list[0].kwargs
+        assert first_call["args"] == [hotspots["best"].id]
+        assert first_call["queue"] == "enrichment"
+        assert first_call["priority"] <= task.apply_async.call_args_list[-1].kwargs["priority"]
+
+    def test_schedule_releases_claim_on_dispatch_failure(self, db_session, hotspots):
+        """测试投递失败时释放URL占用"""
+        task = MagicMock()
+        task.apply_async.side_effect = RuntimeError("broker down")
+        with patch.object(enrichment, "claim_url", return_value=True), \
+             patch.object(enrichment, "release_url") as release, \
+             patch("app.services.hotspot.tasks.enrich_hotspot_task", task):
+            result = schedule_enrichment(db_session, urls=["https://test.com/best"], budget=10)
+
+        assert result["scheduled"] == 0
+        release.assert_called_once_with("https://test.com/best")
+
+
+class TestEnrichHotspotContent:
+    """单个热点增强测试"""
+
+    @pytest.mark.asyncio
+    async def test_enrich_uses_summary_then_transcript(self):
+        """测试内容摘要优先使用分析摘要，其次使用转录文本"""
+        structure_agent = MagicMock()
+        structure_agent.execute = AsyncMock(return_value={"video_structure": {"transcript": "转录" * 400}})
+        analysis_agent = MagicMock()
+        analysis_agent.execute = AsyncMock(return_value={"content_analysis": {"summary": "摘要"}})
+
+        result = await enrich_hotspot_content(
+            {"url": "https://test.com/v", "title": "标题"}, structure_agent, analysis_agent
+        )
+        assert result["content_compact"] == "摘要"
+        assert analysis_agent.execute.call_args.args[0]["video_structure"] == {"transcript": "转录" * 400}
+
+        analysis_agent.execute = AsyncMock(return_value={"content_analysis": {}})
+        result = await enrich_hotspot_content(
+            {"url": "https://test.com/v", "title": "标题"}, structure_agent, analysis_agent
+        )
+        assert len(result["content_compact"]) == 500
+
+
+class TestEnrichHotspotTask:
+    """增强任务测试"""
+
+    def test_task_refreshes_room_scores(self, db_session):
+        """测试增强写入content_analysis后重新计算该热点的直播间匹配度"""
+        from app.services.hotspot.tasks import enrich_hotspot_task
+
+        room = LiveRoom(id=str(uuid.uuid4()), name="时尚真惠选", category="女装", keywords=["连衣裙"])
+        hotspot = Hotspot(id=str(uuid.uuid4()), title="明星机场街拍", url="https://example.com/street", platform="douyin")
+        db_session.add_all([room, hotspot])
+        db_session.commit()
+        hotspot_id, room_id = hotspot.id, room.id
+
+        result = {
+            "video_structure": {"transcript": "街拍"},
+            "content_analysis": {"ecommerce_fit": {"score": 0.9, "applicable_categories": ["女装"]}},
+            "content_compact": "街拍",
+        }
+        with patch("app.services.hotspot.tasks.SessionLocal", return_value=db_session), \
+             patch.object(enrichment, "enrich_hotspot_content", new_callable=AsyncMock, return_value=result), \
+             patch.object(enrichment, "release_url"):
+            outcome = enrich_hotspot_task.apply(args=[hotspot_id]).get()
+
+        assert outcome["status"] == "success"
+        rows = db_session.query(HotspotRoomScore).filter(HotspotRoomScore.hotspot_id == hotspot_id).all()
+        assert [row.live_room_id for row in rows] == [room_id]
+        assert rows[0].match_score > 0
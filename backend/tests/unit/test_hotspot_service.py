@@ -223,7 +223,64 @@ class TestHotspotMonitorService:
         assert updated.title == "新标题"
         assert updated.heat_score == 95
         assert updated.match_score == 0.9
-    
+
+    def test_bulk_upsert_hotspots_merge(self, service: HotspotMonitorService, db_session):
+        """测试批量保存返回新增/更新数量，未出现的字段保留原值"""
+        import uuid
+
+        db_session.add(Hotspot(
+            id=str(uuid.uuid4()),
+            title="已有热点",
+            url="https://test.com/bulk/existing",
+            platform="weibo",
+            heat_score=60,
+            content_analysis={"summary": "已分析"},
+            video_structure={"scenes": 3},
+            publish_time=datetime(2025, 1, 1),
+            created_at=datetime.now(),
+            updated_at=datetime.now()
+        ))
+        db_session.commit()
+
+        hotspots = [
+            {"title": "已有热点", "url": "https://test.com/bulk/existing", "heat_score": 88, "publish_time": None},
+            {"title": "新热点A", "url": "https://test.com/bulk/a", "heat_score": 70},
+            {"title": "新热点B", "url": "https://test.com/bulk/b", "content_compact": "摘要"},
+        ]
+
+        with patch("app.services.hotspot.service.settings.HOTSPOT_UPSERT_CHUNK_SIZE", 2):
+            result = service.bulk_upsert_hotspots(db_session, hotspots, "douyin")
+
+        assert result == {"inserted": 2, "updated": 1}
+
+        existing = db_session.query(Hotspot).filter(Hotspot.url == "https://test.com/bulk/existing").first()
+        assert existing.heat_score == 88
+        assert existing.content_analysis == {"summary": "已分析"}
+        assert existing.video_structure == {"scenes": 3}
+        assert existing.publish_time == datetime(2025, 1, 1)
+        assert existing.platform == "weibo"
+
+        new_b = db_session.query(Hotspot).filter(Hotspot.url == "https://test.com/bulk/b").first()
+        assert new_b.platform == "douyin"
+        assert new_b.content_compact == "摘要"
+        assert new_b.heat_score is None
+
+    def test_bulk_upsert_hotspots_duplicate_urls(self, service: HotspotMonitorService, db_session):
+        """测试同一批中重复的URL合并为一条，后出现的字段覆盖先出现的"""
+        hotspots = [
+            {"title": "第一次", "url": "https://test.com/bulk/dup", "heat_score": 50, "tags": ["a"]},
+            {"title": "第二次", "url": "https://test.com/bulk/dup", "heat_score": 90},
+        ]
+
+        result = service.bulk_upsert_hotspots(db_session, hotspots, "douyin")
+        assert result == {"inserted": 1, "updated": 0}
+
+        saved = db_session.query(Hotspot).filter(Hotspot.url == "https://test.com/bulk/dup").all()
+        assert len(saved) == 1
+        assert saved[0].title == "第二次"
+        assert saved[0].heat_score == 90
+        assert saved[0].tags == ["a"]
+
     @pytest.mark.asyncio
     async def test_push_to_feishu_success(
         self, 
@@ -293,3 +350,176 @@ class TestHotspotMonitorService:
         assert isinstance(hotspots, list)
         assert total >= 0
 
+    
+    @pytest.mark.asyncio
+    async def test_relevance_agent_execute_batch(self, service: HotspotMonitorService):
+        """测试批量关联度分析解析LLM返回的JSON数组"""
+        hotspots = [{"title": "热点1", "tags": ["测试"]}, {"title": "热点2"}, {"title": "热点3"}]
+        llm_response = {
+            "choices": [{
+                "message": {
+                    "content": '结果如下：[{"index": 1, "relevance_score": 0.8, "reason": "相关"}, '
+                               '{"index": 3, "relevance_score": 1.5, "reason": "非常相关"}]'
+                }
+            }]
+        }
+        
+        with patch.object(
+            service.relevance_agent.llm_client,
+            'generate',
+            new_callable=AsyncMock,
+            return_value=llm_response
+        ) as mock_generate:
+            results = await service.relevance_agent.execute_batch(hotspots, "直播间名称：测试直播间", "测试")
+        
+        assert mock_generate.await_count == 1
+        assert len(results) == 3
+        assert results[0]["relevance_score"] == 0.8
+        # LLM漏掉的热点没有评分
+        assert results[1]["relevance_score"] is None
+        # 超出范围的分数被截断
+        assert results[2]["relevance_score"] == 1.0
+    
+    @pytest.mark.asyncio
+    async def test_filter_hotspots_with_semantic_batched(
+        self,
+        service: HotspotMonitorService,
+        db_session,
+        sample_live_room_id: str
+    ):
+        """测试语义筛选按批调用Agent，而不是逐条调用"""
+        hotspots = [
+            {"title": f"测试热点{i}", "url": f"https://test.com/batch/{i}", "tags": []}
+            for i in range(45)
+        ]
+        
+        async def fake_execute_batch(chunk, target_text, target_category=""):
+            return [
+                {"relevance_score": 0.9 if h["title"].endswith("0") else 0.1, "reason": ""}
+                for h in chunk
+            ]
+        
+        with patch("app.services.hotspot.service.settings.RELEVANCE_BATCH_SIZE", 20), \
+             patch.object(
+                 service.relevance_agent, 'execute_batch', side_effect=fake_execute_batch
+             ) as mock_batch, \
+             patch.object(
+                 service.relevance_agent, 'execute', new_callable=AsyncMock
+             ) as mock_execute:
+            result = await service.filter_hotspots_with_semantic(
+                db_session, hotspots, live_room_id=sample_live_room_id
+            )
+        
+        # 45个热点 / 每批20个 = 3次LLM调用
+        assert mock_batch.call_count == 3
+        mock_execute.assert_not_called()
+        assert len(result) == 45
+        assert all(isinstance(h["match_score"], float) for h in result)
+        # Agent判断不相关的热点匹配度为0，相关的排在前面
+        assert result[0]["match_score"] > 0
+        assert result[-1]["match_score"] == 0.0
+    
+    @pytest.mark.asyncio
+    async def test_filter_hotspots_with_semantic_batch_failure(
+        self,
+        service: HotspotMonitorService,
+        db_session,
+        sample_live_room_id: str
+    ):
+        """测试批量分析失败时回退到关键词匹配，不抛出异常"""
+        hotspots = [{"title": "测试热点", "url": "https://test.com/batch-fail", "tags": []}]
+        
+        with patch.object(
+            service.relevance_agent,
+            'execute_batch',
+            new_callable=AsyncMock,
+            side_effect=Exception("LLM不可用")
+        ):
+            result = await service.filter_hotspots_with_semantic(
+                db_session, hotspots, live_room_id=sample_live_room_id
+            )
+        
+        assert len(result) == 1
+        assert result[0]["match_score"] > 0
+    
+    @pytest.mark.asyncio
+    async def test_filter_hotspots_for_live_rooms(
+        self,
+        service: HotspotMonitorService,
+        db_session,
+        sample_live_room_id: str
+    ):
+        """测试多个直播间并发计算匹配度"""
+        import uuid
+        from datetime import datetime
+        
+        other_room = LiveRoom(
+            id=str(uuid.uuid4()),
+            name="其他直播间",
+            category="美妆",
+            keywords=["口红"],
+            created_at=datetime.now(),
+            updated_at=datetime.now()
+        )
+        db_session.add(other_room)
+        db_session.commit()
+        
+        hotspots = [{"title": "测试热点", "url": "https://test.com/multi-room", "tags": []}]
+        
+        with patch.object(
+            service.relevance_agent,
+            'execute_batch',
+            new_callable=AsyncMock,
+            return_value=[{"relevance_score": 0.9, "reason": ""}]
+        ):
+            result = await service.filter_hotspots_for_live_rooms(
+                db_session, hotspots, [sample_live_room_id, other_room.id]
+            )
+        
+        assert set(result.keys()) == {sample_live_room_id, other_room.id}
+        # 关键词命中的直播间有匹配度，不相关的直播间为0
+        assert result[sample_live_room_id][0]["match_score"] > 0
+        assert result[other_room.id][0]["match_score"] == 0.0
+        # 原始热点不被修改
+        assert "match_score" not in hotspots[0]
+    
+    @pytest.mark.asyncio
+    async def test_filter_hotspots_across_live_rooms(
+        self,
+        service: HotspotMonitorService,
+        db_session,
+        sample_live_room_id: str
+    ):
+        """测试未指定直播间时按所有直播间评分，每个热点取最高匹配度"""
+        import uuid
+        from datetime import datetime
+        
+        db_session.add(LiveRoom(
+            id=str(uuid.uuid4()),
+            name="美妆直播间",
+            category="美妆",
+            keywords=["口红"],
+            created_at=datetime.now(),
+            updated_at=datetime.now()
+        ))
+        db_session.commit()
+        
+        hotspots = [
+            {"title": "口红试色", "url": "https://test.com/lipstick", "tags": []},
+            {"title": "测试热点", "url": "https://test.com/test", "tags": []},
+            {"title": "今日天气", "url": "https://test.com/weather", "tags": []},
+        ]
+        
+        async def fake_batch(items, *args, **kwargs):
+            return [{"relevance_score": 0.9, "reason": ""} for _ in items]
+        
+        with patch.object(service.relevance_agent, 'execute_batch', side_effect=fake_batch), \
+             patch.object(service, 'filter_hotspots_for_live_rooms', wraps=service.filter_hotspots_for_live_rooms) as fan_out:
+            result = await service.filter_hotspots_across_live_rooms(db_session, hotspots)
+        
+        assert len(fan_out.call_args.args[2]) == 2
+        scores = {h["url"]: h["match_score"] for h in result}
+        assert scores["https://test.com/lipstick"] > 0
+        assert scores["https://test.com/test"] > 0
+        assert scores["https://test.com/weather"] == 0.0
+        assert result[-1]["url"] == "https://test.com/weather"
@@ -0,0 +1,86 @@
+"""
+热点增量抓取快照单元测试
+"""
+import uuid
+from unittest.mock import patch
+
+import pytest
+
+from app.models.hotspot import Hotspot
+from app.services.hotspot import snapshots
+from app.utils.cache import LayeredCache
+
+
+def _hotspot(title: str, rank: int, url: str = None) -> dict:
+    return {
+        "title": title,
+        "url": url or f"https://test.com/{title}",
+        "platform": "douyin",
+        "rank": rank,
+        "heat_score": 100 - (rank - 1),
+    }
+
+
+class TestHotspotSnapshots:
+    """增量抓取快照测试"""
+
+    @pytest.fixture(autouse=True)
+    def isolated_cache(self):
+        with patch.object(snapshots, "_snapshot_cache", LayeredCache(f"test-snapshot-{uuid.uuid4()}", use_redis=False)):
+            yield
+
+    def test_diff_without_snapshot(self):
+        """测试没有快照时全部视为新热点"""
+        hotspots = [_hotspot("a", 1), _hotspot("b", 2)]
+        changed, unchanged = snapshots.diff_hotspots(None, hotspots)
+        assert changed == hotspots
+        assert unchanged == []
+
+    def test_diff_against_snapshot(self):
+        """测试新热点、URL变化、排名大幅变化进入完整处理，其余只更新热度"""
+        snapshots.save_snapshot("douyin", [
+            _hotspot("stable", 1),
+            _hotspot("small move", 2),
+            _hotspot("big jump", 30),
+            _hotspot("new url", 4),
+        ])
+        current = [
+            _hotspot("stable", 1),
+            _hotspot("big jump", 2),
+            _hotspot("small move", 4),
+            _hotspot("new url", 5, url="https://test.com/other"),
+            _hotspot("brand new", 6),
+        ]
+
+        changed, unchanged = snapshots.diff_hotspots(snapshots.get_snapshot("douyin"), current, rank_jump=10)
+
+        assert [h["title"] for h in changed] == ["big jump", "new url", "brand new"]
+        assert [h["title"] for h in unchanged] == ["stable", "small move"]
+
+    def test_snapshot_per_live_room(self):
+        """测试快照按平台+直播间区分，一个直播间的增量抓取不影响另一个直播间"""
+        hotspots = [_hotspot("a", 1)]
+        snapshots.save_snapshot("douyin", hotspots, live_room_id="room-a")
+
+        assert snapshots.get_snapshot("douyin", "room-b") is None
+        assert snapshots.get_snapshot("douyin") is None
+        changed, _ = snapshots.diff_hotspots(snapshots.get_snapshot("douyin", "room-b"), hotspots)
+        assert changed == hotspots
+        assert snapshots.get_snapshot("douyin", "room-a") is not None
+
+    def test_title_fingerprint_ignores_whitespace(self):
+        """测试标题指纹忽略空白和大小写"""
+        assert snapshots.title_fingerprint(" Hot  Topic ") == snapshots.title_fingerprint("hot topic")
+
+    def test_update_hotspot_heat(self, db_session):
+        """测试只更新已入库热点的热度"""
+        hotspot = Hotspot(id=str(uuid.uuid4()), title="stable", url="https://test.com/stable", platform="douyin", heat_score=50)
+        db_session.add(hotspot)
+        db_session.commit()
+
+        updated = snapshots.update_hotspot_heat(db_session, [_hotspot("stable", 1), _hotspot("unsaved", 2)])
+
+        assert updated == 1
+        db_session.expire_all()
+        assert db_session.query(Hotspot).filter(Hotspot.url == "https://test.com/stable").one().heat_score == 100
+        assert db_session.query(Hotspot).count() == 1
@@ -0,0 +1,152 @@
+"""
+共享HTTP客户端单元测试
+"""
+import asyncio
+import httpx
+import pytest
+from unittest.mock import patch
+
+from app.utils import http_client
+from app.utils.http_client import aclose_http_clients, close_loop_http_clients, get_http_client
+
+
+def _mock_client_factory(handler):
+    """用MockTransport替换真实连接池"""
+    def factory(proxy=None):
+        return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return factory
+
+
+class TestHttpClient:
+    """共享HTTP客户端测试"""
+
+    @pytest.mark.asyncio
+    async def test_client_reused_within_loop(self):
+        """测试同一事件循环内复用同一个连接池"""
+        with patch.object(http_client, "_create_client", side_effect=_mock_client_factory(lambda r: httpx.Response(200))):
+            first = http_client._get_pooled_client("test", None)
+            second = http_client._get_pooled_client("test", None)
+            other = http_client._get_pooled_client("other", None)
+            assert first is second
+            assert first is not other
+            await aclose_http_clients()
+            assert first.is_closed
+
+    def test_clients_isolated_per_loop(self):
+        """测试不同事件循环使用不同的连接池，关闭循环前可以释放连接池"""
+        async def get_client():
+            return http_client._get_pooled_client("test", None)
+
+        with patch.object(http_client, "_create_client", side_effect=_mock_client_factory(lambda r: httpx.Response(200))):
+            loop1 = asyncio.new_event_loop()
+            loop2 = asyncio.new_event_loop()
+            try:
+                client1 = loop1.run_until_complete(get_client())
+                client2 = loop2.run_until_complete(get_client())
+                assert client1 is not client2
+
+                close_loop_http_clients(loop1)
+                assert client1.is_closed
+                assert not client2.is_closed
+                close_loop_http_clients(loop2)
+            finally:
+                loop1.close()
+                loop2.close()
+
+    @pytest.mark.asyncio
+    async def test_retry_on_status(self):
+        """测试429/503响应按退避策略重试"""
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(503 if len(calls) < 3 else 200, json={"ok": True})
+
+        with patch.object(http_client, "_create_client", side_effect=_mock_client_factory(handler)):
+            client = get_http_client("retry-status", retries=2, backoff=0)
+            response = await client.post("https://api.example.com/v1/chat", json={})
+            assert response.status_code == 200
+            assert len(calls) == 3
+            await aclose_http_clients()
+
+    @pytest.mark.asyncio
+    async def test_retry_exhausted_returns_last_response(self):
+        """测试重试次数用完后返回最后一次响应"""
+        with patch.object(http_client, "_create_client", side_effect=_mock_client_factory(lambda r: httpx.Response(429))):
+            client = get_http_client("retry-exhausted", retries=1, backoff=0)
+            response = await client.get("https://api.example.com/")
+            assert response.status_code == 429
+            await aclose_http_clients()
+
+    @pytest.mark.asyncio
+    async def test_transport_error_only_retried_for_idempotent(self):
+        """测试网络错误只对幂等方法重试"""
+        calls = []
+
+        def handler(request):
+            calls.append(request.method)
+            raise httpx.ReadTimeout("timeout", request=request)
+
+        with patch.object(http_client, "_create_client", side_effect=_mock_client_factory(handler)):
+            client = get_http_client("retry-transport", retries=2, backoff=0)
+            with pytest.raises(httpx.ReadTimeout):
+                await client.post("https://api.example.com/")
+            assert calls == ["POST"]
+
+            with pytest.raises(httpx.ReadTimeout):
+                await client.get("https://api.example.com/")
+            assert calls == ["POST", "GET", "GET", "GET"]
+            await aclose_http_clients()
+
+    @pytest.mark.asyncio
+    async def test_gateway_error_only_retried_for_idempotent(self):
+        """测试502/504只对幂等方法重试，POST不重复发送"""
+        calls = []
+
+        def handler(request):
+            calls.append(request.method)
+            return httpx.Response(504)
+
+        with patch.object(http_client, "_create_client", side_effect=_mock_client_factory(handler)):
+            client = get_http_client("retry-gateway", retries=2, backoff=0)
+            response = await client.post("https://api.example.com/v1/chat", json={})
+            assert response.status_code == 504
+            assert calls == ["POST"]
+
+            await client.get("https://api.example.com/")
+            assert calls == ["POST", "GET", "GET", "GET"]
+            await aclose_http_clients()
+
+    @pytest.mark.asyncio
+    async def test_connect_error_retried_for_post(self):
+        """测试连接失败（请求未发出）时POST也重试"""
+        calls = []
+
+        def handler(request):
+            calls.append(request.method)
+            if len(calls) < 2:
+                raise httpx.ConnectError("refused", request=request)
+            return httpx.Response(200)
+
+        with patch.object(http_client, "_create_client", side_effect=_mock_client_factory(handler)):
+            client = get_http_client("retry-connect", retries=2, backoff=0)
+            response = await client.post("https://api.example.com/v1/chat", json={})
+            assert response.status_code == 200
+            assert calls == ["POST", "POST"]
+            await aclose_http_clients()
+
+    @pytest.mark.asyncio
+    async def test_default_headers_merged(self):
+        """测试默认请求头与单次请求头合并"""
+        seen = {}
+
+        def handler(request):
+            seen.update(request.headers)
+            return httpx.Response(200)
+
+        with patch.object(http_client, "_create_client", side_effect=_mock_client_factory(handler)):
+            async with get_http_client("headers", headers={"User-Agent": "test-agent"}) as client:
+                await client.get("https://api.example.com/", headers={"X-Extra": "1"})
+            assert seen["user-agent"] == "test-agent"
+            assert seen["x-extra"] == "1"
+            await aclose_http_clients()
@@ -0,0 +1,69 @@
+"""
+多模式关键词匹配单元测试
+"""
+import random
+
+from app.models.product import LiveRoom
+from app.services.hotspot.room_scores import get_room_matcher
+from app.utils.keyword_matcher import (
+    KeywordMatcher,
+    compile_keyword_matcher,
+    split_keyword_rules,
+)
+
+
+class TestKeywordMatcher:
+    """Aho-Corasick匹配器测试"""
+
+    def test_overlapping_patterns(self):
+        """测试重叠、嵌套的关键词全部命中"""
+        matcher = KeywordMatcher({"include": ["he", "she", "his", "hers"]})
+        assert matcher.match("USHERS") == {"include": {"he", "she", "hers"}}
+        assert matcher.match("ahishers")["include"] == {"his", "she", "he", "hers"}
+        assert matcher.match("xyz") == {}
+
+    def test_multiple_categories(self):
+        """测试一次扫描返回多个类别的命中，同一关键词可属于多个类别"""
+        matcher = KeywordMatcher({
+            "include": ["连衣裙", "夏装", "女装"],
+            "category": ["女装", ""],
+            "exclude": ["家电"],
+        })
+        assert matcher.pattern_counts == {"include": 3, "category": 1, "exclude": 1}
+
+        hits = matcher.match("夏季女装连衣裙推荐")
+        assert hits == {"include": {"女装", "连衣裙"}, "category": {"女装"}}
+        assert matcher.hit_ratio(hits, "include") == 2 / 3
+        assert matcher.hit_ratio(hits, "exclude") == 0.0
+        assert matcher.match_many(["家电促销", ""]) == [{"exclude": {"家电"}}, {}]
+
+    def test_matches_naive_substring_scan(self):
+        """测试与逐个子串查找的结果一致"""
+        rng = random.Random(7)
+        alphabet = "abcab衣裙"
+        keywords = {"".join(rng.choice(alphabet) for _ in range(rng.randint(1, 4))) for _ in range(200)}
+        matcher = KeywordMatcher({"include": keywords})
+        for _ in range(50):
+            text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 40)))
+            expected = {kw for kw in keywords if kw in text}
+            assert matcher.match(text).get("include", set()) == expected
+
+    def test_compile_cached(self):
+        """测试相同关键词配置只编译一次（与顺序、大小写无关）"""
+        first = compile_keyword_matcher({"include": ["A", "b"], "exclude": ["c"]})
+        second = compile_keyword_matcher({"exclude": ["c"], "include": ["b", "a"]})
+        assert first is second
+
+    def test_split_keyword_rules(self):
+        """测试按+/!标记拆分关键词"""
+        assert split_keyword_rules([" +必须 ", "!过滤", "普通"]) == {
+            "required": ["必须"], "exclude": ["过滤"], "include": ["普通"]
+        }
+
+    def test_room_matcher(self):
+        """测试直播间匹配器包含关键词、类目和不相关关键词"""
+        room = LiveRoom(id="room-1", name="时尚真惠选", category="女装、 配饰", keywords=["连衣裙"])
+        hits = get_room_matcher(room).match("北欧风沙发与配饰")
+        assert hits["category"] == {"配饰"}
+        assert {"北欧", "沙发"} <= hits["exclude"]
+        assert "include" not in hits
@@ -0,0 +1,107 @@
+"""
+直播间画像缓存单元测试
+"""
+import json
+import os
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.core.config import settings
+from app.models.product import LiveRoom
+from app.services.config import live_room_config
+from app.services.config.live_room_config import LiveRoomConfigService
+from app.services.data.service import DataService
+
+
+class TestLiveRoomProfileCache:
+    """直播间画像缓存测试"""
+
+    @pytest.fixture
+    def config_service(self, tmp_path):
+        live_room_config.invalidate_live_room_profile()
+        service = LiveRoomConfigService(config_dir=str(tmp_path))
+        service.save_live_room_config("测试直播间", {
+            "basic_info": {"name": "测试直播间", "category": "女装"},
+            "keywords": [" 连衣裙 ", "Summer", "连衣裙"],
+            "product_categories": {"primary": ["女装"], "secondary": []},
+        })
+        yield service
+        live_room_config.invalidate_live_room_profile()
+
+    def _write_config(self, service, category):
+        config_file = service.config_dir / "测试直播间.json"
+        config_file.write_text(json.dumps({
+            "basic_info": {"name": "测试直播间", "category": category},
+            "keywords": ["连衣裙"],
+        }, ensure_ascii=False), encoding="utf-8")
+        stat = config_file.stat()
+        os.utime(config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    def test_entry_cached_with_derived_artifacts(self, config_service):
+        """测试画像文本、类目和归一化关键词只构建一次"""
+        with patch.object(config_service, "load_live_room_config", wraps=config_service.load_live_room_config) as load:
+            entry = config_service.get_live_room_entry("测试直播间")
+            profile = config_service.get_live_room_profile("测试直播间")
+
+        assert load.call_count == 1
+        assert profile == entry["profile_text"]
+        assert "主营类目：女装" in profile
+        assert entry["category"] == "女装"
+        assert entry["keywords"] == frozenset({"连衣裙", "summer", "女装"})
+
+    def test_reload_on_mtime_change(self, config_service):
+        """测试配置文件mtime变化时重新加载，检查间隔内不访问文件"""
+        config_service.get_live_room_entry("测试直播间")
+        self._write_config(config_service, "童装")
+
+        with patch.object(settings, "LIVE_ROOM_PROFILE_CHECK_INTERVAL", 3600):
+            assert config_service.get_live_room_entry("测试直播间")["category"] == "女装"
+        with patch.object(settings, "LIVE_ROOM_PROFILE_CHECK_INTERVAL", 0):
+            assert config_service.get_live_room_entry("测试直播间")["category"] == "童装"
+
+    def test_save_invalidates(self, config_service):
+        """测试保存配置后缓存失效"""
+        config_service.get_live_room_entry("测试直播间")
+        config_service.save_live_room_config("测试直播间", {"basic_info": {"category": "男装"}})
+        assert config_service.get_live_room_entry("测试直播间")["category"] == "男装"
+
+    async def test_embedding_computed_once(self, config_service):
+        """测试直播间embedding每个画像版本只计算一次"""
+        client = MagicMock()
+        client.get_embedding = AsyncMock(return_value=[0.1, 0.2])
+
+        assert await config_service.get_live_room_embedding("测试直播间", client) == [0.1, 0.2]
+        assert await config_service.get_live_room_embedding("测试直播间", client) == [0.1, 0.2]
+        client.get_embedding.assert_awaited_once()
+
+        live_room_config.invalidate_live_room_profile("测试直播间")
+        await config_service.get_live_room_embedding("测试直播间", client)
+        assert client.get_embedding.await_count == 2
+
+    def test_update_live_room_invalidates(self, config_service, db_session):
+        """测试DataService更新直播间时按新旧名称失效画像缓存"""
+        service = DataService()
+        room = service.create_live_room(db_session, {"name": "测试直播间", "category": "女装"})
+        config_service.get_live_room_entry("测试直播间")
+        assert any(key[1] == "测试直播间" for key in live_room_config._profile_cache)
+
+        service.update_live_room(db_session, room.id, {"name": "新直播间"})
+
+        assert not any(key[1] == "测试直播间" for key in live_room_config._profile_cache)
+
+    def test_reload_on_db_update_from_other_process(self, config_service, db_session):
+        """测试其他进程更新数据库中的直播间（本进程缓存未失效、配置文件mtime不变）时，检查间隔到期后重新加载"""
+        room = DataService().create_live_room(db_session, {"name": "测试直播间", "category": "女装"})
+        with patch.object(live_room_config, "SessionLocal", return_value=db_session), \
+             patch.object(config_service, "_config_mtime", return_value=0), \
+             patch.object(settings, "LIVE_ROOM_PROFILE_CHECK_INTERVAL", 0):
+            config_service.get_live_room_entry("测试直播间")
+            self._write_config(config_service, "童装")
+            assert config_service.get_live_room_entry("测试直播间")["category"] == "女装"
+
+            # 模拟API进程更新直播间：只修改数据库，不调用invalidate_live_room_profile
+            db_session.query(LiveRoom).filter(LiveRoom.id == room.id).update({"updated_at": datetime(2030, 1, 1)})
+            db_session.commit()
+            assert config_service.get_live_room_entry("测试直播间")["category"] == "童装"
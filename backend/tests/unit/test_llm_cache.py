@@ -0,0 +1,108 @@
+"""
+LLM响应缓存单元测试
+"""
+import uuid
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.utils.cache import LayeredCache
+from app.utils.deepseek import DeepSeekClient, get_llm_cache_stats
+
+
+def _mock_http_client(result):
+    """构造返回固定响应的共享HTTP客户端"""
+    response = MagicMock()
+    response.json.return_value = result
+    response.raise_for_status.return_value = None
+    client = MagicMock()
+    client.__aenter__ = AsyncMock(return_value=client)
+    client.__aexit__ = AsyncMock(return_value=None)
+    client.post = AsyncMock(return_value=response)
+    return client
+
+
+class TestDeepSeekClientCache:
+    """DeepSeekClient响应缓存测试"""
+
+    @pytest.fixture
+    def llm_result(self):
+        return {
+            "choices": [{"message": {"content": "分析结果"}}],
+            "usage": {"prompt_tokens": 100, "completion_tokens": 50, "total_tokens": 150}
+        }
+
+    def _client(self, cache_ttl=None):
+        client = DeepSeekClient(api_key="sk-test", cache_ttl=cache_ttl)
+        client.cache = LayeredCache(f"test-llm-{uuid.uuid4()}", use_redis=False)
+        return client
+
+    @pytest.mark.asyncio
+    async def test_same_request_hits_cache(self, llm_result):
+        """测试相同指纹的请求只调用一次API，并统计节省的token"""
+        client = self._client()
+        http_client = _mock_http_client(llm_result)
+        before = get_llm_cache_stats()["tokens_saved"]
+
+        with patch("app.utils.deepseek.get_http_client", return_value=http_client):
+            first = await client.generate("提示词", system_prompt="系统", temperature=0.3, max_tokens=100)
+            second = await client.generate("提示词", system_prompt="系统", temperature=0.3, max_tokens=100)
+
+        assert http_client.post.await_count == 1
+        assert first == second
+        assert client.cache.get_stats()["hits"] == 1
+        assert get_llm_cache_stats()["tokens_saved"] - before == 150
+
+    @pytest.mark.asyncio
+    async def test_different_params_miss_cache(self, llm_result):
+        """测试temperature、max_tokens或系统提示词不同时不命中缓存"""
+        client = self._client()
+        http_client = _mock_http_client(llm_result)
+
+        with patch("app.utils.deepseek.get_http_client", return_value=http_client):
+            await client.generate("提示词", temperature=0.3, max_tokens=100)
+            await client.generate("提示词", temperature=0.7, max_tokens=100)
+            await client.generate("提示词", temperature=0.3, max_tokens=200)
+            await client.generate("提示词", system_prompt="系统", temperature=0.3, max_tokens=100)
+
+        assert http_client.post.await_count == 4
+
+    @pytest.mark.asyncio
+    async def test_cache_opt_out(self, llm_result):
+        """测试cache_ttl=0或use_cache=False时不使用缓存"""
+        http_client = _mock_http_client(llm_result)
+
+        with patch("app.utils.deepseek.get_http_client", return_value=http_client):
+            no_cache_client = self._client(cache_ttl=0)
+            await no_cache_client.generate("提示词")
+            await no_cache_client.generate("提示词")
+
+            client = self._client()
+            await client.generate("提示词", use_cache=False)
+            await client.generate("提示词", use_cache=False)
+
+        assert http_client.post.await_count == 4
+
+    @pytest.mark.asyncio
+    async def test_cached_result_is_copy(self, llm_result):
+        """测试修改返回结果不影响缓存"""
+        client = self._client()
+        http_client = _mock_http_client(llm_result)
+
+        with patch("app.utils.deepseek.get_http_client", return_value=http_client):
+            await client.generate("提示词")
+            cached = await client.generate("提示词")
+            cached["choices"][0]["message"]["content"] = "被修改"
+            again = await client.generate("提示词")
+
+        assert again["choices"][0]["message"]["content"] == "分析结果"
+
+    def test_agent_cache_ttl(self):
+        """测试各Agent的缓存配置，脚本生成不缓存"""
+        from app.agents.script_generation_agent import ScriptGenerationAgent
+        from app.agents.relevance_analysis_agent import RelevanceAnalysisAgent
+
+        assert ScriptGenerationAgent().llm_client.cache_ttl == 0
+        assert RelevanceAnalysisAgent().llm_client.cache_ttl > 0
+
+        with patch("app.agents.base.settings.LLM_CACHE_AGENT_TTLS", {"RelevanceAnalysisAgent": 60}):
+            assert RelevanceAnalysisAgent().llm_client.cache_ttl == 60
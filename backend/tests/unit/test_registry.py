@@ -0,0 +1,105 @@
+"""
+进程级组件注册表单元测试
+"""
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from app.core.registry import ComponentRegistry
+
+
+class TestComponentRegistry:
+    """组件注册表测试"""
+
+    def test_get_creates_once_across_threads(self):
+        """测试并发获取时组件只创建一次"""
+        registry = ComponentRegistry()
+        created = []
+
+        def factory():
+            time.sleep(0.05)
+            created.append(object())
+            return created[-1]
+
+        registry.register("slow", factory)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(registry.get("slow"))) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(created) == 1
+        assert all(r is created[0] for r in results)
+
+    def test_nested_factory(self):
+        """测试工厂函数可以从注册表获取其他组件"""
+        registry = ComponentRegistry()
+        registry.register("client", lambda: {"name": "client"})
+        registry.register("service", lambda: {"client": registry.get("client")})
+
+        assert registry.get("service")["client"] is registry.get("client")
+
+    def test_warmup_and_health(self):
+        """测试预热失败不影响其他组件，健康状态反映创建结果和健康检查"""
+        registry = ComponentRegistry()
+
+        def broken():
+            raise RuntimeError("boom")
+
+        registry.register("ok", lambda: 1)
+        registry.register("broken", broken)
+        registry.register("unhealthy", lambda: 2, health_check=lambda instance: False)
+        registry.register("lazy", lambda: 3)
+
+        assert registry.warmup(["ok", "broken", "unhealthy"]) == {"ok": True, "broken": False, "unhealthy": True}
+
+        health = registry.health()
+        assert health["ok"]["status"] == "ready"
+        assert health["broken"] == {"status": "error", "error": "boom"}
+        assert health["unhealthy"]["status"] == "unhealthy"
+        assert health["lazy"] == {"status": "not_initialized"}
+
+        with pytest.raises(KeyError):
+            registry.get("missing")
+
+    def test_reset(self):
+        """测试reset后重新创建实例"""
+        registry = ComponentRegistry()
+        registry.register("item", object)
+        first = registry.get("item")
+        registry.reset(["item"])
+        assert registry.get("item") is not first
+
+    def test_agent_factories_return_shared_instance(self):
+        """测试get_*_agent返回进程级共享实例"""
+        from app.agents import get_content_analysis_agent, get_relevance_analysis_agent
+        from app.core.registry import get_hotspot_service
+
+        assert get_content_analysis_agent() is get_content_analysis_agent()
+        assert get_hotspot_service().relevance_agent is get_relevance_analysis_agent()
+
+    def test_worker_init_warmup_does_not_block(self):
+        """测试worker子进程初始化信号立即返回（预热在后台线程执行，不拖延WORKER_UP）"""
+        from app.celery_app import warmup_components_on_init
+        from app.core.config import settings
+        from app.core.registry import registry
+
+        warmed = threading.Event()
+
+        def slow_warmup():
+            time.sleep(0.5)
+            warmed.set()
+
+        with patch.object(settings, "REGISTRY_WARMUP_ON_STARTUP", True), \
+             patch.object(registry, "warmup", side_effect=slow_warmup):
+            start = time.perf_counter()
+            thread = warmup_components_on_init()
+            elapsed = time.perf_counter() - start
+
+            assert elapsed < 0.1
+            assert not warmed.is_set()
+            thread.join(timeout=5)
+        assert warmed.is_set()
@@ -0,0 +1,131 @@
+"""
+关联度级联筛选单元测试
+"""
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.core.config import settings
+from app.models.hotspot import Hotspot
+from app.models.product import LiveRoom
+from app.services.hotspot import cascade
+from app.services.hotspot.cascade import lexical_similarity, run_relevance_cascade
+from app.services.hotspot.room_scores import get_room_matcher
+from app.services.hotspot.service import HotspotMonitorService
+
+
+def _scorer(score=0.6):
+    async def llm_scorer(items):
+        return [{"relevance_score": score, "reason": "llm"} for _ in items]
+    return AsyncMock(side_effect=llm_scorer)
+
+
+def _embedding_client(vectors):
+    client = MagicMock()
+    client.get_embeddings = AsyncMock(return_value=vectors)
+    return client
+
+
+class TestRelevanceCascade:
+    """级联筛选测试"""
+
+    @pytest.fixture
+    def room_matcher(self):
+        room = LiveRoom(id="room-1", name="时尚真惠选", category="女装", keywords=["连衣裙"])
+        return get_room_matcher(room)
+
+    async def test_rule_stage_rejects(self, room_matcher):
+        """测试规则阶段拒绝不相关关键词、低电商适配性和无关键词命中的热点"""
+        hotspots = [
+            {"title": "女装沙发套装"},
+            {"title": "连衣裙", "content_analysis": {"ecommerce_fit": {"score": 0.05}}},
+            {"title": "今日天气"},
+            {"title": "夏季连衣裙"},
+        ]
+        scorer = _scorer()
+        with patch.object(settings, "RELEVANCE_CASCADE_USE_EMBEDDING", False):
+            results, stats = await run_relevance_cascade(
+                hotspots, "女装直播间", scorer, matcher=room_matcher, require_keyword_hit=True
+            )
+
+        assert [r["decision"] for r in results] == ["reject", "reject", "reject", "uncertain"]
+        assert [r["stage"] for r in results] == ["rule", "rule", "rule", "llm"]
+        assert results[0]["relevance_score"] == 0.0
+        assert stats["rule"] == {**stats["rule"], "rejected": 3, "passed": 1}
+        scorer.assert_awaited_once()
+        assert scorer.await_args.args[0] == [hotspots[3]]
+
+    async def test_rule_stage_uses_stored_analysis(self, db_session, room_matcher):
+        """测试新抓取的热点没有content_analysis时，按URL使用数据库中已保存的电商适配性"""
+        db_session.add(Hotspot(
+            id="stored-1", title="连衣裙", url="https://example.com/stored", platform="douyin",
+            content_analysis={"ecommerce_fit": {"score": 0.05}}
+        ))
+        db_session.commit()
+        hotspots = [
+            {"title": "连衣裙", "url": "https://example.com/stored"},
+            {"title": "夏季连衣裙", "url": "https://example.com/new"},
+        ]
+
+        stored = HotspotMonitorService(use_agent=False)._stored_content_analyses(db_session, hotspots)
+        assert list(stored) == ["https://example.com/stored"]
+
+        with patch.object(settings, "RELEVANCE_CASCADE_USE_EMBEDDING", False):
+            results, _ = await run_relevance_cascade(
+                hotspots, "女装直播间", _scorer(), matcher=room_matcher, stored_analyses=stored
+            )
+        assert [r["decision"] for r in results] == ["reject", "uncertain"]
+        assert "电商适配性" in results[0]["reason"]
+
+    async def test_similarity_stage(self):
+        """测试embedding相似度低的拒绝、高的直接采纳，只有中间区间调用LLM，结果保持输入顺序"""
+        hotspots = [{"title": "低"}, {"title": "中"}, {"title": "高"}]
+        client = _embedding_client([[1.0, 0.0], [0.0, 1.0], [0.6, 0.8], [1.0, 0.05]])
+        scorer = _scorer(0.5)
+
+        results, stats = await run_relevance_cascade(hotspots, "目标", scorer, embedding_client=client)
+
+        assert [r["decision"] for r in results] == ["reject", "uncertain", "accept"]
+        assert results[1]["relevance_score"] == 0.5
+        assert results[2]["relevance_score"] > 0.99
+        assert stats["similarity"]["method"] == "embedding"
+        assert (stats["similarity"]["rejected"], stats["similarity"]["accepted"]) == (1, 1)
+        assert scorer.await_args.args[0] == [hotspots[1]]
+        client.get_embeddings.assert_awaited_once()
+
+    async def test_keyword_hit_not_rejected_by_similarity(self, room_matcher):
+        """测试有关键词命中的热点不会因为相似度低被拒绝"""
+        client = _embedding_client([[1.0, 0.0], [0.0, 1.0]])
+        scorer = _scorer()
+
+        results, _ = await run_relevance_cascade(
+            [{"title": "连衣裙"}], "目标", scorer, matcher=room_matcher, embedding_client=client
+        )
+
+        assert results[0]["decision"] == "uncertain"
+
+    async def test_embedding_unavailable_falls_back_to_lexical(self):
+        """测试embedding不可用时使用字符相似度（默认不拒绝）"""
+        client = _embedding_client([None, None])
+        scorer = _scorer()
+
+        results, stats = await run_relevance_cascade([{"title": "热点"}], "目标", scorer, embedding_client=client)
+
+        assert results[0]["decision"] == "uncertain"
+        assert stats["similarity"]["method"] == "lexical"
+
+    async def test_cumulative_stats(self):
+        """测试累计统计包含各阶段计数"""
+        before = cascade.get_cascade_stats()
+        with patch.object(settings, "RELEVANCE_CASCADE_USE_EMBEDDING", False):
+            await run_relevance_cascade([{"title": "a"}, {"title": "b"}], "目标", _scorer(None))
+        after = cascade.get_cascade_stats()
+
+        assert after["total"] - before["total"] == 2
+        assert after["llm"]["failed"] - before["llm"]["failed"] == 2
+
+    def test_lexical_similarity(self):
+        """测试字符二元组相似度"""
+        assert lexical_similarity("夏季连衣裙", "夏季连衣裙") == pytest.approx(1.0)
+        assert lexical_similarity("夏季连衣裙", "冬季羽绒服") == 0.0
+        assert 0 < lexical_similarity("夏季连衣裙推荐", "连衣裙") < 1
@@ -0,0 +1,157 @@
+"""
+热点-直播间匹配度预计算单元测试
+"""
+import uuid
+import pytest
+from datetime import datetime
+from unittest.mock import patch
+
+from app.models.hotspot import Hotspot, HotspotRoomScore
+from app.models.product import LiveRoom
+from app.services.data.service import DataService
+from app.services.hotspot import room_scores
+from app.services.hotspot.room_scores import (
+    calculate_room_match_score,
+    ensure_room_scores,
+    get_room_top_hotspots,
+    refresh_room_scores,
+)
+from app.services.hotspot.service import HotspotMonitorService
+
+
+def _hotspot(title, url, tags=None, match_score=None, content_analysis=None):
+    return Hotspot(
+        id=str(uuid.uuid4()),
+        title=title,
+        url=url,
+        platform="douyin",
+        tags=tags,
+        match_score=match_score,
+        content_analysis=content_analysis,
+        created_at=datetime.now(),
+        updated_at=datetime.now()
+    )
+
+
+class TestRoomScores:
+    """预计算匹配度测试"""
+
+    @pytest.fixture
+    def live_room(self, db_session):
+        room = LiveRoom(
+            id=str(uuid.uuid4()),
+            name="时尚真惠选",
+            category="女装",
+            keywords=["连衣裙", "穿搭"],
+            created_at=datetime.now(),
+            updated_at=datetime.now()
+        )
+        db_session.add(room)
+        db_session.commit()
+        return room
+
+    def test_calculate_room_match_score(self, live_room):
+        """测试关键词、类目、电商适配性和排除关键词的计算"""
+        matched = _hotspot("秋季连衣裙穿搭", "https://example.com/1", tags=["女装"])
+        assert calculate_room_match_score(matched, live_room) > 0.3
+
+        excluded = _hotspot("北欧风连衣裙沙发", "https://example.com/2")
+        assert calculate_room_match_score(excluded, live_room) == 0.0
+
+        unrelated = _hotspot("股市行情", "https://example.com/3")
+        assert calculate_room_match_score(unrelated, live_room) == 0.0
+
+        llm_only = _hotspot(
+            "明星机场街拍",
+            "https://example.com/4",
+            content_analysis={"ecommerce_fit": {"score": 0.9, "applicable_categories": ["女装"]}}
+        )
+        score = calculate_room_match_score(llm_only, live_room)
+        assert 0 < score <= 0.5
+
+    def test_refresh_and_top_hotspots(self, db_session, live_room):
+        """测试刷新后按匹配度读取Top N，按标题去重并排除测试URL"""
+        db_session.add_all([
+            _hotspot("连衣裙穿搭", "https://example.com/a", tags=["女装"]),
+            _hotspot("连衣裙穿搭", "https://example.com/b"),
+            _hotspot("连衣裙", "https://example.com/c"),
+            _hotspot("连衣裙穿搭女装", "https://test.com/d"),
+            _hotspot("股市行情", "https://example.com/e"),
+        ])
+        db_session.commit()
+
+        written = refresh_room_scores(db_session)
+        assert written == 3
+
+        top = get_room_top_hotspots(db_session, live_room.id, limit=10)
+        assert [h.url for h, _ in top] == ["https://example.com/a", "https://example.com/c"]
+        assert top[0][1] >= top[1][1]
+
+        assert len(get_room_top_hotspots(db_session, live_room.id, limit=1)) == 1
+        assert get_room_top_hotspots(db_session, live_room.id, limit=10, min_score=1.1) == []
+
+    def test_refresh_compiles_matcher_once_per_room(self, db_session, live_room):
+        """测试全量刷新时每个直播间的匹配器只获取一次，不随热点数增长"""
+        db_session.add_all([_hotspot(f"连衣裙穿搭{i}", f"https://example.com/m{i}") for i in range(5)])
+        db_session.commit()
+
+        with patch(
+            "app.services.hotspot.room_scores.get_room_matcher",
+            wraps=room_scores.get_room_matcher
+        ) as get_matcher:
+            assert refresh_room_scores(db_session) == 5
+
+        assert get_matcher.call_count == 1
+
+    def test_refresh_is_incremental(self, db_session, live_room):
+        """测试只刷新指定热点时不影响其他热点的匹配度"""
+        first = _hotspot("连衣裙", "https://example.com/first")
+        second = _hotspot("穿搭", "https://example.com/second")
+        db_session.add_all([first, second])
+        db_session.commit()
+        refresh_room_scores(db_session)
+
+        second.title = "股市行情"
+        db_session.commit()
+        refresh_room_scores(db_session, hotspot_ids=[second.id])
+
+        rows = db_session.query(HotspotRoomScore).filter(HotspotRoomScore.live_room_id == live_room.id).all()
+        assert [row.hotspot_id for row in rows] == [first.id]
+
+    def test_save_hotspots_and_room_update_refresh_scores(self, db_session, live_room):
+        """测试保存热点、修改直播间配置时刷新匹配度"""
+        HotspotMonitorService().save_hotspots(db_session, [
+            {"title": "连衣裙穿搭", "url": "https://example.com/saved"},
+            {"title": "数码新品", "url": "https://example.com/digital"},
+        ], "douyin")
+        top = get_room_top_hotspots(db_session, live_room.id, limit=10)
+        assert [h.url for h, _ in top] == ["https://example.com/saved"]
+
+        DataService().update_live_room(db_session, live_room.id, {"name": "数码直播间", "keywords": ["数码"], "category": "3C"})
+        top = get_room_top_hotspots(db_session, live_room.id, limit=10)
+        assert [h.url for h, _ in top] == ["https://example.com/digital"]
+
+        DataService().delete_live_room(db_session, live_room.id)
+        assert db_session.query(HotspotRoomScore).count() == 0
+
+    def test_ensure_room_scores(self, db_session, live_room):
+        """测试没有匹配度数据的直播间会补算一次"""
+        db_session.add(_hotspot("连衣裙", "https://example.com/lazy"))
+        db_session.commit()
+        assert db_session.query(HotspotRoomScore).count() == 0
+
+        ensure_room_scores(db_session, [live_room.id])
+        assert db_session.query(HotspotRoomScore).count() == 1
+
+    def test_ensure_room_scores_skips_rooms_without_matches(self, db_session, live_room):
+        """测试全量计算过但没有任何匹配的直播间不会在读取时重复计算"""
+        db_session.add(_hotspot("股市行情", "https://example.com/unmatched"))
+        db_session.commit()
+
+        ensure_room_scores(db_session, [live_room.id])
+        assert db_session.query(HotspotRoomScore).count() == 0
+        assert live_room.room_scores_refreshed_at is not None
+
+        with patch("app.services.hotspot.room_scores.refresh_room_scores") as mock_refresh:
+            ensure_room_scores(db_session, [live_room.id])
+        mock_refresh.assert_not_called()
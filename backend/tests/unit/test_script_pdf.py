@@ -0,0 +1,74 @@
+"""
+脚本PDF导出单元测试
+"""
+import io
+import uuid
+import zipfile
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+
+from app.services.script import pdf
+from app.utils.cache import LayeredCache
+
+
+def _payload(script_id: str = "script-1", updated_at: datetime = None, title: str = "Test Script") -> dict:
+    updated_at = updated_at or datetime(2025, 1, 1, 12, 0, 0)
+    return {
+        "script_id": script_id,
+        "cache_key": pdf.pdf_cache_key(script_id, updated_at),
+        "title": title,
+        "video_info": {"title": title, "duration": 10},
+        "product_name": "Product",
+        "product_category": "Category",
+        "has_hotspot": True,
+        "hotspot_title": "Hotspot",
+        "hotspot_platform": "douyin",
+        "script_content": "line 1\nline 2",
+        "shot_list": [{"time_range": "0-3s", "shot_type": "close", "content": "x" * 80}],
+        "production_notes": {"shooting_tips": ["tip"], "key_points": ["point"]},
+    }
+
+
+class TestScriptPdf:
+    """脚本PDF渲染与缓存测试"""
+
+    @pytest.fixture(autouse=True)
+    def isolated_cache(self):
+        with patch.object(pdf, "_pdf_cache", LayeredCache(f"test-pdf-{uuid.uuid4()}", use_redis=False)):
+            yield
+
+    def test_render_script_pdf(self):
+        """测试渲染PDF，样式只构建一次"""
+        first = pdf.render_script_pdf(_payload())
+        second = pdf.render_script_pdf(_payload())
+        assert first.startswith(b"%PDF")
+        assert second.startswith(b"%PDF")
+        assert pdf._get_styles.cache_info().currsize == 1
+
+    @pytest.mark.asyncio
+    async def test_get_script_pdf_cached_by_updated_at(self):
+        """测试相同版本的脚本只渲染一次，更新时间变化后重新渲染"""
+        updated_at = datetime(2025, 1, 1, 12, 0, 0)
+        with patch.object(pdf, "render_script_pdf", wraps=pdf.render_script_pdf) as render:
+            first = await pdf.get_script_pdf(_payload(updated_at=updated_at))
+            second = await pdf.get_script_pdf(_payload(updated_at=updated_at))
+            assert first == second
+            assert render.call_count == 1
+
+            await pdf.get_script_pdf(_payload(updated_at=updated_at + timedelta(seconds=1)))
+            assert render.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_stream_scripts_zip(self):
+        """测试ZIP流包含每个脚本的PDF，重名文件自动区分"""
+        payloads = [_payload("script-aaaaaaaa"), _payload("script-bbbbbbbb"), _payload("script-cccccccc", title="Other")]
+        chunks = [chunk async for chunk in pdf.stream_scripts_zip(payloads)]
+
+        with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as archive:
+            names = archive.namelist()
+            assert len(names) == 3
+            assert len(set(names)) == 3
+            assert "脚本_Other.pdf" in names
+            assert all(archive.read(name).startswith(b"%PDF") for name in names)
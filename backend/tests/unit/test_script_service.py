@@ -306,6 +306,71 @@ class TestScriptGeneratorService:
         assert script.hotspot_id == sample_hotspot.id
         assert script.product_id == sample_product.id
     
+    def test_save_scripts_single_transaction(
+        self,
+        service: ScriptGeneratorService,
+        db_session,
+        sample_hotspot: Hotspot,
+        sample_product: Product
+    ):
+        """测试批量保存脚本只提交一次"""
+        scripts_data = [
+            {"video_info": {"title": f"测试视频{i}"}, "script_content": f"脚本{i}", "shot_list": []}
+            for i in range(3)
+        ]
+        
+        with patch.object(db_session, "commit", wraps=db_session.commit) as mock_commit:
+            scripts = service.save_scripts(
+                db_session,
+                sample_hotspot.id,
+                sample_product.id,
+                "",
+                scripts_data
+            )
+        
+        assert mock_commit.call_count == 1
+        assert [s.script_content for s in scripts] == ["脚本0", "脚本1", "脚本2"]
+        assert all(s.analysis_report_id is None for s in scripts)
+    
+    @pytest.mark.asyncio
+    async def test_generate_scripts_concurrently(
+        self,
+        service: ScriptGeneratorService,
+        sample_hotspot: Hotspot,
+        sample_product: Product
+    ):
+        """测试多个脚本并发生成，受并发数限制，失败的脚本被跳过"""
+        import asyncio
+        
+        running = 0
+        max_running = 0
+        
+        async def fake_generate_script(*args, script_index=1, total_scripts=5, **kwargs):
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            if script_index == 2:
+                raise ValueError("LLM调用失败")
+            return {"script_content": f"脚本{script_index}", "video_info": {"duration": 10}}
+        
+        progress = []
+        with patch("app.services.script.service.settings.SCRIPT_GENERATION_CONCURRENCY", 3), \
+             patch.object(service, "generate_script", side_effect=fake_generate_script):
+            results = await service.generate_scripts(
+                sample_hotspot,
+                sample_product,
+                script_count=5,
+                on_complete=lambda completed, index, error: progress.append((completed, index, error is None))
+            )
+        
+        assert max_running == 3
+        assert [index for index, _ in results] == [1, 3, 4, 5]
+        assert all("shot_list" in data for _, data in results)
+        assert [completed for completed, _, _ in progress] == [1, 2, 3, 4, 5]
+        assert [index for _, index, ok in progress if not ok] == [2]
+    
     def test_get_optimization_suggestions(
         self,
         service: ScriptGeneratorService,
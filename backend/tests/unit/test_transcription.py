@@ -0,0 +1,84 @@
+"""
+语音转录服务单元测试
+"""
+import asyncio
+import threading
+import time
+import pytest
+from unittest.mock import patch
+
+from app.utils import transcription
+from app.utils.transcription import TranscriptionQueueFullError, TranscriptionService
+
+
+class TestTranscriptionService:
+    """转录服务测试（线程池模式，替换Whisper调用）"""
+
+    @pytest.mark.asyncio
+    async def test_transcribe(self):
+        """测试转录结果透传，并按模型大小调用"""
+        calls = []
+
+        def fake_transcribe(audio_path, model_name, language):
+            calls.append((audio_path, model_name, language))
+            return {"text": "你好", "segments": [], "language": language}
+
+        service = TranscriptionService(workers=1, use_processes=False)
+        with patch.object(transcription, "_transcribe_in_worker", side_effect=fake_transcribe):
+            result = await service.transcribe("/tmp/a.wav", model_name="tiny")
+        service.shutdown()
+
+        assert result["text"] == "你好"
+        assert calls == [("/tmp/a.wav", "tiny", "zh")]
+        assert service.pending == 0
+
+    @pytest.mark.asyncio
+    async def test_concurrency_limited_to_workers(self):
+        """测试同时执行的转录数不超过工作进程数"""
+        running = 0
+        max_running = 0
+        lock = threading.Lock()
+
+        def fake_transcribe(audio_path, model_name, language):
+            nonlocal running, max_running
+            with lock:
+                running += 1
+                max_running = max(max_running, running)
+            time.sleep(0.05)
+            with lock:
+                running -= 1
+            return {"text": audio_path, "segments": [], "language": language}
+
+        service = TranscriptionService(workers=2, max_pending=10, use_processes=False)
+        with patch.object(transcription, "_transcribe_in_worker", side_effect=fake_transcribe):
+            results = await asyncio.gather(*[service.transcribe(f"{i}.wav") for i in range(6)])
+        service.shutdown()
+
+        assert [r["text"] for r in results] == [f"{i}.wav" for i in range(6)]
+        assert max_running == 2
+
+    @pytest.mark.asyncio
+    async def test_backpressure_timeout(self):
+        """测试队列已满时等待超时报错"""
+        release = threading.Event()
+
+        def fake_transcribe(audio_path, model_name, language):
+            release.wait(5)
+            return {"text": "", "segments": [], "language": language}
+
+        service = TranscriptionService(workers=1, max_pending=0, queue_timeout=0.1, use_processes=False)
+        with patch.object(transcription, "_transcribe_in_worker", side_effect=fake_transcribe):
+            first = asyncio.ensure_future(service.transcribe("1.wav"))
+            await asyncio.sleep(0.05)
+            with pytest.raises(TranscriptionQueueFullError):
+                await service.transcribe("2.wav")
+            release.set()
+            await first
+        service.shutdown()
+        assert service.pending == 0
+
+    def test_daemon_process_falls_back_to_threads(self):
+        """测试守护进程中不使用进程池"""
+        with patch("app.utils.transcription.multiprocessing.current_process") as current_process:
+            current_process.return_value.daemon = True
+            assert TranscriptionService(use_processes=True).use_processes is False
@@ -0,0 +1,196 @@
+"""
+热点向量索引单元测试
+"""
+import multiprocessing
+import pytest
+import numpy as np
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, patch
+
+from app.models.hotspot import Hotspot
+from app.services.hotspot.vector_index import HotspotVectorIndex, sync_vector_index
+
+
+def _row_vector(worker: int, i: int) -> list:
+    """每行使用唯一的one-hot向量，便于校验ID与向量对应"""
+    vector = [0.0] * 64
+    vector[worker * 20 + i] = 1.0
+    return vector
+
+
+def _add_rows(index_dir: str, worker: int, count: int):
+    """子进程：各自持有一个索引实例，逐行写入"""
+    index = HotspotVectorIndex(index_dir=index_dir)
+    for i in range(count):
+        index.add([(f"w{worker}-{i}", _row_vector(worker, i), {})])
+
+
+class TestHotspotVectorIndex:
+    """热点向量索引测试"""
+
+    @pytest.fixture
+    def index(self, tmp_path):
+        """创建临时目录下的索引"""
+        return HotspotVectorIndex(index_dir=str(tmp_path / "vector_index"))
+
+    def test_empty_index(self, index: HotspotVectorIndex):
+        """测试空索引返回空结果"""
+        assert len(index) == 0
+        assert index.top_k([1.0, 0.0], k=5) == []
+
+    def test_top_k_order(self, index: HotspotVectorIndex):
+        """测试按余弦相似度排序"""
+        now = datetime.now().timestamp()
+        index.add([
+            ("a", [1.0, 0.0], {"platform": "douyin", "created_at": now}),
+            ("b", [0.0, 1.0], {"platform": "weibo", "created_at": now}),
+            ("c", [2.0, 1.0], {"platform": "douyin", "created_at": now}),
+        ])
+
+        result = index.top_k([1.0, 0.0], k=2)
+        assert [hotspot_id for hotspot_id, _ in result] == ["a", "c"]
+        assert result[0][1] == pytest.approx(1.0)
+
+    def test_top_k_filters(self, index: HotspotVectorIndex):
+        """测试平台、时间和排除ID过滤"""
+        now = datetime.now()
+        index.add([
+            ("old", [1.0, 0.0], {"platform": "douyin", "created_at": (now - timedelta(days=10)).timestamp()}),
+            ("weibo", [1.0, 0.1], {"platform": "weibo", "created_at": now.timestamp()}),
+            ("douyin", [1.0, 0.2], {"platform": "douyin", "created_at": now.timestamp()}),
+        ])
+
+        result = index.top_k([1.0, 0.0], k=10, filters={"platforms": ["douyin"]})
+        assert [hotspot_id for hotspot_id, _ in result] == ["old", "douyin"]
+
+        result = index.top_k([1.0, 0.0], k=10, filters={"min_created_at": now - timedelta(days=1)})
+        assert {hotspot_id for hotspot_id, _ in result} == {"weibo", "douyin"}
+
+        result = index.top_k([1.0, 0.0], k=10, filters={"exclude_ids": {"old", "weibo"}})
+        assert [hotspot_id for hotspot_id, _ in result] == ["douyin"]
+
+    def test_add_updates_existing_and_persists(self, index: HotspotVectorIndex):
+        """测试重复ID原地更新，并且可从磁盘重新加载"""
+        assert index.add([("a", [1.0, 0.0], {})]) == 1
+        assert index.add([("a", [0.0, 1.0], {}), ("b", [1.0, 0.0], {})]) == 1
+        assert len(index) == 2
+
+        reloaded = HotspotVectorIndex(index_dir=str(index.index_dir))
+        assert len(reloaded) == 2
+        assert reloaded.top_k([0.0, 1.0], k=1)[0][0] == "a"
+
+    def test_grow_and_compact(self, index: HotspotVectorIndex):
+        """测试超过初始容量时扩容，过期行被压缩删除"""
+        now = datetime.now().timestamp()
+        rng = np.random.default_rng(0)
+        items = [
+            (f"h{i}", rng.random(8).tolist(), {"created_at": now - (i % 2) * 86400 * 10})
+            for i in range(1500)
+        ]
+        assert index.add(items) == 1500
+        assert len(index) == 1500
+
+        removed = index.compact(min_created_at=now - 86400)
+        assert removed == 750
+        assert len(index) == 750
+        assert "h0" in index
+        assert "h1" not in index
+
+    def test_dimension_mismatch(self, index: HotspotVectorIndex):
+        """测试查询向量维度不一致时报错，写入维度不一致的向量时清空重建"""
+        index.add([("a", [1.0, 0.0], {})])
+        with pytest.raises(ValueError):
+            index.top_k([1.0, 0.0, 0.0])
+
+        assert index.add([("b", [1.0, 0.0, 0.0], {})]) == 1
+        assert "a" not in index
+        assert index.top_k([1.0, 0.0, 0.0], k=1)[0][0] == "b"
+
+    def test_model_change_rebuilds(self, index: HotspotVectorIndex):
+        """测试embedding模型记录在meta.json中，模型变化时清空重建"""
+        index.add([("a", [1.0, 0.0], {})], model="model-a")
+        assert HotspotVectorIndex(index_dir=str(index.index_dir)).model == "model-a"
+
+        index.add([("b", [0.0, 1.0], {})], model="model-b")
+        assert index.model == "model-b"
+        assert len(index) == 1 and "b" in index
+
+    def test_reader_maps_read_only(self, index: HotspotVectorIndex):
+        """测试读取方只读映射矩阵"""
+        index.add([("a", [1.0, 0.0], {})])
+        reader = HotspotVectorIndex(index_dir=str(index.index_dir))
+        assert reader.top_k([1.0, 0.0], k=1)[0][0] == "a"
+        assert reader._matrix.mode == "r"
+
+    def test_concurrent_writers_do_not_lose_rows(self, index: HotspotVectorIndex):
+        """测试多个进程同时写入同一索引时不丢行、ID与向量对应正确"""
+        context = multiprocessing.get_context("fork")
+        workers = [
+            context.Process(target=_add_rows, args=(str(index.index_dir), worker, 20))
+            for worker in range(3)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(timeout=60)
+            assert worker.exitcode == 0
+
+        reloaded = HotspotVectorIndex(index_dir=str(index.index_dir))
+        assert len(reloaded) == 60
+        for worker in range(3):
+            for i in range(20):
+                assert reloaded.top_k(_row_vector(worker, i), k=1)[0][0] == f"w{worker}-{i}"
+
+    @pytest.mark.asyncio
+    async def test_sync_vector_index_only_embeds_new(self, index: HotspotVectorIndex, db_session):
+        """测试同步时只为索引中不存在的热点计算embedding"""
+        for i in range(3):
+            db_session.add(Hotspot(
+                id=f"sync-{i}",
+                title=f"同步热点{i}",
+                url=f"https://test.com/sync/{i}",
+                platform="douyin",
+                tags=["测试"],
+                created_at=datetime.now(),
+                updated_at=datetime.now()
+            ))
+        db_session.commit()
+        index.add([("sync-0", [1.0, 0.0], {"created_at": datetime.now().timestamp()})])
+
+        with patch(
+            "app.utils.embedding.EmbeddingClient.get_embeddings",
+            new_callable=AsyncMock,
+            return_value=[[0.0, 1.0], [1.0, 1.0]]
+        ) as mock_embeddings:
+            result = await sync_vector_index(db_session, index)
+
+        assert mock_embeddings.await_count == 1
+        assert len(mock_embeddings.call_args[0][0]) == 2
+        assert result["added"] == 2
+        assert result["total"] == 3
+
+    @pytest.mark.asyncio
+    async def test_sync_rebuilds_after_model_change(self, index: HotspotVectorIndex, db_session):
+        """测试切换embedding模型后同步时按时间窗口全量重建"""
+        for i in range(2):
+            db_session.add(Hotspot(
+                id=f"rebuild-{i}",
+                title=f"重建热点{i}",
+                url=f"https://test.com/rebuild/{i}",
+                platform="douyin",
+                created_at=datetime.now(),
+                updated_at=datetime.now()
+            ))
+        db_session.commit()
+        index.add([("rebuild-0", [1.0, 0.0], {"created_at": datetime.now().timestamp()})], model="old-model")
+
+        with patch(
+            "app.utils.embedding.EmbeddingClient.get_embeddings",
+            new_callable=AsyncMock,
+            return_value=[[0.0, 1.0, 0.0], [1.0, 0.0, 0.0]]
+        ) as mock_embeddings:
+            result = await sync_vector_index(db_session, index, hotspot_ids=["rebuild-1"])
+
+        assert len(mock_embeddings.call_args[0][0]) == 2
+        assert result["total"] == 2
+        assert index.model not in (None, "old-model")
@@ -0,0 +1,94 @@
+"""
+本地视频分析器单元测试
+"""
+import asyncio
+import time
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from app.utils.video_analyzer_local import LocalVideoAnalyzer
+
+
+class TestLocalVideoAnalyzer:
+    """本地视频分析器阶段执行测试（替换实际的视频处理步骤）"""
+
+    @pytest.fixture
+    def video_file(self, tmp_path):
+        path = tmp_path / "video.mp4"
+        path.write_bytes(b"fake video")
+        return str(path)
+
+    @pytest.mark.asyncio
+    async def test_stages_run_concurrently(self, video_file):
+        """测试视频信息、场景检测、转录并发执行，并返回各阶段耗时"""
+        analyzer = LocalVideoAnalyzer()
+
+        def slow_info(path):
+            time.sleep(0.2)
+            return {"duration": 60.0, "fps": 30.0, "size": (720, 1280)}
+
+        def slow_scenes(path):
+            time.sleep(0.2)
+            return [{"shot_number": 1, "start_time": 0.0, "end_time": 60.0}]
+
+        async def slow_transcribe(path, model_name=None):
+            await asyncio.sleep(0.2)
+            return {"text": "大家好", "segments": [], "language": "zh"}
+
+        with patch.object(analyzer, "_get_video_info", side_effect=slow_info), \
+             patch.object(analyzer, "_detect_scenes", side_effect=slow_scenes), \
+             patch.object(analyzer, "_transcribe_audio", side_effect=slow_transcribe):
+            start = time.time()
+            result = await analyzer.analyze(video_file, {"download_video": False})
+            elapsed = time.time() - start
+
+        assert elapsed < 0.5
+        assert result["duration"] == 60.0
+        assert len(result["shot_table"]) == 1
+        assert result["transcript"] == "大家好"
+        assert set(result["stage_timings"]) == {"video_info", "scenes", "transcribe"}
+        assert all(status == "ok" for status in result["stage_status"].values())
+
+    @pytest.mark.asyncio
+    async def test_stage_timeout_returns_default(self, video_file):
+        """测试单个阶段超时时返回空结果，其他阶段不受影响"""
+        analyzer = LocalVideoAnalyzer()
+
+        async def hanging_transcribe(path, model_name=None):
+            await asyncio.sleep(5)
+
+        with patch.object(analyzer, "_get_video_info", return_value={"duration": 10.0, "fps": 25.0, "size": (1, 1)}), \
+             patch.object(analyzer, "_detect_scenes", return_value=[]), \
+             patch.object(analyzer, "_transcribe_audio", side_effect=hanging_transcribe):
+            result = await analyzer.analyze(
+                video_file,
+                {"download_video": False, "stage_timeouts": {"transcribe": 0.1}}
+            )
+
+        assert result["transcript"] == ""
+        assert result["duration"] == 10.0
+        assert result["stage_status"]["transcribe"] == "timeout"
+        assert result["stage_status"]["video_info"] == "ok"
+
+    @pytest.mark.asyncio
+    async def test_whisper_model_option_not_persisted(self, video_file):
+        """测试单次分析指定的whisper模型只用于本次转录，不修改共享分析器的设置"""
+        analyzer = LocalVideoAnalyzer(whisper_model="base")
+        transcribe = AsyncMock(return_value={"text": "", "segments": []})
+
+        with patch.object(analyzer, "_get_video_info", return_value={"duration": 10.0, "fps": 25.0, "size": (1, 1)}), \
+             patch.object(analyzer, "_detect_scenes", return_value=[]), \
+             patch.object(analyzer, "_transcribe_audio", transcribe):
+            await analyzer.analyze(video_file, {"download_video": False, "whisper_model": "large"})
+            await analyzer.analyze(video_file, {"download_video": False})
+
+        assert [call.args[1] for call in transcribe.await_args_list] == ["large", "base"]
+        assert analyzer.whisper_model_name == "base"
+
+    @pytest.mark.asyncio
+    async def test_download_failure_raises(self):
+        """测试视频下载失败时报错"""
+        analyzer = LocalVideoAnalyzer()
+        with patch.object(analyzer, "_download_video", new_callable=AsyncMock, return_value=None):
+            with pytest.raises(ValueError):
+                await analyzer.analyze("https://cdn.example.com/v.mp4")
@@ -0,0 +1,162 @@
+"""
+视频下载缓存单元测试
+"""
+import os
+import httpx
+import pytest
+from unittest.mock import patch
+
+from app.utils import http_client
+from app.utils.http_client import aclose_http_clients
+from app.utils.video_cache import VideoCache, VideoTooLargeError
+
+
+VIDEO_BYTES = bytes(range(256)) * 40
+
+
+class _FlakyStream(httpx.AsyncByteStream):
+    """发送部分数据后断开连接的响应体"""
+
+    def __init__(self, data: bytes, fail_after: int):
+        self.data = data
+        self.fail_after = fail_after
+
+    async def __aiter__(self):
+        yield self.data[:self.fail_after]
+        raise httpx.ReadError("connection reset")
+
+
+def _range_handler(calls, fail_first_after=None):
+    """支持Range请求的视频服务器，可选第一次请求中途断开"""
+    def handler(request):
+        calls.append(request.headers.get("range"))
+        range_header = request.headers.get("range")
+        if range_header:
+            start = int(range_header.split("=")[1].rstrip("-"))
+            body = VIDEO_BYTES[start:]
+            return httpx.Response(206, content=body, headers={"Content-Length": str(len(body))})
+        if fail_first_after is not None and len(calls) == 1:
+            return httpx.Response(200, stream=_FlakyStream(VIDEO_BYTES, fail_first_after))
+        return httpx.Response(200, content=VIDEO_BYTES, headers={"Content-Length": str(len(VIDEO_BYTES))})
+    return handler
+
+
+def _patch_transport(handler):
+    return patch.object(
+        http_client,
+        "_create_client",
+        side_effect=lambda proxy=None: httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+
+
+class TestVideoCache:
+    """视频缓存测试"""
+
+    @pytest.fixture
+    def cache(self, tmp_path):
+        return VideoCache(cache_dir=str(tmp_path / "videos"), max_bytes=10 ** 9, max_file_bytes=10 ** 6, chunk_size=1024)
+
+    @pytest.mark.asyncio
+    async def test_download_once_then_cached(self, cache: VideoCache):
+        """测试同一URL只下载一次，之后直接返回缓存文件"""
+        calls = []
+        with _patch_transport(_range_handler(calls)):
+            first = await cache.get_or_download("https://cdn.example.com/v/1.mp4?sign=abc")
+            second = await cache.get_or_download("https://cdn.example.com/v/1.mp4?sign=abc")
+            await aclose_http_clients()
+
+        assert first == second
+        assert first.endswith(".mp4")
+        assert len(calls) == 1
+        with open(first, "rb") as f:
+            assert f.read() == VIDEO_BYTES
+
+    @pytest.mark.asyncio
+    async def test_resume_after_interruption(self, cache: VideoCache):
+        """测试下载中断后用Range请求从已下载位置续传"""
+        calls = []
+        with _patch_transport(_range_handler(calls, fail_first_after=3072)):
+            path = await cache.get_or_download("https://cdn.example.com/v/2.mp4")
+            await aclose_http_clients()
+
+        assert calls == [None, "bytes=3072-"]
+        with open(path, "rb") as f:
+            assert f.read() == VIDEO_BYTES
+
+    @pytest.mark.asyncio
+    async def test_size_limit(self, tmp_path):
+        """测试超过单个视频大小上限时报错，不留下缓存文件"""
+        cache = VideoCache(cache_dir=str(tmp_path / "videos"), max_file_bytes=1000, chunk_size=256)
+        with _patch_transport(_range_handler([])):
+            with pytest.raises(VideoTooLargeError):
+                await cache.get_or_download("https://cdn.example.com/v/3.mp4")
+            await aclose_http_clients()
+
+        assert cache.get("https://cdn.example.com/v/3.mp4") is None
+
+    def test_lru_eviction(self, tmp_path):
+        """测试按总大小淘汰最久未使用的文件"""
+        cache = VideoCache(cache_dir=str(tmp_path / "videos"), max_bytes=250)
+        urls = [f"https://cdn.example.com/v/{i}.mp4" for i in range(3)]
+        for i, url in enumerate(urls):
+            path = cache._path_for(url)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(b"x" * 100)
+            os.utime(path, (1000 + i, 1000 + i))
+
+        # 访问最旧的文件，使其变为最近使用
+        assert cache.get(urls[0]) is not None
+
+        assert cache.evict() == 1
+        assert cache.get(urls[1]) is None
+        assert cache.get(urls[0]) is not None
+        assert cache.get(urls[2]) is not None
+        assert cache.total_bytes() == 200
+
+    def test_pinned_video_not_evicted(self, tmp_path):
+        """测试正在使用（pin住）的视频不被淘汰，包括其他进程pin住的视频"""
+        cache = VideoCache(cache_dir=str(tmp_path / "videos"), max_bytes=150)
+        urls = [f"https://cdn.example.com/pin/{i}.mp4" for i in range(3)]
+        paths = []
+        for i, url in enumerate(urls):
+            path = cache._path_for(url)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(b"x" * 100)
+            os.utime(path, (1000 + i, 1000 + i))
+            paths.append(str(path))
+
+        # 其他进程（各自的缓存实例）持有的共享锁同样生效
+        other_process = VideoCache(cache_dir=str(tmp_path / "videos"), max_bytes=150)
+        assert cache.pin(paths[0])
+        assert other_process.pin(paths[1])
+
+        assert cache.evict() == 1
+        assert cache.get(urls[2]) is None
+        assert cache.get(urls[0]) is not None and cache.get(urls[1]) is not None
+
+        cache.unpin(paths[0])
+        other_process.unpin(paths[1])
+        assert cache.evict() == 1
+        assert cache.total_bytes() == 100
+
+    def test_extracted_audio_counted_and_evicted_with_video(self, tmp_path):
+        """测试提取的音频计入所属视频的大小，不单独淘汰，随视频一起删除"""
+        cache = VideoCache(cache_dir=str(tmp_path / "videos"), max_bytes=250)
+        urls = [f"https://cdn.example.com/audio/{i}.mp4" for i in range(2)]
+        for i, url in enumerate(urls):
+            path = cache._path_for(url)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(b"x" * 100)
+            os.utime(path, (1000 + i, 1000 + i))
+        audio = cache._path_for(urls[1]).with_suffix(".wav")
+        audio.write_bytes(b"a" * 100)
+        os.utime(audio, (900, 900))
+
+        assert cache.total_bytes() == 300
+        assert cache.evict() == 1
+        assert cache.get(urls[0]) is None
+        assert audio.exists()
+
+        cache.max_bytes = 100
+        assert cache.evict() == 1
+        assert not audio.exists()
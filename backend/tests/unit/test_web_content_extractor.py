@@ -0,0 +1,132 @@
+"""
+网页内容提取单元测试
+"""
+import threading
+import uuid
+import httpx
+import pytest
+from unittest.mock import patch
+
+from app.utils import http_client, web_content_extractor
+from app.utils.cache import LayeredCache
+from app.utils.http_client import aclose_http_clients
+from app.utils.web_content_extractor import WebContentExtractor
+
+
+HTML = """
+<html><head><title>秋季穿搭指南</title><meta name="description" content="穿搭描述"></head>
+<body><article><h1>秋季穿搭指南</h1>
+<p>今年秋天流行的连衣裙款式有很多，本文从面料、版型和配色三个方面介绍如何挑选适合自己的连衣裙。</p>
+<p>针织面料适合早晚温差大的天气，搭配一件短款外套就能轻松应对通勤和约会等不同场合。</p>
+</article></body></html>
+"""
+
+
+def _patch_transport(handler):
+    return patch.object(
+        http_client,
+        "_create_client",
+        side_effect=lambda proxy=None: httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+
+
+class TestWebContentExtractor:
+    """网页内容提取测试"""
+
+    @pytest.fixture
+    def extractor(self):
+        extractor = WebContentExtractor()
+        extractor.cache = LayeredCache(f"test-web-{uuid.uuid4()}", use_redis=False)
+        return extractor
+
+    @pytest.mark.asyncio
+    async def test_extract_and_cache(self, extractor: WebContentExtractor):
+        """测试提取内容和元数据，同一URL第二次直接命中缓存"""
+        calls = []
+
+        def handler(request):
+            calls.append(str(request.url))
+            return httpx.Response(200, html=HTML)
+
+        with _patch_transport(handler):
+            first = await extractor.extract_from_url("https://news.example.com/a")
+            second = await extractor.extract_from_url("https://news.example.com/a")
+            await aclose_http_clients()
+
+        assert "连衣裙" in first["content"]
+        assert first["metadata"]["title"] == "秋季穿搭指南"
+        assert first["metadata"]["url"] == "https://news.example.com/a"
+        assert second == first
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_fetch_not_cached(self, extractor: WebContentExtractor):
+        """测试下载失败返回空结果且不缓存"""
+        calls = []
+
+        def handler(request):
+            calls.append(1)
+            return httpx.Response(404)
+
+        with _patch_transport(handler):
+            for _ in range(2):
+                result = await extractor.extract_from_url("https://news.example.com/missing")
+                assert result == {"content": "", "metadata": {}}
+            await aclose_http_clients()
+
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_parse_runs_off_event_loop(self, extractor: WebContentExtractor):
+        """测试HTML解析在线程池中执行"""
+        parse_threads = []
+        original = web_content_extractor._parse_html
+
+        def recording_parse(html, url, include_metadata):
+            parse_threads.append(threading.current_thread().name)
+            return original(html, url, include_metadata)
+
+        with patch.object(web_content_extractor, "_parse_html", side_effect=recording_parse):
+            result = await extractor.extract_from_html(HTML, include_metadata=False)
+
+        assert "连衣裙" in result["content"]
+        assert parse_threads and parse_threads[0].startswith("web_extract")
+
+    @pytest.mark.asyncio
+    async def test_gbk_page_with_meta_charset(self, extractor: WebContentExtractor):
+        """测试只在<meta charset>中声明GBK（响应头没有charset）的网页正确解码"""
+        html = HTML.replace("<head>", '<head><meta charset="gbk">').encode("gbk")
+
+        def handler(request):
+            return httpx.Response(200, headers={"Content-Type": "text/html"}, content=html)
+
+        with _patch_transport(handler):
+            result = await extractor.extract_from_url("https://news.example.com/gbk")
+            await aclose_http_clients()
+
+        assert "连衣裙" in result["content"]
+        assert result["metadata"]["title"] == "秋季穿搭指南"
+
+    @pytest.mark.asyncio
+    async def test_oversized_page_skipped(self, extractor: WebContentExtractor):
+        """测试超过大小上限的网页：声明了Content-Length时不读取正文，未声明时读到上限即停止"""
+        consumed = []
+
+        async def body():
+            for _ in range(100):
+                consumed.append(1)
+                yield b"x" * 1024
+
+        def handler(request):
+            if request.url.path == "/declared":
+                return httpx.Response(200, headers={"Content-Length": str(10 * 1024 * 1024)}, content=b"")
+            return httpx.Response(200, content=body())
+
+        with _patch_transport(handler), \
+             patch.object(web_content_extractor.settings, "WEB_EXTRACT_MAX_BYTES", 4 * 1024):
+            declared = await extractor.extract_from_url("https://news.example.com/declared")
+            streamed = await extractor.extract_from_url("https://news.example.com/streamed")
+            await aclose_http_clients()
+
+        assert declared == streamed == {"content": "", "metadata": {}}
+        assert len(consumed) == 5